@@ -3,6 +3,7 @@
 from typing import List
 from typing import Optional
 
+from ..domain.models import BiosFile
 from ..domain.models import CommandResult
 from ..domain.models import ConnectionError
 from ..domain.models import Controller
@@ -10,9 +11,11 @@ from ..domain.models import EmulatorStatus
 from ..domain.models import ExecutionError
 from ..domain.models import Result
 from ..domain.models import RomDirectory
+from ..domain.models import ThemePage
 from ..domain.models import ValidationError
 from ..domain.ports import ControllerRepository
 from ..domain.ports import EmulatorRepository
+from ..domain.ports import SystemRepository
 
 
 class DetectControllersUseCase:
@@ -276,3 +279,103 @@ class ListRomsUseCase:
                     stderr=str(e),
                 )
             )
+
+
+class CheckBiosUseCase:
+    """Use case for listing BIOS files and verifying their checksums."""
+
+    def __init__(self, system_repository: SystemRepository) -> None:
+        """Initialize with system repository."""
+        self._repository = system_repository
+
+    def execute(
+        self, system_filter: Optional[str] = None, verify_checksums: bool = True
+    ) -> Result[List[BiosFile], ExecutionError]:
+        """List BIOS files, optionally checking them against known-good MD5s.
+
+        Args:
+            system_filter: Optional system name to filter by
+            verify_checksums: Hash the files and compare known checksums
+
+        Returns:
+            Result containing BIOS files sorted by system and name
+        """
+        try:
+            bios_files = self._repository.get_bios_files(
+                verify_checksums=verify_checksums
+            )
+        except Exception as e:
+            return Result.error(
+                ExecutionError(
+                    code="BIOS_CHECK_FAILED",
+                    message="Failed to check BIOS files",
+                    command="check BIOS files",
+                    exit_code=1,
+                    stderr=str(e),
+                )
+            )
+
+        if system_filter is not None:
+            bios_files = [bios for bios in bios_files if bios.system == system_filter]
+        return Result.success(sorted(bios_files, key=lambda b: (b.system, b.name)))
+
+
+class ListThemesUseCase:
+    """Use case for searching and paging the EmulationStation theme catalog."""
+
+    def __init__(self, emulator_repository: EmulatorRepository) -> None:
+        """Initialize with emulator repository."""
+        self._repository = emulator_repository
+
+    def execute(
+        self,
+        query: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> Result[ThemePage, ValidationError | ExecutionError]:
+        """List themes matching a search query, one page at a time.
+
+        Args:
+            query: Optional case-insensitive text matched against theme names
+                and descriptions
+            offset: Number of matching themes to skip
+            limit: Maximum number of themes to return
+
+        Returns:
+            Result containing the requested page and the total match count
+        """
+        if offset < 0 or (limit is not None and limit < 1):
+            return Result.error(
+                ValidationError(
+                    code="INVALID_PAGINATION",
+                    message="Offset must be >= 0 and limit must be >= 1",
+                    details={"offset": str(offset), "limit": str(limit)},
+                )
+            )
+
+        try:
+            themes = self._repository.get_themes()
+        except Exception as e:
+            return Result.error(
+                ExecutionError(
+                    code="THEME_LISTING_FAILED",
+                    message="Failed to list themes",
+                    command="list themes",
+                    exit_code=1,
+                    stderr=str(e),
+                )
+            )
+
+        if query:
+            needle = query.lower()
+            themes = [
+                theme
+                for theme in themes
+                if needle in theme.name.lower()
+                or needle in (theme.description or "").lower()
+            ]
+
+        end = None if limit is None else offset + limit
+        return Result.success(
+            ThemePage(themes=themes[offset:end], total=len(themes), offset=offset)
+        )
@@ -1,9 +1,12 @@
 """Package management use cases for RetroMCP."""
 
+from typing import Dict
 from typing import List
+from typing import Optional
 
 from ..domain.models import CommandResult
 from ..domain.models import ExecutionError
+from ..domain.models import Package
 from ..domain.models import Result
 from ..domain.models import ValidationError
 from ..domain.ports import SystemRepository
@@ -146,3 +149,43 @@ class InstallPackagesUseCase:
         # Only allow alphanumeric characters, hyphens, and underscores
         if not package_name.replace("-", "").replace("_", "").isalnum():
             raise ValueError(f"Invalid package name: {package_name}")
+
+
+class CheckPackagesUseCase:
+    """Use case for checking installed status of system packages."""
+
+    def __init__(self, system_repo: SystemRepository) -> None:
+        """Initialize with system repository."""
+        self._system_repo = system_repo
+
+    def execute(self, packages: List[str]) -> Result[Dict[str, bool], ExecutionError]:
+        """Get installed status for all packages from one package index."""
+        index_result = self._system_repo.get_package_index()
+        if index_result.is_error():
+            return Result.error(index_result.error_value)
+
+        return Result.success(index_result.value.status(packages))
+
+
+class ListPackagesUseCase:
+    """Use case for listing installed system packages."""
+
+    def __init__(self, system_repo: SystemRepository) -> None:
+        """Initialize with system repository."""
+        self._system_repo = system_repo
+
+    def execute(
+        self, prefix: Optional[str] = None
+    ) -> Result[List[Package], ExecutionError]:
+        """List installed packages, optionally filtered by name prefix."""
+        index_result = self._system_repo.get_package_index()
+        if index_result.is_error():
+            return Result.error(index_result.error_value)
+
+        index = index_result.value
+        if prefix:
+            packages = [index.get(name) for name in index.search_prefix(prefix)]
+        else:
+            packages = index.to_packages()
+
+        return Result.success([pkg for pkg in packages if pkg.installed])
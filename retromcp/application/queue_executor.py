@@ -0,0 +1,650 @@
+"""Background execution of command queues.
+
+Queues run as asyncio tasks on the server's event loop instead of inline
+in the tool handler. Each command executes on a worker thread while queue
+state is updated and persisted on the loop, and the pause between
+commands is an interruptible wait, so cancel and skip take effect as soon
+as the current command finishes.
+
+Runs are sequential by default. With a concurrency limit, commands run as
+soon as the earlier commands they depend on are done, so independent steps
+overlap; a failed command blocks only the commands depending on it.
+Trusted queues run sequentially as one remote script (see queue_script)
+instead of one command and channel per step.
+"""
+
+import asyncio
+import contextlib
+import functools
+import logging
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from dataclasses import field
+from datetime import datetime
+from enum import Enum
+from typing import Awaitable
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from ..domain.models import CommandQueue
+from ..domain.models import CommandResult
+from ..domain.models import CommandStatus
+from ..domain.models import QueuedCommand
+from ..domain.models import Result
+from ..domain.models import ValidationError
+from ..domain.ports import CommandOutputRepository
+from ..domain.ports import CommandQueueRepository
+from ..domain.ports import RetroPieClient
+from .queue_script import ScriptEvent
+from .queue_script import build_cancel_command
+from .queue_script import build_queue_script
+from .queue_script import new_marker
+from .queue_script import parse_script_line
+from .queue_script import uses_sudo
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RUN_HISTORY = 20  # Finished runs kept for status lookups
+
+# Output longer than this is spilled to the output store, keeping the
+# head and tail inline
+INLINE_OUTPUT_BYTES = 16 * 1024
+OUTPUT_HEAD_BYTES = 4 * 1024
+OUTPUT_TAIL_BYTES = 4 * 1024
+
+# Called with (commands executed, commands to execute) after each command
+ProgressCallback = Callable[[int, int], Awaitable[None]]
+
+
+class RunState(Enum):
+    """State of a background queue run."""
+
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+@dataclass
+class QueueRun:
+    """Background execution of one queue."""
+
+    id: str
+    queue_id: str
+    total: int
+    state: RunState = RunState.RUNNING
+    executed: int = 0
+    message: str = ""
+    started_at: datetime = field(default_factory=datetime.now)
+    finished_at: Optional[datetime] = None
+    cancel_requested: bool = False
+    script: bool = False  # Running as one remote script, steps cannot be skipped
+    wake: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def is_active(self) -> bool:
+        """Check if the run is still executing."""
+        return self.state is RunState.RUNNING
+
+    def describe(self) -> str:
+        """Format as one status line."""
+        line = (
+            f"Run {self.id}: {self.state.value}, "
+            f"{self.executed}/{self.total} commands executed"
+        )
+        return f"{line} - {self.message}" if self.message else line
+
+
+def cap_output(
+    text: str, outputs: Optional[CommandOutputRepository]
+) -> Tuple[str, Optional[str], int]:
+    """Keep the head and tail of long output and spill the rest to a file.
+
+    Args:
+        text: Full output
+        outputs: Store for the full output, None to keep it inline
+
+    Returns:
+        Text to keep inline, ID of the stored full output or None if it was
+        not stored, and the full output size in bytes
+    """
+    data = text.encode("utf-8", errors="replace")
+    if len(data) <= INLINE_OUTPUT_BYTES or outputs is None:
+        return text, None, len(data)
+    saved = outputs.save(data)
+    if saved.is_error():
+        logger.warning(f"Keeping output inline: {saved.error_value.message}")
+        return text, None, len(data)
+
+    head = data[:OUTPUT_HEAD_BYTES].decode("utf-8", errors="ignore")
+    tail = data[-OUTPUT_TAIL_BYTES:].decode("utf-8", errors="ignore")
+    omitted = len(data) - OUTPUT_HEAD_BYTES - OUTPUT_TAIL_BYTES
+    inline = (
+        f"{head}\n... [{omitted} bytes omitted, full output: {saved.value}] ...\n{tail}"
+    )
+    return inline, saved.value, len(data)
+
+
+def record_command_result(
+    queue: CommandQueue,
+    cmd: QueuedCommand,
+    result: Optional[CommandResult] = None,
+    error: Optional[Exception] = None,
+    outputs: Optional[CommandOutputRepository] = None,
+) -> None:
+    """Apply the outcome of a command and advance the queue past it.
+
+    Args:
+        queue: Queue the command belongs to
+        cmd: Executed command
+        result: Command result, if the command ran
+        error: Exception raised instead of a result
+        outputs: Store for output too long to keep in the queue
+    """
+    cmd.end_time = datetime.now()
+    if error is not None or result is None:
+        cmd.status = CommandStatus.FAILED
+        cmd.error = str(error)
+    else:
+        cmd.result = {"exit_code": result.exit_code}
+        for stream, text in (("stdout", result.stdout), ("stderr", result.stderr)):
+            inline, output_id, size = cap_output(text, outputs)
+            cmd.result[stream] = inline
+            if output_id is not None:
+                cmd.result[f"{stream}_output_id"] = output_id
+                cmd.result[f"{stream}_bytes"] = size
+        cmd.status = CommandStatus.COMPLETED if result.success else CommandStatus.FAILED
+    queue.advance()
+
+
+class QueueExecutor:
+    """Runs command queues in the background and tracks their runs."""
+
+    def __init__(
+        self,
+        client: RetroPieClient,
+        storage: CommandQueueRepository,
+        run_history: int = DEFAULT_RUN_HISTORY,
+        outputs: Optional[CommandOutputRepository] = None,
+        command_wrapper: Optional[Callable[[str], str]] = None,
+    ) -> None:
+        """Initialize executor.
+
+        Args:
+            client: RetroPie client commands run on
+            storage: Queue storage state changes are persisted to
+            run_history: Finished runs kept for status lookups
+            outputs: Store for output too long to keep in the queue
+            command_wrapper: Rewrites each step of a script run, e.g. to
+                throttle heavy commands while a game is running. Other runs
+                go through client.execute_command, which applies its own.
+        """
+        self._client = client
+        self._storage = storage
+        self._outputs = outputs
+        self._command_wrapper = command_wrapper
+        self._run_history = run_history
+        self._runs: OrderedDict[str, QueueRun] = OrderedDict()
+        self._active: Dict[str, QueueRun] = {}
+        # Strong references; the loop keeps only weak ones to tasks
+        self._tasks: Dict[str, asyncio.Task[None]] = {}
+
+    def start(
+        self,
+        queue_id: str,
+        progress: Optional[ProgressCallback] = None,
+        max_parallel: Optional[int] = None,
+    ) -> Result[QueueRun, ValidationError]:
+        """Start executing the pending commands of a queue in the background.
+
+        Must be called from the event loop, e.g. inside a tool handler.
+
+        Args:
+            queue_id: Queue to execute
+            progress: Awaited after each command with progress counts
+            max_parallel: Run commands whose dependencies are done concurrently,
+                up to this many at once. None runs them one by one in order,
+                as one remote script if the queue is trusted.
+
+        Returns:
+            Result containing the new run or ValidationError
+        """
+        if max_parallel is not None and max_parallel < 1:
+            return Result.error(
+                ValidationError(
+                    code="INVALID_CONCURRENCY",
+                    message="max_parallel must be at least 1",
+                )
+            )
+        queue = self._storage.get_queue(queue_id)
+        if queue is None:
+            return Result.error(
+                ValidationError(
+                    code="QUEUE_NOT_FOUND", message=f"Queue not found: {queue_id}"
+                )
+            )
+        active = self._active.get(queue_id)
+        if active is not None:
+            return Result.error(
+                ValidationError(
+                    code="QUEUE_RUNNING",
+                    message=f"Queue {queue_id} is already running as run {active.id}",
+                )
+            )
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return Result.error(
+                ValidationError(
+                    code="NO_EVENT_LOOP",
+                    message="Background execution needs a running event loop",
+                )
+            )
+
+        run = QueueRun(
+            id=f"r{uuid.uuid4().hex[:8]}",
+            queue_id=queue_id,
+            total=sum(
+                1
+                for cmd in queue.commands[queue.current_index :]
+                if cmd.status == CommandStatus.PENDING
+            ),
+            script=queue.trusted and max_parallel is None,
+        )
+        self._active[queue_id] = run
+        self._runs[run.id] = run
+        while len(self._runs) > self._run_history:
+            oldest = next(iter(self._runs.values()))
+            if oldest.is_active:
+                break
+            self._runs.popitem(last=False)
+
+        if run.script:
+            coro = self._run_script(run, queue, progress)
+        elif max_parallel is None:
+            coro = self._run(run, queue, progress)
+        else:
+            coro = self._run_parallel(run, queue, progress, max_parallel)
+        task = loop.create_task(coro)
+        self._tasks[run.id] = task
+        task.add_done_callback(lambda _task: self._tasks.pop(run.id, None))
+        return Result.success(run)
+
+    def get_run(self, run_id: str) -> Optional[QueueRun]:
+        """Get a run by ID."""
+        return self._runs.get(run_id)
+
+    def active_run(self, queue_id: str) -> Optional[QueueRun]:
+        """Get the run executing a queue, if any."""
+        return self._active.get(queue_id)
+
+    def latest_run(self, queue_id: str) -> Optional[QueueRun]:
+        """Get the most recent run of a queue, active or finished."""
+        for run in reversed(self._runs.values()):
+            if run.queue_id == queue_id:
+                return run
+        return None
+
+    def cancel(self, queue_id: str) -> Optional[QueueRun]:
+        """Stop a queue's run once its current command finishes.
+
+        Returns:
+            The run being cancelled, or None if the queue is not running
+        """
+        run = self._active.get(queue_id)
+        if run is not None:
+            run.cancel_requested = True
+            run.wake.set()
+        return run
+
+    def cancel_all(self) -> List[QueueRun]:
+        """Stop every active run once its current command finishes.
+
+        Returns:
+            The runs being cancelled
+        """
+        return [
+            run
+            for run in (self.cancel(queue_id) for queue_id in list(self._active))
+            if run is not None
+        ]
+
+    def wake(self, queue_id: str) -> None:
+        """End the pause between commands early, e.g. after a skip."""
+        run = self._active.get(queue_id)
+        if run is not None:
+            run.wake.set()
+
+    async def wait(self, run_id: str) -> Optional[QueueRun]:
+        """Wait for a run to finish.
+
+        Returns:
+            The finished run, or None if unknown
+        """
+        task = self._tasks.get(run_id)
+        if task is not None:
+            await asyncio.shield(task)
+        return self._runs.get(run_id)
+
+    async def _run(
+        self,
+        run: QueueRun,
+        queue: CommandQueue,
+        progress: Optional[ProgressCallback],
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while not run.cancel_requested:
+                cmd = queue.get_next_pending()
+                if cmd is None:
+                    break
+
+                cmd.status = CommandStatus.RUNNING
+                cmd.start_time = datetime.now()
+                await self._save(run.queue_id, queue)
+                try:
+                    result = await loop.run_in_executor(
+                        None, self._client.execute_command, cmd.command
+                    )
+                    await self._record(queue, cmd, result)
+                except Exception as e:
+                    record_command_result(queue, cmd, error=e)
+                run.executed += 1
+                await self._save(run.queue_id, queue)
+                await self._report(progress, run)
+
+                if cmd.status == CommandStatus.FAILED:
+                    run.state = RunState.FAILED
+                    run.message = f"stopped at failed command: {cmd.description}"
+                    return
+
+                if queue.pause_between > 0 and queue.get_next_pending():
+                    run.wake.clear()
+                    with contextlib.suppress(asyncio.TimeoutError):
+                        await asyncio.wait_for(run.wake.wait(), queue.pause_between)
+
+            blocked = queue.get_blocked()
+            if run.cancel_requested:
+                run.state = RunState.CANCELLED
+            elif blocked:
+                # Left behind by a failed dependency, e.g. from a parallel run
+                run.state = RunState.FAILED
+                run.message = f"{len(blocked)} blocked by failed dependencies"
+            else:
+                run.state = RunState.COMPLETED
+        except Exception as e:
+            logger.error(f"Queue run {run.id} failed: {e}", exc_info=True)
+            run.state = RunState.FAILED
+            run.message = str(e)
+        finally:
+            run.finished_at = datetime.now()
+            self._active.pop(run.queue_id, None)
+
+    async def _run_parallel(
+        self,
+        run: QueueRun,
+        queue: CommandQueue,
+        progress: Optional[ProgressCallback],
+        max_parallel: int,
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        running: Dict[asyncio.Future[CommandResult], QueuedCommand] = {}
+        failed = []
+        try:
+            while True:
+                if not run.cancel_requested:
+                    started = False
+                    for cmd in queue.get_ready():
+                        if len(running) >= max_parallel:
+                            break
+                        cmd.status = CommandStatus.RUNNING
+                        cmd.start_time = datetime.now()
+                        future = loop.run_in_executor(
+                            None, self._client.execute_command, cmd.command
+                        )
+                        running[future] = cmd
+                        started = True
+                    if started:
+                        await self._save(run.queue_id, queue)
+                if not running:
+                    break
+
+                done, _ = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED
+                )
+                for future in done:
+                    cmd = running.pop(future)
+                    try:
+                        await self._record(queue, cmd, future.result())
+                    except Exception as e:
+                        record_command_result(queue, cmd, error=e)
+                    if cmd.status == CommandStatus.FAILED:
+                        failed.append(cmd)
+                    run.executed += 1
+                await self._save(run.queue_id, queue)
+                await self._report(progress, run)
+
+            if failed:
+                blocked = sum(
+                    1 for cmd in queue.commands if cmd.status == CommandStatus.PENDING
+                )
+                run.state = RunState.FAILED
+                run.message = f"{len(failed)} failed: " + ", ".join(
+                    cmd.description for cmd in failed
+                )
+                if blocked and not run.cancel_requested:
+                    run.message += f"; {blocked} blocked by failed dependencies"
+            elif run.cancel_requested:
+                run.state = RunState.CANCELLED
+            else:
+                run.state = RunState.COMPLETED
+        except Exception as e:
+            logger.error(f"Queue run {run.id} failed: {e}", exc_info=True)
+            run.state = RunState.FAILED
+            run.message = str(e)
+        finally:
+            run.finished_at = datetime.now()
+            self._active.pop(run.queue_id, None)
+
+    async def _run_script(
+        self,
+        run: QueueRun,
+        queue: CommandQueue,
+        progress: Optional[ProgressCallback],
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        # The script stops at the first failure, so a step may depend on
+        # earlier steps; commands behind a failed dependency stay pending
+        done = {
+            cmd.id
+            for cmd in queue.commands
+            if cmd.status in (CommandStatus.COMPLETED, CommandStatus.SKIPPED)
+        }
+        steps = []
+        for cmd in queue.commands[queue.current_index :]:
+            if cmd.status == CommandStatus.PENDING and all(
+                dep in done for dep in cmd.depends_on
+            ):
+                steps.append(cmd)
+                done.add(cmd.id)
+        marker = new_marker()
+        lines: asyncio.Queue[object] = asyncio.Queue()
+        pgid: Optional[int] = None
+
+        def pump(script: str) -> None:
+            """Read the script's output on a worker thread."""
+            try:
+                for line in self._client.stream_command(script):
+                    loop.call_soon_threadsafe(lines.put_nowait, line)
+            except Exception as e:
+                loop.call_soon_threadsafe(lines.put_nowait, e)
+            finally:
+                loop.call_soon_threadsafe(lines.put_nowait, None)
+
+        async def kill_on_cancel() -> None:
+            while not run.cancel_requested:
+                run.wake.clear()
+                await run.wake.wait()
+            if pgid is not None:
+                # Steps run with sudo leave root processes in the group
+                as_root = current is not None and uses_sudo(current.command)
+                await loop.run_in_executor(
+                    None,
+                    self._client.execute_command,
+                    build_cancel_command(pgid),
+                    as_root,
+                )
+
+        reader: Optional[asyncio.Future[None]] = None
+        killer: Optional[asyncio.Task[None]] = None
+        current: Optional[QueuedCommand] = None
+        out: List[str] = []
+        err: List[str] = []
+        stray: List[str] = []  # Lines outside any marker, e.g. shell errors
+        finished = False
+        try:
+            # Wrapping may probe for a running game over SSH
+            commands = await loop.run_in_executor(
+                None, lambda: [self._wrap(cmd.command) for cmd in steps]
+            )
+            command = build_queue_script(marker, commands, queue.pause_between)
+            reader = loop.run_in_executor(None, pump, command)
+            while True:
+                item = await lines.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                event = parse_script_line(marker, str(item))
+                if event is None:
+                    if str(item).strip():
+                        stray.append(str(item).strip())
+                    continue
+                if event.kind == "done":
+                    finished = True
+                elif event.kind == "pgid":
+                    pgid = event.value
+                    killer = loop.create_task(kill_on_cancel())
+                elif event.kind == "start" and event.step < len(steps):
+                    current, out, err = steps[event.step], [], []
+                    if current.status == CommandStatus.PENDING:
+                        current.status = CommandStatus.RUNNING
+                        current.start_time = datetime.now()
+                        await self._save(run.queue_id, queue)
+                elif event.kind == "out":
+                    out.append(event.text)
+                elif event.kind == "err":
+                    err.append(event.text)
+                elif event.kind == "end" and current is not None:
+                    if current.status == CommandStatus.RUNNING:
+                        await self._record(
+                            queue, current, self._step_result(current, event, out, err)
+                        )
+                        run.executed += 1
+                        await self._save(run.queue_id, queue)
+                        await self._report(progress, run)
+                        if current.status == CommandStatus.FAILED:
+                            run.state = RunState.FAILED
+                            run.message = (
+                                f"stopped at failed command: {current.description}"
+                            )
+                    current = None
+
+            if current is not None and current.status == CommandStatus.RUNNING:
+                # The script was killed or the connection dropped mid-step
+                current.status = (
+                    CommandStatus.CANCELLED
+                    if run.cancel_requested
+                    else CommandStatus.FAILED
+                )
+                current.error = "Script ended before the command finished"
+                current.end_time = datetime.now()
+                await self._save(run.queue_id, queue)
+            unfinished = any(
+                cmd.status in (CommandStatus.PENDING, CommandStatus.RUNNING)
+                for cmd in steps
+            )
+            if run.state is RunState.RUNNING:
+                if run.cancel_requested:
+                    run.state = RunState.CANCELLED
+                elif not finished or unfinished:
+                    # The script broke or was cut off; its exit status never
+                    # reaches the stream, the missing done marker does
+                    run.state = RunState.FAILED
+                    run.message = "script ended before all commands ran"
+                    if stray:
+                        run.message += ": " + " | ".join(stray[-3:])
+                elif queue.get_blocked():
+                    run.state = RunState.FAILED
+                    run.message = (
+                        f"{len(queue.get_blocked())} blocked by failed dependencies"
+                    )
+                else:
+                    run.state = RunState.COMPLETED
+        except Exception as e:
+            logger.error(f"Queue run {run.id} failed: {e}", exc_info=True)
+            run.state = RunState.FAILED
+            run.message = str(e)
+        finally:
+            if killer is not None:
+                killer.cancel()
+            if reader is not None:
+                await asyncio.gather(reader, return_exceptions=True)
+            run.finished_at = datetime.now()
+            self._active.pop(run.queue_id, None)
+
+    def _wrap(self, command: str) -> str:
+        if self._command_wrapper is None:
+            return command
+        return self._command_wrapper(command)
+
+    @staticmethod
+    def _step_result(
+        cmd: QueuedCommand, event: ScriptEvent, out: List[str], err: List[str]
+    ) -> CommandResult:
+        """Build the result of a step from its end marker and output."""
+        elapsed = (datetime.now() - cmd.start_time).total_seconds()
+        return CommandResult(
+            command=cmd.command,
+            exit_code=event.value,
+            stdout="\n".join(out).strip(),
+            stderr="\n".join(err).strip(),
+            success=event.value == 0,
+            execution_time=elapsed,
+        )
+
+    async def _record(
+        self, queue: CommandQueue, cmd: QueuedCommand, result: CommandResult
+    ) -> None:
+        """Apply a command result on a worker thread; long output is stored."""
+        await asyncio.get_running_loop().run_in_executor(
+            None,
+            functools.partial(
+                record_command_result, queue, cmd, result, outputs=self._outputs
+            ),
+        )
+
+    async def _save(self, queue_id: str, queue: CommandQueue) -> None:
+        """Persist a queue on a worker thread; storage writes may fsync."""
+        result = await asyncio.get_running_loop().run_in_executor(
+            None, self._storage.update_queue, queue_id, queue
+        )
+        if result.is_error():
+            logger.warning(
+                f"Failed to save queue {queue_id}: {result.error_value.message}"
+            )
+
+    async def _report(
+        self, progress: Optional[ProgressCallback], run: QueueRun
+    ) -> None:
+        if progress is None:
+            return
+        try:
+            await progress(run.executed, run.total)
+        except Exception as e:
+            # The client may have gone away; polling still works
+            logger.debug(f"Progress notification for run {run.id} failed: {e}")
@@ -0,0 +1,132 @@
+"""Remote script for running a trusted queue over one channel.
+
+Each queued command normally costs its own SSH channel and round trip.
+A trusted queue is instead shipped as one shell script that runs the
+commands in order in a new process group. Around each step the script
+prints marker lines carrying the step number and exit code, and the
+step's output framed line by line, so results arrive over a single
+stream and cannot be confused with markers. A final "done" marker
+tells a script that ran to the end apart from one that broke or was cut
+off before it. Cancelling signals the whole process group.
+"""
+
+import re
+import shlex
+import uuid
+from dataclasses import dataclass
+from typing import List
+from typing import Optional
+
+# Marker prefix; a random token per run is appended
+MARKER_PREFIX = "@@retromcp"
+
+# sudo at the start of any command in a pipeline or list
+SUDO_PATTERN = re.compile(r"(?:^|[;&|(]\s*)sudo\b")
+
+
+@dataclass(frozen=True)
+class ScriptEvent:
+    """One marker line printed by a queue script.
+
+    kind is "pgid" (value holds the process group ID), "start" or "end"
+    of a step, "out"/"err" (text holds one line of step output), or
+    "done" once every step has run.
+    """
+
+    kind: str
+    step: int = 0
+    value: int = 0
+    text: str = ""
+
+
+def new_marker() -> str:
+    """Create a marker unique to one run."""
+    return f"{MARKER_PREFIX}:{uuid.uuid4().hex}"
+
+
+def build_queue_script(marker: str, commands: List[str], pause_between: int = 0) -> str:
+    """Build the command running a list of commands as one script.
+
+    Steps run in a subshell each with stdin closed, so an ``exit`` or a
+    prompt cannot take over the script. The script stops after the first
+    failed step, like a sequential run. Errors of the script itself, e.g.
+    a missing ``setsid``, go to stdout so they reach the reader.
+
+    Args:
+        marker: Marker from new_marker()
+        commands: Shell commands, in order
+        pause_between: Seconds to sleep between steps
+
+    Returns:
+        Command starting the script in a new session and process group
+    """
+    quoted = shlex.quote(marker)
+    lines = [
+        f"M={quoted}",
+        "T=$(mktemp -d) || exit 1",
+        "trap 'rm -rf \"$T\"' EXIT",
+        "trap 'exit 143' TERM INT HUP",
+        'printf \'%s pgid %s\\n\' "$M" "$$"',
+    ]
+    for step, command in enumerate(commands):
+        if step and pause_between > 0:
+            lines.append(f"sleep {int(pause_between)}")
+        lines.extend(
+            [
+                f"printf '%s start {step}\\n' \"$M\"",
+                f'( {command}\n) >"$T/out" 2>"$T/err" </dev/null',
+                "rc=$?",
+                'awk -v p="$M out " \'{print p $0}\' "$T/out"',
+                'awk -v p="$M err " \'{print p $0}\' "$T/err"',
+                f'printf \'%s end {step} %s\\n\' "$M" "$rc"',
+                '[ "$rc" -eq 0 ] || exit "$rc"',
+            ]
+        )
+    lines.append("printf '%s done\\n' \"$M\"")
+    script = "\n".join(lines)
+    return f"setsid sh -c {shlex.quote(script)} 2>&1"
+
+
+def parse_script_line(marker: str, line: str) -> Optional[ScriptEvent]:
+    """Parse a line printed by a queue script.
+
+    Args:
+        marker: Marker the script was built with
+        line: Output line without its newline
+
+    Returns:
+        The event, or None for lines that are not markers
+    """
+    if not line.startswith(marker + " "):
+        return None
+    kind, _, rest = line[len(marker) + 1 :].partition(" ")
+    try:
+        if kind in ("out", "err"):
+            return ScriptEvent(kind=kind, text=rest)
+        if kind == "done":
+            return ScriptEvent(kind=kind)
+        if kind == "pgid":
+            return ScriptEvent(kind=kind, value=int(rest))
+        if kind == "start":
+            return ScriptEvent(kind=kind, step=int(rest))
+        if kind == "end":
+            step, _, exit_code = rest.partition(" ")
+            return ScriptEvent(kind=kind, step=int(step), value=int(exit_code))
+    except ValueError:
+        pass
+    return None
+
+
+def uses_sudo(command: str) -> bool:
+    """Check if a step runs anything as root.
+
+    Processes started with sudo belong to root, so the login user cannot
+    signal them and cancelling has to kill the process group with sudo.
+    """
+    return SUDO_PATTERN.search(command) is not None
+
+
+def build_cancel_command(pgid: int) -> str:
+    """Build the command stopping a queue script and the step it runs."""
+    # Plain POSIX form; dash's kill does not accept "--"
+    return f"kill -TERM -{int(pgid)}"
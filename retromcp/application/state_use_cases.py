@@ -1,8 +1,20 @@
 """State management use cases for RetroMCP."""
 
+import json
+import time
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from dataclasses import replace
 from datetime import datetime
 from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
 from typing import Optional
+from typing import Set
+from typing import Tuple
 
 from ..domain.models import ConnectionError
 from ..domain.models import EmulatorStatus
@@ -17,6 +29,39 @@ from ..domain.ports import ControllerRepository
 from ..domain.ports import EmulatorRepository
 from ..domain.ports import StateRepository
 from ..domain.ports import SystemRepository
+from .state_watcher import DEFAULT_WATCH_INTERVAL
+from .state_watcher import StateFieldWatcher
+
+# Bounded fan-out for state collection; one worker per section by default
+DEFAULT_STATE_WORKERS = 5
+DEFAULT_SECTION_TIMEOUT = 45.0  # seconds
+
+# Collectors each watchable top-level state field is built from
+STATE_FIELD_SOURCES: Dict[str, Tuple[str, ...]] = {
+    "system": ("system",),
+    "emulators": ("emulators",),
+    "controllers": ("controllers",),
+    "roms": ("roms",),
+    "hardware": ("inventory",),
+    "network": ("inventory",),
+    "software": ("inventory",),
+    "services": ("inventory",),
+}
+
+_MISSING = object()
+
+
+def _resolve_path(document: Any, path: str) -> Any:  # noqa: ANN401
+    """Get the value at a dotted path, or _MISSING if it does not exist."""
+    value = document
+    for part in path.split("."):
+        if isinstance(value, dict) and part in value:
+            value = value[part]
+        elif isinstance(value, list) and part.isdigit() and int(part) < len(value):
+            value = value[int(part)]
+        else:
+            return _MISSING
+    return value
 
 
 class ManageStateUseCase:
@@ -28,12 +73,38 @@ class ManageStateUseCase:
         system_repository: SystemRepository,
         emulator_repository: EmulatorRepository,
         controller_repository: ControllerRepository,
+        max_workers: int = DEFAULT_STATE_WORKERS,
+        section_timeout: float = DEFAULT_SECTION_TIMEOUT,
+        watch_interval: float = DEFAULT_WATCH_INTERVAL,
+        run_background: Optional[Callable[[Callable[[], None]], object]] = None,
     ) -> None:
-        """Initialize with required repositories."""
+        """Initialize with required repositories.
+
+        Args:
+            state_repository: State storage
+            system_repository: System information source
+            emulator_repository: Emulator and ROM source
+            controller_repository: Controller source
+            max_workers: Maximum number of state sections collected at once
+            section_timeout: Seconds each section may run before it is left
+                out of the state
+            watch_interval: Seconds between samples of watched fields
+            run_background: Runs the periodic watch sample; may defer it,
+                e.g. while a game is running. Defaults to running it now.
+        """
         self._state_repository = state_repository
         self._system_repository = system_repository
         self._emulator_repository = emulator_repository
         self._controller_repository = controller_repository
+        self._max_workers = max_workers
+        self._section_timeout = section_timeout
+        self._watcher = StateFieldWatcher(
+            self._sample_fields, interval=watch_interval, run_background=run_background
+        )
+
+    def stop(self) -> None:
+        """Stop sampling watched fields."""
+        self._watcher.stop()
 
     def execute(
         self, request: StateManagementRequest
@@ -49,9 +120,19 @@ class ManageStateUseCase:
             elif request.action == StateAction.UPDATE:
                 return self._update_state(request.path, request.value)
             elif request.action == StateAction.COMPARE:
-                return self._compare_state()
+                return self._compare_state(request.since)
             elif request.action == StateAction.EXPORT:
                 return self._export_state()
+            elif request.action == StateAction.DIFF:
+                return self._diff_states(
+                    request.other_state_data, request.since, request.until
+                )
+            elif request.action == StateAction.HISTORY:
+                return self._list_history(request.since, request.until)
+            elif request.action == StateAction.WATCH:
+                return self._watch_field(request.path)
+            elif request.action == StateAction.UNWATCH:
+                return self._unwatch_field(request.path)
             else:
                 return Result.error(
                     ValidationError(
@@ -111,26 +192,85 @@ class ManageStateUseCase:
             return state_result
 
         state = state_result.value
+        previous_state = self._load_previous_state()
+        if previous_state is not None and previous_state.notes:
+            state = replace(state, notes=previous_state.notes)
 
         # Save to repository
         return Result.success(self._state_repository.save_state(state))
 
     def _build_current_state(
-        self,
+        self, fields: Optional[Set[str]] = None
     ) -> Result[SystemState, ConnectionError | ExecutionError]:
-        """Build current system state by scanning the system."""
+        """Build current system state by scanning the system.
+
+        Sections are collected concurrently. A section that exceeds the
+        section timeout is left empty and recorded in ``known_issues``.
+
+        Args:
+            fields: Top-level state fields to collect; all when not given.
+                Other fields are left empty.
+        """
+        collectors: Dict[str, Callable[[], Any]] = {
+            "system": self._system_repository.get_system_info,
+            "emulators": self._emulator_repository.get_emulators,
+            "controllers": self._controller_repository.detect_controllers,
+            "roms": self._emulator_repository.get_rom_directories,
+            "inventory": self._system_repository.get_system_inventory,
+        }
+        if fields is not None:
+            needed = {
+                source for field in fields for source in STATE_FIELD_SOURCES[field]
+            }
+            collectors = {
+                name: collector
+                for name, collector in collectors.items()
+                if name in needed
+            }
+        results, timed_out = self._collect_sections(collectors)
+        known_issues = [
+            f"State section '{name}' timed out after {self._section_timeout:g}s; "
+            "data is incomplete"
+            for name in timed_out
+        ]
+
         # Get system info
-        system_info_result = self._system_repository.get_system_info()
-        if isinstance(system_info_result, Result):
-            if system_info_result.is_error():
-                return system_info_result  # Return the error
-            system_info = system_info_result.value
-        else:
-            # Backward compatibility for repositories not yet returning Result
-            system_info = system_info_result
+        system: Dict[str, Any] = {}
+        if "system" in results:
+            system_info_result = results["system"]
+            if isinstance(system_info_result, Result):
+                if system_info_result.is_error():
+                    return system_info_result  # Return the error
+                system_info = system_info_result.value
+            else:
+                # Backward compatibility for repositories not yet returning Result
+                system_info = system_info_result
+            system = {
+                "hostname": system_info.hostname,
+                "cpu_temperature": system_info.cpu_temperature,
+                "memory_total": system_info.memory_total,
+                "memory_used": system_info.memory_used,
+                "memory_free": system_info.memory_free,
+                "disk_total": system_info.disk_total,
+                "disk_used": system_info.disk_used,
+                "disk_free": system_info.disk_free,
+                "load_average": system_info.load_average,
+                "uptime": system_info.uptime,
+            }
+
+        # Get hardware, network, software and services from the inventory pass
+        inventory = None
+        inventory_result = results.get("inventory")
+        if isinstance(inventory_result, Result):
+            if inventory_result.is_error():
+                known_issues.append(
+                    f"Inventory collection failed: {inventory_result.error_value.message}"
+                )
+            else:
+                inventory = inventory_result.value
 
         # Get emulators
-        emulators = self._emulator_repository.get_emulators()
+        emulators = results.get("emulators", [])
         installed_emulators = [
             e.name for e in emulators if e.status == EmulatorStatus.INSTALLED
         ]
@@ -146,7 +286,7 @@ class ManageStateUseCase:
                 preferred[emulator.system] = emulator.name
 
         # Get controllers
-        controllers = self._controller_repository.detect_controllers()
+        controllers = results.get("controllers", [])
         controller_data = [
             {
                 "type": c.controller_type.value,
@@ -157,7 +297,7 @@ class ManageStateUseCase:
         ]
 
         # Get ROM directories
-        rom_dirs = self._emulator_repository.get_rom_directories()
+        rom_dirs = results.get("roms", [])
         rom_systems = [d.system for d in rom_dirs]
         rom_counts = {d.system: d.rom_count for d in rom_dirs}
 
@@ -165,18 +305,7 @@ class ManageStateUseCase:
         state = SystemState(
             schema_version="2.0",
             last_updated=datetime.now().isoformat(),
-            system={
-                "hostname": system_info.hostname,
-                "cpu_temperature": system_info.cpu_temperature,
-                "memory_total": system_info.memory_total,
-                "memory_used": system_info.memory_used,
-                "memory_free": system_info.memory_free,
-                "disk_total": system_info.disk_total,
-                "disk_used": system_info.disk_used,
-                "disk_free": system_info.disk_free,
-                "load_average": system_info.load_average,
-                "uptime": system_info.uptime,
-            },
+            system=system,
             emulators={
                 "installed": installed_emulators,
                 "preferred": preferred,
@@ -187,16 +316,173 @@ class ManageStateUseCase:
                 "counts": rom_counts,
             },
             custom_configs=[],  # TODO: Detect custom configs
-            known_issues=[],  # TODO: Detect known issues
-            # v2.0 enhanced fields - TODO: populate from enhanced data collection
-            hardware=None,  # Will be populated when enhanced data collection is implemented
-            network=None,  # Will be populated when enhanced data collection is implemented
-            software=None,  # Will be populated when enhanced data collection is implemented
-            services=None,  # Will be populated when enhanced data collection is implemented
-            notes=None,  # Will be populated when enhanced data collection is implemented
+            known_issues=known_issues,
+            hardware=inventory.hardware if inventory else None,
+            network=inventory.network if inventory else None,
+            software=inventory.software if inventory else None,
+            services=inventory.services if inventory else None,
+            # Notes are user-authored and carried over when the state is saved
+            notes=None,
         )
         return Result.success(state)
 
+    def _watch_field(
+        self, path: Optional[str]
+    ) -> Result[
+        StateManagementResult, ValidationError | ConnectionError | ExecutionError
+    ]:
+        """Start watching a field, or report its changes since the last call."""
+        field = path.split(".")[0] if path else ""
+        if field not in STATE_FIELD_SOURCES:
+            return Result.error(
+                ValidationError(
+                    code="INVALID_WATCH_PATH",
+                    message=f"Cannot watch path: {path}",
+                    details={"path": path, "fields": sorted(STATE_FIELD_SOURCES)},
+                )
+            )
+
+        if self._watcher.is_watching(path):
+            value, changes = self._watcher.watch(path, None)
+            message = f"{len(changes)} change(s) to {path} since last check"
+        else:
+            state_result = self._build_current_state({field})
+            if state_result.is_error():
+                return state_result
+            value = _resolve_path(json.loads(state_result.value.to_json()), path)
+            if value is _MISSING:
+                return Result.error(
+                    ValidationError(
+                        code="INVALID_WATCH_PATH",
+                        message=f"Invalid path: {path}",
+                        details={"path": path},
+                    )
+                )
+            value, changes = self._watcher.watch(path, value)
+            message = f"Watch started for {path}"
+
+        return Result.success(
+            StateManagementResult(
+                success=True,
+                action=StateAction.WATCH,
+                message=message,
+                watch_value=value,
+                changes=changes,
+            )
+        )
+
+    def _unwatch_field(
+        self, path: Optional[str]
+    ) -> Result[StateManagementResult, ValidationError]:
+        """Stop watching a field."""
+        if not path or not self._watcher.unwatch(path):
+            return Result.error(
+                ValidationError(
+                    code="NOT_WATCHED",
+                    message=f"Path is not watched: {path}",
+                    details={"path": path, "watched": self._watcher.watched_paths},
+                )
+            )
+        return Result.success(
+            StateManagementResult(
+                success=True,
+                action=StateAction.UNWATCH,
+                message=f"Stopped watching {path}",
+            )
+        )
+
+    def _sample_fields(self, paths: Set[str]) -> Dict[str, Any]:
+        """Collect the current value of watched paths from their sources only."""
+        state_result = self._build_current_state({p.split(".")[0] for p in paths})
+        if state_result.is_error():
+            raise RuntimeError(state_result.error_value.message)
+        document = json.loads(state_result.value.to_json())
+        values = {}
+        for path in paths:
+            value = _resolve_path(document, path)
+            values[path] = None if value is _MISSING else value
+        return values
+
+    def _load_previous_state(self) -> Optional[SystemState]:
+        """Load the stored state, or None if there is no usable one."""
+        try:
+            previous_state = self._state_repository.load_state()
+        except (FileNotFoundError, ValueError):
+            return None
+        return previous_state if isinstance(previous_state, SystemState) else None
+
+    def _collect_sections(
+        self, sections: Dict[str, Callable[[], Any]]
+    ) -> Tuple[Dict[str, Any], List[str]]:
+        """Run state collectors concurrently under per-section timeouts.
+
+        Each section's timeout starts when a worker picks it up. Sections still
+        queued when no section makes progress for a full timeout are treated as
+        timed out too, so collection always finishes. Exceptions raised by a
+        collector propagate to the caller.
+
+        Args:
+            sections: Section name -> collector
+
+        Returns:
+            Tuple of (section name -> collected value, timed out section names)
+        """
+        started: Dict[str, float] = {}
+
+        def run(name: str, collector: Callable[[], Any]) -> Any:  # noqa: ANN401
+            started[name] = time.monotonic()
+            return collector()
+
+        executor = ThreadPoolExecutor(
+            max_workers=self._max_workers, thread_name_prefix="state-section"
+        )
+        futures: Dict[Future, str] = {
+            executor.submit(run, name, collector): name
+            for name, collector in sections.items()
+        }
+        pending: Set[Future] = set(futures)
+        timed_out: List[str] = []
+        try:
+            while pending:
+                now = time.monotonic()
+                deadlines = {
+                    future: started[futures[future]] + self._section_timeout
+                    for future in pending
+                    if futures[future] in started
+                }
+                for future, deadline in deadlines.items():
+                    if now >= deadline and not future.done():
+                        pending.discard(future)
+                        timed_out.append(futures[future])
+
+                if not pending:
+                    break
+                wait_time = (
+                    min(deadline - now for deadline in deadlines.values())
+                    if deadlines
+                    else self._section_timeout
+                )
+                done, _ = wait(
+                    pending, timeout=max(wait_time, 0), return_when=FIRST_COMPLETED
+                )
+                if not done and not deadlines:
+                    # Queued behind hung sections with no progress
+                    for future in pending:
+                        future.cancel()
+                        timed_out.append(futures[future])
+                    pending.clear()
+                pending -= done
+        finally:
+            # Timed out collectors cannot be interrupted; let them finish alone
+            executor.shutdown(wait=False)
+
+        results = {
+            name: future.result()
+            for future, name in futures.items()
+            if name not in timed_out
+        }
+        return results, sorted(timed_out, key=list(sections).index)
+
     def _update_state(
         self, path: Optional[str], value: Any
     ) -> Result[StateManagementResult, ValidationError]:
@@ -216,14 +502,18 @@ class ManageStateUseCase:
         return Result.success(self._state_repository.update_state_field(path, value))
 
     def _compare_state(
-        self,
+        self, since: Optional[str] = None
     ) -> Result[
         StateManagementResult, ValidationError | ConnectionError | ExecutionError
     ]:
-        """Compare current state with stored state."""
+        """Compare current state with stored state, or the state as of since."""
         try:
             # Load stored state
-            self._state_repository.load_state()
+            if since:
+                baseline = self._state_repository.load_state_at(since)
+            else:
+                baseline = None
+                self._state_repository.load_state()
 
             # Get current state
             current_state_result = self._build_current_state()
@@ -233,7 +523,10 @@ class ManageStateUseCase:
             current_state = current_state_result.value
 
             # Compare states
-            diff = self._state_repository.compare_state(current_state)
+            if baseline is not None:
+                diff = self._state_repository.compare_state(current_state, baseline)
+            else:
+                diff = self._state_repository.compare_state(current_state)
 
             result = StateManagementResult(
                 success=True,
@@ -247,10 +540,102 @@ class ManageStateUseCase:
                 ValidationError(
                     code="NO_STORED_STATE",
                     message="No stored state to compare against",
-                    details={"action": StateAction.COMPARE.value},
+                    details={"action": StateAction.COMPARE.value, "since": since},
+                )
+            )
+        except ValueError as e:
+            return Result.error(
+                ValidationError(
+                    code="INVALID_TIMESTAMP",
+                    message=str(e),
+                    details={"since": since},
+                )
+            )
+
+    def _diff_states(
+        self,
+        other_state_data: Optional[str],
+        since: Optional[str],
+        until: Optional[str],
+    ) -> Result[StateManagementResult, ValidationError]:
+        """Diff stored state with another state, or two points in the history.
+
+        With ``since``, the state saved as of ``since`` is compared with the
+        state saved as of ``until``, or the stored state if ``until`` is not
+        given.
+        """
+        if other_state_data:
+            other_state = SystemState.from_json(other_state_data)
+            return Result.success(self._state_repository.diff_states(other_state))
+        if not since:
+            return Result.error(
+                ValidationError(
+                    code="MISSING_DIFF_PARAMS",
+                    message="other_state_data or since required for diff",
+                    details={"action": StateAction.DIFF.value},
+                )
+            )
+
+        try:
+            baseline = self._state_repository.load_state_at(since)
+            target = (
+                self._state_repository.load_state_at(until)
+                if until
+                else self._state_repository.load_state()
+            )
+        except FileNotFoundError as e:
+            return Result.error(
+                ValidationError(
+                    code="NO_STORED_STATE",
+                    message=str(e),
+                    details={"since": since, "until": until},
+                )
+            )
+        except ValueError as e:
+            return Result.error(
+                ValidationError(
+                    code="INVALID_TIMESTAMP",
+                    message=str(e),
+                    details={"since": since, "until": until},
+                )
+            )
+
+        return Result.success(
+            StateManagementResult(
+                success=True,
+                action=StateAction.DIFF,
+                message=(
+                    f"State diff from {baseline.last_updated} "
+                    f"to {target.last_updated} completed"
+                ),
+                diff=self._state_repository.compare_state(target, baseline),
+            )
+        )
+
+    def _list_history(
+        self, since: Optional[str], until: Optional[str]
+    ) -> Result[StateManagementResult, ValidationError]:
+        """List saved states within a time range."""
+        try:
+            history = self._state_repository.list_history(since, until)
+        except ValueError as e:
+            return Result.error(
+                ValidationError(
+                    code="INVALID_TIMESTAMP",
+                    message=str(e),
+                    details={"since": since, "until": until},
                 )
             )
 
+        return Result.success(
+            StateManagementResult(
+                success=True,
+                action=StateAction.HISTORY,
+                message=f"Found {len(history)} saved state(s)",
+                history=history,
+            )
+        )
+
     def _export_state(
         self,
     ) -> Result[
@@ -0,0 +1,187 @@
+"""Background sampler for watched state fields."""
+
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any
+from typing import Callable
+from typing import Deque
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+from ..domain.models import StateChange
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WATCH_INTERVAL = 30.0  # seconds
+DEFAULT_MAX_CHANGES = 100  # buffered changes per watched path
+
+
+class StateFieldWatcher:
+    """Samples watched state paths on a daemon thread and records changes.
+
+    One sampler serves every watched path, so repeated ``watch`` calls read
+    buffered changes from memory instead of scanning the system again. The
+    thread starts with the first watch and exits when the last one is
+    removed.
+    """
+
+    def __init__(
+        self,
+        sample: Callable[[Set[str]], Dict[str, Any]],
+        interval: float = DEFAULT_WATCH_INTERVAL,
+        max_changes: int = DEFAULT_MAX_CHANGES,
+        run_background: Optional[Callable[[Callable[[], None]], object]] = None,
+    ) -> None:
+        """Initialize watcher.
+
+        Args:
+            sample: Returns the current value of each of the given paths
+            interval: Seconds between samples
+            max_changes: Changes kept per path until they are read
+            run_background: Runs each periodic sample; may defer it instead.
+                Defaults to running it now.
+        """
+        self._sample = sample
+        self._run_background = run_background
+        self._interval = interval
+        self._max_changes = max_changes
+        self._lock = threading.Lock()
+        self._values: Dict[str, Any] = {}
+        self._changes: Dict[str, Deque[StateChange]] = {}
+        self._listeners: List[Callable[[StateChange], None]] = []
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def watched_paths(self) -> List[str]:
+        """Get the watched paths."""
+        with self._lock:
+            return sorted(self._values)
+
+    def add_listener(self, listener: Callable[[StateChange], None]) -> None:
+        """Call a listener for every recorded change."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def watch(
+        self,
+        path: str,
+        initial_value: Any,  # noqa: ANN401
+    ) -> Tuple[Any, List[StateChange]]:
+        """Register a path, or read the changes recorded since the last call.
+
+        Args:
+            path: Dotted state path
+            initial_value: Current value, used when the path is new
+
+        Returns:
+            Tuple of (latest sampled value, changes since the previous call)
+        """
+        with self._lock:
+            if path not in self._values:
+                self._values[path] = initial_value
+                self._changes[path] = deque(maxlen=self._max_changes)
+                self._ensure_running()
+                return initial_value, []
+            changes = list(self._changes[path])
+            self._changes[path].clear()
+            return self._values[path], changes
+
+    def is_watching(self, path: str) -> bool:
+        """Check if a path is watched."""
+        with self._lock:
+            return path in self._values
+
+    def unwatch(self, path: str) -> bool:
+        """Stop watching a path.
+
+        Returns:
+            True if the path was watched
+        """
+        with self._lock:
+            if path not in self._values:
+                return False
+            del self._values[path]
+            del self._changes[path]
+            if not self._values:
+                self._wakeup.set()
+            return True
+
+    def stop(self) -> None:
+        """Stop watching every path."""
+        with self._lock:
+            self._values.clear()
+            self._changes.clear()
+            self._wakeup.set()
+
+    def sample_now(self) -> None:
+        """Sample every watched path once and record changes."""
+        with self._lock:
+            paths = set(self._values)
+        if not paths:
+            return
+        try:
+            values = self._sample(paths)
+        except Exception as e:
+            logger.warning(f"State watch sample failed: {e}")
+            return
+
+        timestamp = datetime.now().isoformat()
+        recorded = []
+        with self._lock:
+            for path, new_value in values.items():
+                if path not in self._values:
+                    continue  # Unwatched while sampling
+                old_value = self._values[path]
+                if new_value == old_value:
+                    continue
+                change = StateChange(
+                    path=path,
+                    old_value=old_value,
+                    new_value=new_value,
+                    timestamp=timestamp,
+                )
+                self._values[path] = new_value
+                self._changes[path].append(change)
+                recorded.append(change)
+            listeners = list(self._listeners)
+
+        for change in recorded:
+            logger.info(
+                f"State field {change.path} changed: "
+                f"{change.old_value!r} -> {change.new_value!r}"
+            )
+            for listener in listeners:
+                try:
+                    listener(change)
+                except Exception as e:
+                    logger.warning(f"State watch listener failed: {e}")
+
+    def _ensure_running(self) -> None:
+        """Start the sampler thread if it is not running. Caller holds the lock."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._wakeup.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="state-field-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self) -> None:
+        """Sample until no paths are watched."""
+        while True:
+            self._wakeup.wait(self._interval)
+            with self._lock:
+                if not self._values:
+                    self._thread = None
+                    return
+                self._wakeup.clear()
+            if self._run_background is None:
+                self.sample_now()
+            else:
+                self._run_background(self.sample_now)
@@ -2,11 +2,15 @@
 
 # Import all use cases from their domain-specific modules
 from .docker_use_cases import ManageDockerUseCase
+from .gaming_use_cases import CheckBiosUseCase
 from .gaming_use_cases import DetectControllersUseCase
 from .gaming_use_cases import InstallEmulatorUseCase
 from .gaming_use_cases import ListRomsUseCase
+from .gaming_use_cases import ListThemesUseCase
 from .gaming_use_cases import SetupControllerUseCase
+from .package_use_cases import CheckPackagesUseCase
 from .package_use_cases import InstallPackagesUseCase
+from .package_use_cases import ListPackagesUseCase
 from .state_use_cases import ManageStateUseCase
 from .system_use_cases import CheckConnectionUseCase
 from .system_use_cases import ExecuteCommandUseCase
@@ -16,13 +20,17 @@ from .system_use_cases import WriteFileUseCase
 
 # Export all use cases for backward compatibility
 __all__ = [
+    "CheckBiosUseCase",
     "CheckConnectionUseCase",
+    "CheckPackagesUseCase",
     "DetectControllersUseCase",
     "ExecuteCommandUseCase",
     "GetSystemInfoUseCase",
     "InstallEmulatorUseCase",
     "InstallPackagesUseCase",
+    "ListPackagesUseCase",
     "ListRomsUseCase",
+    "ListThemesUseCase",
     "ManageDockerUseCase",
     "ManageStateUseCase",
     "SetupControllerUseCase",
@@ -1,6 +1,9 @@
 """Dependency injection container for RetroMCP."""
 
 import logging
+import os
+import threading
+from pathlib import Path
 from typing import Any
 from typing import Callable
 from typing import Dict
@@ -12,13 +15,18 @@ from .application.core_use_cases import ListCoreOptionsUseCase
 from .application.core_use_cases import ListCoresUseCase
 from .application.core_use_cases import SetDefaultEmulatorUseCase
 from .application.core_use_cases import UpdateCoreOptionUseCase
+from .application.queue_executor import QueueExecutor
+from .application.use_cases import CheckBiosUseCase
 from .application.use_cases import CheckConnectionUseCase
+from .application.use_cases import CheckPackagesUseCase
 from .application.use_cases import DetectControllersUseCase
 from .application.use_cases import ExecuteCommandUseCase
 from .application.use_cases import GetSystemInfoUseCase
 from .application.use_cases import InstallEmulatorUseCase
 from .application.use_cases import InstallPackagesUseCase
+from .application.use_cases import ListPackagesUseCase
 from .application.use_cases import ListRomsUseCase
+from .application.use_cases import ListThemesUseCase
 from .application.use_cases import ManageDockerUseCase
 from .application.use_cases import ManageStateUseCase
 from .application.use_cases import SetupControllerUseCase
@@ -26,6 +34,8 @@ from .application.use_cases import UpdateSystemUseCase
 from .application.use_cases import WriteFileUseCase
 from .config import RetroPieConfig
 from .discovery import RetroPieDiscovery
+from .domain.ports import CommandOutputRepository
+from .domain.ports import CommandQueueRepository
 from .domain.ports import ControllerRepository
 from .domain.ports import DockerRepository
 from .domain.ports import EmulatorRepository
@@ -37,9 +47,18 @@ from .infrastructure import SSHEmulatorRepository
 from .infrastructure import SSHRetroPieClient
 from .infrastructure import SSHSystemRepository
 from .infrastructure.cache_system import SystemCache
+from .infrastructure.game_aware_scheduler import GameAwareScheduler
+from .infrastructure.gzip_output_store import DEFAULT_RETENTION_DAYS
+from .infrastructure.gzip_output_store import GzipOutputStore
+from .infrastructure.persistent_queue_storage import PersistentQueueStorage
+from .infrastructure.sqlite_queue_storage import SQLiteQueueStorage
 from .infrastructure.ssh_docker_repository import SSHDockerRepository
 from .infrastructure.ssh_state_repository import SSHStateRepository
+from .infrastructure.state_history import StateHistory
 from .infrastructure.structured_logger import StructuredLogger
+from .infrastructure.system_log_reader import SystemLogReader
+from .infrastructure.telemetry import TelemetrySampler
+from .infrastructure.telemetry_logger import TelemetryLogger
 from .ssh_handler import RetroPieSSH
 
 logger = logging.getLogger(__name__)
@@ -52,14 +71,20 @@ class Container:
         """Initialize container with configuration."""
         self._initial_config = config
         self._instances: Dict[str, Any] = {}
+        # Reentrant: factories resolve their own dependencies
+        self._lock = threading.RLock()
         self._config: Optional[RetroPieConfig] = None
         self._discovery_completed = False
 
     def _get_or_create(self, key: str, factory: Callable[[], Any]) -> Any:  # noqa: ANN401
-        """Get existing instance or create new one."""
-        if key not in self._instances:
-            self._instances[key] = factory()
-        return self._instances[key]
+        """Get existing instance or create new one, once across threads."""
+        instance = self._instances.get(key)
+        if instance is None:
+            with self._lock:
+                if key not in self._instances:
+                    self._instances[key] = factory()
+                instance = self._instances[key]
+        return instance
 
     @property
     def config(self) -> RetroPieConfig:
@@ -102,7 +127,25 @@ class Container:
         """Get RetroPie client instance."""
         return self._get_or_create(
             "retropie_client",
-            lambda: SSHRetroPieClient(self.ssh_handler),
+            self._create_retropie_client,
+        )
+
+    def _create_retropie_client(self) -> SSHRetroPieClient:
+        """Create the SSH client with its game-aware scheduler attached."""
+        client = SSHRetroPieClient(self.ssh_handler)
+        scheduler = self._get_or_create(
+            "game_scheduler", lambda: GameAwareScheduler(client)
+        )
+        client.command_wrapper = scheduler.wrap
+        return client
+
+    @property
+    def game_scheduler(self) -> GameAwareScheduler:
+        """Get game-aware scheduler instance."""
+        client = self.retropie_client  # Creating the client attaches one
+        return self._get_or_create(
+            "game_scheduler",
+            lambda: GameAwareScheduler(client),
         )
 
     @property
@@ -138,7 +181,9 @@ class Container:
         self._ensure_discovery()
         return self._get_or_create(
             "controller_repository",
-            lambda: SSHControllerRepository(self.retropie_client, self.system_cache),
+            lambda: SSHControllerRepository(
+                self.retropie_client, self.system_cache, watch_hotplug=True
+            ),
         )
 
     @property
@@ -156,9 +201,93 @@ class Container:
         self._ensure_discovery()
         return self._get_or_create(
             "state_repository",
-            lambda: SSHStateRepository(self.retropie_client, self.config),
+            lambda: SSHStateRepository(
+                self.retropie_client, self.config, history=self.state_history
+            ),
+        )
+
+    @property
+    def state_history(self) -> StateHistory:
+        """Get local state history instance, one file per host."""
+        return self._get_or_create(
+            "state_history",
+            lambda: StateHistory(
+                Path.home()
+                / ".retromcp"
+                / "state-history"
+                / f"{self.config.host}.jsonl.gz"
+            ),
+        )
+
+    @property
+    def system_log_reader(self) -> SystemLogReader:
+        """Get incremental kernel and journal error reader instance."""
+        return self._get_or_create(
+            "system_log_reader",
+            lambda: SystemLogReader(self.retropie_client),
+        )
+
+    @property
+    def telemetry_sampler(self) -> TelemetrySampler:
+        """Get hardware telemetry sampler instance; started on first use."""
+        return self._get_or_create(
+            "telemetry_sampler",
+            lambda: TelemetrySampler(self.retropie_client),
+        )
+
+    @property
+    def telemetry_logger(self) -> TelemetryLogger:
+        """Get on-Pi telemetry logger instance."""
+        self._ensure_discovery()
+        return self._get_or_create(
+            "telemetry_logger",
+            lambda: TelemetryLogger(self.retropie_client, self.config.paths.home_dir),
+        )
+
+    @property
+    def command_queue_storage(self) -> CommandQueueRepository:
+        """Get command queue storage shared by all tool instances."""
+        return self._get_or_create(
+            "command_queue_storage", self._create_command_queue_storage
+        )
+
+    @property
+    def queue_executor(self) -> QueueExecutor:
+        """Get background command queue executor instance."""
+        return self._get_or_create(
+            "queue_executor",
+            lambda: QueueExecutor(
+                self.retropie_client,
+                self.command_queue_storage,
+                outputs=self.command_output_store,
+                command_wrapper=self.game_scheduler.wrap,
+            ),
         )
 
+    @property
+    def command_output_store(self) -> CommandOutputRepository:
+        """Get storage for long queued command output."""
+        return self._get_or_create(
+            "command_output_store", self._create_command_output_store
+        )
+
+    def _create_command_output_store(self) -> CommandOutputRepository:
+        """Create the output store in ~/.retromcp/outputs, pruning old outputs."""
+        store = GzipOutputStore(str(Path.home() / ".retromcp" / "outputs"))
+        store.prune(DEFAULT_RETENTION_DAYS)
+        return store
+
+    def _create_command_queue_storage(self) -> CommandQueueRepository:
+        """Create the queue storage selected by RETROMCP_QUEUE_STORAGE.
+
+        "json" (the default) keeps queues in ~/.retromcp/command_queues.json,
+        "sqlite" in ~/.retromcp/command_queues.db.
+        """
+        storage_dir = Path.home() / ".retromcp"
+        if os.getenv("RETROMCP_QUEUE_STORAGE", "json").lower() == "sqlite":
+            return SQLiteQueueStorage(str(storage_dir / "command_queues.db"))
+        return PersistentQueueStorage(str(storage_dir / "command_queues.json"))
+
     @property
     def docker_repository(self) -> DockerRepository:
         """Get Docker repository instance."""
@@ -193,6 +322,22 @@ class Container:
             lambda: InstallPackagesUseCase(self.system_repository),
         )
 
+    @property
+    def check_packages_use_case(self) -> CheckPackagesUseCase:
+        """Get check packages use case."""
+        return self._get_or_create(
+            "check_packages_use_case",
+            lambda: CheckPackagesUseCase(self.system_repository),
+        )
+
+    @property
+    def list_packages_use_case(self) -> ListPackagesUseCase:
+        """Get list packages use case."""
+        return self._get_or_create(
+            "list_packages_use_case",
+            lambda: ListPackagesUseCase(self.system_repository),
+        )
+
     @property
     def update_system_use_case(self) -> UpdateSystemUseCase:
         """Get update system use case."""
@@ -233,6 +378,22 @@ class Container:
             lambda: ListRomsUseCase(self.emulator_repository),
         )
 
+    @property
+    def check_bios_use_case(self) -> CheckBiosUseCase:
+        """Get check BIOS use case."""
+        return self._get_or_create(
+            "check_bios_use_case",
+            lambda: CheckBiosUseCase(self.system_repository),
+        )
+
+    @property
+    def list_themes_use_case(self) -> ListThemesUseCase:
+        """Get list themes use case."""
+        return self._get_or_create(
+            "list_themes_use_case",
+            lambda: ListThemesUseCase(self.emulator_repository),
+        )
+
     @property
     def execute_command_use_case(self) -> ExecuteCommandUseCase:
         """Get execute command use case."""
@@ -259,6 +420,9 @@ class Container:
                 self.system_repository,
                 self.emulator_repository,
                 self.controller_repository,
+                run_background=lambda job: self.game_scheduler.submit(
+                    "Sample watched state fields", job, key="state-watch"
+                ),
             ),
         )
 
@@ -325,6 +489,17 @@ class Container:
         return self.retropie_client.connect()
 
     def disconnect(self) -> None:
-        """Close all connections."""
+        """Stop background work and close all connections."""
+        if "telemetry_sampler" in self._instances:
+            self.telemetry_sampler.stop()
+        controller_repository = self._instances.get("controller_repository")
+        if isinstance(controller_repository, SSHControllerRepository):
+            controller_repository.stop_hotplug_watch()
+        if "manage_state_use_case" in self._instances:
+            self.manage_state_use_case.stop()
+        if "game_scheduler" in self._instances:
+            self.game_scheduler.stop()
+        if "queue_executor" in self._instances:
+            self.queue_executor.cancel_all()
         if "retropie_client" in self._instances:
             self.retropie_client.disconnect()
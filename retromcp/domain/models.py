@@ -1,6 +1,7 @@
 """Domain models for RetroMCP."""
 
 import json
+from bisect import bisect_left
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
@@ -91,6 +92,36 @@ class Controller:
     driver_required: Optional[str] = None
 
 
+@dataclass(frozen=True)
+class InputDevice:
+    """Input device entry from the kernel input device table."""
+
+    name: str
+    handlers: List[str]
+    bus: str = ""
+    vendor_id: str = ""
+    product_id: str = ""
+    phys: str = ""
+    sysfs: str = ""
+
+    @property
+    def joystick_node(self) -> Optional[str]:
+        """Get the joystick device path, if the device has one."""
+        for handler in self.handlers:
+            if handler.startswith("js"):
+                return f"/dev/input/{handler}"
+        return None
+
+    @property
+    def event_nodes(self) -> List[str]:
+        """Get the event device paths of the device."""
+        return [
+            f"/dev/input/{handler}"
+            for handler in self.handlers
+            if handler.startswith("event")
+        ]
+
+
 @dataclass(frozen=True)
 class Emulator:
     """Emulator model."""
@@ -156,6 +187,7 @@ class BiosFile:
     present: bool
     size: Optional[int] = None
     checksum: Optional[str] = None
+    checksum_valid: Optional[bool] = None
 
 
 @dataclass(frozen=True)
@@ -166,6 +198,9 @@ class SystemService:
     status: ServiceStatus
     enabled: bool
     description: Optional[str] = None
+    sub_state: Optional[str] = None
+    memory_bytes: Optional[int] = None
+    restart_count: Optional[int] = None
 
 
 @dataclass(frozen=True)
@@ -179,6 +214,89 @@ class Package:
     description: Optional[str] = None
 
 
+class PackageIndex:
+    """Columnar index of installed packages built from a single package query.
+
+    Stores names, versions and installed flags in parallel arrays instead of
+    one Package object per entry, and materializes Package objects on demand.
+    """
+
+    def __init__(
+        self,
+        names: List[str],
+        versions: List[str],
+        installed: bytearray,
+        fingerprint: Optional[str] = None,
+    ) -> None:
+        """Initialize index from parallel columns.
+
+        Args:
+            names: Package names in query order
+            versions: Package versions, aligned with names
+            installed: 1 if the package is installed, 0 otherwise
+            fingerprint: Package database fingerprint the index was built from
+        """
+        self._names = names
+        self._versions = versions
+        self._installed = installed
+        self.fingerprint = fingerprint
+        self._rows: Dict[str, int] = {}
+        for row, name in enumerate(names):
+            # Multi-arch packages can appear twice; prefer the installed row
+            existing = self._rows.get(name)
+            if existing is None or (installed[row] and not installed[existing]):
+                self._rows[name] = row
+        self._sorted_names = sorted(self._rows)
+
+    def __len__(self) -> int:
+        """Get number of indexed packages."""
+        return len(self._names)
+
+    def __contains__(self, name: object) -> bool:
+        """Check if a package name is indexed."""
+        return name in self._rows
+
+    def get(self, name: str) -> Optional[Package]:
+        """Look up a package by exact name."""
+        row = self._rows.get(name)
+        if row is None:
+            return None
+        return self._package_at(row)
+
+    def is_installed(self, name: str) -> bool:
+        """Check if a package is installed."""
+        row = self._rows.get(name)
+        return row is not None and bool(self._installed[row])
+
+    def status(self, names: List[str]) -> Dict[str, bool]:
+        """Get installed status for several packages at once."""
+        return {name: self.is_installed(name) for name in names}
+
+    def search_prefix(self, prefix: str, limit: Optional[int] = None) -> List[str]:
+        """Get sorted package names starting with a prefix."""
+        start = bisect_left(self._sorted_names, prefix)
+        matches = []
+        for name in self._sorted_names[start:]:
+            if not name.startswith(prefix):
+                break
+            matches.append(name)
+            if limit is not None and len(matches) >= limit:
+                break
+        return matches
+
+    def to_packages(self) -> List[Package]:
+        """Materialize all indexed packages in query order."""
+        return [self._package_at(row) for row in range(len(self._names))]
+
+    def _package_at(self, row: int) -> Package:
+        """Build a Package from one row of the index."""
+        return Package(
+            name=self._names[row],
+            version=self._versions[row],
+            installed=bool(self._installed[row]),
+        )
+
+
 @dataclass(frozen=True)
 class GameList:
     """Game list model."""
@@ -219,6 +337,17 @@ class Theme:
     path: str
     active: bool
     description: Optional[str] = None
+    size: Optional[int] = None
+    mtime: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class ThemePage:
+    """One page of a theme catalog listing."""
+
+    themes: List[Theme]
+    total: int
+    offset: int
 
 
 @dataclass(frozen=True)
@@ -278,6 +407,8 @@ class StateAction(Enum):
     IMPORT = "import"
     DIFF = "diff"
     WATCH = "watch"
+    UNWATCH = "unwatch"
+    HISTORY = "history"
 
 
 @dataclass(frozen=True)
@@ -567,6 +698,29 @@ class StateManagementRequest:
     force_scan: bool = False
     state_data: Optional[str] = None
     other_state_data: Optional[str] = None
+    # ISO 8601 bounds for history-backed compare, diff and history actions
+    since: Optional[str] = None
+    until: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class StateSnapshot:
+    """Entry in the saved state history."""
+
+    sequence: int
+    timestamp: str
+    full: bool  # Full snapshot rather than a delta against the previous entry
+    size: int  # Compressed size in bytes
+
+
+@dataclass(frozen=True)
+class StateChange:
+    """Change of a watched state field between two samples."""
+
+    path: str
+    old_value: Any
+    new_value: Any
+    timestamp: str
 
 
 @dataclass(frozen=True)
@@ -580,6 +734,8 @@ class StateManagementResult:
     diff: Optional[Dict[str, Any]] = None
     exported_data: Optional[str] = None
     watch_value: Optional[Any] = None
+    history: Optional[List[StateSnapshot]] = None
+    changes: Optional[List[StateChange]] = None
 
 
 class DockerResource(Enum):
@@ -726,6 +882,30 @@ class SoftwareInfo:
     retropie_status: ServiceStatus
 
 
+@dataclass(frozen=True)
+class SystemInventory:
+    """Enhanced v2.0 state sections collected in one inventory pass."""
+
+    hardware: HardwareInfo
+    network: List[NetworkInterface]
+    software: SoftwareInfo
+    services: List[SystemService]
+
+
+@dataclass(frozen=True)
+class TelemetryStats:
+    """Summary of one telemetry field over a time window."""
+
+    metric: str
+    window: float  # seconds
+    resolution: float  # seconds per stored point, 0 for raw samples
+    samples: int
+    minimum: Optional[float] = None
+    maximum: Optional[float] = None
+    average: Optional[float] = None
+    percentiles: Dict[int, float] = field(default_factory=dict)
+
+
 @dataclass(frozen=True)
 class SystemNote:
     """System note model for v2.0 schema."""
@@ -892,6 +1072,7 @@ class QueuedCommand:
     error: Optional[str] = None
     start_time: Optional[datetime] = None
     end_time: Optional[datetime] = None
+    depends_on: List[str] = field(default_factory=list)  # Earlier command IDs
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
@@ -899,6 +1080,7 @@ class QueuedCommand:
             "id": self.id,
             "command": self.command,
             "description": self.description,
+            "depends_on": list(self.depends_on),
             "status": self.status.value,
             "result": self.result,
             "error": self.error,
@@ -918,11 +1100,35 @@ class CommandQueue:
     created_at: datetime = field(default_factory=datetime.now)
     auto_execute: bool = False
     pause_between: int = 2  # seconds
+    trusted: bool = False  # execute_all ships all commands as one script
 
-    def add_command(self, command: str, description: str) -> QueuedCommand:
-        """Add a command to the queue."""
+    def add_command(
+        self,
+        command: str,
+        description: str,
+        depends_on: Optional[List[str]] = None,
+    ) -> QueuedCommand:
+        """Add a command to the queue.
+
+        Args:
+            command: Shell command
+            description: Human-readable description
+            depends_on: IDs of earlier commands that must complete first
+
+        Raises:
+            ValueError: If a dependency is not a command already in the queue
+        """
+        known = {cmd.id for cmd in self.commands}
+        unknown = [dep for dep in depends_on or [] if dep not in known]
+        if unknown:
+            raise ValueError(f"Unknown dependencies: {', '.join(unknown)}")
         cmd_id = f"{self.id}_{len(self.commands)}"
-        cmd = QueuedCommand(id=cmd_id, command=command, description=description)
+        cmd = QueuedCommand(
+            id=cmd_id,
+            command=command,
+            description=description,
+            depends_on=list(depends_on or []),
+        )
         self.commands.append(cmd)
         return cmd
 
@@ -933,11 +1139,43 @@ class CommandQueue:
         return None
 
     def get_next_pending(self) -> Optional[QueuedCommand]:
-        """Get the next pending command."""
-        for cmd in self.commands[self.current_index :]:
-            if cmd.status == CommandStatus.PENDING:
-                return cmd
-        return None
+        """Get the next pending command whose dependencies are all done."""
+        ready = self.get_ready()
+        return ready[0] if ready else None
+
+    def get_ready(self) -> List[QueuedCommand]:
+        """Get pending commands whose dependencies are all done.
+
+        A dependency is done once it completed or was skipped; commands
+        depending on a failed or cancelled command stay pending.
+        """
+        done = {
+            cmd.id
+            for cmd in self.commands
+            if cmd.status in (CommandStatus.COMPLETED, CommandStatus.SKIPPED)
+        }
+        return [
+            cmd
+            for cmd in self.commands[self.current_index :]
+            if cmd.status == CommandStatus.PENDING
+            and all(dep in done for dep in cmd.depends_on)
+        ]
+
+    def get_blocked(self) -> List[QueuedCommand]:
+        """Get pending commands held back by a failed or cancelled dependency."""
+        ready = {cmd.id for cmd in self.get_ready()}
+        return [
+            cmd
+            for cmd in self.commands[self.current_index :]
+            if cmd.status == CommandStatus.PENDING and cmd.id not in ready
+        ]
+
+    def advance(self) -> None:
+        """Move the current index past leading completed or skipped commands."""
+        while self.current_index < len(self.commands) and self.commands[
+            self.current_index
+        ].status in (CommandStatus.COMPLETED, CommandStatus.SKIPPED):
+            self.current_index += 1
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
@@ -949,8 +1187,30 @@ class CommandQueue:
             "created_at": self.created_at.isoformat(),
             "auto_execute": self.auto_execute,
             "pause_between": self.pause_between,
+            "trusted": self.trusted,
             "completed": sum(
                 1 for cmd in self.commands if cmd.status == CommandStatus.COMPLETED
             ),
             "total": len(self.commands),
         }
+
+
+@dataclass(frozen=True)
+class OutputRange:
+    """Byte range of a command output kept outside the queue."""
+
+    output_id: str
+    offset: int
+    data: bytes
+    total_bytes: int
+
+
+@dataclass(frozen=True)
+class QueueSummary:
+    """Progress of a command queue without its commands."""
+
+    id: str
+    name: str
+    created_at: datetime
+    completed: int
+    total: int
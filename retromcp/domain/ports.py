@@ -4,9 +4,13 @@ from abc import ABC
 from abc import abstractmethod
 from typing import Any
 from typing import Dict
+from typing import Iterator
 from typing import List
+from typing import Optional
+from typing import Protocol
 
 from .models import BiosFile
+from .models import CommandQueue
 from .models import CommandResult
 from .models import ConfigFile
 from .models import ConnectionInfo
@@ -19,18 +23,34 @@ from .models import DomainError
 from .models import Emulator
 from .models import EmulatorMapping
 from .models import ESSystemsConfig
+from .models import ExecutionError
+from .models import OutputRange
 from .models import Package
+from .models import PackageIndex
+from .models import QueueSummary
 from .models import Result
 from .models import RetroArchCore
 from .models import RomDirectory
 from .models import StateManagementResult
+from .models import StateSnapshot
 from .models import SystemInfo
+from .models import SystemInventory
 from .models import SystemService
 from .models import SystemState
 from .models import Theme
 from .models import ValidationError
 
 
+class CommandStream(Protocol):
+    """Output of a command running on its own channel."""
+
+    def __iter__(self) -> Iterator[str]:
+        """Yield output lines without line endings as they arrive."""
+
+    def close(self) -> None:
+        """End the stream; may be called from another thread while reading."""
+
+
 class RetroPieClient(ABC):
     """Interface for RetroPie system communication."""
 
@@ -62,6 +82,13 @@ class RetroPieClient(ABC):
         that are intended to run continuously. Returns guidance on termination.
         """
 
+    @abstractmethod
+    def stream_command(self, command: str, pty: bool = False) -> CommandStream:
+        """Run a long-lived command and stream its output lines as they arrive.
+
+        With pty, closing the stream hangs up the remote command as well.
+        """
+
 
 class SystemRepository(ABC):
     """Interface for system-level operations."""
@@ -74,6 +101,10 @@ class SystemRepository(ABC):
     def get_packages(self) -> List[Package]:
         """Get list of installed packages."""
 
+    @abstractmethod
+    def get_package_index(self) -> Result[PackageIndex, ExecutionError]:
+        """Get index of installed packages for fast lookups."""
+
     @abstractmethod
     def install_packages(self, packages: List[str]) -> CommandResult:
         """Install system packages."""
@@ -82,6 +113,10 @@ class SystemRepository(ABC):
     def update_system(self) -> CommandResult:
         """Update system packages."""
 
+    @abstractmethod
+    def get_system_inventory(self) -> Result[SystemInventory, ExecutionError]:
+        """Get hardware, network, software and service inventory."""
+
     @abstractmethod
     def get_services(self) -> List[SystemService]:
         """Get list of system services."""
@@ -91,8 +126,8 @@ class SystemRepository(ABC):
         """Restart a system service."""
 
     @abstractmethod
-    def get_bios_files(self) -> List[BiosFile]:
-        """Get list of BIOS files."""
+    def get_bios_files(self, verify_checksums: bool = False) -> List[BiosFile]:
+        """Get list of BIOS files, optionally verifying their checksums."""
 
 
 class ControllerRepository(ABC):
@@ -220,6 +255,60 @@ class EmulatorRepository(ABC):
         """
 
 
+class CommandQueueRepository(ABC):
+    """Interface for command queue persistence."""
+
+    @abstractmethod
+    def create_queue(
+        self, queue_id: str, queue: CommandQueue
+    ) -> Result[None, ValidationError]:
+        """Create and persist a new queue."""
+
+    @abstractmethod
+    def get_queue(self, queue_id: str) -> Optional[CommandQueue]:
+        """Get a queue by ID."""
+
+    @abstractmethod
+    def list_queues(self) -> List[str]:
+        """List all queue IDs."""
+
+    @abstractmethod
+    def summarize_queues(self) -> List[QueueSummary]:
+        """Get the progress of all queues without loading their commands."""
+
+    @abstractmethod
+    def update_queue(
+        self, queue_id: str, queue: CommandQueue
+    ) -> Result[None, ValidationError]:
+        """Persist changes to an existing queue."""
+
+    @abstractmethod
+    def delete_queue(self, queue_id: str) -> Result[None, ValidationError]:
+        """Delete a queue."""
+
+    @abstractmethod
+    def next_queue_id(self) -> Result[str, ValidationError]:
+        """Allocate the ID for a new queue."""
+
+
+class CommandOutputRepository(ABC):
+    """Interface for command output kept outside queue storage."""
+
+    @abstractmethod
+    def save(self, data: bytes) -> Result[str, ValidationError]:
+        """Store an output and return its ID."""
+
+    @abstractmethod
+    def read(
+        self, output_id: str, offset: int = 0, length: Optional[int] = None
+    ) -> Result[OutputRange, ValidationError]:
+        """Read a byte range of a stored output."""
+
+    @abstractmethod
+    def prune(self, max_age_days: float) -> int:
+        """Delete outputs older than the given age and return how many."""
+
+
 class StateRepository(ABC):
     """Interface for state persistence."""
 
@@ -236,8 +325,10 @@ class StateRepository(ABC):
         """Update specific field in state."""
 
     @abstractmethod
-    def compare_state(self, current_state: SystemState) -> Dict[str, Any]:
-        """Compare current state with stored state."""
+    def compare_state(
+        self, current_state: SystemState, baseline: Optional[SystemState] = None
+    ) -> Dict[str, Any]:
+        """Compare current state with stored state, or with a baseline."""
 
     @abstractmethod
     def export_state(self) -> StateManagementResult:
@@ -255,6 +346,16 @@ class StateRepository(ABC):
     def watch_field(self, path: str) -> StateManagementResult:
         """Monitor specific field changes."""
 
+    @abstractmethod
+    def list_history(
+        self, since: Optional[str] = None, until: Optional[str] = None
+    ) -> List[StateSnapshot]:
+        """List saved state history entries within a time range."""
+
+    @abstractmethod
+    def load_state_at(self, timestamp: str) -> SystemState:
+        """Load the state saved at or before a point in time."""
+
 
 class DockerRepository(ABC):
     """Interface for Docker management."""
@@ -286,7 +387,9 @@ class ConfigurationParser(ABC):
     """Interface for parsing configuration files."""
 
     @abstractmethod
-    def parse_es_systems_config(self, content: str) -> Result[ESSystemsConfig, ValidationError]:
+    def parse_es_systems_config(
+        self, content: str
+    ) -> Result[ESSystemsConfig, ValidationError]:
         """Parse es_systems.cfg XML content into domain models.
 
         Args:
@@ -0,0 +1,74 @@
+"""Known-good BIOS checksums for RetroPie systems.
+
+MD5 values follow the RetroPie and libretro BIOS documentation. File names are
+matched case-insensitively.
+"""
+
+from typing import Dict
+from typing import Optional
+
+# System -> {file name -> MD5 checksum}
+KNOWN_BIOS_CHECKSUMS: Dict[str, Dict[str, str]] = {
+    "psx": {
+        "scph1001.bin": "924e392ed05558ffdb115408c263dccf",
+        "scph5500.bin": "8dd7d5296a650fac7319bce665a6a53c",
+        "scph5501.bin": "490f666e1afb15b7362b406ed1cea246",
+        "scph5502.bin": "32736f17079d0b2b7024407c39bd3050",
+        "scph7001.bin": "1e68c231d0896b7eadcad1d7d8e76129",
+    },
+    "dreamcast": {
+        "dc_boot.bin": "e10c53c2f8b90bab96ead2d368858623",
+        "dc_flash.bin": "0a93f7940c455905bea6e392dfde92a4",
+    },
+    "gba": {
+        "gba_bios.bin": "a860e8c0b6d573d191e4ec7db1b1e4f6",
+    },
+    "segacd": {
+        "bios_cd_e.bin": "e66fa1dc5820d254611fdcdba0662372",
+        "bios_cd_j.bin": "278a9397d192149e84e820ac621a8edd",
+        "bios_cd_u.bin": "2efd74e3232ff260e371b99f84024f7f",
+    },
+    "atarilynx": {
+        "lynxboot.img": "fcd403db69f54290b51035d82f835e7b",
+    },
+    "atari5200": {
+        "5200.rom": "281f20ea4320404ec820fb7ec0693b38",
+    },
+    "pcengine": {
+        "syscard3.pce": "38179df8f4ac870017db21ebcbf53114",
+    },
+}
+
+# File name -> system, derived once for constant-time classification
+_FILE_TO_SYSTEM: Dict[str, str] = {
+    file_name: system
+    for system, files in KNOWN_BIOS_CHECKSUMS.items()
+    for file_name in files
+}
+
+
+def lookup_bios_system(file_name: str) -> Optional[str]:
+    """Get the system a known BIOS file belongs to.
+
+    Args:
+        file_name: BIOS file name without directory
+
+    Returns:
+        System name, or None if the file is not in the known table
+    """
+    return _FILE_TO_SYSTEM.get(file_name.lower())
+
+
+def expected_bios_checksum(file_name: str) -> Optional[str]:
+    """Get the known-good MD5 checksum for a BIOS file.
+
+    Args:
+        file_name: BIOS file name without directory
+
+    Returns:
+        Expected MD5 checksum, or None if the file is not in the known table
+    """
+    system = lookup_bios_system(file_name)
+    if system is None:
+        return None
+    return KNOWN_BIOS_CHECKSUMS[system][file_name.lower()]
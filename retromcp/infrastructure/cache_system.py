@@ -11,6 +11,7 @@ from typing import Optional
 from typing import TypeVar
 
 from ..domain.models import SystemInfo
+from ..domain.models import SystemService
 
 T = TypeVar("T")
 
@@ -137,11 +138,11 @@ class SystemCache:
         """Get cached network scan results."""
         return self._cache.get("network_scan")
 
-    def cache_service_status(self, data: List[Dict[str, Any]]) -> None:
+    def cache_service_status(self, data: List[SystemService]) -> None:
         """Cache service status results."""
         self._cache.set("service_status", data, self.service_status_ttl)
 
-    def get_service_status(self) -> Optional[List[Dict[str, Any]]]:
+    def get_service_status(self) -> Optional[List[SystemService]]:
         """Get cached service status results."""
         return self._cache.get("service_status")
 
@@ -0,0 +1,171 @@
+"""Background watcher for controller hotplug events."""
+
+import logging
+import re
+import threading
+from dataclasses import dataclass
+from typing import Callable
+from typing import Optional
+
+from ..domain.ports import CommandStream
+from ..domain.ports import RetroPieClient
+
+logger = logging.getLogger(__name__)
+
+UDEV_MONITOR_COMMAND = "udevadm monitor --kernel --subsystem-match=input"
+
+# e.g. "KERNEL[1234.567890] add      /devices/.../input/input5/js0 (input)"
+_EVENT_PATTERN = re.compile(
+    r"^(?:KERNEL|UDEV)\[[\d.]+\]\s+(?P<action>\w+)\s+(?P<devpath>\S+)\s+\((?P<subsystem>[\w-]+)\)"
+)
+
+
+@dataclass(frozen=True)
+class HotplugEvent:
+    """Input device add or remove event reported by udev."""
+
+    action: str
+    devpath: str
+
+    @property
+    def node(self) -> str:
+        """Get the device node name, e.g. js0 or event3."""
+        return self.devpath.rsplit("/", 1)[-1]
+
+    @property
+    def device_path(self) -> str:
+        """Get the /dev path of the device node."""
+        return f"/dev/input/{self.node}"
+
+    @property
+    def is_joystick(self) -> bool:
+        """Check if the event concerns a joystick node."""
+        return self.node.startswith("js")
+
+
+def parse_udev_event(line: str) -> Optional[HotplugEvent]:
+    """Parse one line of udevadm monitor output.
+
+    Args:
+        line: Output line from udevadm monitor
+
+    Returns:
+        Parsed event, or None for headers and non-input lines
+    """
+    match = _EVENT_PATTERN.match(line.strip())
+    if match is None or match.group("subsystem") != "input":
+        return None
+    return HotplugEvent(action=match.group("action"), devpath=match.group("devpath"))
+
+
+class ControllerHotplugWatcher:
+    """Streams udev input events over a persistent channel on a daemon thread.
+
+    Joystick add and remove events are passed to ``on_event``. ``on_ready``
+    is called on the watcher thread once the monitor prints its first line,
+    i.e. is listening, and before any event is delivered. When the stream
+    ends on its own, for example because the connection dropped, ``on_stop``
+    is called so the owner can fall back to polling.
+
+    The monitor runs on a pseudo-terminal, so stop() closing the channel
+    also ends the remote ``udevadm`` process.
+    """
+
+    def __init__(
+        self,
+        client: RetroPieClient,
+        on_event: Callable[[HotplugEvent], None],
+        on_stop: Callable[[], None],
+        on_ready: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """Initialize watcher.
+
+        Args:
+            client: RetroPie client used to open the event stream
+            on_event: Called for each joystick add or remove event
+            on_stop: Called once when the stream ends without stop()
+            on_ready: Called once the monitor is listening
+        """
+        self._client = client
+        self._on_event = on_event
+        self._on_stop = on_stop
+        self._on_ready = on_ready
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stream: Optional[CommandStream] = None
+
+    @property
+    def is_running(self) -> bool:
+        """Check if the watcher thread is alive and not stopped."""
+        return (
+            self._thread is not None
+            and self._thread.is_alive()
+            and not self._stopped.is_set()
+        )
+
+    def start(self) -> None:
+        """Start watching in the background."""
+        if self.is_running:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="controller-hotplug-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop watching and close the event stream."""
+        self._stopped.set()
+        stream = self._stream
+        if stream is not None:
+            self._close(stream)
+
+    def _run(self) -> None:
+        """Consume the udev event stream until stopped or disconnected."""
+        ready = False
+        try:
+            stream = self._client.stream_command(UDEV_MONITOR_COMMAND, pty=True)
+            self._stream = stream
+            if self._stopped.is_set():
+                # stop() ran before the stream was published
+                self._close(stream)
+                return
+            for line in stream:
+                if self._stopped.is_set():
+                    break
+                if not ready:
+                    ready = True
+                    self._notify_ready()
+                event = parse_udev_event(line)
+                if event is None or not event.is_joystick:
+                    continue
+                if event.action not in ("add", "remove"):
+                    continue
+                try:
+                    self._on_event(event)
+                except Exception as e:
+                    logger.warning(f"Failed to handle hotplug event {event}: {e}")
+        except Exception as e:
+            if not self._stopped.is_set():
+                logger.warning(f"Controller hotplug stream ended: {e}")
+        finally:
+            self._stream = None
+            requested = self._stopped.is_set()
+            self._stopped.set()
+            if not requested:
+                self._on_stop()
+
+    def _notify_ready(self) -> None:
+        if self._on_ready is None:
+            return
+        try:
+            self._on_ready()
+        except Exception as e:
+            logger.warning(f"Failed to handle hotplug watcher start: {e}")
+
+    @staticmethod
+    def _close(stream: CommandStream) -> None:
+        try:
+            stream.close()
+        except Exception as e:
+            logger.debug(f"Closing controller hotplug stream failed: {e}")
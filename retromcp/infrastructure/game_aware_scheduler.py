@@ -0,0 +1,320 @@
+"""Game-aware scheduling of heavy work on the Pi.
+
+While an emulator is running, heavy commands (ROM scans, hashing, ``du``,
+``dpkg-query``, apt) compete with it for CPU and SD card bandwidth and
+cause visible frame drops. The scheduler detects a running emulator,
+wraps heavy commands in ``nice``/``ionice``/``taskset`` and holds back
+background jobs until the game ends.
+"""
+
+import logging
+import re
+import shlex
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from dataclasses import field
+from datetime import datetime
+from enum import Enum
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from ..domain.ports import RetroPieClient
+
+logger = logging.getLogger(__name__)
+
+EMULATORS_DIR = "/opt/retropie/emulators"
+
+# Emulator binaries that may run from outside the emulators directory
+EMULATOR_BINARIES = (
+    "retroarch",
+    "mupen64plus",
+    "PPSSPPSDL",
+    "reicast",
+    "redream",
+    "dosbox",
+    "scummvm",
+    "amiberry",
+    "uae4arm",
+    "drastic",
+    "advmame",
+    "mame",
+    "fbzx",
+    "hatari",
+    "pifba",
+    "pisnes",
+    "vice",
+    "x64",
+)
+
+# One pgrep per detection: anything started from the emulators directory,
+# or a known emulator binary as the first word of its command line
+DETECT_COMMAND = "pgrep -a -f " + shlex.quote(
+    f"^({EMULATORS_DIR}/|(/[^ ]*/)?({'|'.join(EMULATOR_BINARIES)})( |$))"
+)
+
+# Commands heavy enough to disturb a running game, at the start of any
+# command in a pipeline, list or line
+HEAVY_COMMAND_PATTERN = re.compile(
+    r"(?:^|[;&|(\n]\s*|\bsudo\s+)"
+    r"(?:du|find|dpkg-query|dpkg|apt|apt-get|apt-cache|md5sum|sha1sum|"
+    r"sha256sum|crc32|rsync|tar|unzip|7z|retropie_packages\.sh)\b"
+)
+
+# Heredoc redirection, "<<WORD", "<<-WORD" or with a quoted delimiter, but
+# not a "<<<" here-string
+HEREDOC_PATTERN = re.compile(r"(?<!<)<<(-?)\s*(['\"]?)([A-Za-z_][A-Za-z0-9_]*)\2")
+
+
+def strip_heredoc_bodies(command: str) -> str:
+    """Remove heredoc bodies, keeping only the lines the shell runs.
+
+    Args:
+        command: Shell command, possibly spanning several lines
+
+    Returns:
+        The command without the data lines and delimiters of its heredocs
+    """
+    kept: List[str] = []
+    pending: List[Tuple[str, bool]] = []  # Open heredocs: delimiter, strip tabs
+    for line in command.split("\n"):
+        if pending:
+            delimiter, strip_tabs = pending[0]
+            if (line.lstrip("\t") if strip_tabs else line) == delimiter:
+                pending.pop(0)
+            continue
+        kept.append(line)
+        pending.extend(
+            (match.group(3), match.group(1) == "-")
+            for match in HEREDOC_PATTERN.finditer(line)
+        )
+    return "\n".join(kept)
+
+
+class JobPriority(Enum):
+    """Priority of work submitted to the scheduler."""
+
+    BACKGROUND = "background"  # Deferred while a game runs
+    LOW = "low"  # Deferred while a game runs if the policy says so
+    NORMAL = "normal"  # Always runs now
+
+
+@dataclass
+class SchedulingPolicy:
+    """How the scheduler throttles work while a game is running."""
+
+    defer_background: bool = True
+    defer_low: bool = False
+    wrap_heavy_commands: bool = True
+    nice: int = 19  # 0-19
+    ionice_class: int = 3  # 1 realtime, 2 best-effort, 3 idle
+    cpu_affinity: Optional[str] = "0"  # taskset CPU list, None to skip
+    detection_ttl: float = 5.0  # Seconds a detection result is reused
+    resume_poll_interval: float = 15.0  # Seconds between checks for game end
+
+    def to_dict(self) -> Dict[str, object]:
+        """Convert the policy to a dictionary."""
+        return {
+            "defer_background": self.defer_background,
+            "defer_low": self.defer_low,
+            "wrap_heavy_commands": self.wrap_heavy_commands,
+            "nice": self.nice,
+            "ionice_class": self.ionice_class,
+            "cpu_affinity": self.cpu_affinity,
+            "detection_ttl": self.detection_ttl,
+            "resume_poll_interval": self.resume_poll_interval,
+        }
+
+
+@dataclass
+class DeferredJob:
+    """Job held back until no game is running."""
+
+    id: str
+    key: str
+    description: str
+    priority: JobPriority
+    deferred_at: str
+    run: Callable[[], object] = field(repr=False)
+
+
+class GameAwareScheduler:
+    """Throttles heavy commands and defers background jobs during play."""
+
+    def __init__(
+        self, client: RetroPieClient, policy: Optional[SchedulingPolicy] = None
+    ) -> None:
+        """Initialize scheduler.
+
+        Args:
+            client: RetroPie client used to detect running emulators
+            policy: Scheduling policy, defaults to SchedulingPolicy()
+        """
+        self._client = client
+        self.policy = policy or SchedulingPolicy()
+        self._lock = threading.Lock()
+        self._detected_at = 0.0
+        self._active: Optional[str] = None
+        self._deferred: OrderedDict[str, DeferredJob] = OrderedDict()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    @property
+    def deferred_jobs(self) -> List[DeferredJob]:
+        """Get the deferred jobs, oldest first."""
+        with self._lock:
+            return list(self._deferred.values())
+
+    def active_emulator(self, refresh: bool = False) -> Optional[str]:
+        """Get the command line of a running emulator, if any.
+
+        Args:
+            refresh: Detect again even if the cached result is fresh
+
+        Returns:
+            Emulator command line, or None when no game is running
+        """
+        now = time.monotonic()
+        with self._lock:
+            if not refresh and now - self._detected_at < self.policy.detection_ttl:
+                return self._active
+        result = self._client.execute_command(DETECT_COMMAND)
+        active = None
+        if result.success and result.stdout.strip():
+            # "<pid> <command line>"
+            active = result.stdout.strip().splitlines()[0].partition(" ")[2] or None
+        with self._lock:
+            self._active = active
+            self._detected_at = now
+        return active
+
+    def is_heavy(self, command: str) -> bool:
+        """Check if a command is heavy enough to disturb a running game.
+
+        Heredoc bodies are data, not commands, and are not matched.
+        """
+        return HEAVY_COMMAND_PATTERN.search(strip_heredoc_bodies(command)) is not None
+
+    def wrap(self, command: str) -> str:
+        """Run a heavy command at low CPU and I/O priority while a game runs.
+
+        Args:
+            command: Shell command
+
+        Returns:
+            The command, wrapped in nice/ionice/taskset if it is heavy and a
+            game is running, otherwise unchanged
+        """
+        if not self.policy.wrap_heavy_commands or not self.is_heavy(command):
+            return command
+        if self.active_emulator() is None:
+            return command
+
+        prefix = [
+            f"nice -n {self.policy.nice}",
+            f"ionice -c {self.policy.ionice_class}",
+        ]
+        if self.policy.cpu_affinity:
+            prefix.append(f"taskset -c {shlex.quote(self.policy.cpu_affinity)}")
+        return f"{' '.join(prefix)} bash -c {shlex.quote(command)}"
+
+    def submit(
+        self,
+        description: str,
+        job: Callable[[], object],
+        priority: JobPriority = JobPriority.BACKGROUND,
+        key: Optional[str] = None,
+    ) -> Optional[DeferredJob]:
+        """Run a job now, or defer it while a game is running.
+
+        Args:
+            description: Human-readable job description
+            job: Callable doing the work
+            priority: Job priority
+            key: Deduplication key; a deferred job with the same key is
+                replaced. Defaults to the description.
+
+        Returns:
+            The deferred job, or None if the job ran now
+        """
+        if self._should_defer(priority) and self.active_emulator() is not None:
+            deferred = DeferredJob(
+                id=uuid.uuid4().hex[:8],
+                key=key or description,
+                description=description,
+                priority=priority,
+                deferred_at=datetime.now().isoformat(),
+                run=job,
+            )
+            with self._lock:
+                self._deferred.pop(deferred.key, None)
+                self._deferred[deferred.key] = deferred
+                self._ensure_resume_thread()
+            logger.info(f"Deferred '{description}' while a game is running")
+            return deferred
+
+        job()
+        return None
+
+    def run_deferred(self, force: bool = False) -> int:
+        """Run deferred jobs if no game is running.
+
+        Args:
+            force: Run them even while a game is running
+
+        Returns:
+            Number of jobs run
+        """
+        if not force and self.active_emulator(refresh=True) is not None:
+            return 0
+        with self._lock:
+            jobs = list(self._deferred.values())
+            self._deferred.clear()
+        for job in jobs:
+            try:
+                job.run()
+            except Exception as e:
+                logger.warning(f"Deferred job '{job.description}' failed: {e}")
+        return len(jobs)
+
+    def stop(self) -> None:
+        """Stop the resume thread and drop the deferred jobs."""
+        with self._lock:
+            self._deferred.clear()
+            self._stopped.set()
+
+    def _should_defer(self, priority: JobPriority) -> bool:
+        if priority is JobPriority.BACKGROUND:
+            return self.policy.defer_background
+        if priority is JobPriority.LOW:
+            return self.policy.defer_low
+        return False
+
+    def _ensure_resume_thread(self) -> None:
+        """Start the thread that runs deferred jobs. Caller holds the lock."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._resume_when_idle, name="game-aware-scheduler", daemon=True
+        )
+        self._thread.start()
+
+    def _resume_when_idle(self) -> None:
+        """Wait for the game to end and run deferred jobs; exit when none remain."""
+        while not self._stopped.wait(self.policy.resume_poll_interval):
+            try:
+                self.run_deferred()
+            except Exception as e:
+                logger.warning(f"Resuming deferred jobs failed: {e}")
+            with self._lock:
+                if not self._deferred:
+                    self._thread = None
+                    return
+        with self._lock:
+            self._thread = None
@@ -0,0 +1,259 @@
+"""Compressed file storage for large command output.
+
+Queued command results keep only the head and tail of long output inline,
+so queue saves stay small. The full output is written once to its own
+gzip file, named by a random ID, and read back in byte ranges on request.
+
+The file is a series of independent gzip members of ``CHUNK_BYTES``
+uncompressed bytes each, so it still decompresses as one stream. A small
+JSON index next to it holds the exact size and where each member starts,
+so a range read decompresses only the members it covers.
+"""
+
+import gzip
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+import uuid
+import zlib
+from pathlib import Path
+from typing import Any
+from typing import BinaryIO
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from ..domain.models import OutputRange
+from ..domain.models import Result
+from ..domain.models import ValidationError
+from ..domain.ports import CommandOutputRepository
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_SUFFIX = ".out.gz"
+INDEX_SUFFIX = ".out.idx"
+CHUNK_BYTES = 256 * 1024  # Uncompressed bytes per gzip member
+DEFAULT_RETENTION_DAYS = 30.0  # Matches the SQLite queue store
+
+_OUTPUT_ID = re.compile(r"^[0-9a-f]{16}$")
+
+
+class GzipOutputStore(CommandOutputRepository):
+    """Stores command outputs as gzip files in one directory."""
+
+    def __init__(self, directory: str) -> None:
+        """Initialize store.
+
+        Args:
+            directory: Directory holding the output files, created on first save
+        """
+        self.directory = Path(directory)
+
+    def _path(self, output_id: str) -> Path:
+        return self.directory / f"{output_id}{OUTPUT_SUFFIX}"
+
+    def _index_path(self, output_id: str) -> Path:
+        return self.directory / f"{output_id}{INDEX_SUFFIX}"
+
+    def save(self, data: bytes) -> Result[str, ValidationError]:
+        """Compress and store an output.
+
+        Args:
+            data: Full output
+
+        Returns:
+            Result containing the output ID or ValidationError
+        """
+        output_id = uuid.uuid4().hex[:16]
+        offsets = [0]
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as raw:
+                    for start in range(0, len(data), CHUNK_BYTES):
+                        member = gzip.compress(
+                            data[start : start + CHUNK_BYTES], mtime=0
+                        )
+                        raw.write(member)
+                        offsets.append(offsets[-1] + len(member))
+                index = {
+                    "chunk_bytes": CHUNK_BYTES,
+                    "total_bytes": len(data),
+                    "offsets": offsets,
+                }
+                # The index lands first, so an output is never visible without it
+                self._write_atomic(
+                    self._index_path(output_id), json.dumps(index).encode("utf-8")
+                )
+                os.replace(temp_path, self._path(output_id))
+            except BaseException:
+                Path(temp_path).unlink(missing_ok=True)
+                self._index_path(output_id).unlink(missing_ok=True)
+                raise
+        except OSError as e:
+            return Result.error(
+                ValidationError(
+                    code="OUTPUT_SAVE_FAILED",
+                    message=f"Failed to save command output: {e}",
+                )
+            )
+        return Result.success(output_id)
+
+    def _write_atomic(self, path: Path, content: bytes) -> None:
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                temp_file.write(content)
+            os.replace(temp_path, path)
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+
+    def read(
+        self, output_id: str, offset: int = 0, length: Optional[int] = None
+    ) -> Result[OutputRange, ValidationError]:
+        """Read a byte range of a stored output.
+
+        Args:
+            output_id: ID returned by save()
+            offset: First byte to read
+            length: Bytes to read, or None for the rest of the output
+
+        Returns:
+            Result containing the range or ValidationError
+        """
+        if not _OUTPUT_ID.match(output_id or ""):
+            return Result.error(
+                ValidationError(
+                    code="INVALID_OUTPUT_ID", message=f"Invalid output ID: {output_id}"
+                )
+            )
+        if offset < 0 or (length is not None and length < 0):
+            return Result.error(
+                ValidationError(
+                    code="INVALID_RANGE",
+                    message="Offset and length must not be negative",
+                )
+            )
+        path = self._path(output_id)
+        try:
+            index = self._load_index(output_id)
+            with path.open("rb") as raw:
+                if index is None:
+                    data, total = self._read_unindexed(raw, offset, length)
+                else:
+                    data, total = self._read_indexed(raw, index, offset, length)
+        except FileNotFoundError:
+            return Result.error(
+                ValidationError(
+                    code="OUTPUT_NOT_FOUND", message=f"Output not found: {output_id}"
+                )
+            )
+        except (
+            OSError,
+            EOFError,
+            zlib.error,
+            ValueError,
+            KeyError,
+            IndexError,
+        ) as e:
+            return Result.error(
+                ValidationError(
+                    code="OUTPUT_READ_FAILED",
+                    message=f"Failed to read output {output_id}: {e}",
+                )
+            )
+        return Result.success(
+            OutputRange(
+                output_id=output_id, offset=offset, data=data, total_bytes=total
+            )
+        )
+
+    def _load_index(self, output_id: str) -> Optional[Dict[str, Any]]:
+        """Load the member index of an output, None if it was saved without one."""
+        try:
+            content = self._index_path(output_id).read_bytes()
+        except FileNotFoundError:
+            return None
+        return json.loads(content)
+
+    @staticmethod
+    def _read_indexed(
+        raw: BinaryIO,
+        index: Dict[str, Any],
+        offset: int,
+        length: Optional[int],
+    ) -> Tuple[bytes, int]:
+        """Decompress only the members covering a range."""
+        total = index["total_bytes"]
+        chunk = index["chunk_bytes"]
+        offsets = index["offsets"]
+        start = min(offset, total)
+        end = total if length is None else min(total, start + length)
+        if start >= end:
+            return b"", total
+        first = start // chunk
+        last = (end - 1) // chunk
+        raw.seek(offsets[first])
+        members = raw.read(offsets[last + 1] - offsets[first])
+        data = gzip.decompress(members)
+        base = first * chunk
+        return data[start - base : end - base], total
+
+    @staticmethod
+    def _read_unindexed(
+        raw: BinaryIO,
+        offset: int,
+        length: Optional[int],
+    ) -> Tuple[bytes, int]:
+        """Read a range of an output saved as one gzip stream without an index.
+
+        The stream is decompressed from the start, and to the end to count
+        its exact size.
+        """
+        parts: List[bytes] = []
+        total = 0
+        end = None if length is None else offset + length
+        with gzip.GzipFile(fileobj=raw, mode="rb") as compressed:
+            while True:
+                block = compressed.read(CHUNK_BYTES)
+                if not block:
+                    break
+                block_start = total
+                total += len(block)
+                if total <= offset or (end is not None and block_start >= end):
+                    continue
+                stop = None if end is None else end - block_start
+                parts.append(block[max(offset - block_start, 0) : stop])
+        return b"".join(parts), total
+
+    def prune(self, max_age_days: float) -> int:
+        """Delete outputs older than the given age.
+
+        Args:
+            max_age_days: Age in days after which outputs are deleted
+
+        Returns:
+            Number of outputs deleted
+        """
+        cutoff = time.time() - max_age_days * 86400
+        deleted = 0
+        try:
+            paths = list(self.directory.glob(f"*{OUTPUT_SUFFIX}"))
+        except OSError:
+            return 0
+        for path in paths:
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    output_id = path.name[: -len(OUTPUT_SUFFIX)]
+                    self._index_path(output_id).unlink(missing_ok=True)
+                    deleted += 1
+            except OSError as e:
+                logger.debug(f"Could not prune {path}: {e}")
+        return deleted
@@ -1,23 +1,55 @@
-"""Persistent storage for command queues to survive MCP instance recreation."""
+"""Persistent storage for command queues to survive MCP instance recreation.
 
+Queues live in a JSON snapshot plus an append-only journal next to it
+(``<storage_path>.journal``, one JSON record per line). Every state
+change appends only the records that differ from what is already on
+disk, so a status update costs one small write instead of rewriting
+every queue. The first save writes the snapshot, loading replays the
+journal over it, and once the journal grows past the snapshot size it
+is compacted into a new snapshot and truncated.
+
+Files are read on first use and each queue is deserialized when it is
+first accessed. One instance is meant to be shared, so access is
+serialized with a lock.
+"""
+
+import fcntl
 import json
 import os
+import tempfile
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
-import fcntl
-import tempfile
-
-from ..domain.models import (
-    Result,
-    ValidationError,
-    CommandQueue,
-    CommandStatus,
-    QueuedCommand,
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from ..domain.models import CommandQueue
+from ..domain.models import CommandStatus
+from ..domain.models import QueuedCommand
+from ..domain.models import QueueSummary
+from ..domain.models import Result
+from ..domain.models import ValidationError
+from ..domain.ports import CommandQueueRepository
+
+JOURNAL_SUFFIX = ".journal"
+# The journal is compacted once it is larger than both this and the snapshot
+COMPACT_MIN_BYTES = 256 * 1024
+
+_QUEUE_FIELDS = (
+    "id",
+    "name",
+    "current_index",
+    "created_at",
+    "auto_execute",
+    "pause_between",
+    "trusted",
 )
 
 
-class PersistentQueueStorage:
+class PersistentQueueStorage(CommandQueueRepository):
     """Manages persistent storage of command queues using JSON files."""
 
     def __init__(self, storage_path: str) -> None:
@@ -27,9 +59,19 @@ class PersistentQueueStorage:
             storage_path: Path to JSON file for storing queues
         """
         self.storage_path = storage_path
+        self.journal_path = storage_path + JOURNAL_SUFFIX
         self.queues: Dict[str, CommandQueue] = {}
+        # Queues read from disk but not yet deserialized
+        self._pending: Dict[str, Any] = {}
+        self._loaded = False
+        self._lock = threading.RLock()
+        # Serialized state on disk per queue: (queue fields, commands by id)
+        self._persisted: Dict[str, Tuple[Dict[str, Any], Dict[str, Dict]]] = {}
+        self._snapshot_bytes = 0
+        self._journal_bytes = 0
+        # Set when an append may have left a partial line; forces compaction
+        self._journal_damaged = False
         self._ensure_storage_directory()
-        self._load_queues()
 
     def _ensure_storage_directory(self) -> None:
         """Ensure storage directory exists."""
@@ -40,40 +82,211 @@ class PersistentQueueStorage:
             # If we can't create the directory, we'll handle it gracefully later
             pass
 
+    def _ensure_loaded(self) -> None:
+        """Read storage on first use. Caller holds the lock."""
+        if not self._loaded:
+            self._loaded = True
+            self._load_queues()
+
     def _load_queues(self) -> None:
-        """Load queues from persistent storage."""
+        """Load the snapshot and replay the journal over it.
+
+        Queues are deserialized on first access, see _materialize.
+        """
+        data: Dict[str, Any] = {}
         try:
-            if not os.path.exists(self.storage_path):
-                # File doesn't exist yet, start with empty storage
-                self.queues = {}
-                return
-
-            with open(self.storage_path, "r") as f:
-                # Use file locking for thread safety
-                fcntl.flock(f.fileno(), fcntl.LOCK_SH)
-                try:
-                    data = json.load(f)
-                    if isinstance(data, dict):
-                        self.queues = {}
-                        for queue_id, queue_data in data.items():
-                            queue = self._deserialize_queue(queue_data)
-                            if queue:
-                                self.queues[queue_id] = queue
-                    else:
-                        # Invalid format, start fresh
-                        self.queues = {}
-                finally:
-                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            if os.path.exists(self.storage_path):
+                with open(self.storage_path) as f:
+                    # Use file locking for thread safety
+                    fcntl.flock(f.fileno(), fcntl.LOCK_SH)
+                    try:
+                        loaded = json.load(f)
+                        if isinstance(loaded, dict):
+                            data = loaded
+                        self._snapshot_bytes = os.fstat(f.fileno()).st_size
+                    finally:
+                        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
         except (json.JSONDecodeError, OSError, PermissionError):
             # Corrupted file or permission issues - start with empty storage
-            self.queues = {}
+            data = {}
+
+        # The first save always writes a snapshot, so a journal without one
+        # is left over from a removed snapshot and is not replayed
+        if self._snapshot_bytes:
+            try:
+                self._replay_journal(data)
+            except (OSError, PermissionError):
+                # Unreadable journal - keep the snapshot state
+                self._journal_damaged = True
+
+        for queue_id, queue_data in data.items():
+            if queue_id not in self.queues:
+                self._pending[queue_id] = queue_data
+
+    def _materialize(self, queue_id: str) -> Optional[CommandQueue]:
+        """Get a queue, deserializing it on first access. Caller holds the lock."""
+        if queue_id not in self._pending:
+            return self.queues.get(queue_id)
+        queue = self._deserialize_queue(self._pending.pop(queue_id))
+        if queue:
+            self.queues[queue_id] = queue
+            self._persisted[queue_id] = self._split(self._serialize_queue(queue))
+        return queue
+
+    def _materialize_all(self) -> None:
+        """Deserialize every queue not accessed yet. Caller holds the lock."""
+        for queue_id in list(self._pending):
+            self._materialize(queue_id)
+
+    def _replay_journal(self, data: Dict[str, Any]) -> None:
+        """Apply journal records, oldest first, to serialized queues.
+
+        Records carry absolute values, so replaying a journal that is
+        already contained in the snapshot (a crash between writing the
+        snapshot and truncating the journal) yields the same state.
+        """
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path) as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_SH)
+            try:
+                for line in f:
+                    self._journal_bytes += len(line.encode())
+                    try:
+                        record = json.loads(line)
+                        self._apply_record(data, record)
+                    except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+                        # Torn or corrupted record - skip it and compact soon
+                        self._journal_damaged = True
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def _apply_record(self, data: Dict[str, Any], record: Dict[str, Any]) -> None:
+        """Apply one journal record to serialized queues."""
+        op = record["op"]
+        queue_id = record["queue_id"]
+        if op == "put":
+            data[queue_id] = record["queue"]
+        elif op == "delete":
+            data.pop(queue_id, None)
+        elif op == "queue":
+            data[queue_id].update(record["fields"])
+        elif op == "command":
+            command = record["command"]
+            commands = data[queue_id]["commands"]
+            for i, existing in enumerate(commands):
+                if existing.get("id") == command["id"]:
+                    commands[i] = command
+                    break
+            else:
+                commands.append(command)
+        else:
+            raise ValueError(f"Unknown journal record: {op}")
+
+    def _split(
+        self, serialized: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], Dict[str, Dict]]:
+        """Split a serialized queue into its fields and commands by id."""
+        fields = {key: serialized[key] for key in _QUEUE_FIELDS}
+        commands = {cmd["id"]: cmd for cmd in serialized["commands"]}
+        return fields, commands
+
+    def _diff_records(self, queue_id: str, queue: CommandQueue) -> List[Dict]:
+        """Build the journal records that bring the disk state up to a queue."""
+        serialized = self._serialize_queue(queue)
+        persisted = self._persisted.get(queue_id)
+        if persisted is None:
+            return [{"op": "put", "queue_id": queue_id, "queue": serialized}]
+
+        fields, commands = self._split(serialized)
+        old_fields, old_commands = persisted
+        # Commands are only ever appended; anything else rewrites the queue
+        old_ids = list(old_commands)
+        if [cmd["id"] for cmd in serialized["commands"]][: len(old_ids)] != old_ids:
+            return [{"op": "put", "queue_id": queue_id, "queue": serialized}]
+
+        records: List[Dict] = [
+            {"op": "command", "queue_id": queue_id, "command": command}
+            for command_id, command in commands.items()
+            if old_commands.get(command_id) != command
+        ]
+        changed = {
+            key: value for key, value in fields.items() if old_fields.get(key) != value
+        }
+        if changed:
+            records.append({"op": "queue", "queue_id": queue_id, "fields": changed})
+        return records
+
+    def _mark_persisted(self, queue_id: str) -> None:
+        """Record a queue's current state as written to disk."""
+        queue = self.queues.get(queue_id)
+        if queue is not None:
+            self._persisted[queue_id] = self._split(self._serialize_queue(queue))
+
+    def _save_queues(
+        self, records: Optional[List[Dict]] = None
+    ) -> Result[None, ValidationError]:
+        """Persist queue changes.
 
-    def _save_queues(self) -> Result[None, ValidationError]:
-        """Save queues to persistent storage.
+        Args:
+            records: Journal records to append. When None, or when the
+                journal has grown past the snapshot, all queues are
+                written to a new snapshot and the journal is truncated.
 
         Returns:
             Result indicating success or failure
         """
+        with self._lock:
+            if records is not None and not self._compaction_due():
+                return self._append_journal(records)
+            return self._write_snapshot()
+
+    def _compaction_due(self) -> bool:
+        if self._journal_damaged or not self._snapshot_bytes:
+            return True
+        return self._journal_bytes > max(COMPACT_MIN_BYTES, self._snapshot_bytes)
+
+    def _append_journal(self, records: List[Dict]) -> Result[None, ValidationError]:
+        """Append records to the journal with one write and fsync."""
+        if not records:
+            return Result.success(None)
+        payload = "".join(
+            json.dumps(record, default=str) + "\n" for record in records
+        ).encode()
+        try:
+            fd = os.open(
+                self.journal_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600
+            )
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                try:
+                    written = os.write(fd, payload)
+                    if written != len(payload):
+                        self._journal_damaged = True
+                        raise OSError("Short write to queue journal")
+                    os.fsync(fd)
+                finally:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+            finally:
+                os.close(fd)
+        except (OSError, PermissionError) as e:
+            return Result.error(
+                ValidationError(
+                    code="STORAGE_SAVE_FAILED",
+                    message=f"Failed to save queues to storage: {e}",
+                )
+            )
+        self._journal_bytes += len(payload)
+        return Result.success(None)
+
+    def _write_snapshot(self) -> Result[None, ValidationError]:
+        """Write all queues to a new snapshot and truncate the journal.
+
+        Returns:
+            Result indicating success or failure
+        """
+        self._ensure_loaded()
+        self._materialize_all()
         try:
             # Create temp file first, then atomic rename for safety
             temp_fd, temp_path = tempfile.mkstemp(
@@ -92,12 +305,12 @@ class PersistentQueueStorage:
                         json.dump(serialized_queues, f, indent=2, default=str)
                         f.flush()
                         os.fsync(f.fileno())
+                        snapshot_bytes = f.tell()
                     finally:
                         fcntl.flock(f.fileno(), fcntl.LOCK_UN)
 
                 # Atomic rename to final location
                 os.rename(temp_path, self.storage_path)
-                return Result.success(None)
 
             except Exception:
                 # Clean up temp file on error
@@ -107,14 +320,27 @@ class PersistentQueueStorage:
                     pass
                 raise
 
+            # The snapshot now holds everything the journal did
+            with open(self.journal_path, "w"):
+                pass
+
         except (OSError, PermissionError) as e:
             return Result.error(
                 ValidationError(
                     code="STORAGE_SAVE_FAILED",
-                    message=f"Failed to save queues to storage: {str(e)}",
+                    message=f"Failed to save queues to storage: {e}",
                 )
             )
 
+        self._snapshot_bytes = snapshot_bytes
+        self._journal_bytes = 0
+        self._journal_damaged = False
+        self._persisted = {
+            queue_id: self._split(serialized)
+            for queue_id, serialized in serialized_queues.items()
+        }
+        return Result.success(None)
+
     def _serialize_queue(self, queue: CommandQueue) -> Dict:
         """Serialize a CommandQueue to dictionary."""
         return {
@@ -125,6 +351,7 @@ class PersistentQueueStorage:
             "created_at": queue.created_at.isoformat(),
             "auto_execute": queue.auto_execute,
             "pause_between": queue.pause_between,
+            "trusted": queue.trusted,
         }
 
     def _serialize_command(self, command: QueuedCommand) -> Dict:
@@ -140,6 +367,7 @@ class PersistentQueueStorage:
             if command.start_time
             else None,
             "end_time": command.end_time.isoformat() if command.end_time else None,
+            "depends_on": list(command.depends_on),
         }
 
     def _deserialize_queue(self, data: Dict) -> Optional[CommandQueue]:
@@ -167,6 +395,9 @@ class PersistentQueueStorage:
             auto_execute_val = data.get("auto_execute", False)
             if not isinstance(auto_execute_val, bool):
                 return None
+            trusted = data.get("trusted", False)
+            if not isinstance(trusted, bool):
+                return None
 
             # Validate commands is a list
             commands_data = data.get("commands", [])
@@ -179,6 +410,7 @@ class PersistentQueueStorage:
                 current_index=current_index,
                 auto_execute=auto_execute_val,
                 pause_between=pause_between,
+                trusted=trusted,
             )
 
             # Parse created_at if present
@@ -236,6 +468,7 @@ class PersistentQueueStorage:
                 error=data.get("error"),
                 start_time=start_time,
                 end_time=end_time,
+                depends_on=list(data.get("depends_on") or []),
             )
 
         except (KeyError, TypeError):
@@ -254,18 +487,52 @@ class PersistentQueueStorage:
         Returns:
             Result indicating success or failure
         """
-        if not queue_id or not queue_id.strip():
-            return Result.error(
-                ValidationError(
-                    code="INVALID_QUEUE_ID", message="Queue ID cannot be empty"
+        with self._lock:
+            self._ensure_loaded()
+            if not queue_id or not queue_id.strip():
+                return Result.error(
+                    ValidationError(
+                        code="INVALID_QUEUE_ID", message="Queue ID cannot be empty"
+                    )
                 )
-            )
 
-        # Store queue in memory
-        self.queues[queue_id] = queue
+            # Store queue in memory
+            self._pending.pop(queue_id, None)
+            self.queues[queue_id] = queue
+
+            # Persist to storage
+            records = [
+                {
+                    "op": "put",
+                    "queue_id": queue_id,
+                    "queue": self._serialize_queue(queue),
+                }
+            ]
+            result = self._save_queues(records)
+            if result.is_success():
+                self._mark_persisted(queue_id)
+            return result
+
+    def next_queue_id(self) -> Result[str, ValidationError]:
+        """Allocate the ID after the highest existing one.
+
+        This storage never evicts queues, so only an explicitly deleted
+        newest queue can have its ID handed out again.
 
-        # Persist to storage
-        return self._save_queues()
+        Returns:
+            Result containing the new queue ID
+        """
+        with self._lock:
+            self._ensure_loaded()
+            highest = max(
+                (
+                    int(queue_id[1:])
+                    for queue_id in [*self.queues, *self._pending]
+                    if queue_id[1:].isdigit()
+                ),
+                default=0,
+            )
+            return Result.success(f"q{highest + 1}")
 
     def get_queue(self, queue_id: str) -> Optional[CommandQueue]:
         """Retrieve queue from storage.
@@ -276,7 +543,9 @@ class PersistentQueueStorage:
         Returns:
             CommandQueue instance or None if not found
         """
-        return self.queues.get(queue_id)
+        with self._lock:
+            self._ensure_loaded()
+            return self._materialize(queue_id)
 
     def list_queues(self) -> List[str]:
         """List all persisted queue IDs.
@@ -284,7 +553,35 @@ class PersistentQueueStorage:
         Returns:
             List of queue IDs
         """
-        return list(self.queues.keys())
+        with self._lock:
+            self._ensure_loaded()
+            self._materialize_all()
+            return list(self.queues.keys())
+
+    def summarize_queues(self) -> List[QueueSummary]:
+        """Get the progress of all queues.
+
+        Returns:
+            One summary per queue, in creation order
+        """
+        with self._lock:
+            self._ensure_loaded()
+            self._materialize_all()
+            summaries = [
+                QueueSummary(
+                    id=queue_id,
+                    name=queue.name,
+                    created_at=queue.created_at,
+                    completed=sum(
+                        1
+                        for cmd in queue.commands
+                        if cmd.status == CommandStatus.COMPLETED
+                    ),
+                    total=len(queue.commands),
+                )
+                for queue_id, queue in self.queues.items()
+            ]
+        return sorted(summaries, key=lambda summary: summary.created_at)
 
     def delete_queue(self, queue_id: str) -> Result[None, ValidationError]:
         """Delete queue from storage.
@@ -295,23 +592,40 @@ class PersistentQueueStorage:
         Returns:
             Result indicating success or failure
         """
-        if queue_id not in self.queues:
-            return Result.error(
-                ValidationError(
-                    code="QUEUE_NOT_FOUND",
-                    message=f"Queue with ID '{queue_id}' not found",
+        with self._lock:
+            self._ensure_loaded()
+            if self._materialize(queue_id) is None:
+                return Result.error(
+                    ValidationError(
+                        code="QUEUE_NOT_FOUND",
+                        message=f"Queue with ID '{queue_id}' not found",
+                    )
                 )
-            )
 
-        # Store original queue for rollback
-        deleted_queue = self.queues[queue_id]
-        del self.queues[queue_id]
+            # Store original queue for rollback
+            deleted_queue = self.queues[queue_id]
+            del self.queues[queue_id]
 
-        try:
-            # Persist the change
-            save_result = self._save_queues()
-            if save_result.is_error():
-                # Rollback on save failure
+            try:
+                # Persist the change
+                save_result = self._save_queues(
+                    [{"op": "delete", "queue_id": queue_id}]
+                )
+                if save_result.is_error():
+                    # Rollback on save failure
+                    self.queues[queue_id] = deleted_queue
+                    return Result.error(
+                        ValidationError(
+                            code="DELETE_QUEUE_SAVE_FAILED",
+                            message="Failed to save after deleting queue",
+                        )
+                    )
+
+                self._persisted.pop(queue_id, None)
+                return Result.success(None)
+
+            except Exception as e:
+                # Rollback on exception
                 self.queues[queue_id] = deleted_queue
                 return Result.error(
                     ValidationError(
@@ -320,18 +634,6 @@ class PersistentQueueStorage:
                     )
                 )
 
-            return Result.success(None)
-
-        except Exception as e:
-            # Rollback on exception
-            self.queues[queue_id] = deleted_queue
-            return Result.error(
-                ValidationError(
-                    code="DELETE_QUEUE_SAVE_FAILED",
-                    message="Failed to save after deleting queue",
-                )
-            )
-
     def update_queue(
         self, queue_id: str, queue: CommandQueue
     ) -> Result[None, ValidationError]:
@@ -344,34 +646,37 @@ class PersistentQueueStorage:
         Returns:
             Result indicating success or failure
         """
-        if queue_id not in self.queues:
-            return Result.error(
-                ValidationError(
-                    code="QUEUE_NOT_FOUND",
-                    message=f"Queue with ID '{queue_id}' not found",
+        with self._lock:
+            self._ensure_loaded()
+            if self._materialize(queue_id) is None:
+                return Result.error(
+                    ValidationError(
+                        code="QUEUE_NOT_FOUND",
+                        message=f"Queue with ID '{queue_id}' not found",
+                    )
                 )
-            )
 
-        # Store original queue for potential rollback
-        original_queue = self.queues[queue_id]
-        self.queues[queue_id] = queue
+            # Store original queue for potential rollback
+            original_queue = self.queues[queue_id]
+            self.queues[queue_id] = queue
 
-        try:
-            save_result = self._save_queues()
+            try:
+                save_result = self._save_queues(self._diff_records(queue_id, queue))
 
-            if save_result.is_error():
-                # Rollback on save failure
-                self.queues[queue_id] = original_queue
-                return save_result
+                if save_result.is_error():
+                    # Rollback on save failure
+                    self.queues[queue_id] = original_queue
+                    return save_result
 
-            return Result.success(None)
+                self._mark_persisted(queue_id)
+                return Result.success(None)
 
-        except Exception as e:
-            # Rollback on exception and return error
-            self.queues[queue_id] = original_queue
-            return Result.error(
-                ValidationError(
-                    code="UPDATE_QUEUE_FAILED",
-                    message=f"Failed to update queue: {str(e)}",
+            except Exception as e:
+                # Rollback on exception and return error
+                self.queues[queue_id] = original_queue
+                return Result.error(
+                    ValidationError(
+                        code="UPDATE_QUEUE_FAILED",
+                        message=f"Failed to update queue: {e}",
+                    )
                 )
-            )
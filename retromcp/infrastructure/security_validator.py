@@ -1,21 +1,90 @@
 """Security validation service for command and path validation.
 
 Implements whitelist-based validation to replace regex blacklist approaches.
+Command validation runs on every executed and queued command, so the
+injection patterns are compiled once into a single regex, the whitelist
+is a prefix trie over command tokens, and recent decisions are cached.
 """
 
 from __future__ import annotations
 
 import re
 import shlex
+import threading
 import urllib.parse
+from collections import OrderedDict
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Generic
+from typing import Iterable
 from typing import TypeVar
 
 T = TypeVar("T")
 E = TypeVar("E")
 
+DECISION_CACHE_SIZE = 1024  # Recent command decisions kept
+
+_DANGEROUS_COMMANDS = r"\b(rm|dd|mkfs|chmod\s+777|passwd|su|sudo)\b"
+
+INJECTION_PATTERNS = (
+    rf";.*{_DANGEROUS_COMMANDS}",  # Command separator with dangerous commands
+    rf"&&.*{_DANGEROUS_COMMANDS}",  # Command AND with dangerous commands
+    rf"\|\|.*{_DANGEROUS_COMMANDS}",  # Command OR with dangerous commands
+    r"\$\(",  # Command substitution
+    r"`[^`]*`",  # Backtick command substitution
+    r"\beval\b",  # Eval command
+    r"\bexec\b",  # Exec command
+    r">\s*/dev/(sd|hd|nvme)",  # Writing to block devices
+    r">\s*/etc/",  # Writing to system config
+    r"\|\s*(bash|sh|zsh|fish)\b",  # Pipe to shell interpreters
+    r"curl.*\|\s*(bash|sh)",  # Download and execute
+    r"wget.*\|\s*(bash|sh)",  # Download and execute
+    r"nc.*-e\s*/bin/",  # Reverse shell with -e flag
+    r"\bnc\b.*\d+",  # Any nc command with port number (potential reverse shell)
+    r"\$\{IFS\}",  # IFS injection attack
+    r";",  # Any command separator
+    r"&&",  # Any command AND
+    r"\|\|",  # Any command OR
+)
+
+# One pass over the command instead of one search per pattern
+_INJECTION_PATTERN = re.compile(
+    "|".join(f"(?:{pattern})" for pattern in INJECTION_PATTERNS), re.IGNORECASE
+)
+
+
+def _tokenize(command: str) -> list[str]:
+    """Split a command into shell words, falling back to whitespace."""
+    try:
+        return shlex.split(command)
+    except ValueError:
+        return command.split()
+
+
+class _CommandTrie:
+    """Prefix trie of whitelisted commands over their tokens."""
+
+    _END = None  # Key marking the end of a whitelisted entry
+
+    def __init__(self, entries: Iterable[str]) -> None:
+        self._root: dict[str | None, dict] = {}
+        for entry in entries:
+            node = self._root
+            for token in _tokenize(entry):
+                node = node.setdefault(token, {})
+            node[self._END] = {}
+
+    def matches(self, tokens: list[str]) -> bool:
+        """Check if a whitelisted entry is a prefix of the tokens."""
+        node = self._root
+        for token in tokens:
+            node = node.get(token)
+            if node is None:
+                return False
+            if self._END in node:
+                return True
+        return False
+
 
 @dataclass(frozen=True)
 class ValidationResult(Generic[T, E]):
@@ -60,10 +129,18 @@ class ValidationResult(Generic[T, E]):
 class SecurityValidator:
     """Whitelist-based security validator for commands and paths."""
 
-    def __init__(self) -> None:
-        """Initialize the security validator."""
+    def __init__(self, cache_size: int = DECISION_CACHE_SIZE) -> None:
+        """Initialize the security validator.
+
+        Args:
+            cache_size: Number of recent command decisions to cache, 0 to disable
+        """
         self._command_whitelist = self._build_command_whitelist()
+        self._whitelist_trie = _CommandTrie(self._command_whitelist)
         self._safe_path_patterns = self._build_safe_path_patterns()
+        self._cache_size = cache_size
+        self._decisions: OrderedDict[str, ValidationResult[str, str]] = OrderedDict()
+        self._cache_lock = threading.Lock()
 
     def _build_command_whitelist(self) -> set[str]:
         """Build comprehensive whitelist of allowed command patterns."""
@@ -201,17 +278,35 @@ class SecurityValidator:
             return ValidationResult.error("Empty command not allowed")
 
         command = command.strip()
-
+        if self._cache_size <= 0:
+            return self._decide(command)
+
+        with self._cache_lock:
+            decision = self._decisions.get(command)
+            if decision is not None:
+                self._decisions.move_to_end(command)
+                return decision
+        # Decide outside the lock; racing threads reach the same decision
+        decision = self._decide(command)
+        with self._cache_lock:
+            self._decisions[command] = decision
+            if len(self._decisions) > self._cache_size:
+                self._decisions.popitem(last=False)
+        return decision
+
+    def _decide(self, command: str) -> ValidationResult[str, str]:
+        """Validate a stripped, non-empty command without the cache."""
         # Check for command injection patterns
         if self._contains_injection_patterns(command):
             return ValidationResult.error(
                 f"Command contains dangerous injection patterns: {command}"
             )
 
-        # Extract base command for whitelist checking
-        base_command = self._extract_base_command(command)
+        # Tokenize once for the base command and the whitelist check
+        tokens = _tokenize(command)
+        base_command = tokens[0] if tokens else ""
 
-        if not self._is_whitelisted_command(command, base_command):
+        if not self._whitelist_trie.matches(tokens):
             return ValidationResult.error(
                 f"Dangerous command blocked: {base_command} not in whitelist"
             )
@@ -220,69 +315,7 @@ class SecurityValidator:
 
     def _contains_injection_patterns(self, command: str) -> bool:
         """Check for command injection patterns."""
-        dangerous_patterns = [
-            r";.*\b(rm|dd|mkfs|chmod\s+777|passwd|su|sudo)\b",  # Command separator with dangerous commands
-            r"&&.*\b(rm|dd|mkfs|chmod\s+777|passwd|su|sudo)\b",  # Command AND with dangerous commands
-            r"\|\|.*\b(rm|dd|mkfs|chmod\s+777|passwd|su|sudo)\b",  # Command OR with dangerous commands
-            r"\$\(",  # Command substitution
-            r"`[^`]*`",  # Backtick command substitution
-            r"\beval\b",  # Eval command
-            r"\bexec\b",  # Exec command
-            r">\s*/dev/(sd|hd|nvme)",  # Writing to block devices
-            r">\s*/etc/",  # Writing to system config
-            r"\|\s*(bash|sh|zsh|fish)\b",  # Pipe to shell interpreters
-            r"curl.*\|\s*(bash|sh)",  # Download and execute
-            r"wget.*\|\s*(bash|sh)",  # Download and execute
-            r"nc.*-e\s*/bin/",  # Reverse shell with -e flag
-            r"\bnc\b.*\d+",  # Any nc command with port number (potential reverse shell)
-            r"\$\{IFS\}",  # IFS injection attack
-            r";",  # Any command separator
-            r"&&",  # Any command AND
-            r"\|\|",  # Any command OR
-        ]
-
-        for pattern in dangerous_patterns:
-            if re.search(pattern, command, re.IGNORECASE):
-                return True
-
-        return False
-
-    def _extract_base_command(self, command: str) -> str:
-        """Extract the base command from a full command string."""
-        # Use shlex to properly parse the command
-        try:
-            tokens = shlex.split(command)
-            if tokens:
-                return tokens[0]
-        except ValueError:
-            # If shlex parsing fails, fall back to simple splitting
-            pass
-
-        # Simple fallback
-        return command.split()[0] if command.split() else ""
-
-    def _is_whitelisted_command(self, full_command: str, base_command: str) -> bool:
-        """Check if command is in whitelist."""
-        # Direct base command match
-        if base_command in self._command_whitelist:
-            return True
-
-        # Pattern matching for parameterized commands
-        for allowed_pattern in self._command_whitelist:
-            if self._matches_command_pattern(full_command, allowed_pattern):
-                return True
-
-        return False
-
-    def _matches_command_pattern(self, command: str, pattern: str) -> bool:
-        """Check if command matches an allowed pattern."""
-        # For patterns like "systemctl status", check if command starts with it
-        if " " in pattern:
-            return command.startswith(pattern + " ") or command == pattern
-
-        # For single commands, exact match on base command
-        base_command = self._extract_base_command(command)
-        return base_command == pattern
+        return _INJECTION_PATTERN.search(command) is not None
 
     def validate_path(self, path: str) -> ValidationResult[str, str]:
         """Validate path using canonicalization and whitelist.
@@ -0,0 +1,596 @@
+"""SQLite storage for command queues.
+
+An alternative to the JSON snapshot and journal for long queue histories.
+Queues and commands live in indexed tables and command output in a
+separate table that is read only when a queue is loaded, so listing
+progress never touches output. Updates run in one transaction that writes
+only changed rows, the database uses WAL so readers never block the
+writer, and finished queues past the retention limits are evicted.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from ..domain.models import CommandQueue
+from ..domain.models import CommandStatus
+from ..domain.models import QueuedCommand
+from ..domain.models import QueueSummary
+from ..domain.models import Result
+from ..domain.models import ValidationError
+from ..domain.ports import CommandQueueRepository
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_FINISHED_QUEUES = 50
+DEFAULT_RETENTION_DAYS = 30.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS queues (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    current_index INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    auto_execute INTEGER NOT NULL,
+    pause_between INTEGER NOT NULL,
+    finished_at REAL,
+    trusted INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_queues_finished_at ON queues (finished_at);
+CREATE TABLE IF NOT EXISTS commands (
+    queue_id TEXT NOT NULL REFERENCES queues (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    command TEXT NOT NULL,
+    description TEXT NOT NULL,
+    status TEXT NOT NULL,
+    error TEXT,
+    start_time TEXT,
+    end_time TEXT,
+    depends_on TEXT,
+    PRIMARY KEY (queue_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_commands_queue_status ON commands (queue_id, status);
+CREATE INDEX IF NOT EXISTS idx_commands_status ON commands (status);
+CREATE TABLE IF NOT EXISTS command_outputs (
+    queue_id TEXT NOT NULL REFERENCES queues (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    result TEXT NOT NULL,
+    PRIMARY KEY (queue_id, position)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+# Columns added after the first release, created on open in older databases
+_ADDED_COLUMNS = (
+    ("commands", "depends_on", "TEXT"),
+    ("queues", "trusted", "INTEGER NOT NULL DEFAULT 0"),
+)
+
+_UNFINISHED = (CommandStatus.PENDING, CommandStatus.RUNNING)
+
+# Rows of one queue as last written: queue row, command rows and output
+# blobs by position
+_Rows = Tuple[Tuple[Any, ...], Dict[int, Tuple[Any, ...]], Dict[int, str]]
+
+
+class SQLiteQueueStorage(CommandQueueRepository):
+    """Manages persistent storage of command queues in a SQLite database."""
+
+    def __init__(
+        self,
+        database_path: str,
+        max_finished_queues: int = DEFAULT_MAX_FINISHED_QUEUES,
+        retention_days: float = DEFAULT_RETENTION_DAYS,
+    ) -> None:
+        """Initialize storage and create the schema if needed.
+
+        Args:
+            database_path: Path to the SQLite database file
+            max_finished_queues: Finished queues kept, newest first
+            retention_days: Days a finished queue is kept
+        """
+        self.database_path = database_path
+        self.max_finished_queues = max_finished_queues
+        self.retention_days = retention_days
+        self._lock = threading.RLock()
+        # Loaded queues are shared, so in-place edits are seen by every caller
+        self._queues: Dict[str, CommandQueue] = {}
+        self._persisted: Dict[str, _Rows] = {}
+        self._finished_at: Dict[str, Optional[float]] = {}
+        self._conn = self._connect()
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Open the database in WAL mode, or None if it cannot be opened."""
+        try:
+            Path(self.database_path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                self.database_path,
+                timeout=10.0,
+                isolation_level=None,  # Transactions are explicit
+                check_same_thread=False,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            conn.executescript(_SCHEMA)
+            for table, column, definition in _ADDED_COLUMNS:
+                columns = {
+                    row[1] for row in conn.execute(f"PRAGMA table_info({table})")
+                }
+                if column not in columns:
+                    conn.execute(
+                        f"ALTER TABLE {table} ADD COLUMN {column} {definition}"
+                    )
+            return conn
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Queue database unavailable: {e}")
+            return None
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run statements in one write transaction. Caller holds the lock."""
+        conn = self._conn
+        if conn is None:
+            raise sqlite3.OperationalError("Queue database unavailable")
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _rows(self, queue_id: str, queue: CommandQueue) -> _Rows:
+        """Build the database rows of a queue."""
+        finished_at = None
+        if queue.commands and all(
+            cmd.status not in _UNFINISHED for cmd in queue.commands
+        ):
+            finished_at = self._finished_at.get(queue_id) or time.time()
+        queue_row = (
+            queue.name,
+            queue.current_index,
+            queue.created_at.isoformat(),
+            int(queue.auto_execute),
+            queue.pause_between,
+            finished_at,
+            int(queue.trusted),
+        )
+        commands = {}
+        outputs = {}
+        for position, cmd in enumerate(queue.commands):
+            commands[position] = (
+                cmd.id,
+                cmd.command,
+                cmd.description,
+                cmd.status.value,
+                cmd.error,
+                cmd.start_time.isoformat() if cmd.start_time else None,
+                cmd.end_time.isoformat() if cmd.end_time else None,
+                json.dumps(cmd.depends_on) if cmd.depends_on else None,
+            )
+            if cmd.result is not None:
+                outputs[position] = json.dumps(cmd.result, default=str)
+        return queue_row, commands, outputs
+
+    def _write(
+        self,
+        conn: sqlite3.Connection,
+        queue_id: str,
+        rows: _Rows,
+        old: Optional[_Rows],
+    ) -> None:
+        """Write the rows that differ from the previously written ones."""
+        queue_row, commands, outputs = rows
+        old_queue_row, old_commands, old_outputs = old or (None, {}, {})
+
+        if old is None:
+            conn.execute(
+                "INSERT INTO queues (name, current_index, created_at, auto_execute,"
+                " pause_between, finished_at, trusted, id)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (*queue_row, queue_id),
+            )
+        elif queue_row != old_queue_row:
+            conn.execute(
+                "UPDATE queues SET name = ?, current_index = ?, created_at = ?,"
+                " auto_execute = ?, pause_between = ?, finished_at = ?, trusted = ?"
+                " WHERE id = ?",
+                (*queue_row, queue_id),
+            )
+
+        conn.executemany(
+            "INSERT INTO commands (queue_id, position, id, command, description,"
+            " status, error, start_time, end_time, depends_on)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT (queue_id, position) DO UPDATE SET id = excluded.id,"
+            " command = excluded.command, description = excluded.description,"
+            " status = excluded.status, error = excluded.error,"
+            " start_time = excluded.start_time, end_time = excluded.end_time,"
+            " depends_on = excluded.depends_on",
+            [
+                (queue_id, position, *row)
+                for position, row in commands.items()
+                if old_commands.get(position) != row
+            ],
+        )
+        conn.executemany(
+            "INSERT INTO command_outputs (queue_id, position, result)"
+            " VALUES (?, ?, ?) ON CONFLICT (queue_id, position)"
+            " DO UPDATE SET result = excluded.result",
+            [
+                (queue_id, position, result)
+                for position, result in outputs.items()
+                if old_outputs.get(position) != result
+            ],
+        )
+        conn.execute(
+            "DELETE FROM commands WHERE queue_id = ? AND position >= ?",
+            (queue_id, len(commands)),
+        )
+        conn.executemany(
+            "DELETE FROM command_outputs WHERE queue_id = ? AND position = ?",
+            [
+                (queue_id, position)
+                for position in old_outputs
+                if position not in outputs
+            ],
+        )
+
+    def _remember(self, queue_id: str, queue: CommandQueue, rows: _Rows) -> None:
+        """Record a queue as loaded and its rows as written. Caller holds the lock."""
+        self._queues[queue_id] = queue
+        self._persisted[queue_id] = rows
+        self._finished_at[queue_id] = rows[0][-1]
+
+    def _forget(self, queue_id: str) -> None:
+        self._queues.pop(queue_id, None)
+        self._persisted.pop(queue_id, None)
+        self._finished_at.pop(queue_id, None)
+
+    def _evict(self, conn: sqlite3.Connection) -> List[str]:
+        """Delete finished queues beyond the retention limits."""
+        cutoff = time.time() - self.retention_days * 86400
+        evicted = [
+            row[0]
+            for row in conn.execute(
+                "SELECT id FROM queues WHERE finished_at IS NOT NULL"
+                " ORDER BY finished_at DESC LIMIT -1 OFFSET ?",
+                (self.max_finished_queues,),
+            )
+        ]
+        evicted += [
+            row[0]
+            for row in conn.execute(
+                "SELECT id FROM queues WHERE finished_at < ?", (cutoff,)
+            )
+            if row[0] not in evicted
+        ]
+        conn.executemany("DELETE FROM queues WHERE id = ?", [(qid,) for qid in evicted])
+        return evicted
+
+    def evict_finished_queues(self) -> List[str]:
+        """Delete finished queues beyond the retention limits.
+
+        Returns:
+            IDs of the evicted queues
+        """
+        with self._lock:
+            try:
+                with self._transaction() as conn:
+                    evicted = self._evict(conn)
+            except sqlite3.Error as e:
+                logger.warning(f"Queue eviction failed: {e}")
+                return []
+            for queue_id in evicted:
+                self._forget(queue_id)
+            return evicted
+
+    def next_queue_id(self) -> Result[str, ValidationError]:
+        """Allocate the ID for a new queue from a persisted counter.
+
+        The counter only grows, so IDs of deleted or evicted queues are
+        never handed out again.
+
+        Returns:
+            Result containing the new queue ID
+        """
+        with self._lock:
+            try:
+                with self._transaction() as conn:
+                    row = conn.execute(
+                        "SELECT value FROM meta WHERE key = 'last_queue_id'"
+                    ).fetchone()
+                    # Queues created before the counter existed, or with
+                    # explicit IDs, must not be collided with either
+                    highest = max(
+                        (
+                            int(queue_id[1:])
+                            for (queue_id,) in conn.execute("SELECT id FROM queues")
+                            if queue_id[1:].isdigit()
+                        ),
+                        default=0,
+                    )
+                    number = max(row[0] if row else 0, highest) + 1
+                    conn.execute(
+                        "INSERT INTO meta (key, value) VALUES ('last_queue_id', ?)"
+                        " ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                        (number,),
+                    )
+            except sqlite3.Error as e:
+                return Result.error(
+                    ValidationError(
+                        code="STORAGE_SAVE_FAILED",
+                        message=f"Failed to allocate a queue ID: {e}",
+                    )
+                )
+            return Result.success(f"q{number}")
+
+    def create_queue(
+        self, queue_id: str, queue: CommandQueue
+    ) -> Result[None, ValidationError]:
+        """Create and persist a new queue, replacing one with the same ID.
+
+        Args:
+            queue_id: Unique identifier for the queue
+            queue: CommandQueue instance to store
+
+        Returns:
+            Result indicating success or failure
+        """
+        if not queue_id or not queue_id.strip():
+            return Result.error(
+                ValidationError(
+                    code="INVALID_QUEUE_ID", message="Queue ID cannot be empty"
+                )
+            )
+
+        with self._lock:
+            self._finished_at.pop(queue_id, None)
+            rows = self._rows(queue_id, queue)
+            try:
+                with self._transaction() as conn:
+                    conn.execute("DELETE FROM queues WHERE id = ?", (queue_id,))
+                    self._write(conn, queue_id, rows, None)
+                    evicted = self._evict(conn)
+            except sqlite3.Error as e:
+                return self._save_error(e)
+            for evicted_id in evicted:
+                self._forget(evicted_id)
+            if queue_id not in evicted:
+                self._remember(queue_id, queue, rows)
+            return Result.success(None)
+
+    def get_queue(self, queue_id: str) -> Optional[CommandQueue]:
+        """Retrieve a queue, loading it from the database on first use.
+
+        Args:
+            queue_id: Unique identifier for the queue
+
+        Returns:
+            CommandQueue instance or None if not found
+        """
+        with self._lock:
+            queue = self._queues.get(queue_id)
+            if queue is not None or self._conn is None:
+                return queue
+            try:
+                return self._load_queue(queue_id)
+            except (sqlite3.Error, ValueError) as e:
+                logger.warning(f"Failed to load queue {queue_id}: {e}")
+                return None
+
+    def _load_queue(self, queue_id: str) -> Optional[CommandQueue]:
+        """Load a queue and its commands. Caller holds the lock."""
+        conn = self._conn
+        row = conn.execute(
+            "SELECT name, current_index, created_at, auto_execute, pause_between,"
+            " finished_at, trusted FROM queues WHERE id = ?",
+            (queue_id,),
+        ).fetchone()
+        if row is None:
+            return None
+
+        (
+            name,
+            current_index,
+            created_at,
+            auto_execute,
+            pause_between,
+            finished,
+            trusted,
+        ) = row
+        queue = CommandQueue(
+            id=queue_id,
+            name=name,
+            current_index=current_index,
+            created_at=_parse_time(created_at) or datetime.now(),
+            auto_execute=bool(auto_execute),
+            pause_between=pause_between,
+            trusted=bool(trusted),
+        )
+        for cmd_row in conn.execute(
+            "SELECT c.id, c.command, c.description, c.status, c.error,"
+            " c.start_time, c.end_time, c.depends_on, o.result FROM commands c"
+            " LEFT JOIN command_outputs o"
+            " ON o.queue_id = c.queue_id AND o.position = c.position"
+            " WHERE c.queue_id = ? ORDER BY c.position",
+            (queue_id,),
+        ):
+            (
+                cmd_id,
+                command,
+                description,
+                status,
+                error,
+                start,
+                end,
+                depends_on,
+                result,
+            ) = cmd_row
+            queue.commands.append(
+                QueuedCommand(
+                    id=cmd_id,
+                    command=command,
+                    description=description,
+                    status=CommandStatus(status),
+                    result=json.loads(result) if result is not None else None,
+                    error=error,
+                    start_time=_parse_time(start),
+                    end_time=_parse_time(end),
+                    depends_on=json.loads(depends_on) if depends_on else [],
+                )
+            )
+
+        self._finished_at[queue_id] = finished
+        self._remember(queue_id, queue, self._rows(queue_id, queue))
+        return queue
+
+    def list_queues(self) -> List[str]:
+        """List all persisted queue IDs.
+
+        Returns:
+            List of queue IDs in creation order
+        """
+        with self._lock:
+            if self._conn is None:
+                return []
+            try:
+                return [
+                    row[0]
+                    for row in self._conn.execute(
+                        "SELECT id FROM queues ORDER BY rowid"
+                    )
+                ]
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to list queues: {e}")
+                return []
+
+    def summarize_queues(self) -> List[QueueSummary]:
+        """Get the progress of all queues with one aggregate query.
+
+        Returns:
+            One summary per queue, in creation order
+        """
+        with self._lock:
+            if self._conn is None:
+                return []
+            try:
+                rows = self._conn.execute(
+                    "SELECT q.id, q.name, q.created_at,"
+                    " COALESCE(SUM(c.status = 'completed'), 0), COUNT(c.position)"
+                    " FROM queues q LEFT JOIN commands c ON c.queue_id = q.id"
+                    " GROUP BY q.id ORDER BY q.rowid"
+                ).fetchall()
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to summarize queues: {e}")
+                return []
+        return [
+            QueueSummary(
+                id=queue_id,
+                name=name,
+                created_at=_parse_time(created_at) or datetime.now(),
+                completed=completed,
+                total=total,
+            )
+            for queue_id, name, created_at, completed, total in rows
+        ]
+
+    def update_queue(
+        self, queue_id: str, queue: CommandQueue
+    ) -> Result[None, ValidationError]:
+        """Write the changed rows of an existing queue in one transaction.
+
+        Args:
+            queue_id: Unique identifier for the queue
+            queue: Updated CommandQueue instance
+
+        Returns:
+            Result indicating success or failure
+        """
+        with self._lock:
+            if self.get_queue(queue_id) is None:
+                return Result.error(
+                    ValidationError(
+                        code="QUEUE_NOT_FOUND",
+                        message=f"Queue with ID '{queue_id}' not found",
+                    )
+                )
+            rows = self._rows(queue_id, queue)
+            try:
+                with self._transaction() as conn:
+                    self._write(conn, queue_id, rows, self._persisted[queue_id])
+            except sqlite3.Error as e:
+                return self._save_error(e)
+            self._remember(queue_id, queue, rows)
+            return Result.success(None)
+
+    def delete_queue(self, queue_id: str) -> Result[None, ValidationError]:
+        """Delete a queue with its commands and output.
+
+        Args:
+            queue_id: Unique identifier for the queue
+
+        Returns:
+            Result indicating success or failure
+        """
+        with self._lock:
+            if self.get_queue(queue_id) is None:
+                return Result.error(
+                    ValidationError(
+                        code="QUEUE_NOT_FOUND",
+                        message=f"Queue with ID '{queue_id}' not found",
+                    )
+                )
+            try:
+                with self._transaction() as conn:
+                    conn.execute("DELETE FROM queues WHERE id = ?", (queue_id,))
+            except sqlite3.Error:
+                return Result.error(
+                    ValidationError(
+                        code="DELETE_QUEUE_SAVE_FAILED",
+                        message="Failed to save after deleting queue",
+                    )
+                )
+            self._forget(queue_id)
+            return Result.success(None)
+
+    def _save_error(self, error: sqlite3.Error) -> Result[None, ValidationError]:
+        return Result.error(
+            ValidationError(
+                code="STORAGE_SAVE_FAILED",
+                message=f"Failed to save queues to storage: {error}",
+            )
+        )
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO timestamp, or None if missing or invalid."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
@@ -1,148 +1,305 @@
 """SSH implementation of controller repository."""
 
 import re
+import threading
 from typing import List
+from typing import Optional
 
 from ..domain.models import CommandResult
 from ..domain.models import Controller
 from ..domain.models import ControllerType
+from ..domain.models import InputDevice
 from ..domain.ports import ControllerRepository
 from ..domain.ports import RetroPieClient
 from .cache_system import SystemCache
+from .controller_hotplug_watcher import ControllerHotplugWatcher
+from .controller_hotplug_watcher import HotplugEvent
+
+_INPUT_DEVICES_PATH = "/proc/bus/input/devices"
+_RETROARCH_CONFIG_PATH = "/opt/retropie/configs/all/retroarch.cfg"
+
+# Section markers separating the parts of the combined detection output
+_PROBES_MARKER = "@@retromcp-probes@@"
+_CONFIG_MARKER = "@@retromcp-config@@"
+
+_DETECT_COMMAND = (
+    f"cat {_INPUT_DEVICES_PATH} 2>/dev/null; "
+    f"echo '{_PROBES_MARKER}'; "
+    "grep -qw '^xpad' /proc/modules && echo xpad; "
+    "command -v ds4drv >/dev/null 2>&1 && echo ds4drv; "
+    f"echo '{_CONFIG_MARKER}'; "
+    f"grep -h 'input_device' {_RETROARCH_CONFIG_PATH} 2>/dev/null; "
+    "true"
+)
+
+_FIELD_PATTERN = re.compile(r"(\w+)=(\S*)")
+
+# Seconds a detection waits for a new hotplug watcher to take its first scan
+_HOTPLUG_READY_TIMEOUT = 3.0
+
+
+def parse_input_devices(text: str) -> List[InputDevice]:
+    """Parse the contents of /proc/bus/input/devices.
+
+    Args:
+        text: Raw device table, one blank-line separated block per device
+
+    Returns:
+        Input devices in table order
+    """
+    devices = []
+    for block in text.strip().split("\n\n"):
+        name = ""
+        handlers: List[str] = []
+        ids = {}
+        phys = ""
+        sysfs = ""
+        for line in block.split("\n"):
+            tag, _, value = line.partition(": ")
+            if tag == "I":
+                ids = dict(_FIELD_PATTERN.findall(value))
+            elif tag == "N":
+                name = value.partition("=")[2].strip('"')
+            elif tag == "P":
+                phys = value.partition("=")[2]
+            elif tag == "S":
+                sysfs = value.partition("=")[2]
+            elif tag == "H":
+                handlers = value.partition("=")[2].split()
+        if name or handlers:
+            devices.append(
+                InputDevice(
+                    name=name,
+                    handlers=handlers,
+                    bus=ids.get("Bus", ""),
+                    vendor_id=ids.get("Vendor", ""),
+                    product_id=ids.get("Product", ""),
+                    phys=phys,
+                    sysfs=sysfs,
+                )
+            )
+    return devices
+
+
+def _node_number(path: str) -> int:
+    """Get the numeric suffix of a device node for stable ordering."""
+    digits = re.search(r"(\d+)$", path)
+    return int(digits.group(1)) if digits else 0
+
+
+def _classify_controller(name: str) -> ControllerType:
+    """Determine controller type from the device name."""
+    name_lower = name.lower()
+    if "xbox" in name_lower or "x-box" in name_lower:
+        return ControllerType.XBOX
+    if "ps5" in name_lower or "dualsense" in name_lower:
+        return ControllerType.PS5
+    if (
+        "playstation" in name_lower
+        or "ps4" in name_lower
+        or "dualshock" in name_lower
+        or ("sony" in name_lower and "wireless controller" in name_lower)
+    ):
+        return ControllerType.PS4
+    if "nintendo" in name_lower or "switch pro" in name_lower:
+        return ControllerType.NINTENDO_PRO
+    if "8bitdo" in name_lower:
+        return ControllerType.EIGHT_BIT_DO
+    return ControllerType.GENERIC
 
 
 class SSHControllerRepository(ControllerRepository):
     """SSH implementation of controller repository interface."""
 
-    def __init__(self, client: RetroPieClient, cache: SystemCache) -> None:
-        """Initialize with RetroPie client and cache."""
+    def __init__(
+        self, client: RetroPieClient, cache: SystemCache, watch_hotplug: bool = False
+    ) -> None:
+        """Initialize with RetroPie client and cache.
+
+        Args:
+            client: RetroPie client
+            cache: Shared system cache
+            watch_hotplug: Start a udev hotplug watcher on the first detection
+                so later detections are answered from memory
+        """
         self._client = client
         self._cache = cache
+        self._watch_hotplug = watch_hotplug
+        self._lock = threading.Lock()
+        # Kept current by the hotplug watcher; None while not watching
+        self._live_controllers: Optional[List[Controller]] = None
+        self._watcher: Optional[ControllerHotplugWatcher] = None
+        # Set once the current watcher has taken its first scan or stopped
+        self._watch_ready = threading.Event()
 
     def detect_controllers(self) -> List[Controller]:
-        """Detect connected controllers."""
+        """Detect connected controllers.
+
+        The input device table, driver probes and configured input devices are
+        fetched in one command and parsed locally, so detection costs a single
+        round trip however many controllers are connected. While the hotplug
+        watcher runs, the result is read from memory.
+
+        The in-memory list is seeded by a scan on the watcher thread once the
+        monitor is listening, so no event can slip in between the scan and
+        the first event handled.
+        """
+        with self._lock:
+            if self._live_controllers is not None:
+                return list(self._live_controllers)
+
         # Check cache first
         cached_data = self._cache.get_hardware_scan()
         if cached_data is not None and "controllers" in cached_data:
             return cached_data["controllers"]
 
-        # Use ls to check /dev/input/js* devices
-        js_result = self._client.execute_command("ls -la /dev/input/js* 2>/dev/null")
+        if self._watch_hotplug:
+            ready = self.start_hotplug_watch()
+            if ready.wait(_HOTPLUG_READY_TIMEOUT):
+                with self._lock:
+                    if self._live_controllers is not None:
+                        return list(self._live_controllers)
 
-        # Use lsusb to get more controller info
-        usb_result = self._client.execute_command("lsusb")
+        controllers = self._scan_controllers()
+        if controllers is None:
+            return []
 
-        controllers = []
+        # Cache the result
+        self._cache.cache_hardware_scan({"controllers": controllers})
 
-        # Parse joystick devices
-        if js_result.success:
-            js_devices = []
-            for line in js_result.stdout.strip().split("\n"):
-                if "/dev/input/js" in line:
-                    parts = line.split()
-                    if len(parts) >= 9:
-                        device_path = parts[-1]
-                        js_devices.append(device_path)
-
-            # For each joystick device, try to get more info
-            for device in js_devices:
-                # Extract device number
-                device_num = device.replace("/dev/input/js", "")
-
-                # Try to get device name from /proc/bus/input/devices
-                name_result = self._client.execute_command(
-                    f"cat /proc/bus/input/devices | grep -B 5 js{device_num} | grep Name | head -1"
-                )
+        return controllers
 
-                name = "Unknown Controller"
-                vendor_id = "0000"
-                product_id = "0000"
-                controller_type = ControllerType.UNKNOWN
-
-                if name_result.success and name_result.stdout:
-                    name_match = re.search(r'Name="([^"]+)"', name_result.stdout)
-                    if name_match:
-                        name = name_match.group(1)
-
-                        # Determine controller type from name
-                        name_lower = name.lower()
-                        if "xbox" in name_lower:
-                            controller_type = ControllerType.XBOX
-                        elif "ps5" in name_lower or "dualsense" in name_lower:
-                            controller_type = ControllerType.PS5
-                        elif (
-                            "playstation" in name_lower
-                            or "ps4" in name_lower
-                            or "dualshock" in name_lower
-                            or (
-                                "sony" in name_lower
-                                and "wireless controller" in name_lower
-                            )
-                        ):
-                            controller_type = ControllerType.PS4
-                        elif "nintendo" in name_lower or "switch pro" in name_lower:
-                            controller_type = ControllerType.NINTENDO_PRO
-                        elif "8bitdo" in name_lower:
-                            controller_type = ControllerType.EIGHT_BIT_DO
-                        else:
-                            controller_type = ControllerType.GENERIC
-
-                # Try to get vendor/product IDs from lsusb
-                if usb_result.success and name != "Unknown Controller":
-                    for usb_line in usb_result.stdout.strip().split("\n"):
-                        if any(
-                            keyword in usb_line.lower()
-                            for keyword in [
-                                "gamepad",
-                                "controller",
-                                "xbox",
-                                "playstation",
-                                "8bitdo",
-                            ]
-                        ):
-                            id_match = re.search(
-                                r"ID ([0-9a-fA-F]{4}):([0-9a-fA-F]{4})", usb_line
-                            )
-                            if id_match:
-                                vendor_id = id_match.group(1)
-                                product_id = id_match.group(2)
-                                break
-
-                # Check if controller is configured in ES
-                config_result = self._client.execute_command(
-                    f"grep -q 'input_device.*{name}' /opt/retropie/configs/all/retroarch.cfg"
-                )
-                is_configured = config_result.success
-
-                # Determine if special driver is needed
-                driver_required = None
-                if controller_type == ControllerType.XBOX:
-                    # Check if xboxdrv is needed
-                    xpad_result = self._client.execute_command("lsmod | grep -q xpad")
-                    if not xpad_result.success:
-                        driver_required = "xboxdrv"
-                elif controller_type == ControllerType.PS4:
-                    # Check if ds4drv is installed
-                    ds4_result = self._client.execute_command("which ds4drv")
-                    if not ds4_result.success:
-                        driver_required = "ds4drv"
-
-                controllers.append(
-                    Controller(
-                        name=name,
-                        device_path=device,
-                        controller_type=controller_type,
-                        connected=True,
-                        vendor_id=vendor_id,
-                        product_id=product_id,
-                        is_configured=is_configured,
-                        driver_required=driver_required,
-                    )
-                )
+    def start_hotplug_watch(self) -> threading.Event:
+        """Start the background udev watcher if it is not already running.
 
-        # Cache the result
+        Returns:
+            Event set once the watcher has seeded the in-memory controllers or
+            stopped
+        """
+        with self._lock:
+            if self._watcher is not None and self._watcher.is_running:
+                return self._watch_ready
+            ready = threading.Event()
+            self._watch_ready = ready
+            self._watcher = ControllerHotplugWatcher(
+                self._client,
+                self._handle_hotplug_event,
+                self._handle_watch_stopped,
+                on_ready=lambda: self._handle_watch_ready(ready),
+            )
+            watcher = self._watcher
+        watcher.start()
+        return ready
+
+    def stop_hotplug_watch(self) -> None:
+        """Stop the background watcher and fall back to cached scans."""
+        with self._lock:
+            watcher = self._watcher
+            self._watcher = None
+            self._live_controllers = None
+            self._watch_ready.set()
+        if watcher is not None:
+            watcher.stop()
+
+    def _handle_watch_ready(self, ready: threading.Event) -> None:
+        """Seed the in-memory controllers once the monitor is listening.
+
+        Runs on the watcher thread, so events arriving meanwhile wait in the
+        stream and are applied on top of this scan.
+        """
+        try:
+            scanned = self._scan_controllers()
+            if scanned is None:
+                return
+            with self._lock:
+                if self._watcher is None:
+                    return
+                self._live_controllers = scanned
+            self._cache.cache_hardware_scan({"controllers": scanned})
+        finally:
+            ready.set()
+
+    def _handle_hotplug_event(self, event: HotplugEvent) -> None:
+        """Apply a joystick add or remove event to the in-memory controllers."""
+        if event.action == "remove":
+            with self._lock:
+                if self._live_controllers is None:
+                    return
+                controllers = [
+                    controller
+                    for controller in self._live_controllers
+                    if controller.device_path != event.device_path
+                ]
+                self._live_controllers = controllers
+        else:
+            # New devices need their name and IDs, which takes one rescan
+            scanned = self._scan_controllers()
+            if scanned is None:
+                return
+            with self._lock:
+                if self._watcher is None:
+                    return
+                self._live_controllers = scanned
+            controllers = scanned
         self._cache.cache_hardware_scan({"controllers": controllers})
 
+    def _handle_watch_stopped(self) -> None:
+        """Drop the in-memory view when the event stream ends."""
+        with self._lock:
+            self._watcher = None
+            self._live_controllers = None
+            self._watch_ready.set()
+
+    def _scan_controllers(self) -> Optional[List[Controller]]:
+        """Scan connected controllers with one remote command.
+
+        Returns:
+            Detected controllers, or None if the command failed
+        """
+        result = self._client.execute_command(_DETECT_COMMAND)
+        if not result.success:
+            return None
+
+        device_table, _, rest = result.stdout.partition(_PROBES_MARKER)
+        probe_output, _, config_output = rest.partition(_CONFIG_MARKER)
+        probes = set(probe_output.split())
+        configured_lines = [
+            line for line in config_output.split("\n") if "input_device" in line
+        ]
+
+        controllers = []
+        joysticks = [
+            device
+            for device in parse_input_devices(device_table)
+            if device.joystick_node is not None
+        ]
+        joysticks.sort(key=lambda device: _node_number(device.joystick_node or ""))
+        for device in joysticks:
+            controller_type = _classify_controller(device.name)
+
+            # Determine if special driver is needed
+            driver_required = None
+            if controller_type == ControllerType.XBOX and "xpad" not in probes:
+                driver_required = "xboxdrv"
+            elif controller_type == ControllerType.PS4 and "ds4drv" not in probes:
+                driver_required = "ds4drv"
+
+            controllers.append(
+                Controller(
+                    name=device.name,
+                    device_path=device.joystick_node or "",
+                    controller_type=controller_type,
+                    connected=True,
+                    vendor_id=device.vendor_id or "0000",
+                    product_id=device.product_id or "0000",
+                    is_configured=any(
+                        device.name in line.split("input_device", 1)[1]
+                        for line in configured_lines
+                    ),
+                    driver_required=driver_required,
+                )
+            )
+
         return controllers
 
     def setup_controller(self, controller: Controller) -> CommandResult:
@@ -2,9 +2,11 @@
 
 import re
 import shlex
+from dataclasses import replace
 from typing import Dict
 from typing import List
 from typing import Optional
+from typing import Tuple
 
 from ..config import RetroPieConfig
 from ..domain.models import CommandResult
@@ -26,6 +28,41 @@ from ..domain.ports import RetroPieClient
 from .es_systems_parser import ESSystemsConfigParser
 from .security_validator import SecurityValidator
 
+_THEMES_DIR = "/etc/emulationstation/themes"
+_ES_SETTINGS_PATH = "/opt/retropie/configs/all/emulationstation/es_settings.cfg"
+
+# Directory mtime and active theme; cheap enough to run before every cache hit
+_THEME_PROBE_COMMAND = (
+    f"stat -c 'mtime %Y' {_THEMES_DIR} 2>/dev/null; "
+    f"grep '<string name=\"ThemeSet\"' {_ES_SETTINGS_PATH} 2>/dev/null"
+)
+
+# Section markers separating the parts of the theme catalog output
+_THEME_CATALOG_MARKER = "@@retromcp-theme-mtimes@@"
+_THEME_SIZES_MARKER = "@@retromcp-theme-sizes@@"
+_THEME_DESCRIPTIONS_MARKER = "@@retromcp-theme-descriptions@@"
+
+
+def _parse_theme_probe(output: str) -> Tuple[Optional[str], Optional[str]]:
+    """Parse themes directory mtime and active theme from probe output."""
+    dir_mtime = None
+    current_theme = None
+    for line in output.strip().split("\n"):
+        if line.startswith("mtime "):
+            dir_mtime = line[len("mtime ") :].strip()
+        else:
+            match = re.search(r'value="([^"]+)"', line)
+            if match:
+                current_theme = match.group(1)
+    return dir_mtime, current_theme
+
+
+def _with_active_theme(
+    themes: List[Theme], current_theme: Optional[str]
+) -> List[Theme]:
+    """Copy a theme catalog with the active flag set for the current theme."""
+    return [replace(theme, active=theme.name == current_theme) for theme in themes]
+
 
 class SSHEmulatorRepository(EmulatorRepository):
     """SSH implementation of emulator repository interface."""
@@ -48,6 +85,8 @@ class SSHEmulatorRepository(EmulatorRepository):
         self._config_parser = config_parser or ESSystemsConfigParser()
         self._cached_es_config: Optional[ESSystemsConfig] = None
         self._validator = SecurityValidator()
+        # (themes directory mtime, catalog without active flags)
+        self._theme_catalog: Optional[Tuple[str, List[Theme]]] = None
 
     def get_emulators(self) -> List[Emulator]:
         """Get list of available emulators."""
@@ -265,51 +304,74 @@ class SSHEmulatorRepository(EmulatorRepository):
         return self._client.execute_command(command, use_sudo=True)
 
     def get_themes(self) -> List[Theme]:
-        """Get available themes."""
-        themes = []
-        theme_dir = "/etc/emulationstation/themes"
+        """Get available themes.
 
-        # Get current theme
-        current_theme = None
-        theme_config_result = self._client.execute_command(
-            "grep '<string name=\"ThemeSet\"' /opt/retropie/configs/all/emulationstation/es_settings.cfg 2>/dev/null"
+        The catalog of names, descriptions, sizes and mtimes is built in one
+        remote pass and reused until the themes directory mtime changes. The
+        active theme is re-read on every call.
+        """
+        catalog = self._theme_catalog
+        if catalog is not None:
+            probe = self._client.execute_command(_THEME_PROBE_COMMAND)
+            dir_mtime, current_theme = _parse_theme_probe(probe.stdout)
+            if probe.success and dir_mtime == catalog[0]:
+                return _with_active_theme(catalog[1], current_theme)
+
+        result = self._client.execute_command(
+            f"{_THEME_PROBE_COMMAND}; echo '{_THEME_CATALOG_MARKER}'; "
+            f"cd {_THEMES_DIR} 2>/dev/null || exit 0; "
+            "stat -c '%n\t%Y' */ 2>/dev/null; "
+            f"echo '{_THEME_SIZES_MARKER}'; du -sk */ 2>/dev/null; "
+            f"echo '{_THEME_DESCRIPTIONS_MARKER}'; "
+            "grep -H -m1 '<string name=\"description\"' */theme.xml 2>/dev/null; "
+            "true"
         )
-        if theme_config_result.success:
-            match = re.search(r'value="([^"]+)"', theme_config_result.stdout)
-            if match:
-                current_theme = match.group(1)
-
-        # List available themes
-        result = self._client.execute_command(f"ls -la {theme_dir} 2>/dev/null")
-
-        if result.success:
-            for line in result.stdout.strip().split("\n"):
-                if line.startswith("d") and not line.endswith("."):
-                    parts = line.split()
-                    if len(parts) >= 9:
-                        theme_name = parts[-1]
-                        theme_path = f"{theme_dir}/{theme_name}"
+        if not result.success:
+            return []
+
+        probe_output, _, rest = result.stdout.partition(_THEME_CATALOG_MARKER)
+        mtime_output, _, rest = rest.partition(_THEME_SIZES_MARKER)
+        size_output, _, description_output = rest.partition(_THEME_DESCRIPTIONS_MARKER)
+        dir_mtime, current_theme = _parse_theme_probe(probe_output)
+
+        sizes: Dict[str, int] = {}
+        for line in size_output.strip().split("\n"):
+            size_kib, _, name = line.partition("\t")
+            if size_kib.isdigit():
+                sizes[name.rstrip("/")] = int(size_kib) * 1024
+
+        descriptions: Dict[str, str] = {}
+        for line in description_output.strip().split("\n"):
+            xml_path, _, xml_line = line.partition(":")
+            desc_match = re.search(r">([^<]+)<", xml_line)
+            if desc_match:
+                descriptions[xml_path.split("/")[0]] = desc_match.group(1).strip()
 
-                        # Try to get theme description from theme.xml
-                        desc_result = self._client.execute_command(
-                            f"grep '<string name=\"description\"' {theme_path}/theme.xml 2>/dev/null | head -1"
-                        )
-                        description = None
-                        if desc_result.success:
-                            desc_match = re.search(r">([^<]+)<", desc_result.stdout)
-                            if desc_match:
-                                description = desc_match.group(1).strip()
-
-                        themes.append(
-                            Theme(
-                                name=theme_name,
-                                path=theme_path,
-                                active=theme_name == current_theme,
-                                description=description,
-                            )
-                        )
+        themes = []
+        for line in mtime_output.strip().split("\n"):
+            name, _, mtime = line.partition("\t")
+            name = name.rstrip("/")
+            if not name or not mtime:
+                continue
+            try:
+                theme_mtime: Optional[float] = float(mtime)
+            except ValueError:
+                theme_mtime = None
+            themes.append(
+                Theme(
+                    name=name,
+                    path=f"{_THEMES_DIR}/{name}",
+                    active=False,
+                    description=descriptions.get(name),
+                    size=sizes.get(name),
+                    mtime=theme_mtime,
+                )
+            )
+        themes.sort(key=lambda theme: theme.name.lower())
 
-        return themes
+        if dir_mtime is not None:
+            self._theme_catalog = (dir_mtime, themes)
+        return _with_active_theme(themes, current_theme)
 
     def set_theme(self, theme_name: str) -> CommandResult:
         """Set active theme."""
@@ -1,10 +1,12 @@
 """SSH implementation of RetroPie client."""
 
 import time
+from typing import Callable
 from typing import Optional
 
 from ..domain.models import CommandResult
 from ..domain.models import ConnectionInfo
+from ..domain.ports import CommandStream
 from ..domain.ports import RetroPieClient
 from ..ssh_handler import RetroPieSSH
 from .structured_logger import StructuredLogger
@@ -18,6 +20,9 @@ class SSHRetroPieClient(RetroPieClient):
         self._ssh = ssh_handler
         self._last_connected: Optional[str] = None
         self._logger = StructuredLogger("ssh_client")
+        # Rewrites commands before they run, e.g. to throttle heavy ones
+        # while a game is running
+        self.command_wrapper: Optional[Callable[[str], str]] = None
 
     def connect(self) -> bool:
         """Establish connection to RetroPie system."""
@@ -53,6 +58,8 @@ class SSHRetroPieClient(RetroPieClient):
             # Handle sudo if needed
             if use_sudo and not command.startswith("sudo "):
                 command = f"sudo {command}"
+            if self.command_wrapper is not None:
+                command = self.command_wrapper(command)
 
             exit_code, stdout, stderr = self._ssh.execute_command(command)
             execution_time = time.time() - start_time
@@ -107,6 +114,14 @@ class SSHRetroPieClient(RetroPieClient):
                 execution_time=execution_time,
             )
 
+    def stream_command(self, command: str, pty: bool = False) -> CommandStream:
+        """Run a long-lived command and stream its output lines as they arrive.
+
+        Unlike execute_command, errors are not converted into a CommandResult
+        and propagate to the caller or the consumer of the stream.
+        """
+        return self._ssh.stream_command(command, pty=pty)
+
     def execute_command_with_retry(
         self, command: str, max_retries: int = 3, use_sudo: bool = False
     ) -> CommandResult:
@@ -117,6 +132,8 @@ class SSHRetroPieClient(RetroPieClient):
         # Handle sudo if needed
         if use_sudo and not command.startswith("sudo "):
             command = f"sudo {command}"
+        if self.command_wrapper is not None:
+            command = self.command_wrapper(command)
 
         for attempt in range(max_retries):
             try:
@@ -239,6 +256,8 @@ class SSHRetroPieClient(RetroPieClient):
             # Handle sudo if needed
             if use_sudo and not command.startswith("sudo "):
                 command = f"sudo {command}"
+            if self.command_wrapper is not None:
+                command = self.command_wrapper(command)
 
             exit_code, stdout, stderr = self._ssh.execute_command(command)
             execution_time = time.time() - start_time
@@ -1,33 +1,91 @@
 """SSH-based state repository implementation."""
 
+import base64
 import json
+import logging
 import shlex
 from typing import Any
 from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
 
 from ..config import RetroPieConfig
 from ..domain.models import StateAction
 from ..domain.models import StateManagementResult
+from ..domain.models import StateSnapshot
 from ..domain.models import SystemState
 from ..domain.ports import RetroPieClient
 from ..domain.ports import StateRepository
+from .state_diff import diff_documents
+from .state_history import StateHistory
+
+logger = logging.getLogger(__name__)
+
+# Header line carrying the state file's "mtime size" fingerprint
+_STAT_MARKER = "@@retromcp-state-stat@@"
+# Nanosecond mtime, so two writes within one second still differ
+_STAT_FORMAT = "%.9Y %s"
+# Exit code of a conditional write when the file changed since it was read
+_PRECONDITION_FAILED = 3
+
+
+def _split_stat_header(output: str) -> Tuple[Optional[str], str]:
+    """Split a leading stat header from command output.
+
+    Returns:
+        Tuple of (fingerprint or None if there is no header, remaining output)
+    """
+    if not output.startswith(_STAT_MARKER):
+        return None, output
+    header, _, rest = output.partition("\n")
+    return header[len(_STAT_MARKER) :].strip() or None, rest
 
 
 class SSHStateRepository(StateRepository):
     """SSH-based implementation of StateRepository."""
 
-    def __init__(self, client: RetroPieClient, config: RetroPieConfig) -> None:
-        """Initialize with RetroPie client and configuration."""
+    def __init__(
+        self,
+        client: RetroPieClient,
+        config: RetroPieConfig,
+        history: Optional[StateHistory] = None,
+        mirror_history: bool = False,
+    ) -> None:
+        """Initialize with RetroPie client and configuration.
+
+        Args:
+            client: RetroPie client
+            config: RetroPie configuration
+            history: Local history that records every saved state
+            mirror_history: Also append history entries to a file on the Pi
+        """
         self._client = client
         self._config = config
         self._state_file_path = f"{config.paths.home_dir}/.retropie-state.json"
+        self._history = history
+        self._mirror_history = mirror_history
+        self._history_file_path = f"{config.paths.home_dir}/.retropie-state-history.gz"
+        # Last loaded or written state and the file's "mtime size" at the time
+        self._cached_state: Optional[Tuple[str, SystemState]] = None
 
     def load_state(self) -> SystemState:
-        """Load state from remote file."""
+        """Load state from remote file.
+
+        The last loaded state is kept with the file's mtime and size. Each
+        load stats the file and only downloads it again when those changed.
+        """
         safe_path = shlex.quote(self._state_file_path)
-        result = self._client.execute_command(f"cat {safe_path}")
+        cached = self._cached_state
+        known = shlex.quote(cached[0] if cached else "")
+        result = self._client.execute_command(
+            f"s=$(stat -c '{_STAT_FORMAT}' {safe_path}) && "
+            f'echo "{_STAT_MARKER} $s" && '
+            f'{{ [ "$s" = {known} ] || cat {safe_path}; }}'
+        )
 
         if not result.success:
+            self._cached_state = None
             if "No such file or directory" in result.stderr:
                 raise FileNotFoundError(
                     f"State file not found: {self._state_file_path}"
@@ -35,24 +93,25 @@ class SSHStateRepository(StateRepository):
             else:
                 raise RuntimeError(f"Failed to read state file: {result.stderr}")
 
+        fingerprint, content = _split_stat_header(result.stdout)
+        if cached and fingerprint == cached[0] and not content.strip():
+            return cached[1]
+
         try:
-            return SystemState.from_json(result.stdout)
+            state = SystemState.from_json(content)
         except json.JSONDecodeError as e:
+            self._cached_state = None
             raise json.JSONDecodeError(
-                f"Invalid JSON in state file: {e!s}", result.stdout, 0
+                f"Invalid JSON in state file: {e!s}", content, 0
             ) from e
+        self._cached_state = (fingerprint, state) if fingerprint else None
+        return state
 
     def save_state(self, state: SystemState) -> StateManagementResult:
         """Save state to remote file."""
         try:
             safe_path = shlex.quote(self._state_file_path)
-            json_content = state.to_json()
-
-            # Sanitize JSON content for security
-            sanitized_content = self._sanitize_json_content(json_content)
-
-            # Escape single quotes for shell safety
-            escaped_content = sanitized_content.replace("'", "'\"'\"'")
+            escaped_content = self._state_file_content(state)
 
             # Create parent directory if it doesn't exist
             parent_dir = shlex.quote(str(self._state_file_path).rsplit("/", 1)[0])
@@ -70,15 +129,23 @@ class SSHStateRepository(StateRepository):
             result = self._client.execute_command(write_command)
 
             if result.success:
-                # Set proper permissions (user only)
-                chmod_result = self._client.execute_command(f"chmod 600 {safe_path}")
+                self._cached_state = None
+                # Set proper permissions (user only) and read the new fingerprint
+                chmod_result = self._client.execute_command(
+                    f"chmod 600 {safe_path} && "
+                    f"echo \"{_STAT_MARKER} $(stat -c '{_STAT_FORMAT}' {safe_path})\""
+                )
                 if not chmod_result.success:
                     return StateManagementResult(
                         success=False,
                         action=StateAction.SAVE,
                         message=f"State saved but chmod failed: {chmod_result.stderr}",
                     )
+                fingerprint, _ = _split_stat_header(chmod_result.stdout)
+                if fingerprint:
+                    self._cached_state = (fingerprint, state)
 
+                self._record_history(state)
                 return StateManagementResult(
                     success=True,
                     action=StateAction.SAVE,
@@ -98,48 +165,151 @@ class SSHStateRepository(StateRepository):
                 message=f"Error saving state: {e!s}",
             )
 
+    def _record_history(self, state: SystemState) -> None:
+        """Record a saved state in the history without failing the save."""
+        if self._history is None:
+            return
+        try:
+            entry = self._history.record(
+                json.loads(state.to_json()), state.last_updated
+            )
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to record state history: {e}")
+            return
+
+        if self._mirror_history:
+            safe_path = shlex.quote(self._history_file_path)
+            encoded = base64.b64encode(entry).decode("ascii")
+            result = self._client.execute_command(
+                f"echo {encoded} | base64 -d >> {safe_path} && chmod 600 {safe_path}"
+            )
+            if not result.success:
+                logger.warning(f"Failed to mirror state history: {result.stderr}")
+
+    def list_history(
+        self, since: Optional[str] = None, until: Optional[str] = None
+    ) -> List[StateSnapshot]:
+        """List saved state history entries within a time range."""
+        if self._history is None:
+            return []
+        return self._history.entries(since, until)
+
+    def load_state_at(self, timestamp: str) -> SystemState:
+        """Load the state saved at or before a point in time."""
+        document = (
+            self._history.state_at(timestamp) if self._history is not None else None
+        )
+        if document is None:
+            raise FileNotFoundError(f"No state saved at or before {timestamp}")
+        return SystemState.from_json(json.dumps(document))
+
+    def _state_file_content(self, state: SystemState) -> str:
+        """Render state as the heredoc body written to the state file."""
+        json_content = state.to_json()
+
+        # Sanitize JSON content for security
+        sanitized_content = self._sanitize_json_content(json_content)
+
+        # Escape single quotes for shell safety
+        return sanitized_content.replace("'", "'\"'\"'")
+
+    def _write_if_unchanged(
+        self, state: SystemState, fingerprint: str
+    ) -> Optional[StateManagementResult]:
+        """Write state in one command if the file still has a fingerprint.
+
+        Returns:
+            Save result, or None if the file changed since it was read
+        """
+        safe_path = shlex.quote(self._state_file_path)
+        result = self._client.execute_command(
+            f"[ \"$(stat -c '{_STAT_FORMAT}' {safe_path} 2>/dev/null)\" = "
+            f"{shlex.quote(fingerprint)} ] || exit {_PRECONDITION_FAILED}\n"
+            f"tee {safe_path} > /dev/null << 'EOF_RETROMCP_STATE' && "
+            f"chmod 600 {safe_path} && "
+            f"echo \"{_STAT_MARKER} $(stat -c '{_STAT_FORMAT}' {safe_path})\"\n"
+            f"{self._state_file_content(state)}\nEOF_RETROMCP_STATE"
+        )
+        if result.exit_code == _PRECONDITION_FAILED:
+            return None
+
+        self._cached_state = None
+        if not result.success:
+            return StateManagementResult(
+                success=False,
+                action=StateAction.SAVE,
+                message=f"Failed to save state: {result.stderr}",
+            )
+        new_fingerprint, _ = _split_stat_header(result.stdout)
+        if new_fingerprint:
+            self._cached_state = (new_fingerprint, state)
+        self._record_history(state)
+        return StateManagementResult(
+            success=True,
+            action=StateAction.SAVE,
+            message="State saved successfully",
+        )
+
+    @staticmethod
+    def _with_field(
+        state: SystemState,
+        path: str,
+        value: Any,  # noqa: ANN401
+    ) -> Optional[SystemState]:
+        """Get a copy of state with one field set, or None for invalid paths."""
+        # Parse the path and update the field
+        state_dict = json.loads(state.to_json())
+
+        # Navigate to the parent of the field to update
+        path_parts = path.split(".")
+        current_dict = state_dict
+        for part in path_parts[:-1]:
+            if part not in current_dict:
+                return None
+            current_dict = current_dict[part]
+
+        # Update the field
+        if not isinstance(current_dict, dict):
+            return None
+        current_dict[path_parts[-1]] = value
+        return SystemState.from_json(json.dumps(state_dict))
+
     def update_state_field(self, path: str, value: Any) -> StateManagementResult:  # noqa: ANN401
-        """Update specific field in state."""
+        """Update specific field in state.
+
+        With a cached state this is a single conditional write; the file is
+        only read again if it changed since it was cached.
+        """
         try:
             # Validate path for security
             self._validate_path(path)
 
-            # Load current state
-            current_state = self.load_state()
-
-            # Parse the path and update the field
-            state_dict = json.loads(current_state.to_json())
-
-            # Split path into parts
-            path_parts = path.split(".")
+            for _ in range(2):
+                cached = self._cached_state
+                current_state = cached[1] if cached else self.load_state()
 
-            # Navigate to the parent of the field to update
-            current_dict = state_dict
-            for part in path_parts[:-1]:
-                if part not in current_dict:
+                updated_state = self._with_field(current_state, path, value)
+                if updated_state is None:
                     return StateManagementResult(
                         success=False,
                         action=StateAction.UPDATE,
                         message=f"Invalid path: {path}",
                     )
-                current_dict = current_dict[part]
 
-            # Update the field
-            final_key = path_parts[-1]
-            if isinstance(current_dict, dict):
-                current_dict[final_key] = value
-            else:
-                return StateManagementResult(
-                    success=False,
-                    action=StateAction.UPDATE,
-                    message=f"Invalid path: {path}",
+                if self._cached_state is None:
+                    # No fingerprint to write against; plain save
+                    save_result = self.save_state(updated_state)
+                    break
+                conditional_result = self._write_if_unchanged(
+                    updated_state, self._cached_state[0]
                 )
-
-            # Create updated state
-            updated_state = SystemState.from_json(json.dumps(state_dict))
-
-            # Save the updated state
-            save_result = self.save_state(updated_state)
+                if conditional_result is not None:
+                    save_result = conditional_result
+                    break
+                # Changed since it was cached; reload and apply again
+                self._cached_state = None
+            else:
+                save_result = self.save_state(updated_state)
 
             if save_result.success:
                 return StateManagementResult(
@@ -167,63 +337,18 @@ class SSHStateRepository(StateRepository):
                 message=f"Error updating field: {e!s}",
             )
 
-    def compare_state(self, current_state: SystemState) -> Dict[str, Any]:
-        """Compare current state with stored state."""
+    def compare_state(
+        self, current_state: SystemState, baseline: Optional[SystemState] = None
+    ) -> Dict[str, Any]:
+        """Compare current state with stored state, or with a baseline."""
         try:
-            stored_state = self.load_state()
-
-            # Convert both states to dictionaries for comparison
-            current_dict = json.loads(current_state.to_json())
+            stored_state = baseline if baseline is not None else self.load_state()
             stored_dict = json.loads(stored_state.to_json())
-
-            # Initialize diff structure
-            diff = {"added": {}, "changed": {}, "removed": {}}
-
-            # Compare recursively
-            self._compare_dicts(current_dict, stored_dict, diff, "")
-
-            return diff
-
         except FileNotFoundError:
             # If no stored state, everything is "added"
-            return {
-                "added": json.loads(current_state.to_json()),
-                "changed": {},
-                "removed": {},
-            }
+            stored_dict = {}
 
-    def _compare_dicts(
-        self,
-        current: Dict[str, Any],
-        stored: Dict[str, Any],
-        diff: Dict[str, Any],
-        path: str,
-    ) -> None:
-        """Recursively compare dictionaries."""
-        # Check for changes and additions
-        for key, current_value in current.items():
-            current_path = f"{path}.{key}" if path else key
-
-            if key not in stored:
-                # Added field
-                diff["added"][current_path] = current_value
-            elif current_value != stored[key]:
-                # Changed field
-                if isinstance(current_value, dict) and isinstance(stored[key], dict):
-                    # Recursively compare nested dictionaries
-                    self._compare_dicts(current_value, stored[key], diff, current_path)
-                else:
-                    # Simple value change
-                    diff["changed"][current_path] = {
-                        "old": stored[key],
-                        "new": current_value,
-                    }
-
-        # Check for removals
-        for key, stored_value in stored.items():
-            if key not in current:
-                removed_path = f"{path}.{key}" if path else key
-                diff["removed"][removed_path] = stored_value
+        return diff_documents(stored_dict, json.loads(current_state.to_json()))
 
     def _validate_path(self, path: str) -> None:
         """Validate path for security."""
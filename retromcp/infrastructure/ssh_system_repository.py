@@ -1,7 +1,11 @@
 """SSH implementation of system repository."""
 
 import re
+import shlex
+from typing import Dict
 from typing import List
+from typing import Optional
+from typing import Tuple
 
 from ..config import RetroPieConfig
 from ..domain.models import BiosFile
@@ -9,14 +13,96 @@ from ..domain.models import CommandResult
 from ..domain.models import ConnectionError
 from ..domain.models import ExecutionError
 from ..domain.models import Package
+from ..domain.models import PackageIndex
 from ..domain.models import Result
 from ..domain.models import ServiceStatus
 from ..domain.models import SystemInfo
+from ..domain.models import SystemInventory
 from ..domain.models import SystemService
 from ..domain.models import ValidationError
 from ..domain.ports import RetroPieClient
 from ..domain.ports import SystemRepository
+from .bios_checksums import expected_bios_checksum
+from .bios_checksums import lookup_bios_system
 from .cache_system import SystemCache
+from .system_inventory import build_inventory_script
+from .system_inventory import parse_hardware
+from .system_inventory import parse_network
+from .system_inventory import parse_software
+from .system_inventory import split_sections
+
+_DPKG_STATUS_PATH = "/var/lib/dpkg/status"
+# Marks the dpkg status fingerprint line in combined command output
+_FINGERPRINT_PREFIX = "fingerprint "
+# Nanosecond mtime and size of the dpkg status file
+_FINGERPRINT_FORMAT = "%.9Y %s"
+
+# Unit properties requested from systemctl show, in one call for all services
+_SERVICE_PROPERTIES = (
+    "Id",
+    "Description",
+    "LoadState",
+    "ActiveState",
+    "SubState",
+    "UnitFileState",
+    "MemoryCurrent",
+    "NRestarts",
+)
+
+_SERVICES_COMMAND = (
+    f"systemctl show --no-pager --property={','.join(_SERVICE_PROPERTIES)} '*.service'"
+)
+
+_ACTIVE_STATE_TO_STATUS = {
+    "active": ServiceStatus.RUNNING,
+    "inactive": ServiceStatus.STOPPED,
+    "failed": ServiceStatus.FAILED,
+}
+
+# systemd reports unset integer properties as "[not set]" or UINT64_MAX
+_SYSTEMD_UNSET = 2**64 - 1
+
+# File name patterns matched when listing the BIOS directory
+_BIOS_PATTERNS = ("*.bin", "*.rom", "*.bios", "*.img", "*.pce", "kick*")
+
+
+def _parse_systemd_int(value: Optional[str]) -> Optional[int]:
+    """Parse an integer unit property, treating unset values as None."""
+    if not value:
+        return None
+    try:
+        number = int(value)
+    except ValueError:
+        return None
+    return None if number == _SYSTEMD_UNSET else number
+
+
+def _parse_services(output: str) -> List[SystemService]:
+    """Parse systemctl show output, one key=value block per unit."""
+    services = []
+    for block in output.strip().split("\n\n"):
+        properties = dict(
+            line.split("=", 1) for line in block.split("\n") if "=" in line
+        )
+        unit_id = properties.get("Id", "")
+        if not unit_id or properties.get("LoadState") == "not-found":
+            continue
+        services.append(
+            SystemService(
+                name=unit_id[: -len(".service")]
+                if unit_id.endswith(".service")
+                else unit_id,
+                status=_ACTIVE_STATE_TO_STATUS.get(
+                    properties.get("ActiveState", ""), ServiceStatus.UNKNOWN
+                ),
+                enabled=properties.get("UnitFileState") == "enabled",
+                description=properties.get("Description") or None,
+                sub_state=properties.get("SubState") or None,
+                memory_bytes=_parse_systemd_int(properties.get("MemoryCurrent")),
+                restart_count=_parse_systemd_int(properties.get("NRestarts")),
+            )
+        )
+    return services
 
 
 class SSHSystemRepository(SystemRepository):
@@ -29,6 +115,9 @@ class SSHSystemRepository(SystemRepository):
         self._client = client
         self._config = config
         self._cache = cache
+        # BIOS path -> (size, mtime, md5) so unchanged files are never re-hashed
+        self._bios_checksum_cache: Dict[str, Tuple[int, float, str]] = {}
+        self._package_index: Optional[PackageIndex] = None
 
     def get_system_info(
         self,
@@ -141,7 +230,28 @@ class SSHSystemRepository(SystemRepository):
 
     def get_packages(self) -> Result[List[Package], ExecutionError]:
         """Get list of installed packages."""
+        index_result = self.get_package_index()
+        if index_result.is_error():
+            return Result.error(index_result.error_value)
+        return Result.success(index_result.value.to_packages())
+
+    def get_package_index(self) -> Result[PackageIndex, ExecutionError]:
+        """Get index of installed packages.
+
+        The index is rebuilt from one dpkg-query call and kept until the dpkg
+        status file changes, which is checked with a single stat call.
+        """
+        index = self._package_index
+        if index is not None and index.fingerprint is not None:
+            stat_result = self._client.execute_command(
+                f"stat -c '{_FINGERPRINT_FORMAT}' {_DPKG_STATUS_PATH}"
+            )
+            if stat_result.success and stat_result.stdout.strip() == index.fingerprint:
+                return Result.success(index)
+
         result = self._client.execute_command(
+            f"stat -c '{_FINGERPRINT_PREFIX}{_FINGERPRINT_FORMAT}' "
+            f"{_DPKG_STATUS_PATH} 2>/dev/null; "
             "dpkg-query -W -f='${Package}|${Version}|${Status}\\n'"
         )
 
@@ -156,25 +266,24 @@ class SSHSystemRepository(SystemRepository):
                 )
             )
 
-        packages = []
+        fingerprint = None
+        names: List[str] = []
+        versions: List[str] = []
+        installed = bytearray()
         for line in result.stdout.strip().split("\n"):
-            if line and "|" in line:
+            if line.startswith(_FINGERPRINT_PREFIX):
+                fingerprint = line[len(_FINGERPRINT_PREFIX) :].strip()
+            elif line and "|" in line:
                 parts = line.split("|")
                 if len(parts) >= 3:
-                    name = parts[0]
-                    version = parts[1]
-                    status = parts[2]
-                    installed = "installed" in status
-
-                    packages.append(
-                        Package(
-                            name=name,
-                            version=version,
-                            installed=installed,
-                        )
-                    )
+                    names.append(parts[0])
+                    versions.append(parts[1])
+                    # Status is "want flag state"; only the state word matters
+                    state = parts[2].rsplit(" ", 1)[-1]
+                    installed.append(1 if state == "installed" else 0)
 
-        return Result.success(packages)
+        self._package_index = PackageIndex(names, versions, installed, fingerprint)
+        return Result.success(self._package_index)
 
     def install_packages(
         self, packages: List[str] | None
@@ -222,91 +331,176 @@ class SSHSystemRepository(SystemRepository):
         command = "sudo apt-get update && sudo apt-get upgrade -y"
         return self._client.execute_command(command, use_sudo=True)
 
-    def get_services(self) -> List[SystemService]:
-        """Get list of system services."""
-        result = self._client.execute_command(
-            "systemctl list-units --type=service --no-pager"
+    def get_system_inventory(self) -> Result[SystemInventory, ExecutionError]:
+        """Get hardware, network, software and service inventory.
+
+        Everything is gathered by one remote script that prints a marked
+        section per item. The service section also refreshes the cached
+        service inventory.
+        """
+        script = build_inventory_script(
+            self._config.retropie_setup_dir
+            or f"{self._config.home_dir}/RetroPie-Setup",
+            _SERVICES_COMMAND,
         )
-        services = []
+        result = self._client.execute_command(script)
+        if not result.success:
+            return Result.error(
+                ExecutionError(
+                    code="INVENTORY_FAILED",
+                    message=f"Failed to collect system inventory: {result.stderr}",
+                    command="system inventory",
+                    exit_code=result.exit_code,
+                    stderr=result.stderr,
+                )
+            )
 
-        if result.success:
-            lines = result.stdout.strip().split("\n")
-            for line in lines[1:]:  # Skip header
-                if line.strip() and not line.startswith("UNIT"):
-                    parts = line.split()
-                    if len(parts) >= 4:
-                        name = parts[0].replace(".service", "")
-                        load_state = parts[1]
-                        active_state = parts[2]
-                        _sub_state = parts[3]  # Not used but needed for unpacking
-
-                        if active_state == "active":
-                            status = ServiceStatus.RUNNING
-                        elif active_state == "inactive":
-                            status = ServiceStatus.STOPPED
-                        elif active_state == "failed":
-                            status = ServiceStatus.FAILED
-                        else:
-                            status = ServiceStatus.UNKNOWN
-
-                        services.append(
-                            SystemService(
-                                name=name,
-                                status=status,
-                                enabled=load_state == "loaded",
-                                description=" ".join(parts[4:])
-                                if len(parts) > 4
-                                else None,
-                            )
-                        )
+        sections = split_sections(result.stdout)
+        services = _parse_services(sections.get("services", ""))
+        if services:
+            self._cache.cache_service_status(services)
+        return Result.success(
+            SystemInventory(
+                hardware=parse_hardware(sections),
+                network=parse_network(sections),
+                software=parse_software(sections),
+                services=services,
+            )
+        )
+
+    def get_services(self) -> List[SystemService]:
+        """Get list of system services.
 
+        All service units are read with a single ``systemctl show`` call that
+        emits one ``key=value`` block per unit. The inventory is cached and
+        invalidated whenever a service is changed through this server.
+        """
+        cached_services = self._cache.get_service_status()
+        if cached_services is not None:
+            return cached_services
+
+        result = self._client.execute_command(_SERVICES_COMMAND)
+        if not result.success:
+            return []
+
+        services = _parse_services(result.stdout)
+        self._cache.cache_service_status(services)
         return services
 
     def restart_service(self, service_name: str) -> CommandResult:
         """Restart a system service."""
         command = f"sudo systemctl restart {service_name}"
-        return self._client.execute_command(command, use_sudo=True)
+        result = self._client.execute_command(command, use_sudo=True)
+        self._cache.invalidate_service_status()
+        return result
+
+    def get_bios_files(self, verify_checksums: bool = False) -> List[BiosFile]:
+        """Get list of BIOS files.
 
-    def get_bios_files(self) -> List[BiosFile]:
-        """Get list of BIOS files."""
+        Lists every BIOS file with its size and mtime in a single ``find`` pass.
+        When ``verify_checksums`` is set, files are hashed with one ``md5sum``
+        call and compared against the known-good table. Checksums are cached
+        by path, size and mtime so unchanged files are never re-hashed.
+        """
         bios_dir = self._config.bios_dir or f"{self._config.home_dir}/RetroPie/BIOS"
+        name_patterns = " -o ".join(f"-iname '{pattern}'" for pattern in _BIOS_PATTERNS)
         result = self._client.execute_command(
-            f"find {bios_dir} -type f -name '*.bin' -o -name '*.rom' -o -name '*.bios' 2>/dev/null"
+            f"find {shlex.quote(bios_dir)} -type f \\( {name_patterns} \\) "
+            "-printf '%p\\t%s\\t%T@\\n' 2>/dev/null"
         )
 
-        bios_files = []
+        entries = []
         if result.success:
             for line in result.stdout.strip().split("\n"):
-                if line.strip():
-                    path = line.strip()
-                    name = path.split("/")[-1]
-
-                    # Get file size
-                    size_result = self._client.execute_command(f"stat -c%s '{path}'")
-                    size = (
-                        int(size_result.stdout.strip()) if size_result.success else None
-                    )
+                parts = line.rsplit("\t", 2)
+                if len(parts) != 3 or not parts[0]:
+                    continue
+                path = parts[0]
+                try:
+                    size = int(parts[1])
+                    mtime = float(parts[2])
+                except ValueError:
+                    continue
+                entries.append((path, size, mtime))
+
+        checksums: Dict[str, str] = {}
+        if verify_checksums and entries:
+            checksums = self._get_bios_checksums(entries)
 
-                    # Determine system based on file name patterns
-                    system = "unknown"
-                    if "psx" in name.lower() or "scph" in name.lower():
-                        system = "psx"
-                    elif "dc_" in name.lower():
-                        system = "dreamcast"
-                    elif "kick" in name.lower():
-                        system = "amiga"
-                    elif "gba" in name.lower():
-                        system = "gba"
-
-                    bios_files.append(
-                        BiosFile(
-                            name=name,
-                            path=path,
-                            system=system,
-                            required=True,  # Assume all BIOS files are required
-                            present=True,  # If we found it, it's present
-                            size=size,
-                        )
-                    )
+        bios_files = []
+        for path, size, _ in entries:
+            name = path.split("/")[-1]
+            checksum = checksums.get(path)
+            expected = expected_bios_checksum(name)
+            checksum_valid = None
+            if checksum is not None and expected is not None:
+                checksum_valid = checksum == expected
+
+            bios_files.append(
+                BiosFile(
+                    name=name,
+                    path=path,
+                    system=self._classify_bios_file(name),
+                    required=True,  # Assume all BIOS files are required
+                    present=True,  # If we found it, it's present
+                    size=size,
+                    checksum=checksum,
+                    checksum_valid=checksum_valid,
+                )
+            )
 
         return bios_files
+
+    def _get_bios_checksums(
+        self, entries: List[Tuple[str, int, float]]
+    ) -> Dict[str, str]:
+        """Get MD5 checksums for BIOS files, hashing only changed files."""
+        checksums: Dict[str, str] = {}
+        stale_paths = []
+        for path, size, mtime in entries:
+            cached = self._bios_checksum_cache.get(path)
+            if cached is not None and cached[0] == size and cached[1] == mtime:
+                checksums[path] = cached[2]
+            else:
+                stale_paths.append(path)
+
+        if not stale_paths:
+            return checksums
+
+        quoted_paths = " ".join(shlex.quote(path) for path in stale_paths)
+        hash_result = self._client.execute_command(
+            f"md5sum -- {quoted_paths} 2>/dev/null"
+        )
+        # md5sum exits non-zero if any file is unreadable, but still prints
+        # checksums for the rest, so parse whatever output we got.
+        stat_by_path = {path: (size, mtime) for path, size, mtime in entries}
+        for line in hash_result.stdout.strip().split("\n"):
+            parts = line.split(None, 1)
+            if len(parts) != 2 or len(parts[0]) != 32:
+                continue
+            checksum = parts[0].lower()
+            path = parts[1].lstrip("*")
+            if path in stat_by_path:
+                size, mtime = stat_by_path[path]
+                self._bios_checksum_cache[path] = (size, mtime, checksum)
+                checksums[path] = checksum
+
+        return checksums
+
+    def _classify_bios_file(self, name: str) -> str:
+        """Determine the system a BIOS file belongs to."""
+        system = lookup_bios_system(name)
+        if system is not None:
+            return system
+
+        # Fall back to file name patterns for files not in the known table
+        name_lower = name.lower()
+        if "psx" in name_lower or "scph" in name_lower:
+            return "psx"
+        elif "dc_" in name_lower:
+            return "dreamcast"
+        elif "kick" in name_lower:
+            return "amiga"
+        elif "gba" in name_lower:
+            return "gba"
+        return "unknown"
@@ -0,0 +1,190 @@
+"""Structural diff for system state documents.
+
+Subtrees are hashed once per document so equal branches are skipped
+without walking them. Lists of records are matched by key (controllers by
+device, services by name, ...) and lists of scalars by value, so a change
+to one entry is reported for that entry instead of the whole list. Paths
+are RFC 6901 JSON pointers; list items use their index in the document the
+value comes from.
+"""
+
+import hashlib
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+# Record keys for known state lists, by JSON pointer of the list
+LIST_KEYS: Dict[str, str] = {
+    "/controllers": "device",
+    "/hardware/storage": "mount",
+    "/network": "name",
+    "/services": "name",
+}
+
+# Tried in order for other lists of records; used when unique in both lists
+_CANDIDATE_KEYS = ("device", "name", "id", "path", "mount", "system")
+
+
+def _escape(token: str) -> str:
+    """Escape one JSON pointer reference token."""
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+class _Digests:
+    """Memoized structural hashes of the subtrees of one document."""
+
+    def __init__(self) -> None:
+        self._cache: Dict[int, bytes] = {}
+        # Keep hashed containers alive so their ids are not reused
+        self._nodes: List[Any] = []
+
+    def __call__(self, node: Any) -> bytes:  # noqa: ANN401
+        """Get the digest of a subtree."""
+        if not isinstance(node, (dict, list)):
+            # Scalars are short enough to use their tagged repr directly
+            return f"{type(node).__name__}:{node!r}".encode()
+
+        cached = self._cache.get(id(node))
+        if cached is not None:
+            return cached
+        if isinstance(node, dict):
+            children = [b"{"]
+            for key in sorted(node):
+                children.extend((self(key), self(node[key])))
+        else:
+            children = [b"["]
+            children.extend(self(item) for item in node)
+        # Length-prefix children so concatenations stay unambiguous
+        digest = hashlib.blake2b(
+            b"".join(len(child).to_bytes(4, "big") + child for child in children),
+            digest_size=16,
+        ).digest()
+        self._cache[id(node)] = digest
+        self._nodes.append(node)
+        return digest
+
+
+class StateDiff:
+    """Diff of two JSON documents as added, changed and removed pointers."""
+
+    def __init__(self) -> None:
+        """Initialize an empty diff."""
+        self.added: Dict[str, Any] = {}
+        self.changed: Dict[str, Dict[str, Any]] = {}
+        self.removed: Dict[str, Any] = {}
+        self._old_digests = _Digests()
+        self._new_digests = _Digests()
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Get the diff in the compare/diff result format."""
+        return {"added": self.added, "changed": self.changed, "removed": self.removed}
+
+    def compare(self, old: Any, new: Any, path: str = "") -> None:  # noqa: ANN401
+        """Record the differences between two subtrees."""
+        if self._old_digests(old) == self._new_digests(new):
+            return
+        if isinstance(old, dict) and isinstance(new, dict):
+            self._compare_dicts(old, new, path)
+        elif isinstance(old, list) and isinstance(new, list):
+            self._compare_lists(old, new, path)
+        else:
+            self.changed[path] = {"old": old, "new": new}
+
+    def _compare_dicts(
+        self, old: Dict[str, Any], new: Dict[str, Any], path: str
+    ) -> None:
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key in old:
+                self.compare(old[key], value, child)
+            else:
+                self.added[child] = value
+        for key, value in old.items():
+            if key not in new:
+                self.removed[f"{path}/{_escape(key)}"] = value
+
+    def _compare_lists(self, old: List[Any], new: List[Any], path: str) -> None:
+        key = self._list_key(old, new, path)
+        if key is not None:
+            old_index = {item[key]: (i, item) for i, item in enumerate(old)}
+            new_index = {item[key]: (i, item) for i, item in enumerate(new)}
+            self._compare_indexed(old_index, new_index, path)
+        elif all(not isinstance(item, (dict, list)) for item in old + new):
+            # Lists of scalars behave as multisets, e.g. installed emulators
+            old_groups = self._group(old, self._old_digests)
+            new_groups = self._group(new, self._new_digests)
+            for digest, indices in new_groups.items():
+                for index in indices[len(old_groups.get(digest, ())) :]:
+                    self.added[f"{path}/{index}"] = new[index]
+            for digest, indices in old_groups.items():
+                for index in indices[len(new_groups.get(digest, ())) :]:
+                    self.removed[f"{path}/{index}"] = old[index]
+        else:
+            for index, (old_item, new_item) in enumerate(zip(old, new)):
+                self.compare(old_item, new_item, f"{path}/{index}")
+            for index in range(len(old), len(new)):
+                self.added[f"{path}/{index}"] = new[index]
+            for index in range(len(new), len(old)):
+                self.removed[f"{path}/{index}"] = old[index]
+
+    def _compare_indexed(
+        self,
+        old_index: Dict[Any, Tuple[int, Any]],
+        new_index: Dict[Any, Tuple[int, Any]],
+        path: str,
+    ) -> None:
+        for item_key, (index, item) in new_index.items():
+            if item_key in old_index:
+                self.compare(old_index[item_key][1], item, f"{path}/{index}")
+            else:
+                self.added[f"{path}/{index}"] = item
+        for item_key, (index, item) in old_index.items():
+            if item_key not in new_index:
+                self.removed[f"{path}/{index}"] = item
+
+    @staticmethod
+    def _group(items: List[Any], digests: _Digests) -> Dict[bytes, List[int]]:
+        """Group list indices by item digest."""
+        groups: Dict[bytes, List[int]] = {}
+        for index, item in enumerate(items):
+            groups.setdefault(digests(item), []).append(index)
+        return groups
+
+    @staticmethod
+    def _list_key(old: List[Any], new: List[Any], path: str) -> Optional[str]:
+        """Find a key that identifies every record in both lists."""
+        items = old + new
+        if not items or not all(isinstance(item, dict) for item in items):
+            return None
+        candidates = [LIST_KEYS[path]] if path in LIST_KEYS else []
+        candidates.extend(key for key in _CANDIDATE_KEYS if key not in candidates)
+        for key in candidates:
+            if all(_is_unique_key(side, key) for side in (old, new)):
+                return key
+        return None
+
+
+def _is_unique_key(items: List[Dict[str, Any]], key: str) -> bool:
+    """Check that a key holds a distinct scalar in every record."""
+    values = [item.get(key) for item in items]
+    return all(isinstance(value, (str, int)) for value in values) and len(
+        set(values)
+    ) == len(values)
+
+
+def diff_documents(old: Any, new: Any) -> Dict[str, Any]:  # noqa: ANN401
+    """Diff two JSON documents.
+
+    Args:
+        old: Stored document
+        new: Current document
+
+    Returns:
+        Dict with added, changed and removed maps keyed by JSON pointer;
+        changed entries hold the old and new values
+    """
+    diff = StateDiff()
+    diff.compare(old, new)
+    return diff.as_dict()
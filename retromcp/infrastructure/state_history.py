@@ -0,0 +1,365 @@
+"""Delta-encoded, compressed history of saved system states.
+
+Each save is stored as an RFC 6902 JSON patch against the previous entry,
+with a full snapshot every ``snapshot_interval`` saves so reconstruction
+never replays more than ``snapshot_interval - 1`` patches. Entries are
+appended to one file as independent gzip members, which gzip readers treat
+as a single stream. A truncated or corrupt member left by an interrupted
+write is cut off on load, so later appends stay readable.
+"""
+
+import bisect
+import copy
+import gzip
+import json
+import logging
+import threading
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from ..domain.models import StateSnapshot
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SNAPSHOT_INTERVAL = 10
+_GZIP_WBITS = 16 + zlib.MAX_WBITS
+_READ_CHUNK = 64 * 1024  # Compressed bytes fed to the decompressor at a time
+
+
+def _escape_pointer(key: str) -> str:
+    """Escape one JSON pointer reference token."""
+    return key.replace("~", "~0").replace("/", "~1")
+
+
+def _unescape_pointer(token: str) -> str:
+    """Unescape one JSON pointer reference token."""
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def make_json_patch(
+    old: Any,  # noqa: ANN401
+    new: Any,  # noqa: ANN401
+    path: str = "",
+) -> List[Dict[str, Any]]:
+    """Build a JSON patch turning ``old`` into ``new``.
+
+    Objects are compared key by key and equal-length arrays element by
+    element; anything else that differs is replaced whole.
+
+    Args:
+        old: Previous JSON document
+        new: New JSON document
+        path: JSON pointer of the documents within their parent
+
+    Returns:
+        List of add, remove and replace operations
+    """
+    if old == new:
+        return []
+    if isinstance(old, dict) and isinstance(new, dict):
+        operations: List[Dict[str, Any]] = []
+        for key in old:
+            if key not in new:
+                operations.append(
+                    {"op": "remove", "path": f"{path}/{_escape_pointer(key)}"}
+                )
+        for key, value in new.items():
+            child = f"{path}/{_escape_pointer(key)}"
+            if key not in old:
+                operations.append({"op": "add", "path": child, "value": value})
+            else:
+                operations.extend(make_json_patch(old[key], value, child))
+        return operations
+    if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        operations = []
+        for index, (old_item, new_item) in enumerate(zip(old, new)):
+            operations.extend(make_json_patch(old_item, new_item, f"{path}/{index}"))
+        return operations
+    return [{"op": "replace", "path": path, "value": new}]
+
+
+def apply_json_patch(document: Any, patch: List[Dict[str, Any]]) -> Any:  # noqa: ANN401
+    """Apply a JSON patch produced by ``make_json_patch``.
+
+    Args:
+        document: JSON document to patch; it is not modified
+        patch: Operations to apply in order
+
+    Returns:
+        Patched copy of the document
+    """
+    result = copy.deepcopy(document)
+    for operation in patch:
+        value = copy.deepcopy(operation.get("value"))
+        if operation["path"] == "":
+            result = value
+            continue
+
+        tokens = [_unescape_pointer(t) for t in operation["path"].split("/")[1:]]
+        parent = result
+        for token in tokens[:-1]:
+            parent = parent[int(token) if isinstance(parent, list) else token]
+        last = tokens[-1]
+        if isinstance(parent, list):
+            index = len(parent) if last == "-" else int(last)
+            if operation["op"] == "add":
+                parent.insert(index, value)
+            elif operation["op"] == "remove":
+                del parent[index]
+            else:
+                parent[index] = value
+        elif operation["op"] == "remove":
+            del parent[last]
+        else:
+            parent[last] = value
+    return result
+
+
+def _parse_timestamp(timestamp: str) -> datetime:
+    """Parse an ISO 8601 timestamp as naive local time.
+
+    Timestamps with a UTC offset are converted to local time first, so they
+    order correctly against naive ones.
+    """
+    try:
+        parsed = datetime.fromisoformat(timestamp)
+    except ValueError as e:
+        raise ValueError(f"Invalid timestamp: {timestamp}") from e
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+class StateHistory:
+    """Append-only, delta-encoded state history stored in a gzip file."""
+
+    def __init__(
+        self, path: Path, snapshot_interval: int = DEFAULT_SNAPSHOT_INTERVAL
+    ) -> None:
+        """Initialize history.
+
+        The history file is read lazily on first use.
+
+        Args:
+            path: History file location
+            snapshot_interval: Saves between full snapshots
+        """
+        if snapshot_interval < 1:
+            raise ValueError("snapshot_interval must be at least 1")
+        self._path = path
+        self._snapshot_interval = snapshot_interval
+        self._lock = threading.Lock()
+        self._entries: Optional[List[Dict[str, Any]]] = None
+        self._snapshot_positions: List[int] = []
+        self._times: List[datetime] = []
+        self._sizes: List[int] = []
+        # Latest reconstructed document, the base for the next delta
+        self._latest: Optional[Dict[str, Any]] = None
+
+    def record(self, document: Dict[str, Any], timestamp: str) -> bytes:
+        """Append a state document to the history.
+
+        Args:
+            document: State as a JSON-compatible dict
+            timestamp: ISO 8601 time the state was captured
+
+        Returns:
+            The compressed entry as appended to the history file
+        """
+        captured_at = _parse_timestamp(timestamp)
+        with self._lock:
+            entries = self._load()
+            sequence = len(entries)
+            full = (
+                not self._snapshot_positions
+                or sequence - self._snapshot_positions[-1] >= self._snapshot_interval
+            )
+            entry: Dict[str, Any] = {
+                "sequence": sequence,
+                "timestamp": timestamp,
+                "full": full,
+            }
+            if full:
+                entry["state"] = document
+            else:
+                entry["patch"] = make_json_patch(self._latest, document)
+
+            encoded = gzip.compress(
+                (json.dumps(entry, separators=(",", ":")) + "\n").encode("utf-8")
+            )
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            with self._path.open("ab") as history_file:
+                history_file.write(encoded)
+
+            self._append(entries, entry, captured_at, len(encoded))
+            self._latest = copy.deepcopy(document)
+            return encoded
+
+    def entries(
+        self, since: Optional[str] = None, until: Optional[str] = None
+    ) -> List[StateSnapshot]:
+        """List history entries captured within a time range.
+
+        Args:
+            since: Inclusive ISO 8601 lower bound
+            until: Inclusive ISO 8601 upper bound
+
+        Returns:
+            Matching entries, oldest first
+        """
+        with self._lock:
+            entries = self._load()
+            start = (
+                bisect.bisect_left(self._times, _parse_timestamp(since)) if since else 0
+            )
+            end = (
+                bisect.bisect_right(self._times, _parse_timestamp(until))
+                if until
+                else len(entries)
+            )
+            return [
+                StateSnapshot(
+                    sequence=entry["sequence"],
+                    timestamp=entry["timestamp"],
+                    full=entry["full"],
+                    size=self._sizes[index],
+                )
+                for index, entry in enumerate(entries[start:end], start)
+            ]
+
+    def state_at(self, timestamp: str) -> Optional[Dict[str, Any]]:
+        """Reconstruct the latest state captured at or before a time.
+
+        Args:
+            timestamp: ISO 8601 time
+
+        Returns:
+            State document, or None if nothing was recorded by then
+        """
+        with self._lock:
+            self._load()
+            index = bisect.bisect_right(self._times, _parse_timestamp(timestamp)) - 1
+            return self._reconstruct(index) if index >= 0 else None
+
+    def reconstruct(self, sequence: int) -> Dict[str, Any]:
+        """Reconstruct the state recorded with a sequence number.
+
+        Args:
+            sequence: Entry sequence number
+
+        Returns:
+            State document
+
+        Raises:
+            KeyError: If there is no entry with that sequence number
+        """
+        with self._lock:
+            entries = self._load()
+            if not 0 <= sequence < len(entries):
+                raise KeyError(f"No state history entry {sequence}")
+            return self._reconstruct(sequence)
+
+    def _reconstruct(self, index: int) -> Dict[str, Any]:
+        """Replay patches from the nearest full snapshot up to an entry."""
+        entries = self._entries or []
+        if index == len(entries) - 1 and self._latest is not None:
+            return copy.deepcopy(self._latest)
+        base = self._snapshot_positions[
+            bisect.bisect_right(self._snapshot_positions, index) - 1
+        ]
+        document = entries[base]["state"]
+        for entry in entries[base + 1 : index + 1]:
+            document = apply_json_patch(document, entry["patch"])
+        return copy.deepcopy(document)
+
+    def _append(
+        self,
+        entries: List[Dict[str, Any]],
+        entry: Dict[str, Any],
+        captured_at: datetime,
+        size: int,
+    ) -> None:
+        """Index an entry in memory, keeping timestamps sorted."""
+        if self._times and captured_at < self._times[-1]:
+            # Clock went backwards; keep bisection valid
+            captured_at = self._times[-1]
+        if entry["full"]:
+            self._snapshot_positions.append(len(entries))
+        entries.append(entry)
+        self._times.append(captured_at)
+        self._sizes.append(size)
+
+    def _load(self) -> List[Dict[str, Any]]:
+        """Read the history file once and index its entries."""
+        if self._entries is not None:
+            return self._entries
+        entries: List[Dict[str, Any]] = []
+        self._entries = entries
+        if not self._path.exists():
+            return entries
+
+        data = memoryview(self._path.read_bytes())
+        offset = 0
+        while offset < len(data):
+            parsed = self._parse_member(data, offset, len(entries))
+            if parsed is None:
+                self._truncate(offset, len(data))
+                break
+            entry, captured_at, size = parsed
+            self._append(entries, entry, captured_at, size)
+            offset += size
+        if entries:
+            self._latest = self._reconstruct(len(entries) - 1)
+        return entries
+
+    def _parse_member(
+        self, data: memoryview, offset: int, sequence: int
+    ) -> Optional[Tuple[Dict[str, Any], datetime, int]]:
+        """Decode the gzip member starting at an offset.
+
+        Returns:
+            The entry, its capture time and compressed size, or None if the
+            member is truncated or does not hold the expected entry
+        """
+        decompressor = zlib.decompressobj(wbits=_GZIP_WBITS)
+        position = offset
+        parts: List[bytes] = []
+        try:
+            # Bounded chunks, so each member costs its own size rather than
+            # the rest of the file
+            while not decompressor.eof:
+                if position >= len(data):
+                    # Truncated member from an interrupted write
+                    return None
+                chunk = data[position : position + _READ_CHUNK]
+                parts.append(decompressor.decompress(chunk))
+                position += len(chunk)
+            entry = json.loads(b"".join(parts))
+            captured_at = _parse_timestamp(entry["timestamp"])
+            valid = entry["sequence"] == sequence and (
+                "state" in entry if entry["full"] else "patch" in entry
+            )
+        except (zlib.error, ValueError, KeyError, TypeError):
+            return None
+        if not valid or (not entry["full"] and not self._snapshot_positions):
+            return None
+        size = position - offset - len(decompressor.unused_data)
+        return entry, captured_at, size
+
+    def _truncate(self, offset: int, length: int) -> None:
+        """Cut a damaged tail off the history file before anything is appended."""
+        logger.warning(
+            f"Discarding {length - offset} damaged bytes at the end of "
+            f"state history {self._path}"
+        )
+        try:
+            with self._path.open("r+b") as history_file:
+                history_file.truncate(offset)
+        except OSError as e:
+            logger.warning(f"Could not truncate state history {self._path}: {e}")
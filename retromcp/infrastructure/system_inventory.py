@@ -0,0 +1,216 @@
+"""Single-pass remote inventory for the v2.0 state sections.
+
+One shell script prints every section behind a marker line, so hardware,
+network and software details cost a single round trip.
+"""
+
+import re
+import shlex
+from typing import Dict
+from typing import List
+
+from ..domain.models import HardwareInfo
+from ..domain.models import NetworkInterface
+from ..domain.models import NetworkStatus
+from ..domain.models import ServiceStatus
+from ..domain.models import SoftwareInfo
+from ..domain.models import StorageDevice
+
+_SECTION_PATTERN = re.compile(r"^@@retromcp:(\w+)@@$", re.MULTILINE)
+
+_SCRIPT_TEMPLATE = """\
+s() {{ echo "@@retromcp:$1@@"; }}
+s model; tr -d '\\0' < /proc/device-tree/model 2>/dev/null; echo
+s revision; awk '/^Revision/ {{print $3}}' /proc/cpuinfo 2>/dev/null
+s temperature; cat /sys/class/thermal/thermal_zone0/temp 2>/dev/null
+s memory; free -b 2>/dev/null | awk '/^Mem:/ {{print $2, $3}}'
+s storage; df -PT -B1 -x tmpfs -x devtmpfs 2>/dev/null | tail -n +2
+s cooling; cat /sys/class/thermal/cooling_device0/cur_state 2>/dev/null
+s fan; cat /sys/devices/platform/cooling_fan/hwmon/hwmon*/fan1_input 2>/dev/null | head -1
+s interfaces; for i in /sys/class/net/*; do n=${{i##*/}}; [ "$n" = lo ] && continue; \
+echo "$n $(cat "$i/operstate" 2>/dev/null) $(cat "$i/speed" 2>/dev/null)"; done
+s addresses; ip -o -4 addr show 2>/dev/null | awk '{{print $2, $4}}'
+s ssid; iwgetid 2>/dev/null
+s signal; awk 'NR>2 {{print $1, $4}}' /proc/net/wireless 2>/dev/null
+s os; . /etc/os-release 2>/dev/null; echo "$NAME"; echo "$VERSION"
+s kernel; uname -r
+s python; python3 --version 2>&1; command -v python3
+s docker; docker --version 2>/dev/null; echo "state $(systemctl is-active docker 2>/dev/null)"
+s retropie; grep -m1 '__version=' {retropie_setup_dir}/retropie_packages.sh 2>/dev/null; \
+pgrep -x emulationstation >/dev/null && echo running || echo stopped
+s services; {services_command} 2>/dev/null
+true
+"""
+
+
+def build_inventory_script(retropie_setup_dir: str, services_command: str) -> str:
+    """Build the inventory script.
+
+    Args:
+        retropie_setup_dir: RetroPie-Setup directory used for the version lookup
+        services_command: Command emitting the service inventory section
+
+    Returns:
+        Shell script printing one marked section per inventory item
+    """
+    return _SCRIPT_TEMPLATE.format(
+        retropie_setup_dir=shlex.quote(retropie_setup_dir),
+        services_command=services_command,
+    )
+
+
+def split_sections(output: str) -> Dict[str, str]:
+    """Split inventory output into section name -> section text."""
+    sections: Dict[str, str] = {}
+    matches = list(_SECTION_PATTERN.finditer(output))
+    for index, match in enumerate(matches):
+        end = matches[index + 1].start() if index + 1 < len(matches) else len(output)
+        sections[match.group(1)] = output[match.end() : end].strip()
+    return sections
+
+
+def format_bytes(size: int) -> str:
+    """Format a byte count the way v2.0 state stores sizes, e.g. 15.8GB."""
+    value = float(size)
+    for unit in ("B", "KB", "MB", "GB"):
+        if value < 1024:
+            return f"{value:.0f}{unit}" if unit == "B" else f"{value:.1f}{unit}"
+        value /= 1024
+    return f"{value:.1f}TB"
+
+
+def _to_int(text: str, default: int = 0) -> int:
+    """Parse an integer, falling back to a default for missing values."""
+    try:
+        return int(float(text.strip().rstrip(".")))
+    except ValueError:
+        return default
+
+
+def parse_hardware(sections: Dict[str, str]) -> HardwareInfo:
+    """Build hardware information from inventory sections."""
+    memory = sections.get("memory", "").split()
+    storage = []
+    for line in sections.get("storage", "").split("\n"):
+        parts = line.split()
+        # Filesystem Type 1-blocks Used Available Capacity Mounted-on
+        if len(parts) >= 7:
+            storage.append(
+                StorageDevice(
+                    device=parts[0],
+                    mount=" ".join(parts[6:]),
+                    size=format_bytes(_to_int(parts[2])),
+                    used=format_bytes(_to_int(parts[3])),
+                    filesystem_type=parts[1],
+                )
+            )
+
+    return HardwareInfo(
+        model=sections.get("model", "") or "unknown",
+        revision=sections.get("revision", "") or "unknown",
+        cpu_temperature=_to_int(sections.get("temperature", "0")) / 1000,
+        memory_total=format_bytes(_to_int(memory[0])) if memory else "unknown",
+        memory_used=format_bytes(_to_int(memory[1])) if len(memory) > 1 else "unknown",
+        storage=storage,
+        gpio_usage={},
+        cooling_active=_to_int(sections.get("cooling", "0")) > 0,
+        case_type="unknown",
+        fan_speed=_to_int(sections.get("fan", "0")),
+    )
+
+
+def parse_network(sections: Dict[str, str]) -> List[NetworkInterface]:
+    """Build network interfaces from inventory sections."""
+    addresses: Dict[str, str] = {}
+    for line in sections.get("addresses", "").split("\n"):
+        parts = line.split()
+        if len(parts) == 2:
+            addresses.setdefault(parts[0], parts[1].split("/")[0])
+
+    ssids: Dict[str, str] = {}
+    for line in sections.get("ssid", "").split("\n"):
+        match = re.match(r'^(\S+)\s+ESSID:"(.*)"', line)
+        if match:
+            ssids[match.group(1)] = match.group(2)
+
+    signals: Dict[str, int] = {}
+    for line in sections.get("signal", "").split("\n"):
+        parts = line.split()
+        if len(parts) == 2:
+            signals[parts[0].rstrip(":")] = _to_int(parts[1])
+
+    interfaces = []
+    for line in sections.get("interfaces", "").split("\n"):
+        parts = line.split()
+        if not parts:
+            continue
+        name = parts[0]
+        state = parts[1] if len(parts) > 1 else ""
+        speed = parts[2] if len(parts) > 2 else ""
+        if state == "up":
+            status = NetworkStatus.UP
+        elif state == "down":
+            status = NetworkStatus.DOWN
+        else:
+            status = NetworkStatus.UNKNOWN
+        interfaces.append(
+            NetworkInterface(
+                name=name,
+                ip=addresses.get(name, ""),
+                status=status,
+                speed=f"{speed}Mbps" if speed.isdigit() else "unknown",
+                ssid=ssids.get(name),
+                signal_strength=signals.get(name),
+            )
+        )
+    return interfaces
+
+
+def parse_software(sections: Dict[str, str]) -> SoftwareInfo:
+    """Build software information from inventory sections."""
+    os_lines = sections.get("os", "").split("\n")
+    python_lines = sections.get("python", "").split("\n")
+    python_version = ""
+    if python_lines and python_lines[0].startswith("Python "):
+        python_version = python_lines[0][len("Python ") :]
+
+    docker_version = ""
+    docker_state = ""
+    for line in sections.get("docker", "").split("\n"):
+        if line.startswith("state "):
+            docker_state = line[len("state ") :].strip()
+        else:
+            match = re.search(r"version ([^,\s]+)", line)
+            if match:
+                docker_version = match.group(1)
+    if docker_state == "active":
+        docker_status = ServiceStatus.RUNNING
+    elif docker_state == "failed":
+        docker_status = ServiceStatus.FAILED
+    elif docker_version:
+        docker_status = ServiceStatus.STOPPED
+    else:
+        docker_status = ServiceStatus.UNKNOWN
+
+    retropie_version = ""
+    retropie_status = ServiceStatus.UNKNOWN
+    for line in sections.get("retropie", "").split("\n"):
+        match = re.search(r'__version="?([^"\s]+)', line)
+        if match:
+            retropie_version = match.group(1)
+        elif line == "running":
+            retropie_status = ServiceStatus.RUNNING
+        elif line == "stopped":
+            retropie_status = ServiceStatus.STOPPED
+
+    return SoftwareInfo(
+        os_name=os_lines[0] if os_lines[0] else "unknown",
+        os_version=os_lines[1] if len(os_lines) > 1 else "unknown",
+        kernel=sections.get("kernel", "") or "unknown",
+        python_version=python_version or "unknown",
+        python_path=python_lines[1] if len(python_lines) > 1 else "unknown",
+        docker_version=docker_version or "not installed",
+        docker_status=docker_status,
+        retropie_version=retropie_version or "unknown",
+        retropie_status=retropie_status,
+    )
@@ -0,0 +1,232 @@
+"""Incremental reader for kernel and journal error logs.
+
+Each poll sends one command that returns only entries newer than the last
+poll: kernel messages after the last seen kernel timestamp (reset when the
+boot id changes) and journal errors after the last journal cursor. New
+entries are classified into hardware, USB, power and thermal buckets and
+kept in a bounded in-memory index, so repeated error checks cost only the
+new entries.
+"""
+
+import logging
+import re
+import shlex
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+from ..domain.ports import RetroPieClient
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 500
+INITIAL_JOURNAL_LINES = 200  # Journal errors read when no cursor is known
+
+_MARKER = "@@retromcp-logs@@"
+
+# Checked in order; an entry lands in every bucket it matches
+LOG_CATEGORIES: Tuple[Tuple[str, "re.Pattern[str]"], ...] = (
+    (
+        "thermal",
+        re.compile(r"therm|temperat|overheat|throttl|cpufreq", re.IGNORECASE),
+    ),
+    (
+        "power",
+        re.compile(r"voltage|undervolt|brown-?out|power supply", re.IGNORECASE),
+    ),
+    (
+        "usb",
+        re.compile(r"\busb|xhci|dwc_otg|dwc2|\bhub\b|\bhid", re.IGNORECASE),
+    ),
+    (
+        "hardware",
+        re.compile(
+            r"hardware|mmc|sdhci|i/o error|ext4-fs error|firmware|gpio|i2c|"
+            r"\bspi\b|bcm2835|vchiq|edac|machine check",
+            re.IGNORECASE,
+        ),
+    ),
+)
+
+# Kernel lines without a problem keyword are kept only at warning or worse
+_PROBLEM = re.compile(r"error|fail|warn", re.IGNORECASE)
+# Raw dmesg line, e.g. "<3>[  12.345678] usb 1-1: device not accepting address"
+_DMESG_LINE = re.compile(
+    r"^<(?P<priority>\d+)>\[\s*(?P<time>\d+\.\d+)\]\s?(?P<msg>.*)$"
+)
+_JOURNAL_CURSOR = re.compile(r"^-- cursor: (?P<cursor>\S+)")
+
+
+@dataclass(frozen=True)
+class LogEntry:
+    """Classified kernel or journal log entry."""
+
+    source: str  # "kernel" or "journal"
+    timestamp: str  # Seconds since boot for kernel entries, ISO time for journal
+    message: str
+    categories: Tuple[str, ...]
+
+    def __str__(self) -> str:
+        """Format as one log line."""
+        prefix = f"[{self.timestamp}]" if self.source == "kernel" else self.timestamp
+        return f"{prefix} {self.message}"
+
+
+def classify_log_message(message: str) -> Tuple[str, ...]:
+    """Get the buckets a log message belongs to.
+
+    Args:
+        message: Log message text
+
+    Returns:
+        Matching category names in LOG_CATEGORIES order
+    """
+    return tuple(name for name, pattern in LOG_CATEGORIES if pattern.search(message))
+
+
+class SystemLogReader:
+    """Reads new kernel and journal errors since the previous poll."""
+
+    def __init__(
+        self, client: RetroPieClient, max_entries: int = DEFAULT_MAX_ENTRIES
+    ) -> None:
+        """Initialize reader.
+
+        Args:
+            client: RetroPie client
+            max_entries: Entries kept in the local index
+        """
+        self._client = client
+        self._entries: Deque[LogEntry] = deque(maxlen=max_entries)
+        self._lock = threading.Lock()
+        self._boot_id: Optional[str] = None
+        self._kernel_time = 0.0
+        self._journal_cursor: Optional[str] = None
+
+    def poll(self) -> List[LogEntry]:
+        """Fetch, classify and index entries logged since the previous poll.
+
+        Returns:
+            The new entries, oldest first
+        """
+        with self._lock:
+            result = self._client.execute_command(self._poll_command())
+            if not result.stdout:
+                if not result.success:
+                    logger.warning(f"Log poll failed: {result.stderr}")
+                return []
+            entries = self._consume(result.stdout)
+            self._entries.extend(entries)
+            return entries
+
+    def recent(
+        self, categories: Optional[Sequence[str]] = None, limit: int = 10
+    ) -> List[LogEntry]:
+        """Get the newest indexed entries.
+
+        Args:
+            categories: Only entries in any of these buckets; all if None
+            limit: Maximum number of entries
+
+        Returns:
+            Up to limit entries, oldest first
+        """
+        with self._lock:
+            matches = [
+                entry
+                for entry in reversed(self._entries)
+                if categories is None
+                or any(category in entry.categories for category in categories)
+            ][:limit]
+        matches.reverse()
+        return matches
+
+    def counts(self) -> Dict[str, int]:
+        """Count indexed entries per bucket."""
+        counts: Dict[str, int] = {}
+        with self._lock:
+            for entry in self._entries:
+                for category in entry.categories:
+                    counts[category] = counts.get(category, 0) + 1
+        return counts
+
+    def _poll_command(self) -> str:
+        """Build the command that prints boot id and new entries of both logs."""
+        if self._journal_cursor:
+            journal_position = f"--after-cursor={shlex.quote(self._journal_cursor)}"
+        else:
+            journal_position = f"-n {INITIAL_JOURNAL_LINES}"
+        # After a reboot kernel timestamps restart, so read the whole buffer.
+        # Keep "-f" out of the command; the timeout config treats journalctl
+        # with it as a never-ending stream.
+        known_boot = shlex.quote(self._boot_id or "")
+        return (
+            'b=$(cat /proc/sys/kernel/random/boot_id); echo "$b"; '
+            f'a=0; [ "$b" = {known_boot} ] && a={self._kernel_time:.6f}; '
+            f'echo "{_MARKER} kernel"; '
+            'dmesg -r 2>/dev/null | awk -v after="$a" '
+            '\'{ s = index($0, "["); e = index($0, "]"); '
+            "if (s && e && substr($0, s + 1, e - s - 1) + 0 > after) print }'; "
+            f'echo "{_MARKER} journal"; '
+            "journalctl -p err --no-pager -o short-iso --show-cursor "
+            f"{journal_position} 2>/dev/null"
+        )
+
+    def _consume(self, output: str) -> List[LogEntry]:
+        """Parse poll output and advance the kernel time and journal cursor."""
+        header, _, rest = output.partition(f"{_MARKER} kernel")
+        kernel_output, _, journal_output = rest.partition(f"{_MARKER} journal")
+
+        boot_id = header.strip()
+        if boot_id != self._boot_id:
+            self._boot_id = boot_id
+            self._kernel_time = 0.0
+
+        return self._consume_kernel(kernel_output) + self._consume_journal(
+            journal_output
+        )
+
+    def _consume_kernel(self, output: str) -> List[LogEntry]:
+        entries = []
+        for line in output.splitlines():
+            match = _DMESG_LINE.match(line.strip())
+            if match is None:
+                continue
+            timestamp = float(match.group("time"))
+            self._kernel_time = max(self._kernel_time, timestamp)
+            message = match.group("msg")
+            if int(match.group("priority")) & 7 > 4 and not _PROBLEM.search(message):
+                continue
+            categories = classify_log_message(message)
+            if categories:
+                entries.append(
+                    LogEntry("kernel", match.group("time"), message, categories)
+                )
+        return entries
+
+    def _consume_journal(self, output: str) -> List[LogEntry]:
+        entries = []
+        for line in output.splitlines():
+            line = line.strip()
+            cursor = _JOURNAL_CURSOR.match(line)
+            if cursor is not None:
+                self._journal_cursor = cursor.group("cursor")
+                continue
+            if not line or line.startswith("-- "):
+                continue  # "-- No entries --", "-- Boot ... --"
+            timestamp, _, message = line.partition(" ")
+            entries.append(
+                LogEntry(
+                    "journal",
+                    timestamp,
+                    message,
+                    classify_log_message(message) or ("system",),
+                )
+            )
+        return entries
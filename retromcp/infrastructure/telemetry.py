@@ -0,0 +1,360 @@
+"""Background hardware telemetry sampler with fixed-size ring buffers.
+
+Every sample is one SSH round trip that reads all metrics. Each metric is
+stored in several tiers: raw samples for the last hour, one-minute buckets
+for a day and fifteen-minute buckets for a week. Tiers are array-backed
+rings of (start, min, max, sum, count) points, so memory stays constant
+however long the sampler runs.
+
+With an on-Pi logger attached, the sampler fetches the logger's new
+records once a minute instead of polling each metric over SSH.
+"""
+
+import logging
+import math
+import threading
+import time
+from array import array
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+from ..domain.models import TelemetryStats
+from ..domain.ports import RetroPieClient
+from .telemetry_logger import TelemetryLogger
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SAMPLE_INTERVAL = 5.0  # seconds
+REMOTE_FETCH_INTERVAL = 60.0  # seconds between fetches from the on-Pi logger
+
+# Each line is "name=value"; missing tools just leave their metric out
+TELEMETRY_COMMAND = (
+    "vcgencmd measure_temp; "
+    "vcgencmd get_throttled; "
+    "vcgencmd measure_volts core; "
+    "vcgencmd measure_clock arm; "
+    "echo load=$(cut -d' ' -f1 /proc/loadavg); "
+    "awk '/^MemTotal:/ {t=$2} /^MemAvailable:/ {a=$2} "
+    'END {if (t) printf "memory=%.1f\\n", (t-a)*100/t}\' /proc/meminfo'
+)
+
+TELEMETRY_METRICS = (
+    "temperature",  # SoC temperature, °C
+    "throttled",  # 1 while any current throttle flag is set, else 0
+    "core_voltage",  # V
+    "arm_clock",  # MHz
+    "cpu_load",  # 1-minute load average
+    "memory",  # percent used
+)
+
+# (resolution, span) in seconds; resolution 0 keeps every sample
+TELEMETRY_TIERS: Tuple[Tuple[float, float], ...] = (
+    (0.0, 3600.0),
+    (60.0, 86400.0),
+    (900.0, 604800.0),
+)
+
+PERCENTILES = (50, 90, 95, 99)
+
+# Point tuple: (start, minimum, maximum, total, count)
+_Point = Tuple[float, float, float, float, int]
+
+
+def parse_telemetry_sample(output: str) -> Dict[str, float]:
+    """Parse the output of TELEMETRY_COMMAND.
+
+    Args:
+        output: Command output
+
+    Returns:
+        Metric values by name; unparseable lines are skipped
+    """
+    values: Dict[str, float] = {}
+    for line in output.splitlines():
+        key, sep, raw = line.strip().partition("=")
+        if not sep:
+            continue
+        try:
+            if key == "temp":
+                values["temperature"] = float(raw.rstrip("'C"))
+            elif key == "throttled":
+                values["throttled"] = 1.0 if int(raw, 16) & 0xF else 0.0
+            elif key == "volt":
+                values["core_voltage"] = float(raw.rstrip("V"))
+            elif key.startswith("frequency"):
+                values["arm_clock"] = int(raw) / 1_000_000
+            elif key == "load":
+                values["cpu_load"] = float(raw)
+            elif key == "memory":
+                values["memory"] = float(raw)
+        except ValueError:
+            continue
+    return values
+
+
+class TelemetryRing:
+    """Fixed-size ring of aggregated points in parallel arrays."""
+
+    def __init__(self, capacity: int, resolution: float) -> None:
+        """Initialize ring.
+
+        Args:
+            capacity: Number of points kept
+            resolution: Seconds per point; 0 stores every value as a point
+        """
+        self.capacity = capacity
+        self.resolution = resolution
+        self._start = array("d", [0.0]) * capacity
+        self._minimum = array("d", [0.0]) * capacity
+        self._maximum = array("d", [0.0]) * capacity
+        self._total = array("d", [0.0]) * capacity
+        self._count = array("L", [0]) * capacity
+        self._head = -1
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Get the number of stored points."""
+        return self._size
+
+    def add(self, timestamp: float, value: float) -> None:
+        """Add a value, merging it into the newest point if it is in its bucket."""
+        start = (
+            timestamp - timestamp % self.resolution if self.resolution else timestamp
+        )
+        head = self._head
+        if self._size and self.resolution and self._start[head] == start:
+            self._minimum[head] = min(self._minimum[head], value)
+            self._maximum[head] = max(self._maximum[head], value)
+            self._total[head] += value
+            self._count[head] += 1
+            return
+
+        head = (head + 1) % self.capacity
+        self._head = head
+        self._size = min(self._size + 1, self.capacity)
+        self._start[head] = start
+        self._minimum[head] = value
+        self._maximum[head] = value
+        self._total[head] = value
+        self._count[head] = 1
+
+    def points(self, since: float) -> Iterator[_Point]:
+        """Yield points overlapping the window starting at since, newest first."""
+        for offset in range(self._size):
+            index = (self._head - offset) % self.capacity
+            start = self._start[index]
+            if start + self.resolution < since:
+                return
+            yield (
+                start,
+                self._minimum[index],
+                self._maximum[index],
+                self._total[index],
+                self._count[index],
+            )
+
+
+class TelemetrySampler:
+    """Samples hardware telemetry on a daemon thread into ring buffers."""
+
+    def __init__(
+        self,
+        client: RetroPieClient,
+        interval: float = DEFAULT_SAMPLE_INTERVAL,
+        tiers: Sequence[Tuple[float, float]] = TELEMETRY_TIERS,
+    ) -> None:
+        """Initialize sampler.
+
+        Args:
+            client: RetroPie client used to read telemetry
+            interval: Seconds between samples
+            tiers: (resolution, span) of each storage tier, finest first
+        """
+        self._client = client
+        self.interval = interval
+        self._tiers = tuple(tiers)
+        self._rings: Dict[str, List[TelemetryRing]] = {
+            metric: [
+                TelemetryRing(math.ceil(span / (resolution or interval)), resolution)
+                for resolution, span in self._tiers
+            ]
+            for metric in TELEMETRY_METRICS
+        }
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._remote_log: Optional[TelemetryLogger] = None
+        self._last_synced = 0.0
+        self._newest = 0.0  # Latest recorded timestamp
+
+    @property
+    def remote_log(self) -> Optional[TelemetryLogger]:
+        """Get the attached on-Pi logger, if any."""
+        return self._remote_log
+
+    def use_remote_log(self, remote_log: Optional[TelemetryLogger]) -> None:
+        """Read from an on-Pi logger instead of polling, or detach with None.
+
+        Log records older than what was already recorded, e.g. by polling
+        before the logger was attached, are skipped.
+        """
+        with self._lock:
+            self._last_synced = max(self._last_synced, self._newest)
+        self._remote_log = remote_log
+
+    @property
+    def is_running(self) -> bool:
+        """Check if the sampler thread is alive and not stopped."""
+        return (
+            self._thread is not None
+            and self._thread.is_alive()
+            and not self._stopped.is_set()
+        )
+
+    def start(self) -> None:
+        """Start sampling in the background."""
+        if self.is_running:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="telemetry-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling; recorded data is kept."""
+        self._stopped.set()
+
+    def sample_now(self) -> Dict[str, float]:
+        """Read every metric once and record it.
+
+        Returns:
+            The sampled values, empty if the read failed
+        """
+        try:
+            result = self._client.execute_command(TELEMETRY_COMMAND)
+        except Exception as e:
+            logger.warning(f"Telemetry sample failed: {e}")
+            return {}
+        values = parse_telemetry_sample(result.stdout or "")
+        if not values:
+            logger.warning(f"Telemetry sample returned no values: {result.stderr}")
+            return {}
+        self.record(values, time.time())
+        return values
+
+    def sync(self) -> int:
+        """Record the attached logger's records written since the last sync.
+
+        Returns:
+            Number of records added
+        """
+        remote_log = self._remote_log
+        if remote_log is None:
+            return 0
+        try:
+            records = remote_log.fetch()
+        except Exception as e:
+            logger.warning(f"Telemetry log sync failed: {e}")
+            return 0
+        added = 0
+        for timestamp, values in records:
+            # Rings expect time order; skip anything already covered
+            if timestamp < self._last_synced:
+                continue
+            self.record(values, timestamp)
+            self._last_synced = timestamp
+            added += 1
+        return added
+
+    def record(self, values: Dict[str, float], timestamp: float) -> None:
+        """Record metric values taken at a timestamp."""
+        with self._lock:
+            for metric, value in values.items():
+                for ring in self._rings.get(metric, ()):
+                    ring.add(timestamp, value)
+            self._newest = max(self._newest, timestamp)
+
+    def query(
+        self, metric: str, window: float, now: Optional[float] = None
+    ) -> TelemetryStats:
+        """Summarize a metric over the last window seconds.
+
+        The finest tier whose span covers the window is used. Percentiles
+        are exact on raw samples and weighted bucket averages otherwise.
+
+        Args:
+            metric: One of TELEMETRY_METRICS
+            window: Window length in seconds
+            now: End of the window, defaults to the current time
+
+        Returns:
+            Statistics for the window
+
+        Raises:
+            ValueError: If the metric is unknown or the window not positive
+        """
+        if metric not in self._rings:
+            raise ValueError(
+                f"Unknown metric: {metric}. "
+                f"Must be one of: {', '.join(TELEMETRY_METRICS)}"
+            )
+        if window <= 0:
+            raise ValueError("Window must be positive")
+
+        rings = self._rings[metric]
+        tier = next(
+            (i for i, (_, span) in enumerate(self._tiers) if span >= window),
+            len(self._tiers) - 1,
+        )
+        ring = rings[tier]
+        since = (time.time() if now is None else now) - window
+        with self._lock:
+            points = list(ring.points(since))
+
+        samples = sum(point[4] for point in points)
+        if not samples:
+            return TelemetryStats(
+                metric=metric, window=window, resolution=ring.resolution, samples=0
+            )
+        return TelemetryStats(
+            metric=metric,
+            window=window,
+            resolution=ring.resolution,
+            samples=samples,
+            minimum=min(point[1] for point in points),
+            maximum=max(point[2] for point in points),
+            average=sum(point[3] for point in points) / samples,
+            percentiles=_percentiles(points, samples),
+        )
+
+    def _run(self) -> None:
+        """Sample, or sync from the on-Pi logger, until stopped."""
+        while not self._stopped.is_set():
+            if self._remote_log is not None:
+                self.sync()
+                wait = REMOTE_FETCH_INTERVAL
+            else:
+                self.sample_now()
+                wait = self.interval
+            if self._stopped.wait(wait):
+                break
+
+
+def _percentiles(points: List[_Point], samples: int) -> Dict[int, float]:
+    """Nearest-rank percentiles of point averages weighted by sample count."""
+    weighted = sorted((total / count, count) for _, _, _, total, count in points)
+    result: Dict[int, float] = {}
+    for percentile in PERCENTILES:
+        rank = max(1, math.ceil(percentile / 100 * samples))
+        seen = 0
+        for value, count in weighted:
+            seen += count
+            if seen >= rank:
+                result[percentile] = value
+                break
+    return result
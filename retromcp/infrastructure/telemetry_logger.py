@@ -0,0 +1,206 @@
+"""On-Pi telemetry logger fetched incrementally by byte offset.
+
+The logger is a small shell loop started with nohup on the Pi. It appends
+one CSV record per sample to a log file and rotates the file to ``.1``
+when it grows past a size limit, so it keeps recording while the MCP
+server is not connected. Fetches send only the bytes written since the
+previous fetch; the file's inode tells a rotated log apart from the one
+the offset refers to.
+"""
+
+import logging
+import shlex
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from ..domain.models import CommandResult
+from ..domain.ports import RetroPieClient
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOG_INTERVAL = 2.0  # seconds
+DEFAULT_MAX_LOG_BYTES = 1_048_576  # rotate after ~20k records
+
+_MARKER = "@@retromcp-telemetry@@"
+
+# Record: epoch,temp_c,throttled_hex,core_volts,arm_hz,load1,memory_pct
+LOGGER_SCRIPT = """#!/bin/sh
+# retromcp telemetry logger: $1 log file, $2 interval, $3 rotate size
+log="$1"
+while :; do
+  t=$(vcgencmd measure_temp 2>/dev/null | tr -dc '0-9.')
+  th=$(vcgencmd get_throttled 2>/dev/null | cut -d= -f2)
+  v=$(vcgencmd measure_volts core 2>/dev/null | tr -dc '0-9.')
+  c=$(vcgencmd measure_clock arm 2>/dev/null | cut -d= -f2)
+  l=$(cut -d' ' -f1 /proc/loadavg)
+  m=$(awk '/^MemTotal:/ {t=$2} /^MemAvailable:/ {a=$2} END {if (t) printf "%.1f", (t-a)*100/t}' /proc/meminfo)
+  printf '%s,%s,%s,%s,%s,%s,%s\\n' "$(date +%s)" "$t" "$th" "$v" "$c" "$l" "$m" >> "$log"
+  if [ "$(stat -c %s "$log")" -gt "$3" ]; then mv "$log" "$log.1"; fi
+  sleep "$2"
+done
+"""
+
+
+def parse_telemetry_record(line: str) -> Optional[Tuple[float, Dict[str, float]]]:
+    """Parse one logger record.
+
+    Args:
+        line: CSV record written by LOGGER_SCRIPT
+
+    Returns:
+        Tuple of (timestamp, metric values), or None if the line is malformed;
+        empty fields are left out of the values
+    """
+    fields = line.strip().split(",")
+    if len(fields) != 7:
+        return None
+    try:
+        timestamp = float(fields[0])
+    except ValueError:
+        return None
+
+    parsers = (
+        ("temperature", float),
+        ("throttled", lambda raw: 1.0 if int(raw, 16) & 0xF else 0.0),
+        ("core_voltage", float),
+        ("arm_clock", lambda raw: int(raw) / 1_000_000),
+        ("cpu_load", float),
+        ("memory", float),
+    )
+    values: Dict[str, float] = {}
+    for (metric, parse), raw in zip(parsers, fields[1:]):
+        if not raw:
+            continue
+        try:
+            values[metric] = parse(raw)
+        except ValueError:
+            continue
+    return timestamp, values
+
+
+class TelemetryLogger:
+    """Installs the on-Pi telemetry logger and fetches its new records."""
+
+    def __init__(
+        self,
+        client: RetroPieClient,
+        home_dir: str,
+        interval: float = DEFAULT_LOG_INTERVAL,
+        max_bytes: int = DEFAULT_MAX_LOG_BYTES,
+    ) -> None:
+        """Initialize logger.
+
+        Args:
+            client: RetroPie client
+            home_dir: Home directory on the Pi; files go under ~/.retromcp
+            interval: Seconds between records on the Pi
+            max_bytes: Log size that triggers rotation
+        """
+        self._client = client
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self.directory = f"{home_dir}/.retromcp"
+        self.log_path = f"{self.directory}/telemetry.csv"
+        self.script_path = f"{self.directory}/telemetry-logger.sh"
+        self.pid_path = f"{self.directory}/telemetry-logger.pid"
+        # Position in the log identified by inode
+        self._inode: Optional[str] = None
+        self._offset = 0
+
+    def install(self) -> CommandResult:
+        """Write the logger script and start it unless it is already running."""
+        script = shlex.quote(self.script_path)
+        pid = shlex.quote(self.pid_path)
+        command = (
+            f"mkdir -p {shlex.quote(self.directory)} && "
+            f"cat > {script} << 'EOF_RETROMCP_TELEMETRY'\n"
+            f"{LOGGER_SCRIPT}"
+            "EOF_RETROMCP_TELEMETRY\n"
+            f"chmod 700 {script} && "
+            f"{{ kill -0 $(cat {pid} 2>/dev/null) 2>/dev/null || "
+            f"{{ nohup nice -n 19 sh {script} {shlex.quote(self.log_path)} "
+            f"{self.interval:g} {self.max_bytes} > /dev/null 2>&1 & "
+            f"echo $! > {pid}; }}; }}"
+        )
+        return self._client.execute_command(command)
+
+    def uninstall(self) -> CommandResult:
+        """Stop the logger; recorded data is kept."""
+        pid = shlex.quote(self.pid_path)
+        return self._client.execute_command(
+            f"{{ kill $(cat {pid} 2>/dev/null) 2>/dev/null; rm -f {pid}; }}; true"
+        )
+
+    def is_running(self) -> bool:
+        """Check if the logger process is alive."""
+        result = self._client.execute_command(
+            f"kill -0 $(cat {shlex.quote(self.pid_path)} 2>/dev/null) 2>/dev/null"
+        )
+        return result.success
+
+    def fetch(self) -> List[Tuple[float, Dict[str, float]]]:
+        """Fetch records written since the previous fetch.
+
+        Only complete lines are consumed, so a record being written is read
+        on the next fetch. If the log rotated since the last fetch, the rest
+        of the rotated file is read before the new one.
+
+        Returns:
+            List of (timestamp, metric values), oldest first
+        """
+        log = shlex.quote(self.log_path)
+        known = shlex.quote(self._inode or "")
+        start = self._offset + 1
+        # Avoid "tail -f" lookalikes; the timeout config treats them as streams
+        command = (
+            f"i=$(stat -c %i {log} 2>/dev/null) || exit 1; "
+            f'if [ "$i" = {known} ]; then '
+            f'echo "{_MARKER} $i"; tail -c +{start} {log}; '
+            "else "
+            f'[ -n {known} ] && [ "$(stat -c %i {log}.1 2>/dev/null)" = {known} ] '
+            f'&& {{ echo "{_MARKER} rotated"; tail -c +{start} {log}.1; }}; '
+            f'echo "{_MARKER} $i"; cat {log}; '
+            "fi; "
+            f'echo "{_MARKER} end"'
+        )
+        result = self._client.execute_command(command)
+        if not result.success:
+            logger.warning(f"Telemetry log fetch failed: {result.stderr}")
+            return []
+        return self._consume(result.stdout)
+
+    def _consume(self, output: str) -> List[Tuple[float, Dict[str, float]]]:
+        """Parse fetch output and advance the offset past complete lines."""
+        end = output.rfind(_MARKER + " end")
+        if end < 0:
+            return []
+        output = output[:end]
+
+        lines: List[str] = []
+        rotated = output.find(_MARKER + " rotated\n")
+        current = output.rfind(_MARKER + " ")
+        if current < 0:
+            return []
+        if 0 <= rotated < current:
+            section = output[rotated + len(_MARKER) + len(" rotated\n") : current]
+            lines.extend(section.splitlines())
+
+        header_end = output.find("\n", current)
+        inode = output[current + len(_MARKER) + 1 : header_end].strip()
+        data = output[header_end + 1 :] if header_end >= 0 else ""
+        complete = data[: data.rfind("\n") + 1]
+        lines.extend(complete.splitlines())
+
+        if inode != self._inode:
+            self._inode = inode
+            self._offset = 0
+        self._offset += len(complete.encode())
+
+        records = []
+        for line in lines:
+            record = parse_telemetry_record(line)
+            if record is not None:
+                records.append(record)
+        return records
@@ -3,6 +3,7 @@
 import logging
 from typing import Any
 from typing import Dict
+from typing import Iterator
 from typing import List
 from typing import Optional
 from typing import Tuple
@@ -14,6 +15,30 @@ from .timeout_config import get_timeout_config
 logger = logging.getLogger(__name__)
 
 
+class ChannelStream:
+    """Output lines of a command running on its own SSH channel.
+
+    Closing the stream closes the channel, which also ends a read blocked
+    on another thread.
+    """
+
+    def __init__(self, stdout: paramiko.ChannelFile) -> None:
+        """Initialize with the command's stdout."""
+        self._stdout = stdout
+
+    def __iter__(self) -> Iterator[str]:
+        """Yield output lines until the command exits or the stream closes."""
+        try:
+            for line in self._stdout:
+                yield line.rstrip("\r\n")
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Close the channel."""
+        self._stdout.channel.close()
+
+
 class SSHHandler:
     """Handles SSH connections to RetroPie."""
 
@@ -140,6 +165,30 @@ class SSHHandler:
             logger.error(f"Failed to execute command '{command}': {e}")
             raise
 
+    def stream_command(self, command: str, pty: bool = False) -> "ChannelStream":
+        """Run a long-lived command and stream its output line by line.
+
+        The command runs on its own channel without a timeout, so it can share
+        the connection with regular commands. The channel is closed when the
+        command exits or the stream is closed.
+
+        Args:
+            command: Command to run, e.g. an event monitor
+            pty: Run the command on a pseudo-terminal, so closing the channel
+                hangs it up instead of leaving it running on the host
+
+        Returns:
+            Stream of output lines without trailing newlines
+
+        Raises:
+            RuntimeError: If not connected
+        """
+        if not self.client:
+            raise RuntimeError("Not connected to SSH server")
+
+        _, stdout, _ = self.client.exec_command(command, get_pty=pty)
+        return ChannelStream(stdout)
+
     def execute_monitoring_command(self, command: str) -> Tuple[int, str, str]:
         """Execute a monitoring command that runs indefinitely without timeout.
 
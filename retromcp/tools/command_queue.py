@@ -1,33 +1,36 @@
 """Command queue system for interruptible batch execution."""
 
-import os
-import time
 from datetime import datetime
 from typing import Any
 from typing import Dict
 from typing import List
+from typing import Optional
 
 from mcp.types import TextContent
 from mcp.types import Tool
 
-from ..container import Container
+from ..application.queue_executor import QueueExecutor
+from ..application.queue_executor import record_command_result
 from ..domain.models import CommandQueue
 from ..domain.models import CommandStatus
-from ..infrastructure.persistent_queue_storage import PersistentQueueStorage
+from ..domain.ports import CommandQueueRepository
 from .base import BaseTool
 
+MAX_OUTPUT_READ = 64 * 1024  # Bytes returned by one output action
+
 
 class CommandQueueTools(BaseTool):
     """Tools for managing command queues."""
 
-    def __init__(self, container: Container) -> None:
-        """Initialize with container and persistent storage."""
-        super().__init__(container)
+    @property
+    def _storage(self) -> CommandQueueRepository:
+        """Get queue storage, created on first use and shared across instances."""
+        return self.container.command_queue_storage
 
-        # Initialize persistent storage
-        storage_path = os.path.expanduser("~/.retromcp/command_queues.json")
-        self._storage = PersistentQueueStorage(storage_path)
-        self._queue_counter = len(self._storage.list_queues())
+    @property
+    def _executor(self) -> QueueExecutor:
+        """Get the background queue executor shared across instances."""
+        return self.container.queue_executor
 
     def get_tools(self) -> List[Tool]:
         """Get tool definitions."""
@@ -51,6 +54,7 @@ class CommandQueueTools(BaseTool):
                                 "status",
                                 "cancel",
                                 "skip",
+                                "output",
                             ],
                             "description": "Action to perform",
                         },
@@ -69,6 +73,11 @@ class CommandQueueTools(BaseTool):
                                 "properties": {
                                     "command": {"type": "string"},
                                     "description": {"type": "string"},
+                                    "depends_on": {
+                                        "type": "array",
+                                        "items": {"type": "integer"},
+                                        "description": "Step numbers of earlier commands that must complete first (used by execute_all with max_parallel)",
+                                    },
                                 },
                                 "required": ["command", "description"],
                             },
@@ -82,6 +91,34 @@ class CommandQueueTools(BaseTool):
                             "type": "integer",
                             "description": "Seconds to pause between commands (default: 2)",
                         },
+                        "trusted": {
+                            "type": "boolean",
+                            "description": "Non-interactive commands that execute_all may ship to the Pi as one script (for create action)",
+                        },
+                        "run_id": {
+                            "type": "string",
+                            "description": "Background run ID returned by execute_all (for status action)",
+                        },
+                        "force": {
+                            "type": "boolean",
+                            "description": "Run execute_all even if the queue was not created with auto_execute",
+                        },
+                        "output_id": {
+                            "type": "string",
+                            "description": "ID of a long command output kept outside the queue (for output action)",
+                        },
+                        "offset": {
+                            "type": "integer",
+                            "description": "First byte of the output to return (for output action, default: 0)",
+                        },
+                        "length": {
+                            "type": "integer",
+                            "description": f"Bytes of the output to return (for output action, default and maximum: {MAX_OUTPUT_READ})",
+                        },
+                        "max_parallel": {
+                            "type": "integer",
+                            "description": "For execute_all: run commands concurrently, up to this many at once, each as soon as its depends_on steps complete",
+                        },
                     },
                     "required": ["action"],
                 },
@@ -111,36 +148,42 @@ class CommandQueueTools(BaseTool):
         elif action == "execute_all":
             return self._execute_all(queue_id, arguments)
         elif action == "status":
-            return self._get_status(queue_id)
+            return self._get_status(queue_id, arguments.get("run_id"))
         elif action == "cancel":
             return self._cancel_queue(queue_id)
         elif action == "skip":
             return self._skip_current(queue_id)
+        elif action == "output":
+            return self._read_output(arguments)
         else:
             return self.format_error(f"Unknown action: {action}")
 
     def _create_queue(self, arguments: Dict[str, Any]) -> List[TextContent]:
         """Create a new command queue."""
-        name = arguments.get("name", f"Queue_{self._queue_counter}")
+        id_result = self._storage.next_queue_id()
+        if id_result.is_error():
+            return self.format_error(
+                f"Failed to create queue: {id_result.error_value.message}"
+            )
+        queue_id = id_result.value
+        name = arguments.get("name", f"Queue_{queue_id[1:]}")
         commands = arguments.get("commands", [])
         auto_execute = arguments.get("auto_execute", False)
         pause_between = arguments.get("pause_between", 2)
-
-        self._queue_counter += 1
-        queue_id = f"q{self._queue_counter}"
+        trusted = arguments.get("trusted", False)
 
         queue = CommandQueue(
             id=queue_id,
             name=name,
             auto_execute=auto_execute,
             pause_between=pause_between,
+            trusted=trusted,
         )
 
         # Add initial commands
-        for cmd_data in commands:
-            queue.add_command(
-                command=cmd_data["command"], description=cmd_data["description"]
-            )
+        error = self._add_commands(queue, commands)
+        if error:
+            return self.format_error(error)
 
         # Persist queue to storage
         result = self._storage.create_queue(queue_id, queue)
@@ -153,14 +196,18 @@ class CommandQueueTools(BaseTool):
             f"Created command queue: {name} (ID: {queue_id})",
             f"Total commands: {len(queue.commands)}",
             f"Auto-execute: {auto_execute}",
-            "",
         ]
+        if trusted:
+            output.append("Trusted: execute_all runs the queue as one remote script")
+        output.append("")
 
         if queue.commands:
             output.append("Commands in queue:")
             for i, cmd in enumerate(queue.commands):
                 output.append(f"{i + 1}. {cmd.description}")
                 output.append(f"   Command: {cmd.command}")
+                if cmd.depends_on:
+                    output.append(f"   After: {self._steps(queue, cmd.depends_on)}")
 
             output.append("")
             output.append(
@@ -169,6 +216,44 @@ class CommandQueueTools(BaseTool):
 
         return [TextContent(type="text", text="\n".join(output))]
 
+    def _add_commands(
+        self, queue: CommandQueue, commands: List[Dict[str, Any]]
+    ) -> Optional[str]:
+        """Add commands, resolving depends_on step numbers to command IDs.
+
+        Commands are only added if all of them are valid.
+
+        Returns:
+            Error message, or None if the commands were added
+        """
+        resolved = []
+        position = len(queue.commands)
+        for cmd_data in commands:
+            position += 1
+            depends_on = []
+            for step in cmd_data.get("depends_on") or []:
+                if not isinstance(step, int) or not 1 <= step < position:
+                    return (
+                        f"Step {position} can only depend on earlier steps "
+                        f"(1-{position - 1}), got: {step}"
+                    )
+                depends_on.append(f"{queue.id}_{step - 1}")
+            resolved.append((cmd_data, depends_on))
+
+        for cmd_data, depends_on in resolved:
+            queue.add_command(
+                command=cmd_data["command"],
+                description=cmd_data["description"],
+                depends_on=depends_on,
+            )
+        return None
+
+    @staticmethod
+    def _steps(queue: CommandQueue, command_ids: List[str]) -> str:
+        """Format command IDs as the step numbers shown to users."""
+        positions = {cmd.id: i + 1 for i, cmd in enumerate(queue.commands)}
+        return ", ".join(str(positions.get(cmd_id, cmd_id)) for cmd_id in command_ids)
+
     def _add_to_queue(
         self, queue_id: str, arguments: Dict[str, Any]
     ) -> List[TextContent]:
@@ -183,12 +268,10 @@ class CommandQueueTools(BaseTool):
             return self.format_error("No commands provided to add")
 
         # Add commands
-        added = 0
-        for cmd_data in commands:
-            queue.add_command(
-                command=cmd_data["command"], description=cmd_data["description"]
-            )
-            added += 1
+        added = len(commands)
+        error = self._add_commands(queue, commands)
+        if error:
+            return self.format_error(error)
 
         # Update queue in storage
         result = self._storage.update_queue(queue_id, queue)
@@ -209,8 +292,20 @@ class CommandQueueTools(BaseTool):
         queue = self._storage.get_queue(queue_id)
         if queue is None:
             return self.format_error(f"Queue not found: {queue_id}")
+        run = self._executor.active_run(queue_id)
+        if run is not None:
+            return self.format_error(
+                f"Queue is running in the background as run {run.id}. "
+                "Use 'status' to follow it or 'cancel' to stop it."
+            )
         cmd = queue.get_next_pending()
 
+        blocked = queue.get_blocked()
+        if not cmd and blocked:
+            return self.format_error(
+                f"Queue is blocked: {len(blocked)} pending commands depend on a "
+                "failed command. Use 'skip' on the failed command to unblock them."
+            )
         if not cmd:
             return [
                 TextContent(
@@ -231,43 +326,33 @@ class CommandQueueTools(BaseTool):
         try:
             # Execute the command using the proper RetroPieClient abstraction
             result = self.container.retropie_client.execute_command(cmd.command)
+            record_command_result(
+                queue, cmd, result, outputs=self.container.command_output_store
+            )
 
-            cmd.end_time = datetime.now()
-            cmd.result = {
-                "exit_code": result.exit_code,
-                "stdout": result.stdout,
-                "stderr": result.stderr,
-            }
-
+            # Long output is kept as head and tail, see the 'output' action
             if result.success:
-                cmd.status = CommandStatus.COMPLETED
                 output.append("✓ Success")
-                if result.stdout:
-                    output.append(f"Output: {result.stdout}")
+                if cmd.result["stdout"]:
+                    output.append(f"Output: {cmd.result['stdout']}")
             else:
-                cmd.status = CommandStatus.FAILED
                 output.append(f"✗ Failed (exit code: {result.exit_code})")
-                if result.stderr:
-                    output.append(f"Error: {result.stderr}")
+                if cmd.result["stderr"]:
+                    output.append(f"Error: {cmd.result['stderr']}")
                 output.append("")
                 output.append(
                     "Queue execution stopped. Use 'skip' to skip this command and continue."
                 )
 
         except Exception as e:
-            cmd.status = CommandStatus.FAILED
-            cmd.error = str(e)
-            cmd.end_time = datetime.now()
+            record_command_result(queue, cmd, error=e)
             output.append(f"✗ Exception: {e}")
             output.append("")
             output.append(
                 "Queue execution stopped. Use 'skip' to skip this command and continue."
             )
 
-        # Move to next command if successful
         if cmd.status == CommandStatus.COMPLETED:
-            queue.current_index += 1
-
             # Show next command preview
             next_cmd = queue.get_next_pending()
             if next_cmd:
@@ -302,60 +387,52 @@ class CommandQueueTools(BaseTool):
                 )
             ]
 
-        output = []
-        executed = 0
-        last_cmd = None
-
-        while True:
-            cmd = queue.get_next_pending()
-            if not cmd:
-                break
-
-            # Execute command
-            result = self._execute_next(queue_id)
-            output.extend(result[0].text.split("\n"))
-            executed += 1
-            last_cmd = cmd
-
-            # Check if execution failed
-            if cmd.status == CommandStatus.FAILED:
-                output.append("")
-                output.append(
-                    f"Execution stopped after {executed} commands due to failure."
-                )
-                break
-
-            # Pause between commands if configured
-            if queue.pause_between > 0 and queue.get_next_pending():
-                time.sleep(queue.pause_between)
-
-        if last_cmd is None or last_cmd.status != CommandStatus.FAILED:
-            output.append("")
-            output.append(f"All {executed} commands executed successfully.")
+        # The call returns once the run has started, and MCP progress
+        # tokens are only valid until then; clients follow the run by
+        # polling 'status' instead
+        result = self._executor.start(
+            queue_id, max_parallel=arguments.get("max_parallel")
+        )
+        if result.is_error():
+            return self.format_error(result.error_value.message)
+        run = result.value
 
-        return [TextContent(type="text", text="\n".join(output))]
+        return [
+            TextContent(
+                type="text",
+                text=(
+                    f"Started background run {run.id} for queue: {queue.name} "
+                    f"({run.total} commands pending)\n"
+                    f"Use 'status' with queue_id={queue_id} or run_id={run.id} "
+                    "to follow progress, or 'cancel' to stop after the current "
+                    "command."
+                ),
+            )
+        ]
 
-    def _get_status(self, queue_id: str) -> List[TextContent]:
+    def _get_status(
+        self, queue_id: Optional[str], run_id: Optional[str] = None
+    ) -> List[TextContent]:
         """Get the status of a command queue."""
+        run = None
+        if run_id is not None:
+            run = self._executor.get_run(run_id)
+            if run is None:
+                return self.format_error(f"Run not found: {run_id}")
+            queue_id = run.queue_id
+
         if queue_id is None:
             # Show all queues
-            queue_ids = self._storage.list_queues()
-            if not queue_ids:
+            summaries = self._storage.summarize_queues()
+            if not summaries:
                 return [TextContent(type="text", text="No command queues exist.")]
 
             output = ["Active command queues:"]
-            for qid in queue_ids:
-                queue = self._storage.get_queue(qid)
-                if queue:
-                    completed = sum(
-                        1
-                        for cmd in queue.commands
-                        if cmd.status == CommandStatus.COMPLETED
-                    )
-                    total = len(queue.commands)
-                    output.append(
-                        f"- {queue.name} (ID: {qid}): {completed}/{total} completed"
-                    )
+            for summary in summaries:
+                output.append(
+                    f"- {summary.name} (ID: {summary.id}): "
+                    f"{summary.completed}/{summary.total} completed"
+                )
 
             return [TextContent(type="text", text="\n".join(output))]
 
@@ -366,8 +443,11 @@ class CommandQueueTools(BaseTool):
             f"Queue: {queue.name} (ID: {queue.id})",
             f"Created: {queue.created_at.strftime('%Y-%m-%d %H:%M:%S')}",
             f"Progress: {queue.current_index}/{len(queue.commands)} commands",
-            "",
         ]
+        run = run or self._executor.latest_run(queue_id)
+        if run is not None:
+            output.append(run.describe())
+        output.append("")
 
         for i, cmd in enumerate(queue.commands):
             status_icon = {
@@ -380,6 +460,8 @@ class CommandQueueTools(BaseTool):
             }.get(cmd.status, "❓")
 
             output.append(f"{i + 1}. {status_icon} {cmd.description}")
+            if cmd.depends_on and cmd.status == CommandStatus.PENDING:
+                output.append(f"   After: {self._steps(queue, cmd.depends_on)}")
             if cmd.status == CommandStatus.FAILED and cmd.error:
                 output.append(f"   Error: {cmd.error}")
             elif cmd.status == CommandStatus.COMPLETED and cmd.result:
@@ -389,9 +471,39 @@ class CommandQueueTools(BaseTool):
                     else 0
                 )
                 output.append(f"   Duration: {duration:.1f}s")
+            for stream in ("stdout", "stderr"):
+                output_id = (cmd.result or {}).get(f"{stream}_output_id")
+                if output_id:
+                    size = cmd.result.get(f"{stream}_bytes", 0)
+                    output.append(f"   Full {stream}: {output_id} ({size} bytes)")
 
         return [TextContent(type="text", text="\n".join(output))]
 
+    def _read_output(self, arguments: Dict[str, Any]) -> List[TextContent]:
+        """Read a byte range of a long command output."""
+        output_id = arguments.get("output_id")
+        if not output_id:
+            return self.format_error("output_id is required for the output action")
+        offset = arguments.get("offset", 0)
+        length = arguments.get("length", MAX_OUTPUT_READ)
+        if not isinstance(offset, int) or not isinstance(length, int):
+            return self.format_error("offset and length must be integers")
+        length = min(length, MAX_OUTPUT_READ)
+
+        result = self.container.command_output_store.read(output_id, offset, length)
+        if result.is_error():
+            return self.format_error(result.error_value.message)
+        chunk = result.value
+
+        end = chunk.offset + len(chunk.data)
+        header = (
+            f"Output {output_id}: bytes {chunk.offset}-{end} of {chunk.total_bytes}"
+        )
+        if end < chunk.total_bytes:
+            header += f" (continue with offset={end})"
+        text = chunk.data.decode("utf-8", errors="replace")
+        return [TextContent(type="text", text=f"{header}\n\n{text}")]
+
     def _skip_current(self, queue_id: str) -> List[TextContent]:
         """Skip the current failed command and move to the next."""
         queue = self._storage.get_queue(queue_id)
@@ -403,9 +515,35 @@ class CommandQueueTools(BaseTool):
             else None
         )
 
+        run = self._executor.active_run(queue_id)
+        if run is not None and run.script:
+            return self.format_error(
+                f"Run {run.id} executes the queue as one remote script, so its "
+                "commands cannot be skipped. Use 'cancel' to stop it."
+            )
+        if run is not None:
+            # Skip the next command the background run would start
+            current = queue.get_next_pending()
+
         if not current:
             return [TextContent(type="text", text="No command to skip.")]
 
+        if run is not None:
+            current.status = CommandStatus.SKIPPED
+            queue.advance()
+            result = self._storage.update_queue(queue_id, queue)
+            if result.is_error():
+                return self.format_error(
+                    f"Failed to update queue: {result.error_value.message}"
+                )
+            self._executor.wake(queue_id)
+            return [
+                TextContent(
+                    type="text",
+                    text=f"Skipped pending command: {current.description}",
+                )
+            ]
+
         if current.status == CommandStatus.FAILED:
             current.status = CommandStatus.SKIPPED
             queue.current_index += 1
@@ -450,9 +588,8 @@ class CommandQueueTools(BaseTool):
                 f"Failed to update queue: {result.error_value.message}"
             )
 
-        return [
-            TextContent(
-                type="text",
-                text=f"Cancelled {cancelled} pending commands in queue: {queue.name}",
-            )
-        ]
+        text = f"Cancelled {cancelled} pending commands in queue: {queue.name}"
+        run = self._executor.cancel(queue_id)
+        if run is not None:
+            text += f"\nBackground run {run.id} stops after the current command."
+        return [TextContent(type="text", text=text)]
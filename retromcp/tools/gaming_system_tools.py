@@ -1,5 +1,6 @@
 """Gaming system tools for unified gaming management operations."""
 
+import asyncio
 import shlex
 from typing import Any
 from typing import ClassVar
@@ -49,6 +50,9 @@ class GamingSystemTools(BaseTool):
             "configure": ["<emulator_name>"],
             "list": [],  # No target required
         },
+        "bios": {
+            "check": ["all", "<system_name>"],
+        },
         "audio": {
             "configure": ["hdmi", "analog"],
             "test": ["hdmi", "analog"],
@@ -72,7 +76,8 @@ class GamingSystemTools(BaseTool):
                     "Unified gaming system management tool. "
                     "Components: retropie (setup/install/configure), emulationstation (configure/restart/scan), "
                     "controller (detect/setup/test/configure), roms (scan/list/configure), "
-                    "emulator (install/configure/list), core (list/info/options), audio (configure/test), video (configure/test). "
+                    "emulator (install/configure/list), core (list/info/options), bios (check), "
+                    "audio (configure/test), video (configure/test). "
                     "Most actions require a 'target' parameter - error messages will show valid targets."
                 ),
                 inputSchema={
@@ -87,6 +92,7 @@ class GamingSystemTools(BaseTool):
                                 "roms",
                                 "emulator",
                                 "core",
+                                "bios",
                                 "audio",
                                 "video",
                             ],
@@ -103,9 +109,13 @@ class GamingSystemTools(BaseTool):
                                 "retropie setup: 'update'; "
                                 "controller setup: 'xbox', 'ps3', 'ps4', '8bitdo', 'generic'; "
                                 "audio configure: 'hdmi', 'analog'; "
+                                "emulationstation configure: 'themes' "
+                                "(options.action 'list' with query/offset/limit); "
                                 "roms scan: system name (e.g., 'nes', 'arcade'); "
                                 "emulator install: emulator name (e.g., 'lr-mame2003'); "
-                                "core info/options: core name (e.g., 'lr-mupen64plus-next')"
+                                "core info/options: core name (e.g., 'lr-mupen64plus-next'); "
+                                "bios check: 'all' or system name (e.g., 'psx'), "
+                                "options.verify_checksums (default true)"
                             ),
                         },
                         "options": {
@@ -231,6 +241,7 @@ class GamingSystemTools(BaseTool):
             "roms",
             "emulator",
             "core",
+            "bios",
             "audio",
             "video",
         ]
@@ -259,6 +270,8 @@ class GamingSystemTools(BaseTool):
             return await self._handle_emulator(action, arguments)
         elif component == "core":
             return await self._handle_core(action, arguments)
+        elif component == "bios":
+            return await self._handle_bios(action, arguments)
         elif component == "audio":
             return await self._handle_audio(action, arguments)
         elif component == "video":
@@ -382,6 +395,24 @@ class GamingSystemTools(BaseTool):
         else:
             return self.format_error(f"Emulator action '{action}' not implemented")
 
+    async def _handle_bios(
+        self, action: str, arguments: Dict[str, Any]
+    ) -> List[TextContent]:
+        """Handle BIOS file operations."""
+        valid_actions = ["check"]
+        if action not in valid_actions:
+            return self.format_error(
+                f"Invalid action: {action}. Must be one of: {', '.join(valid_actions)}"
+            )
+
+        target = arguments.get("target")
+        options = arguments.get("options", {})
+
+        if action == "check":
+            return await self._bios_check(target, options)
+        else:
+            return self.format_error(f"BIOS action '{action}' not implemented")
+
     async def _handle_audio(
         self, action: str, arguments: Dict[str, Any]
     ) -> List[TextContent]:
@@ -631,6 +662,9 @@ class GamingSystemTools(BaseTool):
         """Handle EmulationStation configuration operations."""
         try:
             if target == "themes":
+                if options.get("action") == "list":
+                    return self._list_themes(options)
+
                 theme = options.get("theme", "carbon")
                 action = options.get("action", "install")
                 quoted_theme = shlex.quote(theme)
@@ -660,6 +694,38 @@ class GamingSystemTools(BaseTool):
         except Exception as e:
             return self.format_error(f"EmulationStation configuration failed: {e!s}")
 
+    def _list_themes(self, options: Dict[str, Any]) -> List[TextContent]:
+        """List installed themes with optional search and pagination."""
+        result = self.container.list_themes_use_case.execute(
+            query=options.get("query"),
+            offset=int(options.get("offset", 0)),
+            limit=int(options.get("limit", 20)),
+        )
+        if result.is_error():
+            return self.format_error(
+                f"Theme listing failed: {result.error_value.message}"
+            )
+
+        page = result.value
+        if not page.themes:
+            return self.format_info("No matching themes found")
+
+        first = page.offset + 1
+        last = page.offset + len(page.themes)
+        output = "🎨 **EmulationStation - Themes**\n\n"
+        output += f"Showing {first}-{last} of {page.total}\n\n"
+        for theme in page.themes:
+            marker = "✅" if theme.active else "•"
+            line = f"{marker} **{theme.name}**"
+            if theme.size is not None:
+                line += f" ({theme.size / (1024 * 1024):.1f} MB)"
+            if theme.description:
+                line += f" - {theme.description}"
+            output += line + "\n"
+        if last < page.total:
+            output += f"\nNext page: options.offset={last}"
+        return [TextContent(type="text", text=output)]
+
     async def _emulationstation_restart(self) -> List[TextContent]:
         """Handle EmulationStation restart operations."""
         try:
@@ -911,6 +977,46 @@ class GamingSystemTools(BaseTool):
         except Exception as e:
             return self.format_error(f"Controller configuration failed: {e!s}")
 
+    # BIOS component methods
+
+    async def _bios_check(
+        self, target: Optional[str], options: Optional[dict] = None
+    ) -> List[TextContent]:
+        """List BIOS files and verify them against known-good checksums."""
+        options = options or {}
+        verify = options.get("verify_checksums", True)
+        system = None if target in (None, "", "all") else target
+        # Hashing runs md5sum over SSH; keep it off the event loop
+        result = await asyncio.get_running_loop().run_in_executor(
+            None, self.container.check_bios_use_case.execute, system, verify
+        )
+        if result.is_error():
+            return self.format_error(f"BIOS check failed: {result.error_value.message}")
+
+        bios_files = result.value
+        scope = f"{system} " if system else ""
+        if not bios_files:
+            return self.format_info(f"No {scope}BIOS files found")
+
+        invalid = [bios for bios in bios_files if bios.checksum_valid is False]
+        output = f"🧩 **BIOS Files** ({len(bios_files)} found)\n\n"
+        for bios in bios_files:
+            if bios.checksum_valid is True:
+                status = "✅ checksum matches"
+            elif bios.checksum_valid is False:
+                status = f"❌ checksum mismatch ({bios.checksum})"
+            elif verify:
+                status = "❔ no known checksum"
+            else:
+                status = "not verified"
+            output += f"• **{bios.name}** ({bios.system}): {status}\n"
+        if invalid:
+            output += (
+                f"\n⚠️ {len(invalid)} file(s) do not match the known-good dump "
+                "and may not work with their emulator"
+            )
+        return [TextContent(type="text", text=output)]
+
     # ROM component methods
 
     async def _roms_scan(
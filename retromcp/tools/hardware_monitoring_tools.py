@@ -1,5 +1,6 @@
 """Hardware monitoring tools for unified hardware management operations."""
 
+import asyncio
 import shlex
 from typing import Any
 from typing import Dict
@@ -10,12 +11,25 @@ from mcp.types import ImageContent
 from mcp.types import TextContent
 from mcp.types import Tool
 
+from ..container import Container
+from ..domain.models import TelemetryStats
+from ..infrastructure.game_aware_scheduler import SchedulingPolicy
+from ..infrastructure.system_log_reader import LOG_CATEGORIES
+from ..infrastructure.telemetry import TELEMETRY_METRICS
 from .base import BaseTool
 
+# Shared deadline in seconds for the components of component=all
+ALL_HARDWARE_TIMEOUT = 20.0
+
 
 class HardwareMonitoringTools(BaseTool):
     """Unified hardware monitoring tools for all hardware management operations."""
 
+    def __init__(self, container: Container) -> None:
+        """Initialize with container and overview deadline."""
+        super().__init__(container)
+        self.all_hardware_timeout = ALL_HARDWARE_TIMEOUT
+
     def get_tools(self) -> List[Tool]:
         """Return list of available hardware monitoring tools.
 
@@ -25,7 +39,7 @@ class HardwareMonitoringTools(BaseTool):
         return [
             Tool(
                 name="manage_hardware",
-                description="Unified hardware monitoring tool for temperature, fan, power, gpio, errors, and system overview",
+                description="Unified hardware monitoring tool for temperature, fan, power, gpio, errors, telemetry history, game-aware scheduling, and system overview",
                 inputSchema={
                     "type": "object",
                     "properties": {
@@ -37,6 +51,8 @@ class HardwareMonitoringTools(BaseTool):
                                 "power",
                                 "gpio",
                                 "errors",
+                                "telemetry",
+                                "scheduler",
                                 "all",
                             ],
                             "description": "Hardware component to manage",
@@ -65,6 +81,21 @@ class HardwareMonitoringTools(BaseTool):
                             "type": "integer",
                             "description": "Number of error lines to analyze",
                         },
+                        # Telemetry-specific parameters
+                        "metric": {
+                            "type": "string",
+                            "enum": list(TELEMETRY_METRICS),
+                            "description": "Telemetry metric to query (default: all)",
+                        },
+                        # Scheduler-specific parameters
+                        "policy": {
+                            "type": "object",
+                            "description": 'Scheduling policy fields to change, e.g. {"defer_background": true, "nice": 19, "ionice_class": 3, "cpu_affinity": "0"}',
+                        },
+                        "window": {
+                            "type": "integer",
+                            "description": "Telemetry query window in minutes (default: 60, up to 10080)",
+                        },
                     },
                     "required": ["component", "action"],
                 },
@@ -112,6 +143,10 @@ class HardwareMonitoringTools(BaseTool):
             return await self._handle_gpio(action, arguments)
         elif component == "errors":
             return await self._handle_errors(action, arguments)
+        elif component == "telemetry":
+            return await self._handle_telemetry(action, arguments)
+        elif component == "scheduler":
+            return await self._handle_scheduler(action, arguments)
         elif component == "all":
             return await self._handle_all(action, arguments)
         else:
@@ -128,7 +163,7 @@ class HardwareMonitoringTools(BaseTool):
             )
 
         if action == "check":
-            return await self._check_temperatures()
+            return self._check_temperatures()
         elif action == "monitor":
             threshold = arguments.get("threshold", 75.0)
             return await self._monitor_temperatures(threshold)
@@ -174,7 +209,7 @@ class HardwareMonitoringTools(BaseTool):
             )
 
         if action == "check":
-            return await self._check_power_supply()
+            return self._check_power_supply()
         elif action == "monitor":
             return await self._monitor_power_status()
         elif action == "inspect":
@@ -217,13 +252,63 @@ class HardwareMonitoringTools(BaseTool):
             )
 
         if action == "check":
-            return await self._check_hardware_errors()
+            return self._check_hardware_errors()
         elif action == "inspect":
             lines = arguments.get("lines", 50)
             return await self._inspect_hardware_errors(lines)
         else:
             return self.format_error(f"Errors action '{action}' not implemented")
 
+    async def _handle_telemetry(
+        self, action: str, arguments: Dict[str, Any]
+    ) -> List[TextContent]:
+        """Handle telemetry sampling operations."""
+        valid_actions = ["start", "stop", "query", "install", "uninstall"]
+        if action not in valid_actions:
+            return self.format_error(
+                f"Invalid action: {action}. Must be one of: {', '.join(valid_actions)}"
+            )
+
+        sampler = self.container.telemetry_sampler
+        if action == "install":
+            return await self._install_telemetry_logger()
+        elif action == "uninstall":
+            return await self._uninstall_telemetry_logger()
+        elif action == "start":
+            sampler.start()
+            return self.format_success(
+                f"Telemetry sampling every {sampler.interval:g}s"
+            )
+        elif action == "stop":
+            sampler.stop()
+            return self.format_success("Telemetry sampling stopped")
+        elif action == "query":
+            return await self._query_telemetry(
+                arguments.get("metric"), arguments.get("window", 60)
+            )
+        else:
+            return self.format_error(f"Telemetry action '{action}' not implemented")
+
+    async def _handle_scheduler(
+        self, action: str, arguments: Dict[str, Any]
+    ) -> List[TextContent]:
+        """Handle game-aware scheduler operations."""
+        valid_actions = ["status", "configure", "run_deferred"]
+        if action not in valid_actions:
+            return self.format_error(
+                f"Invalid action: {action}. Must be one of: {', '.join(valid_actions)}"
+            )
+
+        if action == "status":
+            return await self._scheduler_status()
+        elif action == "configure":
+            return await self._configure_scheduler(arguments.get("policy") or {})
+        elif action == "run_deferred":
+            count = self.container.game_scheduler.run_deferred(force=True)
+            return self.format_success(f"Ran {count} deferred job(s)")
+        else:
+            return self.format_error(f"Scheduler action '{action}' not implemented")
+
     async def _handle_all(
         self,
         action: str,
@@ -245,13 +330,13 @@ class HardwareMonitoringTools(BaseTool):
 
     # Temperature monitoring methods
 
-    async def _check_temperatures(self) -> List[TextContent]:
+    def _check_temperatures(self) -> List[TextContent]:
         """Check current CPU and GPU temperatures."""
         output = "🌡️ **Temperature Status**\n\n"
 
         try:
             # Get SoC temperature (CPU and GPU share the same sensor on Raspberry Pi)
-            temp_result = await self._get_soc_temperature()
+            temp_result = self._get_soc_temperature()
             if temp_result is not None:
                 temp_status = self._get_temperature_status(temp_result)
                 output += f"CPU: {temp_status} {temp_result}°C\n"
@@ -278,9 +363,17 @@ class HardwareMonitoringTools(BaseTool):
 
     async def _monitor_temperatures(self, threshold: float) -> List[TextContent]:
         """Monitor temperatures with custom threshold."""
-        # For now, just check current temperatures and compare to threshold
-        temp_check = await self._check_temperatures()
+        temp_check = self._check_temperatures()
         output = temp_check[0].text + f"\n\n**Monitor Threshold**: {threshold}°C"
+
+        # Keep sampling in the background so later calls report history
+        sampler = self.container.telemetry_sampler
+        sampler.start()
+        stats = sampler.query("temperature", 3600)
+        if stats.samples:
+            output += "\n\n**Last Hour:**\n" + self._format_telemetry_stats(stats)
+            if stats.maximum is not None and stats.maximum >= threshold:
+                output += f"\n⚠️ Peaked at {stats.maximum:g}°C, above threshold"
         return [TextContent(type="text", text=output)]
 
     async def _configure_temperature_settings(
@@ -294,7 +387,7 @@ class HardwareMonitoringTools(BaseTool):
         """Inspect detailed temperature information."""
         return self.format_info("Temperature inspection not yet implemented")
 
-    async def _get_soc_temperature(self) -> float | None:
+    def _get_soc_temperature(self) -> float | None:
         """Get SoC temperature using fallback method chain."""
         try:
             # Try vcgencmd first (primary method)
@@ -369,7 +462,7 @@ class HardwareMonitoringTools(BaseTool):
 
     # Power monitoring methods
 
-    async def _check_power_supply(self) -> List[TextContent]:
+    def _check_power_supply(self) -> List[TextContent]:
         """Check power supply status."""
         output = "⚡ **Power Supply Status**\n\n"
 
@@ -466,40 +559,35 @@ class HardwareMonitoringTools(BaseTool):
 
     # Error monitoring methods
 
-    async def _check_hardware_errors(self) -> List[TextContent]:
+    def _check_hardware_errors(self) -> List[TextContent]:
         """Check for hardware errors."""
         output = "🔍 **Hardware Error Analysis**\n\n"
 
         try:
-            # Check dmesg for hardware-related errors
-            dmesg_result = self.container.retropie_client.execute_command(
-                "dmesg | grep -i 'error\\|fail\\|warn' | grep -i 'hardware\\|temp\\|power\\|usb' | tail -10"
-            )
-
-            # Check systemd journal for errors
-            journal_result = self.container.retropie_client.execute_command(
-                "journalctl -p err -n 10 --no-pager"
-            )
-
-            errors_found = False
-
-            if dmesg_result.success and dmesg_result.stdout.strip():
+            # Only entries logged since the previous check are fetched
+            log_reader = self.container.system_log_reader
+            log_reader.poll()
+            recent = log_reader.recent(limit=50)
+            kernel_entries = [e for e in recent if e.source == "kernel"][-10:]
+            journal_entries = [e for e in recent if e.source == "journal"][-10:]
+
+            if kernel_entries:
                 output += "**System Log Errors:**\n```\n"
-                output += dmesg_result.stdout
+                output += "\n".join(str(entry) for entry in kernel_entries)
                 output += "\n```\n\n"
-                errors_found = True
 
-            if (
-                journal_result.success
-                and journal_result.stdout.strip()
-                and "No entries" not in journal_result.stdout
-            ):
+            if journal_entries:
                 output += "**Journal Errors:**\n```\n"
-                output += journal_result.stdout
+                output += "\n".join(str(entry) for entry in journal_entries)
                 output += "\n```\n\n"
-                errors_found = True
 
-            if not errors_found:
+            counts = log_reader.counts()
+            if counts:
+                output += "**By Category:** " + ", ".join(
+                    f"{category} {count}" for category, count in sorted(counts.items())
+                )
+                output += "\n"
+            else:
                 output += "✅ No hardware errors detected\n"
 
         except Exception as e:
@@ -508,32 +596,194 @@ class HardwareMonitoringTools(BaseTool):
         return [TextContent(type="text", text=output)]
 
     async def _inspect_hardware_errors(self, lines: int) -> List[TextContent]:
-        """Inspect hardware errors in detail."""
-        return self.format_info(
-            f"Hardware error inspection with {lines} lines not yet implemented"
-        )
+        """Inspect hardware errors in detail, grouped by category."""
+        output = "🔍 **Hardware Error Details**\n\n"
 
-    # Comprehensive monitoring methods
+        try:
+            log_reader = self.container.system_log_reader
+            log_reader.poll()
+            found = False
+            for category, _ in LOG_CATEGORIES:
+                entries = log_reader.recent(categories=[category], limit=lines)
+                if not entries:
+                    continue
+                found = True
+                output += f"**{category.capitalize()}** ({len(entries)}):\n```\n"
+                output += "\n".join(str(entry) for entry in entries)
+                output += "\n```\n\n"
+            if not found:
+                output += "✅ No hardware errors detected\n"
 
-    async def _check_all_hardware(self) -> List[TextContent]:
-        """Check all hardware components."""
-        output = "🖥️ **Hardware System Overview**\n\n"
+        except Exception as e:
+            return self.format_error(f"Failed to inspect hardware errors: {e!s}")
+
+        return [TextContent(type="text", text=output)]
+
+    # Telemetry methods
+
+    async def _query_telemetry(
+        self, metric: str | None, window_minutes: int
+    ) -> List[TextContent]:
+        """Summarize sampled telemetry over a window."""
+        if not isinstance(window_minutes, int) or window_minutes <= 0:
+            return self.format_error("window must be a positive number of minutes")
 
+        sampler = self.container.telemetry_sampler
+        sampler.sync()  # Pull records logged on the Pi since the last fetch
+        metrics = [metric] if metric else list(TELEMETRY_METRICS)
         try:
-            # Temperature check
-            temp_result = await self._check_temperatures()
-            output += "## Temperature\n" + temp_result[0].text + "\n\n"
+            all_stats = [sampler.query(name, window_minutes * 60) for name in metrics]
+        except ValueError as e:
+            return self.format_error(str(e))
+
+        output = f"📈 **Telemetry - last {window_minutes} min**\n\n"
+        if not sampler.is_running:
+            output += "i Sampler is not running; start it with action 'start'\n\n"
+        for stats in all_stats:
+            output += f"**{stats.metric}**\n{self._format_telemetry_stats(stats)}\n\n"
+        return [TextContent(type="text", text=output.rstrip() + "\n")]
+
+    async def _install_telemetry_logger(self) -> List[TextContent]:
+        """Start the on-Pi logger and read history from it."""
+        telemetry_logger = self.container.telemetry_logger
+        result = telemetry_logger.install()
+        if not result.success:
+            return self.format_error(
+                f"Failed to install telemetry logger: {result.stderr or result.stdout}"
+            )
 
-            # Power check
-            power_result = await self._check_power_supply()
-            output += "## Power\n" + power_result[0].text + "\n\n"
+        sampler = self.container.telemetry_sampler
+        sampler.use_remote_log(telemetry_logger)
+        sampler.sync()
+        sampler.start()
+        return self.format_success(
+            f"Telemetry logger recording every {telemetry_logger.interval:g}s "
+            f"to {telemetry_logger.log_path}"
+        )
 
-            # Error check
-            error_result = await self._check_hardware_errors()
-            output += "## Errors\n" + error_result[0].text
+    async def _uninstall_telemetry_logger(self) -> List[TextContent]:
+        """Stop the on-Pi logger and go back to polling."""
+        result = self.container.telemetry_logger.uninstall()
+        if not result.success:
+            return self.format_error(
+                f"Failed to stop telemetry logger: {result.stderr or result.stdout}"
+            )
 
-        except Exception as e:
-            return self.format_error(f"Failed to check all hardware: {e!s}")
+        sampler = self.container.telemetry_sampler
+        sampler.sync()
+        sampler.use_remote_log(None)
+        return self.format_success("Telemetry logger stopped; recorded log kept")
+
+    def _format_telemetry_stats(self, stats: TelemetryStats) -> str:
+        """Format one telemetry summary."""
+        if not stats.samples:
+            return "- No samples in window"
+        resolution = (
+            "raw samples"
+            if not stats.resolution
+            else f"{stats.resolution / 60:g}-min buckets"
+        )
+        lines = [
+            f"- Samples: {stats.samples} ({resolution})",
+            f"- Min/Avg/Max: {stats.minimum:.2f} / {stats.average:.2f} / "
+            f"{stats.maximum:.2f}",
+        ]
+        if stats.percentiles:
+            lines.append(
+                "- "
+                + ", ".join(
+                    f"p{percentile}: {value:.2f}"
+                    for percentile, value in sorted(stats.percentiles.items())
+                )
+            )
+        if stats.metric == "throttled":
+            lines.append(
+                f"- Throttled {stats.average:.0%} of the time"
+                if stats.maximum
+                else "- No throttling in window"
+            )
+        return "\n".join(lines)
+
+    # Scheduler methods
+
+    async def _scheduler_status(self) -> List[TextContent]:
+        """Show the active emulator, scheduling policy and deferred jobs."""
+        scheduler = self.container.game_scheduler
+        active = scheduler.active_emulator(refresh=True)
+
+        output = "🎮 **Game-Aware Scheduler**\n\n"
+        output += f"Game running: `{active}`\n" if active else "No game running\n"
+        output += "\n**Policy:**\n"
+        for name, value in scheduler.policy.to_dict().items():
+            output += f"- {name}: {value}\n"
+
+        jobs = scheduler.deferred_jobs
+        output += f"\n**Deferred Jobs ({len(jobs)}):**\n"
+        for job in jobs:
+            output += (
+                f"- {job.description} ({job.priority.value}, since {job.deferred_at})\n"
+            )
+        return [TextContent(type="text", text=output)]
+
+    async def _configure_scheduler(self, changes: Dict[str, Any]) -> List[TextContent]:
+        """Change scheduling policy fields."""
+        scheduler = self.container.game_scheduler
+        current = scheduler.policy.to_dict()
+        unknown = sorted(set(changes) - set(current))
+        if unknown:
+            return self.format_error(
+                f"Unknown policy fields: {', '.join(unknown)}. "
+                f"Must be among: {', '.join(current)}"
+            )
+        if not changes:
+            return self.format_error("policy is required for configure action")
+        if not 0 <= changes.get("nice", 0) <= 19:
+            return self.format_error("nice must be between 0 and 19")
+        if changes.get("ionice_class", 3) not in (1, 2, 3):
+            return self.format_error("ionice_class must be 1, 2 or 3")
+
+        scheduler.policy = SchedulingPolicy(**{**current, **changes})
+        return self.format_success(
+            "Scheduling policy updated: "
+            + ", ".join(f"{name}={value}" for name, value in sorted(changes.items()))
+        )
+
+    # Comprehensive monitoring methods
+
+    async def _check_all_hardware(self) -> List[TextContent]:
+        """Check all hardware components.
+
+        The component checks are blocking helpers; they run concurrently on
+        the loop's worker threads, each issuing its SSH commands on its own
+        channel, under one shared deadline. A component
+        that misses it is reported as timed out; its commands finish in the
+        background.
+        """
+        output = "🖥️ **Hardware System Overview**\n\n"
+        components = (
+            ("Temperature", self._check_temperatures),
+            ("Power", self._check_power_supply),
+            ("Errors", self._check_hardware_errors),
+        )
+
+        loop = asyncio.get_running_loop()
+        futures = [loop.run_in_executor(None, check) for _, check in components]
+        done, _ = await asyncio.wait(futures, timeout=self.all_hardware_timeout)
+
+        sections = []
+        for (title, _), future in zip(components, futures):
+            if future not in done:
+                future.cancel()
+                text = (
+                    f"⏱️ Timed out after {self.all_hardware_timeout:g}s "
+                    "- run this component on its own for details"
+                )
+            elif future.exception() is not None:
+                text = f"❌ Check failed: {future.exception()!s}"
+            else:
+                text = future.result()[0].text
+            sections.append(f"## {title}\n{text}")
+        output += "\n\n".join(sections)
 
         return [TextContent(type="text", text=output)]
 
@@ -45,7 +45,7 @@ class PackageManagementTools(BaseTool):
                         },
                         "query": {
                             "type": "string",
-                            "description": "Search query for packages",
+                            "description": "Search query for packages (name prefix for list action)",
                         },
                     },
                     "required": ["action"],
@@ -125,9 +125,7 @@ class PackageManagementTools(BaseTool):
 
                     result = update_result.value
             elif action == "list":
-                result = client.execute_command(
-                    "dpkg --get-selections | grep -v deinstall"
-                )
+                return self._list_installed_packages(query)
             elif action == "search":
                 if not query:
                     return self.format_error(
@@ -139,8 +137,7 @@ class PackageManagementTools(BaseTool):
                     return self.format_error(
                         "Package names are required for check action"
                     )
-                # Check each package individually to get precise status
-                return await self._check_packages_status(client, packages)
+                return await self._check_packages_status(packages)
             else:
                 return self.format_error(f"Unknown action: {action}")
 
@@ -223,50 +220,44 @@ class PackageManagementTools(BaseTool):
         pkg_list = ", ".join(packages) if packages else "packages"
         return f"{base_msg} for {pkg_list}: {error.message}"
 
+    def _list_installed_packages(
+        self, prefix: str
+    ) -> List[TextContent | ImageContent | EmbeddedResource]:
+        """List installed packages from the package index."""
+        list_result = self.container.list_packages_use_case.execute(prefix or None)
+        if list_result.is_error():
+            return self.format_error(
+                f"Failed to list packages: {list_result.error_value.message}"
+            )
+
+        packages = list_result.value
+        if not packages:
+            if prefix:
+                return self.format_info(f"No installed packages match '{prefix}'")
+            return self.format_info("No installed packages found")
+
+        lines = [f"{pkg.name} {pkg.version}" for pkg in packages]
+        return self.format_success(
+            f"Package list ({len(packages)} installed):\n" + "\n".join(lines)
+        )
+
     async def _check_packages_status(
-        self, client: "RetroPieClient", packages: List[str]
+        self, packages: List[str]
     ) -> List[TextContent | ImageContent | EmbeddedResource]:
-        """Check the status of multiple packages individually."""
+        """Check the status of multiple packages with a single index lookup."""
         installed_packages = []
         not_found_packages = []
         error_packages = []
 
-        for package in packages:
-            # Check individual package status
-            result = client.execute_command(
-                f"dpkg -l {package} 2>/dev/null | grep '^ii'"
-            )
-
-            if result.success:
-                if result.stdout.strip():
-                    # Package is installed - extract package name from dpkg output
-                    # Only look for the specific package we're checking
-                    found_package = False
-                    for line in result.stdout.strip().split("\n"):
-                        if line.startswith("ii "):
-                            parts = line.split()
-                            if len(parts) >= 2 and parts[1] == package:
-                                installed_packages.append(package)
-                                found_package = True
-                                break
-
-                    if not found_package:
-                        # dpkg output didn't contain our specific package
-                        not_found_packages.append(package)
+        status_result = self.container.check_packages_use_case.execute(packages)
+        if status_result.is_error():
+            error_packages = list(packages)
+        else:
+            for package, installed in status_result.value.items():
+                if installed:
+                    installed_packages.append(package)
                 else:
-                    # No output means package not installed or doesn't exist
-                    # Check if package exists in repositories
-                    search_result = client.execute_command(
-                        f"apt-cache show {package} >/dev/null 2>&1 && echo 'exists' || echo 'not_found'"
-                    )
-                    if search_result.success and "not_found" in search_result.stdout:
-                        not_found_packages.append(package)
-                    else:
-                        # Package exists but not installed
-                        not_found_packages.append(package)
-            else:
-                # Command failed
-                error_packages.append(package)
+                    not_found_packages.append(package)
 
         # Format comprehensive status report
         if not installed_packages and not not_found_packages and error_packages:
@@ -90,6 +90,10 @@ class ServiceManagementTools(BaseTool):
             else:
                 return self.format_error(f"Unknown action: {action}")
 
+            if action != "status":
+                # Any state change makes the cached service inventory stale
+                self.container.system_cache.invalidate_service_status()
+
             if result.success:
                 return self.format_success(
                     f"Service {service_name} {action}: {result.stdout}"
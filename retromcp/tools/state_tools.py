@@ -43,12 +43,14 @@ class StateTools(BaseTool):
                                 "import",
                                 "diff",
                                 "watch",
+                                "unwatch",
+                                "history",
                             ],
-                            "description": "Action to perform: load (retrieve cached state), save (scan and persist current state), update (modify specific field), compare (detect configuration drift), export (backup state to JSON), import (restore state from JSON), diff (compare with another state), watch (monitor specific field)",
+                            "description": "Action to perform: load (retrieve cached state), save (scan and persist current state), update (modify specific field), compare (detect configuration drift), export (backup state to JSON), import (restore state from JSON), diff (compare with another state or two saved points in time), watch (start monitoring a field; repeat to get changes since the last call), unwatch (stop monitoring a field), history (list saved states)",
                         },
                         "path": {
                             "type": "string",
-                            "description": "Field path for update or watch actions (e.g., 'system.hostname')",
+                            "description": "Field path for update, watch or unwatch actions (e.g., 'system.hostname')",
                         },
                         "value": {
                             "description": "New value for update action (any type)"
@@ -66,6 +68,14 @@ class StateTools(BaseTool):
                             "type": "string",
                             "description": "JSON state data to compare against for diff action",
                         },
+                        "since": {
+                            "type": "string",
+                            "description": "ISO 8601 time: compare against the state saved as of this time, diff from it, or start of the history range",
+                        },
+                        "until": {
+                            "type": "string",
+                            "description": "ISO 8601 time: end of the diff or history range (defaults to the latest saved state)",
+                        },
                     },
                     "required": ["action"],
                     "additionalProperties": False,
@@ -115,17 +125,19 @@ class StateTools(BaseTool):
                 return self.format_error(
                     "Path and value are required for update action"
                 )
-        elif action == StateAction.WATCH:
+        elif action in (StateAction.WATCH, StateAction.UNWATCH):
             if not path:
-                return self.format_error("Path is required for watch action")
+                return self.format_error(f"Path is required for {action.value} action")
         elif action == StateAction.IMPORT:
             state_data = arguments.get("state_data")
             if not state_data:
                 return self.format_error("state_data is required for import action")
         elif action == StateAction.DIFF:
             other_state_data = arguments.get("other_state_data")
-            if not other_state_data:
-                return self.format_error("other_state_data is required for diff action")
+            if not other_state_data and not arguments.get("since"):
+                return self.format_error(
+                    "other_state_data is required for diff action unless since is given"
+                )
 
         # Build request
         request = StateManagementRequest(
@@ -135,6 +147,8 @@ class StateTools(BaseTool):
             force_scan=arguments.get("force_scan", False),
             state_data=arguments.get("state_data"),
             other_state_data=arguments.get("other_state_data"),
+            since=arguments.get("since"),
+            until=arguments.get("until"),
         )
 
         # Execute use case
@@ -370,7 +384,26 @@ class StateTools(BaseTool):
             # Format watch results
             response_text += f"👁️ Watching field: {path or 'unknown'}\n"
             response_text += f"📊 Current value: {result.watch_value}\n"
-            response_text += "Monitor will track changes to this field.\n"
+            if result.changes:
+                response_text += "🔄 Changes since last check:\n"
+                for change in result.changes:
+                    response_text += (
+                        f"  • {change.timestamp}: "
+                        f"{change.old_value} → {change.new_value}\n"
+                    )
+            else:
+                response_text += "Monitor will track changes to this field.\n"
+
+        elif result.action == StateAction.HISTORY and result.history is not None:
+            # Format saved state history
+            if not result.history:
+                response_text += "No saved states in this range.\n"
+            for snapshot in result.history:
+                kind = "snapshot" if snapshot.full else "delta"
+                response_text += (
+                    f"  • #{snapshot.sequence} {snapshot.timestamp} "
+                    f"({kind}, {snapshot.size} bytes)\n"
+                )
 
         elif result.action in [StateAction.DIFF, StateAction.COMPARE] and result.diff:
             # Format comparison results
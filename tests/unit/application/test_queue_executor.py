@@ -0,0 +1,310 @@
+"""Tests for background command queue execution."""
+
+import asyncio
+import threading
+import time
+from typing import List
+from typing import Tuple
+from unittest.mock import Mock
+
+import pytest
+
+from retromcp.application.queue_executor import INLINE_OUTPUT_BYTES
+from retromcp.application.queue_executor import OUTPUT_HEAD_BYTES
+from retromcp.application.queue_executor import OUTPUT_TAIL_BYTES
+from retromcp.application.queue_executor import QueueExecutor
+from retromcp.application.queue_executor import RunState
+from retromcp.application.queue_executor import cap_output
+from retromcp.domain.models import CommandQueue
+from retromcp.domain.models import CommandResult
+from retromcp.domain.models import CommandStatus
+from retromcp.domain.models import Result
+from retromcp.domain.models import ValidationError
+from retromcp.domain.ports import RetroPieClient
+from retromcp.infrastructure.persistent_queue_storage import PersistentQueueStorage
+
+
+def _result(command: str, exit_code: int = 0) -> CommandResult:
+    return CommandResult(
+        command=command,
+        exit_code=exit_code,
+        stdout=command,
+        stderr="",
+        success=exit_code == 0,
+        execution_time=0.1,
+    )
+
+
+class TestQueueExecutor:
+    """Test runs, progress, cancel and skip."""
+
+    @pytest.fixture
+    def storage(self, tmp_path) -> PersistentQueueStorage:
+        """Provide queue storage in a temp directory."""
+        return PersistentQueueStorage(str(tmp_path / "command_queues.json"))
+
+    @pytest.fixture
+    def client(self) -> Mock:
+        """Provide a client whose commands succeed."""
+        client = Mock(spec=RetroPieClient)
+        client.execute_command.side_effect = _result
+        return client
+
+    def _create(
+        self, storage: PersistentQueueStorage, commands: int, pause: int = 0
+    ) -> CommandQueue:
+        queue = CommandQueue(id="q1", name="Test", pause_between=pause)
+        for i in range(commands):
+            queue.add_command(f"echo {i}", f"Step {i}")
+        storage.create_queue("q1", queue)
+        return queue
+
+    @pytest.mark.asyncio
+    async def test_run_reports_progress_and_persists(self, storage, client):
+        """Test a run executes every command and reports after each."""
+        self._create(storage, commands=3)
+        executor = QueueExecutor(client, storage)
+        reports: List[Tuple[int, int]] = []
+
+        async def progress(executed: int, total: int) -> None:
+            reports.append((executed, total))
+
+        run = executor.start("q1", progress=progress).value
+        assert executor.active_run("q1") is run
+        assert executor.start("q1").error_value.code == "QUEUE_RUNNING"
+
+        await executor.wait(run.id)
+
+        assert run.state is RunState.COMPLETED
+        assert reports == [(1, 3), (2, 3), (3, 3)]
+        assert executor.active_run("q1") is None
+        assert executor.latest_run("q1") is run
+        queue = storage.get_queue("q1")
+        assert queue.current_index == 3
+        assert queue.commands[2].result["stdout"] == "echo 2"
+
+    @pytest.mark.asyncio
+    async def test_start_does_not_block_loop(self, storage, client):
+        """Test that commands run off the event loop."""
+        self._create(storage, commands=1)
+        release = threading.Event()
+        client.execute_command.side_effect = lambda command: (
+            release.wait(5),
+            _result(command),
+        )[1]
+        executor = QueueExecutor(client, storage)
+
+        run = executor.start("q1").value
+        await asyncio.sleep(0.05)
+        assert run.is_active  # The loop is free while the command runs
+
+        release.set()
+        await executor.wait(run.id)
+        assert run.state is RunState.COMPLETED
+
+    @pytest.mark.asyncio
+    async def test_saves_and_output_spill_run_off_loop(self, storage, client):
+        """Test that fsync'd saves and output compression leave the loop free."""
+        self._create(storage, commands=1)
+        client.execute_command.side_effect = lambda command: CommandResult(
+            command=command,
+            exit_code=0,
+            stdout="x" * (INLINE_OUTPUT_BYTES + 1),
+            stderr="",
+            success=True,
+            execution_time=0.1,
+        )
+        threads = []
+        update_queue = storage.update_queue
+
+        def save(queue_id: str, queue: CommandQueue) -> Result:
+            threads.append(threading.current_thread())
+            return update_queue(queue_id, queue)
+
+        def spill(_data: bytes) -> Result:
+            threads.append(threading.current_thread())
+            return Result.success("out1")
+
+        storage.update_queue = save
+        outputs = Mock()
+        outputs.save.side_effect = spill
+        executor = QueueExecutor(client, storage, outputs=outputs)
+
+        run = executor.start("q1").value
+        await executor.wait(run.id)
+
+        assert run.state is RunState.COMPLETED
+        assert len(threads) == 3  # Running, spill, finished
+        assert threading.main_thread() not in threads
+
+    @pytest.mark.asyncio
+    async def test_cancel_interrupts_pause(self, storage, client):
+        """Test that cancel ends the run without waiting out the pause."""
+        self._create(storage, commands=3, pause=60)
+        executor = QueueExecutor(client, storage)
+
+        run = executor.start("q1").value
+        while run.executed < 1:
+            await asyncio.sleep(0.01)
+        executor.cancel("q1")
+        await asyncio.wait_for(executor.wait(run.id), timeout=5)
+
+        assert run.state is RunState.CANCELLED
+        assert client.execute_command.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_wake_after_skip_continues_with_next_command(self, storage, client):
+        """Test that waking a paused run picks up a skipped command."""
+        queue = self._create(storage, commands=3, pause=60)
+        executor = QueueExecutor(client, storage)
+
+        run = executor.start("q1").value
+        while run.executed < 1:
+            await asyncio.sleep(0.01)
+        queue.commands[1].status = CommandStatus.SKIPPED
+        queue.current_index = 2
+        executor.wake("q1")
+        while run.executed < 2:
+            await asyncio.sleep(0.01)
+        executor.cancel("q1")
+        await asyncio.wait_for(executor.wait(run.id), timeout=5)
+
+        assert [call.args[0] for call in client.execute_command.call_args_list] == [
+            "echo 0",
+            "echo 2",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_failure_and_missing_queue(self, storage, client):
+        """Test that a failed command stops the run."""
+        self._create(storage, commands=2)
+        client.execute_command.side_effect = RuntimeError("connection lost")
+        executor = QueueExecutor(client, storage)
+
+        assert executor.start("missing").error_value.code == "QUEUE_NOT_FOUND"
+        run = executor.start("q1").value
+        await executor.wait(run.id)
+
+        assert run.state is RunState.FAILED
+        assert "Step 0" in run.describe()
+        assert storage.get_queue("q1").commands[0].error == "connection lost"
+
+    def test_start_needs_running_loop(self, storage, client):
+        """Test that start outside the event loop is an error."""
+        self._create(storage, commands=1)
+        executor = QueueExecutor(client, storage)
+
+        assert executor.start("q1").error_value.code == "NO_EVENT_LOOP"
+
+    @pytest.mark.asyncio
+    async def test_parallel_run_respects_limit_and_dependencies(self, storage, client):
+        """Test concurrency limit, dependency order and blocked commands."""
+        queue = CommandQueue(id="q1", name="Test")
+        for i in range(3):
+            queue.add_command(f"check {i}", f"Check {i}")
+        queue.add_command("restart", "Restart", depends_on=["q1_0", "q1_1", "q1_2"])
+        queue.add_command("false", "Broken")
+        queue.add_command("after broken", "After broken", depends_on=["q1_4"])
+        storage.create_queue("q1", queue)
+
+        lock = threading.Lock()
+        running = 0
+        peak = 0
+        finished = []
+
+        def execute(command: str) -> CommandResult:
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+                finished.append(command)
+            return _result(command, exit_code=1 if command == "false" else 0)
+
+        client.execute_command.side_effect = execute
+        executor = QueueExecutor(client, storage)
+
+        run = executor.start("q1", max_parallel=2).value
+        await executor.wait(run.id)
+
+        assert peak == 2
+        assert finished.index("restart") > max(
+            finished.index(f"check {i}") for i in range(3)
+        )
+        assert "after broken" not in finished
+        assert run.state is RunState.FAILED
+        assert "1 blocked by failed dependencies" in run.message
+        assert [cmd.status for cmd in storage.get_queue("q1").commands] == [
+            CommandStatus.COMPLETED,
+            CommandStatus.COMPLETED,
+            CommandStatus.COMPLETED,
+            CommandStatus.COMPLETED,
+            CommandStatus.FAILED,
+            CommandStatus.PENDING,
+        ]
+        assert executor.start("q1", max_parallel=0).error_value.code == (
+            "INVALID_CONCURRENCY"
+        )
+
+    @pytest.mark.asyncio
+    async def test_sequential_resume_skips_blocked_dependents(self, storage, client):
+        """Test that a sequential run after a parallel failure keeps deps."""
+        queue = CommandQueue(id="q1", name="Test", pause_between=0)
+        queue.add_command("false", "Broken")
+        queue.add_command("after broken", "After broken", depends_on=["q1_0"])
+        queue.add_command("independent", "Independent")
+        storage.create_queue("q1", queue)
+        client.execute_command.side_effect = lambda command: _result(
+            command, exit_code=1 if command == "false" else 0
+        )
+        executor = QueueExecutor(client, storage)
+
+        first = executor.start("q1", max_parallel=2).value
+        await executor.wait(first.id)
+        client.execute_command.reset_mock()
+        client.execute_command.side_effect = _result
+        resumed = executor.start("q1").value
+        await executor.wait(resumed.id)
+
+        client.execute_command.assert_not_called()
+        assert resumed.state is RunState.FAILED
+        assert resumed.message == "1 blocked by failed dependencies"
+        assert storage.get_queue("q1").commands[1].status == CommandStatus.PENDING
+
+
+class TestCapOutput:
+    """Test head and tail capping of long output."""
+
+    def test_short_output_stays_inline(self):
+        """Test that output under the limit is not stored."""
+        outputs = Mock()
+
+        assert cap_output("ok", outputs) == ("ok", None, 2)
+        outputs.save.assert_not_called()
+
+    def test_long_output_keeps_head_and_tail(self):
+        """Test that long output is stored and cut between whole characters."""
+        outputs = Mock()
+        outputs.save.return_value = Result.success("abc")
+        text = "é" * (INLINE_OUTPUT_BYTES // 2) + "x" * OUTPUT_TAIL_BYTES
+
+        inline, output_id, size = cap_output(text, outputs)
+
+        assert output_id == "abc"
+        assert size == len(text.encode())
+        outputs.save.assert_called_once_with(text.encode())
+        assert inline.startswith("é" * (OUTPUT_HEAD_BYTES // 2))
+        assert inline.endswith("\n" + "x" * OUTPUT_TAIL_BYTES)
+        assert f"{size - OUTPUT_HEAD_BYTES - OUTPUT_TAIL_BYTES} bytes omitted" in inline
+
+    def test_failed_save_keeps_full_output(self):
+        """Test that output is not lost when it cannot be stored."""
+        outputs = Mock()
+        outputs.save.return_value = Result.error(
+            ValidationError(code="OUTPUT_SAVE_FAILED", message="disk full")
+        )
+        text = "x" * (INLINE_OUTPUT_BYTES + 1)
+
+        assert cap_output(text, outputs) == (text, None, len(text))
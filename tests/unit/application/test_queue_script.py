@@ -0,0 +1,294 @@
+"""Tests for running trusted queues as one remote script."""
+
+import asyncio
+import shutil
+import subprocess
+import time
+from typing import Iterator
+from unittest.mock import Mock
+
+import pytest
+
+from retromcp.application.queue_executor import QueueExecutor
+from retromcp.application.queue_executor import RunState
+from retromcp.application.queue_script import ScriptEvent
+from retromcp.application.queue_script import build_cancel_command
+from retromcp.application.queue_script import build_queue_script
+from retromcp.application.queue_script import new_marker
+from retromcp.application.queue_script import parse_script_line
+from retromcp.application.queue_script import uses_sudo
+from retromcp.domain.models import CommandQueue
+from retromcp.domain.models import CommandResult
+from retromcp.domain.models import CommandStatus
+from retromcp.domain.ports import RetroPieClient
+from retromcp.infrastructure.persistent_queue_storage import PersistentQueueStorage
+
+requires_shell = pytest.mark.skipif(
+    shutil.which("setsid") is None, reason="needs a POSIX shell with setsid"
+)
+
+
+class LocalShellClient:
+    """Runs commands with the local shell in place of the Pi."""
+
+    def __init__(self) -> None:
+        """Record calls like a mock would."""
+        self.streamed = []
+        self.executed = []
+        self.executed_as_root = []
+
+    def stream_command(self, command: str) -> Iterator[str]:
+        """Yield output lines of a local command."""
+        self.streamed.append(command)
+        process = subprocess.Popen(  # noqa: S602
+            command,
+            shell=True,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        for line in process.stdout:
+            yield line.rstrip("\n")
+        process.wait()
+
+    def execute_command(self, command: str, use_sudo: bool = False) -> CommandResult:
+        """Run a local command to completion, recording sudo requests."""
+        self.executed.append(command)
+        self.executed_as_root.append(use_sudo)
+        done = subprocess.run(  # noqa: S602
+            command,
+            shell=True,
+            capture_output=True,
+            text=True,
+        )
+        return CommandResult(
+            command=command,
+            exit_code=done.returncode,
+            stdout=done.stdout,
+            stderr=done.stderr,
+            success=done.returncode == 0,
+            execution_time=0.0,
+        )
+
+
+def test_parse_script_line():
+    """Test marker parsing and that other lines are ignored."""
+    marker = new_marker()
+
+    assert parse_script_line(marker, f"{marker} pgid 42") == ScriptEvent(
+        kind="pgid", value=42
+    )
+    assert parse_script_line(marker, f"{marker} end 3 127") == ScriptEvent(
+        kind="end", step=3, value=127
+    )
+    assert parse_script_line(marker, f"{marker} out  two  spaces") == ScriptEvent(
+        kind="out", text=" two  spaces"
+    )
+    assert parse_script_line(marker, f"{marker} done") == ScriptEvent(kind="done")
+    assert parse_script_line(marker, f"{new_marker()} start 0") is None
+    assert parse_script_line(marker, f"{marker} end x 1") is None
+    assert parse_script_line(marker, "plain output") is None
+    assert build_cancel_command(1234) == "kill -TERM -1234"
+
+
+def test_uses_sudo():
+    """Test detection of steps running commands as root."""
+    assert uses_sudo("sudo apt-get upgrade -y")
+    assert uses_sudo("cd /tmp && sudo make install")
+    assert not uses_sudo("echo pseudo")
+    assert not uses_sudo("ls /etc/sudoers.d")
+
+
+@requires_shell
+def test_script_prints_done_after_last_step():
+    """Test that a script running every step ends with the done marker."""
+    marker = new_marker()
+    done = subprocess.run(  # noqa: S602
+        build_queue_script(marker, ["true", "echo last"]),
+        shell=True,
+        capture_output=True,
+        text=True,
+    )
+    events = [parse_script_line(marker, line) for line in done.stdout.splitlines()]
+
+    assert done.returncode == 0
+    assert events[-2:] == [
+        ScriptEvent(kind="end", step=1, value=0),
+        ScriptEvent(kind="done"),
+    ]
+
+
+@requires_shell
+def test_script_frames_output_and_stops_on_failure():
+    """Test the generated script against a real shell."""
+    marker = new_marker()
+    command = build_queue_script(
+        marker, ["echo hi; echo oops >&2", "printf 'no newline'", "exit 3", "echo no"]
+    )
+
+    done = subprocess.run(  # noqa: S602
+        command,
+        shell=True,
+        capture_output=True,
+        text=True,
+    )
+    events = [parse_script_line(marker, line) for line in done.stdout.splitlines()]
+
+    assert done.returncode == 3
+    assert events[0].kind == "pgid"
+    assert events[1:] == [
+        ScriptEvent(kind="start", step=0),
+        ScriptEvent(kind="out", text="hi"),
+        ScriptEvent(kind="err", text="oops"),
+        ScriptEvent(kind="end", step=0, value=0),
+        ScriptEvent(kind="start", step=1),
+        ScriptEvent(kind="out", text="no newline"),
+        ScriptEvent(kind="end", step=1, value=0),
+        ScriptEvent(kind="start", step=2),
+        ScriptEvent(kind="end", step=2, value=3),
+    ]
+
+
+class TestQueueExecutorScriptMode:
+    """Test trusted queues in the executor."""
+
+    @pytest.fixture
+    def storage(self, tmp_path) -> PersistentQueueStorage:
+        """Provide queue storage in a temp directory."""
+        return PersistentQueueStorage(str(tmp_path / "command_queues.json"))
+
+    def _create(self, storage, *commands: str) -> CommandQueue:
+        queue = CommandQueue(id="q1", name="Test", pause_between=0, trusted=True)
+        for i, command in enumerate(commands):
+            queue.add_command(command, f"Step {i}")
+        storage.create_queue("q1", queue)
+        return queue
+
+    @requires_shell
+    @pytest.mark.asyncio
+    async def test_trusted_queue_uses_one_stream(self, storage):
+        """Test that all steps run over one stream with per-step results."""
+        self._create(storage, "echo one", "echo two >&2", "false", "echo skipped")
+        client = LocalShellClient()
+        executor = QueueExecutor(client, storage)
+
+        run = executor.start("q1").value
+        assert run.script
+        await asyncio.wait_for(executor.wait(run.id), timeout=10)
+
+        assert len(client.streamed) == 1
+        assert client.executed == []
+        assert run.state is RunState.FAILED
+        assert run.executed == 3
+        commands = storage.get_queue("q1").commands
+        assert [cmd.status for cmd in commands] == [
+            CommandStatus.COMPLETED,
+            CommandStatus.COMPLETED,
+            CommandStatus.FAILED,
+            CommandStatus.PENDING,
+        ]
+        assert commands[0].result["stdout"] == "one"
+        assert commands[1].result["stderr"] == "two"
+        assert commands[2].result["exit_code"] == 1
+
+    @requires_shell
+    @pytest.mark.asyncio
+    async def test_cancel_signals_process_group(self, storage):
+        """Test that cancel stops the running step on the remote side."""
+        self._create(storage, "sleep 30", "echo never")
+        client = LocalShellClient()
+        executor = QueueExecutor(client, storage)
+
+        run = executor.start("q1").value
+        queue = storage.get_queue("q1")
+        while queue.commands[0].status != CommandStatus.RUNNING:
+            await asyncio.sleep(0.01)
+        started = time.monotonic()
+        executor.cancel("q1")
+        await asyncio.wait_for(executor.wait(run.id), timeout=10)
+
+        assert time.monotonic() - started < 5
+        assert run.state is RunState.CANCELLED
+        assert client.executed[0].startswith("kill -TERM -")
+        assert client.executed_as_root == [False]
+        assert queue.commands[0].status == CommandStatus.CANCELLED
+        assert queue.commands[1].status == CommandStatus.PENDING
+
+    @pytest.mark.asyncio
+    async def test_cancel_sudo_step_kills_as_root(self, storage):
+        """Test that cancelling a step run with sudo signals as root."""
+        self._create(storage, "sudo apt-get upgrade -y")
+        started = asyncio.Event()
+        loop = asyncio.get_running_loop()
+
+        def stream(command: str) -> Iterator[str]:
+            m = command.split("M=", 1)[1].split(None, 1)[0].strip("'")
+            yield f"{m} pgid 77"
+            yield f"{m} start 0"
+            loop.call_soon_threadsafe(started.set)
+            time.sleep(0.2)
+
+        client = Mock(spec=RetroPieClient)
+        client.stream_command.side_effect = stream
+        executor = QueueExecutor(client, storage)
+
+        run = executor.start("q1").value
+        await started.wait()
+        await asyncio.sleep(0.05)
+        executor.cancel("q1")
+        await asyncio.wait_for(executor.wait(run.id), timeout=5)
+
+        client.execute_command.assert_called_once_with("kill -TERM -77", True)
+        assert run.state is RunState.CANCELLED
+
+    @pytest.mark.asyncio
+    async def test_script_ending_without_done_fails_run(self, storage):
+        """Test that a script breaking before any step is not completed."""
+        self._create(storage, "echo one", "echo two")
+        client = Mock(spec=RetroPieClient)
+        client.stream_command.return_value = iter(["sh: setsid: not found"])
+        executor = QueueExecutor(client, storage)
+
+        run = executor.start("q1").value
+        await executor.wait(run.id)
+
+        assert run.state is RunState.FAILED
+        assert run.executed == 0
+        assert "setsid: not found" in run.message
+        commands = storage.get_queue("q1").commands
+        assert [cmd.status for cmd in commands] == [
+            CommandStatus.PENDING,
+            CommandStatus.PENDING,
+        ]
+
+    @pytest.mark.asyncio
+    async def test_steps_are_wrapped(self, storage):
+        """Test that each step goes through the command wrapper."""
+        self._create(storage, "du -sh /home", "echo light")
+        client = Mock(spec=RetroPieClient)
+        client.stream_command.return_value = iter([])
+        executor = QueueExecutor(
+            client,
+            storage,
+            command_wrapper=lambda c: f"nice -n 19 sh -c '{c}'" if "du" in c else c,
+        )
+
+        run = executor.start("q1").value
+        await executor.wait(run.id)
+
+        script = client.stream_command.call_args[0][0]
+        assert "nice -n 19 sh -c" in script
+        assert "du -sh /home" in script
+
+    @pytest.mark.asyncio
+    async def test_stream_error_fails_run(self, storage):
+        """Test that a lost connection fails the run."""
+        self._create(storage, "echo one")
+        client = Mock(spec=RetroPieClient)
+        client.stream_command.side_effect = RuntimeError("Not connected")
+        executor = QueueExecutor(client, storage)
+
+        run = executor.start("q1").value
+        await executor.wait(run.id)
+
+        assert run.state is RunState.FAILED
+        assert run.message == "Not connected"
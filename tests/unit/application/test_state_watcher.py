@@ -0,0 +1,98 @@
+"""Unit tests for StateFieldWatcher."""
+
+import threading
+from typing import Any
+from typing import Dict
+from typing import Set
+
+from retromcp.application.state_watcher import StateFieldWatcher
+
+
+class TestStateFieldWatcher:
+    """Test change recording and the background sampler."""
+
+    def setup_method(self):
+        """Set up a watcher over a mutable fake source."""
+        self.source: Dict[str, Any] = {"system.cpu_temperature": 50.0}
+        self.sampled: list = []
+
+        def sample(paths: Set[str]) -> Dict[str, Any]:
+            self.sampled.append(set(paths))
+            return {path: self.source.get(path) for path in paths}
+
+        self.watcher = StateFieldWatcher(sample, interval=0.01)
+
+    def teardown_method(self):
+        """Stop the sampler thread."""
+        self.watcher.stop()
+
+    def test_changes_are_buffered_until_read(self):
+        """Test that changes carry old and new values and are drained once."""
+        self.watcher.watch("system.cpu_temperature", 50.0)
+        self.source["system.cpu_temperature"] = 62.5
+        self.watcher.sample_now()
+        self.source["system.cpu_temperature"] = 64.0
+        self.watcher.sample_now()
+
+        value, changes = self.watcher.watch("system.cpu_temperature", None)
+
+        assert value == 64.0
+        assert [(c.old_value, c.new_value) for c in changes] == [
+            (50.0, 62.5),
+            (62.5, 64.0),
+        ]
+        assert self.watcher.watch("system.cpu_temperature", None) == (64.0, [])
+
+    def test_listeners_receive_changes_from_background_sampler(self):
+        """Test that the sampler thread notifies listeners."""
+        received = []
+        changed = threading.Event()
+        self.watcher.add_listener(
+            lambda change: (received.append(change), changed.set())
+        )
+
+        self.watcher.watch("system.cpu_temperature", 50.0)
+        self.source["system.cpu_temperature"] = 70.0
+
+        assert changed.wait(timeout=5)
+        assert received[0].path == "system.cpu_temperature"
+        assert received[0].new_value == 70.0
+
+    def test_one_sample_serves_all_paths_and_unwatch_stops_sampling(self):
+        """Test that paths share samples and the thread exits when idle."""
+        self.watcher.watch("system.cpu_temperature", 50.0)
+        self.watcher.watch("system.hostname", None)
+        self.watcher.sample_now()
+
+        assert self.sampled[-1] == {"system.cpu_temperature", "system.hostname"}
+
+        assert self.watcher.unwatch("system.cpu_temperature") is True
+        assert self.watcher.unwatch("system.cpu_temperature") is False
+        assert self.watcher.unwatch("system.hostname") is True
+        for _ in range(500):
+            if self.watcher._thread is None:
+                break
+            threading.Event().wait(0.01)
+        assert self.watcher._thread is None
+        assert self.watcher.watched_paths == []
+
+    def test_background_samples_go_through_runner(self):
+        """Test that periodic samples can be deferred by the runner."""
+        deferred = []
+        ran = threading.Event()
+        watcher = StateFieldWatcher(
+            lambda paths: {path: 1 for path in paths},
+            interval=0.01,
+            run_background=lambda job: (deferred.append(job), ran.set()),
+        )
+        try:
+            watcher.watch("system.hostname", 0)
+
+            assert ran.wait(timeout=5)
+            assert watcher.watch("system.hostname", None) == (0, [])
+            deferred[0]()
+            value, changes = watcher.watch("system.hostname", None)
+            assert value == 1
+            assert len(changes) == 1
+        finally:
+            watcher.stop()
@@ -2,13 +2,16 @@
 
 from unittest.mock import Mock
 
+from retromcp.application.use_cases import CheckBiosUseCase
 from retromcp.application.use_cases import CheckConnectionUseCase
 from retromcp.application.use_cases import DetectControllersUseCase
 from retromcp.application.use_cases import GetSystemInfoUseCase
 from retromcp.application.use_cases import InstallEmulatorUseCase
 from retromcp.application.use_cases import InstallPackagesUseCase
+from retromcp.application.use_cases import ListThemesUseCase
 from retromcp.application.use_cases import SetupControllerUseCase
 from retromcp.application.use_cases import UpdateSystemUseCase
+from retromcp.domain.models import BiosFile
 from retromcp.domain.models import CommandResult
 from retromcp.domain.models import ConnectionInfo
 from retromcp.domain.models import Controller
@@ -18,6 +21,7 @@ from retromcp.domain.models import EmulatorStatus
 from retromcp.domain.models import Package
 from retromcp.domain.models import Result
 from retromcp.domain.models import SystemInfo
+from retromcp.domain.models import Theme
 from retromcp.domain.ports import ControllerRepository
 from retromcp.domain.ports import EmulatorRepository
 from retromcp.domain.ports import RetroPieClient
@@ -453,3 +457,98 @@ class TestInstallEmulatorUseCase:
         assert result.is_success()
         assert result.value == expected_result
         mock_repo.install_emulator.assert_called_once_with("pcsx-rearmed")
+
+
+class TestCheckBiosUseCase:
+    """Test cases for Check BIOS use case."""
+
+    def setup_method(self):
+        """Set up BIOS files for two systems."""
+        self.mock_repo = Mock(spec=SystemRepository)
+        self.mock_repo.get_bios_files.return_value = [
+            BiosFile(
+                name=name,
+                path=f"/home/retro/RetroPie/BIOS/{name}",
+                system=system,
+                required=True,
+                present=True,
+                checksum_valid=valid,
+            )
+            for name, system, valid in (
+                ("scph1001.bin", "psx", True),
+                ("gba_bios.bin", "gba", None),
+                ("scph5501.bin", "psx", False),
+            )
+        ]
+        self.use_case = CheckBiosUseCase(self.mock_repo)
+
+    def test_execute_verifies_and_filters_by_system(self):
+        """Test that checksums are requested and results filtered and sorted."""
+        result = self.use_case.execute(system_filter="psx")
+
+        assert result.is_success()
+        assert [bios.name for bios in result.value] == [
+            "scph1001.bin",
+            "scph5501.bin",
+        ]
+        self.mock_repo.get_bios_files.assert_called_once_with(verify_checksums=True)
+
+    def test_execute_returns_error_on_failure(self):
+        """Test that repository failures become an execution error."""
+        self.mock_repo.get_bios_files.side_effect = RuntimeError("ssh down")
+
+        result = self.use_case.execute(verify_checksums=False)
+
+        assert result.is_error()
+        assert result.error_value.code == "BIOS_CHECK_FAILED"
+
+
+class TestListThemesUseCase:
+    """Test cases for List Themes use case."""
+
+    def setup_method(self):
+        """Set up a theme catalog."""
+        self.mock_repo = Mock(spec=EmulatorRepository)
+        self.mock_repo.get_themes.return_value = [
+            Theme(
+                name=f"theme{index:02d}",
+                path=f"/etc/emulationstation/themes/theme{index:02d}",
+                active=index == 0,
+                description="Pixel art" if index % 2 else "Clean layout",
+            )
+            for index in range(25)
+        ]
+        self.use_case = ListThemesUseCase(self.mock_repo)
+
+    def test_execute_returns_requested_page_with_total(self):
+        """Test pagination over the full catalog."""
+        result = self.use_case.execute(offset=20, limit=10)
+
+        assert result.is_success()
+        page = result.value
+        assert page.total == 25
+        assert page.offset == 20
+        assert [theme.name for theme in page.themes] == [
+            "theme20",
+            "theme21",
+            "theme22",
+            "theme23",
+            "theme24",
+        ]
+
+    def test_execute_searches_names_and_descriptions(self):
+        """Test case-insensitive search before paging."""
+        by_description = self.use_case.execute(query="PIXEL", limit=3).value
+        by_name = self.use_case.execute(query="theme1").value
+
+        assert by_description.total == 12
+        assert len(by_description.themes) == 3
+        assert by_name.total == 10
+
+    def test_execute_rejects_invalid_pagination(self):
+        """Test that negative offsets and empty pages are rejected."""
+        result = self.use_case.execute(offset=-1)
+
+        assert result.is_error()
+        assert result.error_value.code == "INVALID_PAGINATION"
+        self.mock_repo.get_themes.assert_not_called()
@@ -12,6 +12,7 @@ from retromcp.domain.models import ControllerType
 from retromcp.domain.models import Emulator
 from retromcp.domain.models import EmulatorStatus
 from retromcp.domain.models import Package
+from retromcp.domain.models import PackageIndex
 from retromcp.domain.models import ServiceStatus
 from retromcp.domain.models import SystemInfo
 from retromcp.domain.models import SystemService
@@ -220,6 +221,53 @@ class TestPackage:
         assert package.available_version == "2.11.3"
 
 
+class TestPackageIndex:
+    """Test PackageIndex model."""
+
+    def _index(self) -> PackageIndex:
+        return PackageIndex(
+            names=["vim", "python3", "libc6", "libc6", "python3-pip", "nano"],
+            versions=["8.2", "3.9.2", "2.31", "2.31", "20.3.4", "5.4"],
+            installed=bytearray([1, 1, 0, 1, 1, 0]),
+            fingerprint="1700000000 123456",
+        )
+
+    def test_lookup_and_status(self):
+        """Test exact lookup and batched status."""
+        index = self._index()
+
+        assert "vim" in index
+        assert index.get("vim") == Package(name="vim", version="8.2", installed=True)
+        assert index.get("missing") is None
+        assert index.status(["python3", "nano", "missing"]) == {
+            "python3": True,
+            "nano": False,
+            "missing": False,
+        }
+
+    def test_multi_arch_entry_prefers_installed_row(self):
+        """Test that a duplicated name resolves to its installed row."""
+        index = self._index()
+
+        assert index.is_installed("libc6") is True
+        assert len(index) == 6
+
+    def test_search_prefix_returns_sorted_matches(self):
+        """Test prefix search over sorted names."""
+        index = self._index()
+
+        assert index.search_prefix("python") == ["python3", "python3-pip"]
+        assert index.search_prefix("python", limit=1) == ["python3"]
+        assert index.search_prefix("zzz") == []
+
+    def test_to_packages_preserves_query_order(self):
+        """Test that materialized packages keep query order."""
+        packages = self._index().to_packages()
+
+        assert [package.name for package in packages][:2] == ["vim", "python3"]
+        assert packages[-1].installed is False
+
+
 class TestCommandResult:
     """Test CommandResult model."""
 
@@ -0,0 +1,220 @@
+"""Tests for controller hotplug watching."""
+
+import queue
+import threading
+from typing import Iterator
+from typing import Optional
+from unittest.mock import Mock
+
+from retromcp.domain.models import CommandResult
+from retromcp.domain.ports import RetroPieClient
+from retromcp.infrastructure.cache_system import SystemCache
+from retromcp.infrastructure.controller_hotplug_watcher import ControllerHotplugWatcher
+from retromcp.infrastructure.controller_hotplug_watcher import parse_udev_event
+from retromcp.infrastructure.ssh_controller_repository import SSHControllerRepository
+
+DEVPATH = "/devices/platform/soc/3f980000.usb/usb1/1-1/1-1.3/input/input5"
+
+XBOX_DEVICE = """I: Bus=0003 Vendor=045e Product=028e Version=0114
+N: Name="Microsoft Xbox 360 pad"
+H: Handlers=event2 js0
+"""
+
+PS4_DEVICE = """I: Bus=0003 Vendor=054c Product=09cc Version=8111
+N: Name="Sony PLAYSTATION(R)4 Wireless Controller"
+H: Handlers=event3 js1
+"""
+
+
+def _detect_result(devices: str) -> CommandResult:
+    return CommandResult(
+        command="cat /proc/bus/input/devices",
+        exit_code=0,
+        stdout=f"{devices}\n@@retromcp-probes@@\nxpad ds4drv\n@@retromcp-config@@\n",
+        stderr="",
+        success=True,
+        execution_time=0.1,
+    )
+
+
+def _event(action: str, node: str) -> str:
+    return f"KERNEL[1234.567890] {action}      {DEVPATH}/{node} (input)"
+
+
+MONITOR_HEADER = "monitor will print the received events for:"
+
+
+class _FakeStream:
+    """Line stream fed from the test thread; None or close() ends the stream."""
+
+    def __init__(self) -> None:
+        self.lines: queue.Queue[Optional[str]] = queue.Queue()
+        self.closed = threading.Event()
+
+    def __call__(self, _command: str, **_options: bool) -> "_FakeStream":
+        return self
+
+    def __iter__(self) -> Iterator[str]:
+        while not self.closed.is_set():
+            line = self.lines.get(timeout=5)
+            if line is None:
+                return
+            yield line
+
+    def close(self) -> None:
+        self.closed.set()
+        self.lines.put(None)
+
+
+class TestParseUdevEvent:
+    """Test udevadm monitor line parsing."""
+
+    def test_parses_joystick_add_event(self):
+        """Test that add events expose action and device node."""
+        event = parse_udev_event(_event("add", "js0"))
+
+        assert event is not None
+        assert event.action == "add"
+        assert event.node == "js0"
+        assert event.device_path == "/dev/input/js0"
+        assert event.is_joystick is True
+
+    def test_ignores_headers_and_other_subsystems(self):
+        """Test that non-event lines are skipped."""
+        assert parse_udev_event("monitor will print the received events for:") is None
+        assert parse_udev_event("KERNEL - the kernel uevent") is None
+        assert parse_udev_event(f"KERNEL[1.0] add {DEVPATH} (usb)") is None
+
+
+class TestControllerHotplugWatcher:
+    """Test event delivery from the background stream."""
+
+    def test_delivers_joystick_events_and_reports_stop(self):
+        """Test that only joystick add/remove events reach the callback."""
+        client = Mock(spec=RetroPieClient)
+        client.stream_command.return_value = iter(
+            [
+                "monitor will print the received events for:",
+                _event("add", "event2"),
+                _event("add", "js0"),
+                _event("change", "js0"),
+                _event("remove", "js0"),
+            ]
+        )
+        events = []
+        stopped = threading.Event()
+        watcher = ControllerHotplugWatcher(client, events.append, stopped.set)
+
+        watcher.start()
+
+        assert stopped.wait(timeout=5)
+        assert [(event.action, event.node) for event in events] == [
+            ("add", "js0"),
+            ("remove", "js0"),
+        ]
+        assert watcher.is_running is False
+
+    def test_stop_closes_stream_without_waiting_for_events(self):
+        """Test that stop ends the remote monitor and the thread promptly."""
+        stream = _FakeStream()
+        stream.lines.put(MONITOR_HEADER)
+        client = Mock(spec=RetroPieClient)
+        client.stream_command.side_effect = stream
+        ready = threading.Event()
+        on_stop = Mock()
+        watcher = ControllerHotplugWatcher(client, Mock(), on_stop, on_ready=ready.set)
+        watcher.start()
+        assert ready.wait(timeout=5)
+
+        watcher.stop()
+        watcher._thread.join(timeout=5)
+
+        assert stream.closed.is_set()
+        assert not watcher._thread.is_alive()
+        client.stream_command.assert_called_once_with(
+            "udevadm monitor --kernel --subsystem-match=input", pty=True
+        )
+        on_stop.assert_not_called()
+
+
+class TestSSHControllerRepositoryHotplug:
+    """Test in-memory controller state maintained by the watcher."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.stream = _FakeStream()
+        self.mock_client = Mock(spec=RetroPieClient)
+        self.mock_client.stream_command.side_effect = self.stream
+        self.cache = SystemCache()
+        self.repository = SSHControllerRepository(
+            self.mock_client, self.cache, watch_hotplug=True
+        )
+        self.stream.lines.put(MONITOR_HEADER)
+
+    def teardown_method(self):
+        """End the fake stream so the watcher thread exits."""
+        self.stream.lines.put(None)
+
+    def _wait_for(self, condition) -> bool:
+        for _ in range(200):
+            if condition():
+                return True
+            threading.Event().wait(0.01)
+        return False
+
+    def test_detect_controllers_is_memory_read_while_watching(self):
+        """Test that later detections need no remote commands."""
+        self.mock_client.execute_command.return_value = _detect_result(XBOX_DEVICE)
+
+        first = self.repository.detect_controllers()
+        self.cache.clear_all()
+        second = self.repository.detect_controllers()
+
+        assert first == second
+        assert self.mock_client.execute_command.call_count == 1
+        self.mock_client.stream_command.assert_called_once()
+
+    def test_add_and_remove_events_update_controllers(self):
+        """Test that hotplug events are reflected immediately."""
+        self.mock_client.execute_command.side_effect = [
+            _detect_result(XBOX_DEVICE),
+            _detect_result(XBOX_DEVICE + "\n" + PS4_DEVICE),
+        ]
+        self.repository.detect_controllers()
+
+        self.stream.lines.put(_event("add", "js1"))
+        assert self._wait_for(lambda: len(self.repository.detect_controllers()) == 2)
+
+        self.stream.lines.put(_event("remove", "js0"))
+        assert self._wait_for(lambda: len(self.repository.detect_controllers()) == 1)
+
+        controllers = self.repository.detect_controllers()
+        assert controllers[0].device_path == "/dev/input/js1"
+        # Removal is applied locally; only the add needed a rescan
+        assert self.mock_client.execute_command.call_count == 2
+        assert self.cache.get_hardware_scan() == {"controllers": controllers}
+
+    def test_events_before_seeding_are_applied(self):
+        """Test that an event queued while seeding is applied to the seed scan."""
+        self.mock_client.execute_command.return_value = _detect_result(XBOX_DEVICE)
+        self.stream.lines.put(_event("remove", "js0"))
+
+        self.repository.detect_controllers()
+
+        assert self._wait_for(lambda: self.repository.detect_controllers() == [])
+        assert self.mock_client.execute_command.call_count == 1
+
+    def test_stream_end_falls_back_to_cached_scans(self):
+        """Test that a dropped stream stops serving from memory."""
+        self.mock_client.execute_command.return_value = _detect_result(XBOX_DEVICE)
+        self.repository.detect_controllers()
+
+        self.stream.lines.put(None)
+        assert self._wait_for(lambda: self.repository._live_controllers is None)
+
+        self.cache.clear_all()
+        self.mock_client.stream_command.side_effect = lambda *_args, **_options: iter(
+            []
+        )
+        self.repository.detect_controllers()
+        assert self.mock_client.execute_command.call_count == 2
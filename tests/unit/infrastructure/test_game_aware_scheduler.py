@@ -0,0 +1,169 @@
+"""Tests for the game-aware scheduler."""
+
+import threading
+from unittest.mock import Mock
+
+from retromcp.domain.models import CommandResult
+from retromcp.domain.ports import RetroPieClient
+from retromcp.infrastructure.game_aware_scheduler import DETECT_COMMAND
+from retromcp.infrastructure.game_aware_scheduler import GameAwareScheduler
+from retromcp.infrastructure.game_aware_scheduler import JobPriority
+from retromcp.infrastructure.game_aware_scheduler import SchedulingPolicy
+from retromcp.infrastructure.game_aware_scheduler import strip_heredoc_bodies
+from retromcp.infrastructure.ssh_retropie_client import SSHRetroPieClient
+
+RETROARCH = (
+    "2412 /opt/retropie/emulators/retroarch/bin/retroarch -L "
+    "/opt/retropie/libretrocores/lr-snes9x/snes9x_libretro.so "
+    "--config /opt/retropie/configs/snes/retroarch.cfg /home/pi/RetroPie/roms/snes/smw.sfc"
+)
+
+
+def _result(stdout: str, exit_code: int = 0) -> CommandResult:
+    return CommandResult(
+        command="pgrep",
+        exit_code=exit_code,
+        stdout=stdout,
+        stderr="",
+        success=exit_code == 0,
+        execution_time=0.1,
+    )
+
+
+class TestGameAwareScheduler:
+    """Test detection, command wrapping and job deferral."""
+
+    def setup_method(self):
+        """Set up a scheduler whose detection result can be switched."""
+        self.playing = True
+        self.mock_client = Mock(spec=RetroPieClient)
+        self.mock_client.execute_command.side_effect = lambda _command: (
+            _result(RETROARCH) if self.playing else _result("", exit_code=1)
+        )
+        self.scheduler = GameAwareScheduler(
+            self.mock_client,
+            SchedulingPolicy(detection_ttl=60.0, resume_poll_interval=0.01),
+        )
+
+    def teardown_method(self):
+        """End the game so the resume thread drains and exits."""
+        self.playing = False
+
+    def test_detects_emulator_and_caches_result(self):
+        """Test that one pgrep serves repeated checks within the TTL."""
+        assert self.scheduler.active_emulator().startswith(
+            "/opt/retropie/emulators/retroarch/bin/retroarch"
+        )
+        self.scheduler.active_emulator()
+
+        self.mock_client.execute_command.assert_called_once_with(DETECT_COMMAND)
+
+        self.playing = False
+        assert self.scheduler.active_emulator(refresh=True) is None
+
+    def test_heavy_command_classification(self):
+        """Test which commands count as heavy."""
+        heavy = [
+            "du -sh /home/pi/RetroPie/roms",
+            "find /home/pi/RetroPie/roms -type f",
+            "sudo apt-get upgrade -y",
+            "dpkg-query -W -f='${Package}\\n'",
+            "cd /home/pi/RetroPie/BIOS && md5sum *.bin",
+        ]
+        light = [
+            "vcgencmd measure_temp",
+            "cat /proc/loadavg",
+            "ls /opt/retropie/emulators",
+            DETECT_COMMAND,
+        ]
+
+        assert all(self.scheduler.is_heavy(command) for command in heavy)
+        assert not any(self.scheduler.is_heavy(command) for command in light)
+
+    def test_heredoc_bodies_are_not_commands(self):
+        """Test that data written through a heredoc is not classified."""
+        state_write = (
+            "tee state.json > /dev/null << 'EOF_STATE' && chmod 600 state.json\n"
+            '{\n"notes": "ran du; find | tar"\n}\nEOF_STATE'
+        )
+        heavy_after = "cat > notes <<-EOF\n\tdu\n\tEOF\ndu -sh /home"
+
+        assert not self.scheduler.is_heavy(state_write)
+        assert self.scheduler.is_heavy(heavy_after)
+        assert self.scheduler.is_heavy("md5sum <<< 'du'")
+        assert strip_heredoc_bodies(heavy_after) == "cat > notes <<-EOF\ndu -sh /home"
+
+    def test_wrap_throttles_heavy_commands_only_while_playing(self):
+        """Test nice/ionice/taskset wrapping and pass-through."""
+        command = "du -sh '/home/pi/RetroPie/roms'"
+
+        assert self.scheduler.wrap(command) == (
+            "nice -n 19 ionice -c 3 taskset -c 0 bash -c "
+            "'du -sh '\"'\"'/home/pi/RetroPie/roms'\"'\"''"
+        )
+        assert self.scheduler.wrap("cat /proc/loadavg") == "cat /proc/loadavg"
+
+        self.playing = False
+        self.scheduler.active_emulator(refresh=True)
+        assert self.scheduler.wrap(command) == command
+
+    def test_background_jobs_deferred_and_deduplicated(self):
+        """Test that background work waits and duplicates collapse."""
+        runs = []
+
+        first = self.scheduler.submit("Scan ROMs", lambda: runs.append(1), key="roms")
+        self.scheduler.submit("Scan ROMs", lambda: runs.append(2), key="roms")
+        ran_now = self.scheduler.submit(
+            "Save state", lambda: runs.append(3), priority=JobPriority.NORMAL
+        )
+
+        assert first is not None
+        assert ran_now is None
+        assert runs == [3]
+        assert [job.description for job in self.scheduler.deferred_jobs] == [
+            "Scan ROMs"
+        ]
+        assert self.scheduler.run_deferred() == 0  # Still playing
+
+    def test_deferred_jobs_run_when_game_ends(self):
+        """Test that the resume thread runs deferred work after play."""
+        done = threading.Event()
+        self.scheduler.submit("Hash BIOS files", done.set)
+
+        self.playing = False
+
+        assert done.wait(timeout=5)
+        assert self.scheduler.deferred_jobs == []
+
+    def test_stop_ends_resume_thread_during_play(self):
+        """Test that stop interrupts the poll wait and drops deferred jobs."""
+        scheduler = GameAwareScheduler(
+            self.mock_client,
+            SchedulingPolicy(detection_ttl=60.0, resume_poll_interval=60.0),
+        )
+        scheduler.submit("Hash BIOS files", lambda: None)
+        thread = scheduler._thread
+
+        scheduler.stop()
+        thread.join(timeout=5)
+
+        assert not thread.is_alive()
+        assert scheduler.deferred_jobs == []
+
+
+class TestSSHRetroPieClientCommandWrapper:
+    """Test that the client passes commands through its wrapper."""
+
+    def test_wrapper_rewrites_command_before_execution(self):
+        """Test that the SSH handler receives the wrapped command."""
+        mock_ssh = Mock()
+        mock_ssh.execute_command.return_value = (0, "ok", "")
+        client = SSHRetroPieClient(mock_ssh)
+        client.command_wrapper = lambda command: f"nice -n 19 sh -c '{command}'"
+
+        result = client.execute_command("du -sh /home", use_sudo=True)
+
+        mock_ssh.execute_command.assert_called_once_with(
+            "nice -n 19 sh -c 'sudo du -sh /home'"
+        )
+        assert result.command == "nice -n 19 sh -c 'sudo du -sh /home'"
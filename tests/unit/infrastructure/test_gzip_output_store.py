@@ -0,0 +1,94 @@
+"""Unit tests for GzipOutputStore."""
+
+import gzip
+import os
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+from retromcp.infrastructure.gzip_output_store import CHUNK_BYTES
+from retromcp.infrastructure.gzip_output_store import INDEX_SUFFIX
+from retromcp.infrastructure.gzip_output_store import OUTPUT_SUFFIX
+from retromcp.infrastructure.gzip_output_store import GzipOutputStore
+
+
+class TestGzipOutputStore:
+    """Test saving, range reads and pruning."""
+
+    def test_save_and_read_ranges(self, tmp_path: Path) -> None:
+        """Test that outputs are compressed and readable by byte range."""
+        store = GzipOutputStore(str(tmp_path / "outputs"))
+        data = b"".join(b"line %05d\n" % i for i in range(10000))
+
+        output_id = store.save(data).value
+        path = tmp_path / "outputs" / f"{output_id}{OUTPUT_SUFFIX}"
+
+        assert path.stat().st_size < len(data) // 4
+        assert gzip.decompress(path.read_bytes()) == data
+        whole = store.read(output_id).value
+        assert whole.data == data
+        assert whole.total_bytes == len(data)
+        chunk = store.read(output_id, offset=len(data) - 11, length=100).value
+        assert chunk.data == b"line 09999\n"
+        assert store.read(output_id, offset=len(data) + 5).value.data == b""
+
+    def test_read_near_end_decompresses_only_covering_members(
+        self, tmp_path: Path
+    ) -> None:
+        """Test that a range at the end of a multi-MB output skips the rest."""
+        store = GzipOutputStore(str(tmp_path))
+        data = os.urandom(CHUNK_BYTES) * 16 + b"tail end"
+        output_id = store.save(data).value
+        size = (tmp_path / f"{output_id}{OUTPUT_SUFFIX}").stat().st_size
+
+        with patch("gzip.decompress", wraps=gzip.decompress) as decompress:
+            chunk = store.read(output_id, offset=len(data) - 20, length=64).value
+
+        assert chunk.data == data[-20:]
+        assert chunk.total_bytes == len(data)
+        assert len(decompress.call_args[0][0]) < size // 8
+
+    def test_reads_outputs_saved_without_index(self, tmp_path: Path) -> None:
+        """Test that outputs written as one gzip stream stay readable."""
+        store = GzipOutputStore(str(tmp_path))
+        data = b"".join(b"line %06d\n" % i for i in range(100000))
+        (tmp_path / f"{'a' * 16}{OUTPUT_SUFFIX}").write_bytes(gzip.compress(data))
+
+        chunk = store.read("a" * 16, offset=CHUNK_BYTES - 3, length=10).value
+
+        assert chunk.data == data[CHUNK_BYTES - 3 : CHUNK_BYTES + 7]
+        assert chunk.total_bytes == len(data)
+
+    def test_read_errors(self, tmp_path: Path) -> None:
+        """Test invalid IDs, ranges and missing outputs."""
+        store = GzipOutputStore(str(tmp_path))
+        output_id = store.save(b"data").value
+
+        assert store.read("../secret").error_value.code == "INVALID_OUTPUT_ID"
+        assert store.read(output_id, offset=-1).error_value.code == "INVALID_RANGE"
+        assert store.read("0" * 16).error_value.code == "OUTPUT_NOT_FOUND"
+
+        (tmp_path / f"{output_id}{OUTPUT_SUFFIX}").write_bytes(b"not gzip")
+        assert store.read(output_id).error_value.code == "OUTPUT_READ_FAILED"
+
+    def test_save_failure(self, tmp_path: Path) -> None:
+        """Test that an unwritable directory is an error, not an exception."""
+        blocker = tmp_path / "file"
+        blocker.write_text("")
+        store = GzipOutputStore(str(blocker / "outputs"))
+
+        assert store.save(b"data").error_value.code == "OUTPUT_SAVE_FAILED"
+
+    def test_prune_deletes_old_outputs(self, tmp_path: Path) -> None:
+        """Test that pruning removes only outputs past the age limit."""
+        store = GzipOutputStore(str(tmp_path))
+        old_id = store.save(b"old").value
+        new_id = store.save(b"new").value
+        old_path = tmp_path / f"{old_id}{OUTPUT_SUFFIX}"
+        month_ago = time.time() - 31 * 86400
+        os.utime(old_path, (month_ago, month_ago))
+
+        assert store.prune(30) == 1
+        assert not old_path.exists()
+        assert not (tmp_path / f"{old_id}{INDEX_SUFFIX}").exists()
+        assert store.read(new_id).value.data == b"new"
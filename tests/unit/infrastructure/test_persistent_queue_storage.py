@@ -4,11 +4,17 @@ import json
 import tempfile
 from datetime import datetime
 from pathlib import Path
-from unittest.mock import Mock, mock_open, patch
+from unittest.mock import Mock
+from unittest.mock import mock_open
+from unittest.mock import patch
 
 import pytest
 
-from retromcp.domain.models import Result, ValidationError, CommandQueue, CommandStatus, QueuedCommand
+from retromcp.domain.models import CommandQueue
+from retromcp.domain.models import CommandStatus
+from retromcp.domain.models import QueuedCommand
+from retromcp.domain.models import Result
+from retromcp.domain.models import ValidationError
 
 
 class TestPersistentQueueStorage:
@@ -24,47 +30,59 @@ class TestPersistentQueueStorage:
     def sample_queue(self) -> CommandQueue:
         """Provide sample command queue for testing."""
         queue = CommandQueue(
-            id="test_queue_1",
-            name="Test Queue",
-            auto_execute=False,
-            pause_between=2
+            id="test_queue_1", name="Test Queue", auto_execute=False, pause_between=2
         )
         queue.add_command("ls -la", "List directory contents")
         queue.add_command("pwd", "Show current directory")
         return queue
 
     # Test Case: Storage initialization
-    def test_persistent_storage_initialization_empty_file(self, temp_storage_path: str) -> None:
+    def test_persistent_storage_initialization_empty_file(
+        self, temp_storage_path: str
+    ) -> None:
         """Test storage initialization with empty/non-existent file."""
-        from retromcp.infrastructure.persistent_queue_storage import PersistentQueueStorage
+        from retromcp.infrastructure.persistent_queue_storage import (
+            PersistentQueueStorage,
+        )
+
         storage = PersistentQueueStorage(temp_storage_path)
-        
+
         # Should start with empty storage
         assert len(storage.list_queues()) == 0
 
     # Test Case: Queue creation and persistence
-    def test_create_queue_persists_to_storage(self, temp_storage_path: str, sample_queue: CommandQueue) -> None:
+    def test_create_queue_persists_to_storage(
+        self, temp_storage_path: str, sample_queue: CommandQueue
+    ) -> None:
         """Test that creating a queue persists it to storage."""
-        from retromcp.infrastructure.persistent_queue_storage import PersistentQueueStorage
+        from retromcp.infrastructure.persistent_queue_storage import (
+            PersistentQueueStorage,
+        )
+
         storage = PersistentQueueStorage(temp_storage_path)
-        
+
         # Create queue should persist immediately
         result = storage.create_queue(sample_queue.id, sample_queue)
         assert result.is_success()
-        
+
         # Verify file was written
         assert Path(temp_storage_path).exists()
 
     # Test Case: Queue retrieval
-    def test_get_queue_retrieves_from_storage(self, temp_storage_path: str, sample_queue: CommandQueue) -> None:
+    def test_get_queue_retrieves_from_storage(
+        self, temp_storage_path: str, sample_queue: CommandQueue
+    ) -> None:
         """Test that getting a queue retrieves it from storage."""
-        from retromcp.infrastructure.persistent_queue_storage import PersistentQueueStorage
+        from retromcp.infrastructure.persistent_queue_storage import (
+            PersistentQueueStorage,
+        )
+
         storage = PersistentQueueStorage(temp_storage_path)
-        
+
         # Create and retrieve queue
         storage.create_queue(sample_queue.id, sample_queue)
         retrieved_queue = storage.get_queue(sample_queue.id)
-        
+
         assert retrieved_queue is not None
         assert retrieved_queue.id == sample_queue.id
         assert retrieved_queue.name == sample_queue.name
@@ -73,27 +91,35 @@ class TestPersistentQueueStorage:
     # Test Case: Queue listing
     def test_list_queues_returns_all_queue_ids(self, temp_storage_path: str) -> None:
         """Test that listing queues returns all persisted queue IDs."""
-        from retromcp.infrastructure.persistent_queue_storage import PersistentQueueStorage
+        from retromcp.infrastructure.persistent_queue_storage import (
+            PersistentQueueStorage,
+        )
+
         storage = PersistentQueueStorage(temp_storage_path)
-        
+
         # Create multiple queues
         queue1 = CommandQueue(id="q1", name="Queue 1")
         queue2 = CommandQueue(id="q2", name="Queue 2")
-        
+
         storage.create_queue(queue1.id, queue1)
         storage.create_queue(queue2.id, queue2)
-        
+
         queue_ids = storage.list_queues()
         assert "q1" in queue_ids
         assert "q2" in queue_ids
         assert len(queue_ids) == 2
 
     # Test Case: Queue deletion
-    def test_delete_queue_removes_from_storage(self, temp_storage_path: str, sample_queue: CommandQueue) -> None:
+    def test_delete_queue_removes_from_storage(
+        self, temp_storage_path: str, sample_queue: CommandQueue
+    ) -> None:
         """Test that deleting a queue removes it from storage."""
-        from retromcp.infrastructure.persistent_queue_storage import PersistentQueueStorage
+        from retromcp.infrastructure.persistent_queue_storage import (
+            PersistentQueueStorage,
+        )
+
         storage = PersistentQueueStorage(temp_storage_path)
-        
+
         # Create and delete queue
         storage.create_queue(sample_queue.id, sample_queue)
         result = storage.delete_queue(sample_queue.id)
@@ -105,13 +131,16 @@ class TestPersistentQueueStorage:
     def test_corrupted_storage_file_recovery(self, temp_storage_path: str) -> None:
         """Test graceful recovery from corrupted storage file."""
         # Create corrupted JSON file
-        with open(temp_storage_path, 'w') as f:
+        with open(temp_storage_path, "w") as f:
             f.write("invalid json content {")
-        
-        from retromcp.infrastructure.persistent_queue_storage import PersistentQueueStorage
+
+        from retromcp.infrastructure.persistent_queue_storage import (
+            PersistentQueueStorage,
+        )
+
         # Should not crash, should recover gracefully
         storage = PersistentQueueStorage(temp_storage_path)
-        
+
         # Should start with empty storage after recovery
         assert len(storage.list_queues()) == 0
 
@@ -119,38 +148,44 @@ class TestPersistentQueueStorage:
     def test_storage_file_permission_error(self) -> None:
         """Test handling of file permission errors."""
         readonly_path = "/readonly/path/queues.json"
-        
-        from retromcp.infrastructure.persistent_queue_storage import PersistentQueueStorage
+
+        from retromcp.infrastructure.persistent_queue_storage import (
+            PersistentQueueStorage,
+        )
+
         # Should handle permission errors gracefully
         storage = PersistentQueueStorage(readonly_path)
-        
+
         # Should start with empty storage when unable to access file
         assert len(storage.list_queues()) == 0
 
     # Test Case: JSON serialization/deserialization
     def test_queue_serialization_deserialization(self, temp_storage_path: str) -> None:
         """Test that queues are properly serialized and deserialized."""
-        from retromcp.infrastructure.persistent_queue_storage import PersistentQueueStorage
+        from retromcp.infrastructure.persistent_queue_storage import (
+            PersistentQueueStorage,
+        )
+
         storage = PersistentQueueStorage(temp_storage_path)
-        
+
         # Create queue with various command states
         queue = CommandQueue(id="serialize_test", name="Serialization Test")
         cmd1 = queue.add_command("echo 'hello'", "Test echo")
         cmd2 = queue.add_command("ls", "List files")
-        
+
         # Modify command states
         cmd1.status = CommandStatus.COMPLETED
         cmd1.start_time = datetime.now()
         cmd1.end_time = datetime.now()
         cmd1.result = {"exit_code": 0, "stdout": "hello"}
-        
+
         cmd2.status = CommandStatus.FAILED
         cmd2.error = "Command not found"
-        
+
         # Store and retrieve
         storage.create_queue(queue.id, queue)
         retrieved = storage.get_queue(queue.id)
-        
+
         assert retrieved is not None
         assert len(retrieved.commands) == 2
         assert retrieved.commands[0].status == CommandStatus.COMPLETED
@@ -158,12 +193,33 @@ class TestPersistentQueueStorage:
         assert retrieved.commands[1].status == CommandStatus.FAILED
         assert retrieved.commands[1].error == "Command not found"
 
+    def test_dependencies_survive_reload(self, temp_storage_path: str) -> None:
+        """Test that command dependencies and the trusted flag are persisted."""
+        from retromcp.infrastructure.persistent_queue_storage import (
+            PersistentQueueStorage,
+        )
+
+        storage = PersistentQueueStorage(temp_storage_path)
+        queue = CommandQueue(id="q1", name="Dependencies", trusted=True)
+        queue.add_command("echo 1", "First")
+        queue.add_command("echo 2", "Second", depends_on=["q1_0"])
+        storage.create_queue(queue.id, queue)
+
+        retrieved = PersistentQueueStorage(temp_storage_path).get_queue("q1")
+
+        assert retrieved.trusted
+        assert retrieved.commands[0].depends_on == []
+        assert retrieved.commands[1].depends_on == ["q1_0"]
+
     # Test Case: Thread safety (basic)
     def test_concurrent_access_handling(self, temp_storage_path: str) -> None:
         """Test basic thread safety mechanisms."""
-        from retromcp.infrastructure.persistent_queue_storage import PersistentQueueStorage
+        from retromcp.infrastructure.persistent_queue_storage import (
+            PersistentQueueStorage,
+        )
+
         storage = PersistentQueueStorage(temp_storage_path)
-        
+
         # This test will verify file locking mechanisms exist
         # Implementation should handle concurrent access
         queue = CommandQueue(id="concurrent_test", name="Concurrent Test")
@@ -173,18 +229,21 @@ class TestPersistentQueueStorage:
     # Test Case: Large queue handling
     def test_large_queue_performance(self, temp_storage_path: str) -> None:
         """Test handling of large queues."""
-        from retromcp.infrastructure.persistent_queue_storage import PersistentQueueStorage
+        from retromcp.infrastructure.persistent_queue_storage import (
+            PersistentQueueStorage,
+        )
+
         storage = PersistentQueueStorage(temp_storage_path)
-        
+
         # Create queue with many commands
         large_queue = CommandQueue(id="large_queue", name="Large Queue")
         for i in range(100):
             large_queue.add_command(f"echo 'command {i}'", f"Command {i}")
-        
+
         # Should handle large queues efficiently
         result = storage.create_queue(large_queue.id, large_queue)
         assert result.is_success()
-        
+
         retrieved = storage.get_queue(large_queue.id)
         assert retrieved is not None
         assert len(retrieved.commands) == 100
@@ -192,7 +251,10 @@ class TestPersistentQueueStorage:
     # Test Case: Storage path validation
     def test_invalid_storage_path_handling(self) -> None:
         """Test handling of invalid storage paths."""
-        from retromcp.infrastructure.persistent_queue_storage import PersistentQueueStorage
+        from retromcp.infrastructure.persistent_queue_storage import (
+            PersistentQueueStorage,
+        )
+
         # Should handle invalid paths gracefully
         storage = PersistentQueueStorage("")
         assert len(storage.list_queues()) == 0
@@ -200,28 +262,36 @@ class TestPersistentQueueStorage:
     # Test Case: Empty queue handling
     def test_empty_queue_storage(self, temp_storage_path: str) -> None:
         """Test storing and retrieving empty queues."""
-        from retromcp.infrastructure.persistent_queue_storage import PersistentQueueStorage
+        from retromcp.infrastructure.persistent_queue_storage import (
+            PersistentQueueStorage,
+        )
+
         storage = PersistentQueueStorage(temp_storage_path)
-        
+
         empty_queue = CommandQueue(id="empty", name="Empty Queue")
-        
+
         result = storage.create_queue(empty_queue.id, empty_queue)
         assert result.is_success()
-        
+
         retrieved = storage.get_queue(empty_queue.id)
         assert retrieved is not None
         assert len(retrieved.commands) == 0
 
     # Test Case: Duplicate queue ID handling
-    def test_duplicate_queue_id_handling(self, temp_storage_path: str, sample_queue: CommandQueue) -> None:
+    def test_duplicate_queue_id_handling(
+        self, temp_storage_path: str, sample_queue: CommandQueue
+    ) -> None:
         """Test handling of duplicate queue IDs."""
-        from retromcp.infrastructure.persistent_queue_storage import PersistentQueueStorage
+        from retromcp.infrastructure.persistent_queue_storage import (
+            PersistentQueueStorage,
+        )
+
         storage = PersistentQueueStorage(temp_storage_path)
-        
+
         # Create queue twice with same ID
         result1 = storage.create_queue(sample_queue.id, sample_queue)
         result2 = storage.create_queue(sample_queue.id, sample_queue)
-        
+
         # Should handle duplicate appropriately (update existing)
         assert result1.is_success()
         assert result2.is_success()
@@ -230,16 +300,22 @@ class TestPersistentQueueStorage:
     # Test Case: Non-existent queue retrieval
     def test_get_nonexistent_queue(self, temp_storage_path: str) -> None:
         """Test retrieving a queue that doesn't exist."""
-        from retromcp.infrastructure.persistent_queue_storage import PersistentQueueStorage
+        from retromcp.infrastructure.persistent_queue_storage import (
+            PersistentQueueStorage,
+        )
+
         storage = PersistentQueueStorage(temp_storage_path)
-        
+
         result = storage.get_queue("nonexistent")
         assert result is None
 
     # Test Case: Delete non-existent queue
     def test_delete_nonexistent_queue(self, temp_storage_path: str) -> None:
         """Test deleting a queue that doesn't exist."""
-        from retromcp.infrastructure.persistent_queue_storage import PersistentQueueStorage
+        from retromcp.infrastructure.persistent_queue_storage import (
+            PersistentQueueStorage,
+        )
+
         storage = PersistentQueueStorage(temp_storage_path)
 
         result = storage.delete_queue("nonexistent")
@@ -247,9 +323,14 @@ class TestPersistentQueueStorage:
         assert result.error_value.code == "QUEUE_NOT_FOUND"
 
     # Test Case: Update queue functionality
-    def test_update_queue_success(self, temp_storage_path: str, sample_queue: CommandQueue) -> None:
+    def test_update_queue_success(
+        self, temp_storage_path: str, sample_queue: CommandQueue
+    ) -> None:
         """Test updating an existing queue."""
-        from retromcp.infrastructure.persistent_queue_storage import PersistentQueueStorage
+        from retromcp.infrastructure.persistent_queue_storage import (
+            PersistentQueueStorage,
+        )
+
         storage = PersistentQueueStorage(temp_storage_path)
 
         # Create queue
@@ -267,9 +348,14 @@ class TestPersistentQueueStorage:
         assert len(retrieved.commands) == 3
 
     # Test Case: Update non-existent queue
-    def test_update_nonexistent_queue(self, temp_storage_path: str, sample_queue: CommandQueue) -> None:
+    def test_update_nonexistent_queue(
+        self, temp_storage_path: str, sample_queue: CommandQueue
+    ) -> None:
         """Test updating a queue that doesn't exist."""
-        from retromcp.infrastructure.persistent_queue_storage import PersistentQueueStorage
+        from retromcp.infrastructure.persistent_queue_storage import (
+            PersistentQueueStorage,
+        )
+
         storage = PersistentQueueStorage(temp_storage_path)
 
         result = storage.update_queue("nonexistent", sample_queue)
@@ -277,9 +363,14 @@ class TestPersistentQueueStorage:
         assert result.error_value.code == "QUEUE_NOT_FOUND"
 
     # Test Case: Update queue with save failure and rollback
-    def test_update_queue_save_failure_rollback(self, temp_storage_path: str, sample_queue: CommandQueue) -> None:
+    def test_update_queue_save_failure_rollback(
+        self, temp_storage_path: str, sample_queue: CommandQueue
+    ) -> None:
         """Test that update queue rolls back on save failure."""
-        from retromcp.infrastructure.persistent_queue_storage import PersistentQueueStorage
+        from retromcp.infrastructure.persistent_queue_storage import (
+            PersistentQueueStorage,
+        )
+
         storage = PersistentQueueStorage(temp_storage_path)
 
         # Create initial queue
@@ -291,7 +382,7 @@ class TestPersistentQueueStorage:
         modified_queue.add_command("new cmd", "New")
 
         # Mock _save_queues to fail
-        with patch.object(storage, '_save_queues') as mock_save:
+        with patch.object(storage, "_save_queues") as mock_save:
             mock_save.return_value = Result.error(
                 ValidationError(code="SAVE_FAILED", message="Save failed")
             )
@@ -307,16 +398,21 @@ class TestPersistentQueueStorage:
             assert len(current_queue.commands) == original_command_count
 
     # Test Case: Delete queue with save failure and rollback
-    def test_delete_queue_save_failure_rollback(self, temp_storage_path: str, sample_queue: CommandQueue) -> None:
+    def test_delete_queue_save_failure_rollback(
+        self, temp_storage_path: str, sample_queue: CommandQueue
+    ) -> None:
         """Test that delete queue rolls back on save failure."""
-        from retromcp.infrastructure.persistent_queue_storage import PersistentQueueStorage
+        from retromcp.infrastructure.persistent_queue_storage import (
+            PersistentQueueStorage,
+        )
+
         storage = PersistentQueueStorage(temp_storage_path)
 
         # Create queue
         storage.create_queue(sample_queue.id, sample_queue)
 
         # Mock _save_queues to fail
-        with patch.object(storage, '_save_queues') as mock_save:
+        with patch.object(storage, "_save_queues") as mock_save:
             mock_save.return_value = Result.error(
                 ValidationError(code="SAVE_FAILED", message="Save failed")
             )
@@ -333,7 +429,9 @@ class TestPersistentQueueStorage:
     # Test Case: Load queues with valid data structure
     def test_load_queues_with_valid_data(self, temp_storage_path: str) -> None:
         """Test loading queues from file with valid data structure."""
-        from retromcp.infrastructure.persistent_queue_storage import PersistentQueueStorage
+        from retromcp.infrastructure.persistent_queue_storage import (
+            PersistentQueueStorage,
+        )
 
         # Create valid queue data
         valid_data = {
@@ -349,18 +447,18 @@ class TestPersistentQueueStorage:
                         "result": None,
                         "error": None,
                         "start_time": None,
-                        "end_time": None
+                        "end_time": None,
                     }
                 ],
                 "current_index": 0,
                 "auto_execute": False,
                 "pause_between": 2,
-                "created_at": "2024-01-01T00:00:00"
+                "created_at": "2024-01-01T00:00:00",
             }
         }
 
         # Write valid data to file
-        with open(temp_storage_path, 'w') as f:
+        with open(temp_storage_path, "w") as f:
             json.dump(valid_data, f)
 
         # Load storage - should successfully deserialize
@@ -374,9 +472,13 @@ class TestPersistentQueueStorage:
         assert len(queue.commands) == 1
 
     # Test Case: Deserialize queue with invalid type for current_index
-    def test_deserialize_queue_invalid_current_index_type(self, temp_storage_path: str) -> None:
+    def test_deserialize_queue_invalid_current_index_type(
+        self, temp_storage_path: str
+    ) -> None:
         """Test deserializing queue with invalid current_index type."""
-        from retromcp.infrastructure.persistent_queue_storage import PersistentQueueStorage
+        from retromcp.infrastructure.persistent_queue_storage import (
+            PersistentQueueStorage,
+        )
 
         invalid_data = {
             "bad_queue": {
@@ -386,11 +488,11 @@ class TestPersistentQueueStorage:
                 "current_index": "not_a_number",  # Invalid type
                 "auto_execute": False,
                 "pause_between": 2,
-                "created_at": "2024-01-01T00:00:00"
+                "created_at": "2024-01-01T00:00:00",
             }
         }
 
-        with open(temp_storage_path, 'w') as f:
+        with open(temp_storage_path, "w") as f:
             json.dump(invalid_data, f)
 
         storage = PersistentQueueStorage(temp_storage_path)
@@ -399,9 +501,13 @@ class TestPersistentQueueStorage:
         assert len(storage.list_queues()) == 0
 
     # Test Case: Deserialize queue with invalid type for pause_between
-    def test_deserialize_queue_invalid_pause_between_type(self, temp_storage_path: str) -> None:
+    def test_deserialize_queue_invalid_pause_between_type(
+        self, temp_storage_path: str
+    ) -> None:
         """Test deserializing queue with invalid pause_between type."""
-        from retromcp.infrastructure.persistent_queue_storage import PersistentQueueStorage
+        from retromcp.infrastructure.persistent_queue_storage import (
+            PersistentQueueStorage,
+        )
 
         invalid_data = {
             "bad_queue": {
@@ -411,11 +517,11 @@ class TestPersistentQueueStorage:
                 "current_index": 0,
                 "auto_execute": False,
                 "pause_between": "not_a_number",  # Invalid type
-                "created_at": "2024-01-01T00:00:00"
+                "created_at": "2024-01-01T00:00:00",
             }
         }
 
-        with open(temp_storage_path, 'w') as f:
+        with open(temp_storage_path, "w") as f:
             json.dump(invalid_data, f)
 
         storage = PersistentQueueStorage(temp_storage_path)
@@ -424,9 +530,13 @@ class TestPersistentQueueStorage:
         assert len(storage.list_queues()) == 0
 
     # Test Case: Deserialize queue with invalid auto_execute type
-    def test_deserialize_queue_invalid_auto_execute_type(self, temp_storage_path: str) -> None:
+    def test_deserialize_queue_invalid_auto_execute_type(
+        self, temp_storage_path: str
+    ) -> None:
         """Test deserializing queue with invalid auto_execute type."""
-        from retromcp.infrastructure.persistent_queue_storage import PersistentQueueStorage
+        from retromcp.infrastructure.persistent_queue_storage import (
+            PersistentQueueStorage,
+        )
 
         invalid_data = {
             "bad_queue": {
@@ -436,11 +546,11 @@ class TestPersistentQueueStorage:
                 "current_index": 0,
                 "auto_execute": "not_a_bool",  # Invalid type
                 "pause_between": 2,
-                "created_at": "2024-01-01T00:00:00"
+                "created_at": "2024-01-01T00:00:00",
             }
         }
 
-        with open(temp_storage_path, 'w') as f:
+        with open(temp_storage_path, "w") as f:
             json.dump(invalid_data, f)
 
         storage = PersistentQueueStorage(temp_storage_path)
@@ -449,9 +559,13 @@ class TestPersistentQueueStorage:
         assert len(storage.list_queues()) == 0
 
     # Test Case: Deserialize queue with invalid created_at format
-    def test_deserialize_queue_invalid_created_at_format(self, temp_storage_path: str) -> None:
+    def test_deserialize_queue_invalid_created_at_format(
+        self, temp_storage_path: str
+    ) -> None:
         """Test deserializing queue with invalid created_at timestamp."""
-        from retromcp.infrastructure.persistent_queue_storage import PersistentQueueStorage
+        from retromcp.infrastructure.persistent_queue_storage import (
+            PersistentQueueStorage,
+        )
 
         invalid_data = {
             "test_queue": {
@@ -461,11 +575,11 @@ class TestPersistentQueueStorage:
                 "current_index": 0,
                 "auto_execute": False,
                 "pause_between": 2,
-                "created_at": "not_a_valid_timestamp"
+                "created_at": "not_a_valid_timestamp",
             }
         }
 
-        with open(temp_storage_path, 'w') as f:
+        with open(temp_storage_path, "w") as f:
             json.dump(invalid_data, f)
 
         storage = PersistentQueueStorage(temp_storage_path)
@@ -477,9 +591,14 @@ class TestPersistentQueueStorage:
         # created_at should be set to current time as fallback
 
     # Test Case: Update queue with exception during save
-    def test_update_queue_exception_during_save(self, temp_storage_path: str, sample_queue: CommandQueue) -> None:
+    def test_update_queue_exception_during_save(
+        self, temp_storage_path: str, sample_queue: CommandQueue
+    ) -> None:
         """Test update queue handles exceptions during save."""
-        from retromcp.infrastructure.persistent_queue_storage import PersistentQueueStorage
+        from retromcp.infrastructure.persistent_queue_storage import (
+            PersistentQueueStorage,
+        )
+
         storage = PersistentQueueStorage(temp_storage_path)
 
         # Create initial queue
@@ -491,7 +610,7 @@ class TestPersistentQueueStorage:
         modified_queue.add_command("new cmd", "New")
 
         # Mock _save_queues to raise exception
-        with patch.object(storage, '_save_queues') as mock_save:
+        with patch.object(storage, "_save_queues") as mock_save:
             mock_save.side_effect = Exception("Unexpected error")
 
             result = storage.update_queue(sample_queue.id, modified_queue)
@@ -503,4 +622,189 @@ class TestPersistentQueueStorage:
             # Verify rollback occurred
             current_queue = storage.get_queue(sample_queue.id)
             assert current_queue is not None
-            assert len(current_queue.commands) == original_command_count
\ No newline at end of file
+            assert len(current_queue.commands) == original_command_count
+
+
+class TestPersistentQueueStorageJournal:
+    """Test the append-only journal, replay and compaction."""
+
+    @pytest.fixture
+    def temp_storage_path(self) -> str:
+        """Provide temporary storage path for testing."""
+        temp_dir = tempfile.mkdtemp()
+        return str(Path(temp_dir) / "test_queues.json")
+
+    @pytest.fixture
+    def queue(self) -> CommandQueue:
+        """Provide a queue with three commands."""
+        queue = CommandQueue(id="q1", name="Setup")
+        for i in range(3):
+            queue.add_command(f"echo {i}", f"Step {i}")
+        return queue
+
+    def _journal(self, path: str) -> list:
+        with open(path + ".journal") as f:
+            return [json.loads(line) for line in f]
+
+    def test_status_change_appends_only_changed_records(
+        self, temp_storage_path: str, queue: CommandQueue
+    ) -> None:
+        """Test that one step writes the changed command and index, not everything."""
+        from retromcp.infrastructure.persistent_queue_storage import (
+            PersistentQueueStorage,
+        )
+
+        storage = PersistentQueueStorage(temp_storage_path)
+        storage.create_queue(queue.id, queue)
+
+        with patch.object(storage, "_write_snapshot") as mock_snapshot:
+            queue.commands[0].status = CommandStatus.COMPLETED
+            queue.commands[0].result = {"exit_code": 0, "stdout": "0", "stderr": ""}
+            queue.current_index = 1
+            assert storage.update_queue(queue.id, queue).is_success()
+
+            # Nothing changed - nothing written
+            assert storage.update_queue(queue.id, queue).is_success()
+
+        mock_snapshot.assert_not_called()
+        records = self._journal(temp_storage_path)
+        assert [record["op"] for record in records] == ["command", "queue"]
+        assert records[0]["command"]["id"] == queue.commands[0].id
+        assert records[1]["fields"] == {"current_index": 1}
+
+    def test_reload_replays_journal_over_snapshot(
+        self, temp_storage_path: str, queue: CommandQueue
+    ) -> None:
+        """Test that a new instance sees every journaled transition."""
+        from retromcp.infrastructure.persistent_queue_storage import (
+            PersistentQueueStorage,
+        )
+
+        storage = PersistentQueueStorage(temp_storage_path)
+        storage.create_queue(queue.id, queue)  # First save writes the snapshot
+        other = CommandQueue(id="q2", name="Other")
+        storage.create_queue(other.id, other)
+
+        queue.commands[0].status = CommandStatus.FAILED
+        queue.commands[0].error = "boom"
+        queue.add_command("echo 3", "Step 3")
+        storage.update_queue(queue.id, queue)
+        storage.delete_queue(other.id)
+        # A torn final record from a crash mid-append is ignored
+        with open(temp_storage_path + ".journal", "a") as f:
+            f.write('{"op": "command", "queue_id": "q1", "comm')
+
+        reloaded = PersistentQueueStorage(temp_storage_path)
+
+        assert reloaded.list_queues() == ["q1"]
+        loaded = reloaded.get_queue("q1")
+        assert [cmd.description for cmd in loaded.commands] == [
+            "Step 0",
+            "Step 1",
+            "Step 2",
+            "Step 3",
+        ]
+        assert loaded.commands[0].status == CommandStatus.FAILED
+        assert loaded.commands[0].error == "boom"
+
+        # The damaged journal is folded into a fresh snapshot on the next save
+        loaded.current_index = 1
+        assert reloaded.update_queue("q1", loaded).is_success()
+        assert Path(temp_storage_path + ".journal").read_text() == ""
+        with open(temp_storage_path) as f:
+            assert json.load(f)["q1"]["current_index"] == 1
+
+    def test_journal_compacts_once_larger_than_snapshot(
+        self, temp_storage_path: str, queue: CommandQueue
+    ) -> None:
+        """Test periodic compaction into a new snapshot."""
+        from retromcp.infrastructure import persistent_queue_storage as module
+
+        storage = module.PersistentQueueStorage(temp_storage_path)
+        storage.create_queue(queue.id, queue)
+
+        with patch.object(module, "COMPACT_MIN_BYTES", 1024):
+            for i in range(50):
+                queue.commands[0].result = {"stdout": "x" * 100, "run": i}
+                storage.update_queue(queue.id, queue)
+                assert (
+                    storage._journal_bytes <= max(1024, storage._snapshot_bytes) + 512
+                )
+
+        reloaded = module.PersistentQueueStorage(temp_storage_path)
+        assert reloaded.get_queue("q1").commands[0].result["run"] == 49
+
+    def test_journal_without_snapshot_is_not_replayed(
+        self, temp_storage_path: str, queue: CommandQueue
+    ) -> None:
+        """Test that removing the snapshot resets storage."""
+        from retromcp.infrastructure.persistent_queue_storage import (
+            PersistentQueueStorage,
+        )
+
+        storage = PersistentQueueStorage(temp_storage_path)
+        storage.create_queue(queue.id, queue)
+        queue.current_index = 2
+        storage.update_queue(queue.id, queue)
+
+        Path(temp_storage_path).unlink()
+
+        assert PersistentQueueStorage(temp_storage_path).list_queues() == []
+
+
+class TestPersistentQueueStorageLazyLoading:
+    """Test deferred loading and shared access."""
+
+    @pytest.fixture
+    def temp_storage_path(self) -> str:
+        """Provide a storage path holding two queues."""
+        from retromcp.infrastructure.persistent_queue_storage import (
+            PersistentQueueStorage,
+        )
+
+        path = str(Path(tempfile.mkdtemp()) / "test_queues.json")
+        storage = PersistentQueueStorage(path)
+        for queue_id in ("q1", "q2"):
+            queue = CommandQueue(id=queue_id, name=queue_id)
+            queue.add_command("echo 1", "Step")
+            storage.create_queue(queue_id, queue)
+        return path
+
+    def test_reads_on_first_use_and_deserializes_per_queue(
+        self, temp_storage_path: str
+    ) -> None:
+        """Test that construction reads nothing and get_queue builds one queue."""
+        from retromcp.infrastructure.persistent_queue_storage import (
+            PersistentQueueStorage,
+        )
+
+        with patch("builtins.open", side_effect=AssertionError("read too early")):
+            storage = PersistentQueueStorage(temp_storage_path)
+
+        assert storage.get_queue("q2").name == "q2"
+        assert list(storage.queues) == ["q2"]
+        assert storage.summarize_queues()[0].id == "q1"
+        assert list(storage.queues) == ["q2", "q1"]
+
+    def test_concurrent_updates_from_threads(self, temp_storage_path: str) -> None:
+        """Test that handlers on several threads can share one instance."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        from retromcp.infrastructure.persistent_queue_storage import (
+            PersistentQueueStorage,
+        )
+
+        storage = PersistentQueueStorage(temp_storage_path)
+
+        def add(i: int) -> bool:
+            queue = storage.get_queue(f"q{i % 2 + 1}")
+            with storage._lock:
+                queue.add_command(f"echo {i}", f"Step {i}")
+                return storage.update_queue(queue.id, queue).is_success()
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            assert all(executor.map(add, range(40)))
+
+        reloaded = PersistentQueueStorage(temp_storage_path)
+        assert len(reloaded.get_queue("q1").commands) == 21
+        assert len(reloaded.get_queue("q2").commands) == 21
@@ -0,0 +1,189 @@
+"""Unit tests for SQLiteQueueStorage."""
+
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+from retromcp.domain.models import CommandQueue
+from retromcp.domain.models import CommandStatus
+from retromcp.infrastructure.sqlite_queue_storage import SQLiteQueueStorage
+
+
+def _queue(queue_id: str, commands: int = 2) -> CommandQueue:
+    queue = CommandQueue(id=queue_id, name=f"Queue {queue_id}")
+    for i in range(commands):
+        queue.add_command(f"echo {i}", f"Step {i}")
+    return queue
+
+
+def _finish(queue: CommandQueue) -> None:
+    for cmd in queue.commands:
+        cmd.status = CommandStatus.COMPLETED
+    queue.current_index = len(queue.commands)
+
+
+class TestSQLiteQueueStorage:
+    """Test the SQLite queue backend."""
+
+    @pytest.fixture
+    def database_path(self) -> str:
+        """Provide a temporary database path."""
+        return str(Path(tempfile.mkdtemp()) / "queues.db")
+
+    def test_round_trip_with_separate_output(self, database_path: str) -> None:
+        """Test that a new instance loads queues, commands and output."""
+        storage = SQLiteQueueStorage(database_path)
+        queue = _queue("q1")
+        storage.create_queue("q1", queue)
+
+        cmd = queue.commands[0]
+        cmd.status = CommandStatus.COMPLETED
+        cmd.result = {"exit_code": 0, "stdout": "0", "stderr": ""}
+        queue.current_index = 1
+        assert storage.update_queue("q1", queue).is_success()
+        storage.close()
+
+        reloaded = SQLiteQueueStorage(database_path)
+        loaded = reloaded.get_queue("q1")
+
+        assert reloaded.get_queue("missing") is None
+        assert loaded.current_index == 1
+        assert [c.status for c in loaded.commands] == [
+            CommandStatus.COMPLETED,
+            CommandStatus.PENDING,
+        ]
+        assert loaded.commands[0].result == cmd.result
+        assert loaded.commands[1].result is None
+        # Repeated lookups share the loaded queue
+        assert reloaded.get_queue("q1") is loaded
+
+        conn = sqlite3.connect(database_path)
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("SELECT COUNT(*) FROM command_outputs").fetchone() == (1,)
+
+    def test_dependencies_round_trip_and_old_schema(self, database_path: str) -> None:
+        """Test dependencies persist, including in databases created without them."""
+        conn = sqlite3.connect(database_path)
+        conn.executescript(
+            "CREATE TABLE commands (queue_id TEXT NOT NULL, position INTEGER NOT NULL,"
+            " id TEXT NOT NULL, command TEXT NOT NULL, description TEXT NOT NULL,"
+            " status TEXT NOT NULL, error TEXT, start_time TEXT, end_time TEXT,"
+            " PRIMARY KEY (queue_id, position));"
+        )
+        conn.close()
+
+        storage = SQLiteQueueStorage(database_path)
+        queue = _queue("q1")
+        queue.add_command("echo 2", "Step 2", depends_on=["q1_0", "q1_1"])
+        queue.trusted = True
+        assert storage.create_queue("q1", queue).is_success()
+        storage.close()
+
+        loaded = SQLiteQueueStorage(database_path).get_queue("q1")
+        assert loaded.trusted
+        assert [cmd.depends_on for cmd in loaded.commands] == [
+            [],
+            [],
+            ["q1_0", "q1_1"],
+        ]
+
+    def test_update_writes_only_changed_rows(self, database_path: str) -> None:
+        """Test that unchanged commands are not rewritten."""
+        storage = SQLiteQueueStorage(database_path)
+        queue = _queue("q1", commands=3)
+        storage.create_queue("q1", queue)
+        statements = []
+        storage._conn.set_trace_callback(statements.append)
+
+        queue.commands[1].status = CommandStatus.FAILED
+        queue.commands[1].error = "boom"
+        storage.update_queue("q1", queue)
+
+        command_writes = [s for s in statements if s.startswith("INSERT INTO commands")]
+        assert len(command_writes) == 1
+        assert "'boom'" in command_writes[0]
+        assert not any(s.startswith("UPDATE queues") for s in statements)
+
+    def test_summaries_come_from_one_query(self, database_path: str) -> None:
+        """Test that summaries do not load commands or output."""
+        storage = SQLiteQueueStorage(database_path)
+        first = _queue("q1", commands=3)
+        first.commands[0].status = CommandStatus.COMPLETED
+        storage.create_queue("q1", first)
+        storage.create_queue("q2", _queue("q2", commands=0))
+        storage.close()
+
+        reloaded = SQLiteQueueStorage(database_path)
+        summaries = reloaded.summarize_queues()
+
+        assert [(s.id, s.name, s.completed, s.total) for s in summaries] == [
+            ("q1", "Queue q1", 1, 3),
+            ("q2", "Queue q2", 0, 0),
+        ]
+        assert reloaded._queues == {}
+
+    def test_finished_queues_are_evicted(self, database_path: str) -> None:
+        """Test the count and age retention limits."""
+        storage = SQLiteQueueStorage(database_path, max_finished_queues=2)
+        for i in range(1, 5):
+            queue = _queue(f"q{i}")
+            storage.create_queue(queue.id, queue)
+            if i < 4:
+                _finish(queue)
+                storage.update_queue(queue.id, queue)
+                time.sleep(0.01)
+
+        storage.create_queue("q5", _queue("q5"))
+
+        # q1 is the oldest finished queue; q4 and q5 are still running
+        assert storage.list_queues() == ["q2", "q3", "q4", "q5"]
+        assert storage.get_queue("q1") is None
+
+        storage.retention_days = 0
+        assert sorted(storage.evict_finished_queues()) == ["q2", "q3"]
+        assert storage.list_queues() == ["q4", "q5"]
+
+    def test_queue_ids_not_reused_after_eviction(self, database_path: str) -> None:
+        """Test that the ID counter survives evicting every queue and reopening."""
+        storage = SQLiteQueueStorage(database_path, retention_days=0)
+        for _ in range(3):
+            queue_id = storage.next_queue_id().value
+            queue = _queue(queue_id)
+            _finish(queue)
+            storage.create_queue(queue_id, queue)
+
+        assert storage.list_queues() == []
+        assert storage.next_queue_id().value == "q4"
+        storage.close()
+
+        reopened = SQLiteQueueStorage(database_path)
+        reopened.create_queue("q9", _queue("q9"))
+        assert reopened.next_queue_id().value == "q10"
+        assert SQLiteQueueStorage(
+            "/proc/retromcp/queues.db"
+        ).next_queue_id().error_value.code == ("STORAGE_SAVE_FAILED")
+
+    def test_delete_and_missing_queues(self, database_path: str) -> None:
+        """Test delete and not-found errors."""
+        storage = SQLiteQueueStorage(database_path)
+        storage.create_queue("q1", _queue("q1"))
+
+        assert storage.delete_queue("q1").is_success()
+        assert storage.list_queues() == []
+        assert storage.delete_queue("q1").error_value.code == "QUEUE_NOT_FOUND"
+        result = storage.update_queue("q1", _queue("q1"))
+        assert result.error_value.code == "QUEUE_NOT_FOUND"
+        assert storage.create_queue(" ", _queue("x")).is_error()
+
+    def test_unavailable_database(self) -> None:
+        """Test that an unusable path degrades to errors, not exceptions."""
+        storage = SQLiteQueueStorage("/proc/retromcp/queues.db")
+
+        assert storage.list_queues() == []
+        assert storage.summarize_queues() == []
+        assert storage.get_queue("q1") is None
+        result = storage.create_queue("q1", _queue("q1"))
+        assert result.error_value.code == "STORAGE_SAVE_FAILED"
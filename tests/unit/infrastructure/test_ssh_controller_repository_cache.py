@@ -11,6 +11,48 @@ from retromcp.domain.models import ControllerType
 from retromcp.domain.ports import RetroPieClient
 from retromcp.infrastructure.cache_system import SystemCache
 from retromcp.infrastructure.ssh_controller_repository import SSHControllerRepository
+from retromcp.infrastructure.ssh_controller_repository import parse_input_devices
+
+XBOX_DEVICE = """I: Bus=0003 Vendor=045e Product=028e Version=0114
+N: Name="Microsoft Xbox 360 pad"
+P: Phys=usb-3f980000.usb-1.3/input0
+S: Sysfs=/devices/platform/soc/3f980000.usb/usb1/1-1/1-1.3/input/input2
+U: Uniq=
+H: Handlers=event2 js0
+B: EV=20000b
+"""
+
+PS4_DEVICE = """I: Bus=0003 Vendor=054c Product=09cc Version=8111
+N: Name="Sony PLAYSTATION(R)4 Wireless Controller"
+P: Phys=usb-3f980000.usb-1.2/input3
+S: Sysfs=/devices/platform/soc/3f980000.usb/usb1/1-1/1-1.2/input/input3
+U: Uniq=
+H: Handlers=event3 js0
+B: EV=1b
+"""
+
+KEYBOARD_DEVICE = """I: Bus=0003 Vendor=046d Product=c31c Version=0110
+N: Name="Logitech USB Keyboard"
+P: Phys=usb-3f980000.usb-1.4/input0
+S: Sysfs=/devices/platform/soc/3f980000.usb/usb1/1-1/1-1.4/input/input0
+U: Uniq=
+H: Handlers=sysrq kbd leds event0
+B: EV=120013
+"""
+
+
+def _detect_result(devices: str, probes: str = "", config: str = "") -> CommandResult:
+    """Build the combined output of the single detection command."""
+    return CommandResult(
+        command="cat /proc/bus/input/devices",
+        exit_code=0,
+        stdout=(
+            f"{devices}\n@@retromcp-probes@@\n{probes}\n@@retromcp-config@@\n{config}\n"
+        ),
+        stderr="",
+        success=True,
+        execution_time=0.1,
+    )
 
 
 class TestSSHControllerRepositoryCache:
@@ -25,48 +67,9 @@ class TestSSHControllerRepositoryCache:
     def test_detect_controllers_caches_result_on_first_call(self):
         """Test that detect_controllers caches the result on first call."""
         # Arrange
-        self.mock_client.execute_command.side_effect = [
-            CommandResult(
-                command="ls -la /dev/input/js* 2>/dev/null",
-                exit_code=0,
-                stdout="crw-rw---- 1 root input 13, 0 Jul 19 17:00 /dev/input/js0",
-                stderr="",
-                success=True,
-                execution_time=0.1,
-            ),
-            CommandResult(
-                command="lsusb",
-                exit_code=0,
-                stdout="Bus 001 Device 002: ID 045e:028e Microsoft Corp. Xbox360 Controller",
-                stderr="",
-                success=True,
-                execution_time=0.1,
-            ),
-            CommandResult(
-                command="cat /proc/bus/input/devices | grep -B 5 js0 | grep Name | head -1",
-                exit_code=0,
-                stdout='N: Name="Microsoft Xbox 360 pad"',
-                stderr="",
-                success=True,
-                execution_time=0.1,
-            ),
-            CommandResult(
-                command="grep -q 'input_device.*Microsoft Xbox 360 pad' /opt/retropie/configs/all/retroarch.cfg",
-                exit_code=0,
-                stdout="",
-                stderr="",
-                success=True,
-                execution_time=0.1,
-            ),
-            CommandResult(
-                command="lsmod | grep -q xpad",
-                exit_code=0,
-                stdout="",
-                stderr="",
-                success=True,
-                execution_time=0.1,
-            ),
-        ]
+        self.mock_client.execute_command.return_value = _detect_result(
+            XBOX_DEVICE, probes="xpad", config='input_device = "Microsoft Xbox 360 pad"'
+        )
 
         # Act - First call
         result = self.repository.detect_controllers()
@@ -78,8 +81,8 @@ class TestSSHControllerRepositoryCache:
         assert result[0].controller_type == ControllerType.XBOX
         assert self.cache.get_hardware_scan() is not None
 
-        # Verify client was called for controller detection commands
-        assert self.mock_client.execute_command.call_count == 5
+        # Verify detection took a single round trip
+        assert self.mock_client.execute_command.call_count == 1
 
     def test_detect_controllers_returns_cached_result_on_second_call(self):
         """Test that detect_controllers returns cached result without SSH calls."""
@@ -129,48 +132,7 @@ class TestSSHControllerRepositoryCache:
         self.cache.cache_hardware_scan({"controllers": cached_controllers})
 
         # Fresh data from SSH
-        self.mock_client.execute_command.side_effect = [
-            CommandResult(
-                command="ls -la /dev/input/js* 2>/dev/null",
-                exit_code=0,
-                stdout="crw-rw---- 1 root input 13, 0 Jul 19 17:00 /dev/input/js0",
-                stderr="",
-                success=True,
-                execution_time=0.1,
-            ),
-            CommandResult(
-                command="lsusb",
-                exit_code=0,
-                stdout="Bus 001 Device 003: ID 054c:09cc Sony Corp. DualShock 4 Wireless Controller",
-                stderr="",
-                success=True,
-                execution_time=0.1,
-            ),
-            CommandResult(
-                command="cat /proc/bus/input/devices | grep -B 5 js0 | grep Name | head -1",
-                exit_code=0,
-                stdout='N: Name="Sony PLAYSTATION(R)4 Wireless Controller"',
-                stderr="",
-                success=True,
-                execution_time=0.1,
-            ),
-            CommandResult(
-                command="grep -q 'input_device.*Sony PLAYSTATION(R)4 Wireless Controller' /opt/retropie/configs/all/retroarch.cfg",
-                exit_code=1,
-                stdout="",
-                stderr="",
-                success=False,
-                execution_time=0.1,
-            ),
-            CommandResult(
-                command="which ds4drv",
-                exit_code=1,
-                stdout="",
-                stderr="",
-                success=False,
-                execution_time=0.1,
-            ),
-        ]
+        self.mock_client.execute_command.return_value = _detect_result(PS4_DEVICE)
 
         # Act
         result = self.repository.detect_controllers()
@@ -180,7 +142,8 @@ class TestSSHControllerRepositoryCache:
         assert result[0].name == "Sony PLAYSTATION(R)4 Wireless Controller"
         assert result[0].controller_type == ControllerType.PS4
         assert result[0].driver_required == "ds4drv"
-        assert self.mock_client.execute_command.call_count == 5
+        assert result[0].is_configured is False
+        assert self.mock_client.execute_command.call_count == 1
 
         # Restore original TTL
         self.cache.hardware_scan_ttl = old_ttl
@@ -252,3 +215,58 @@ class TestSSHControllerRepositoryCache:
         assert len(result) == 1
         assert result[0].name == "Shared Controller"
         assert result[0].controller_type == ControllerType.EIGHT_BIT_DO
+
+
+class TestSSHControllerRepositoryDeviceTable:
+    """Test single-fetch controller detection from the input device table."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.mock_client = Mock(spec=RetroPieClient)
+        self.repository = SSHControllerRepository(self.mock_client, SystemCache())
+
+    def test_parse_input_devices_builds_device_table(self):
+        """Test that every device block is parsed with IDs and nodes."""
+        devices = parse_input_devices(KEYBOARD_DEVICE + "\n" + XBOX_DEVICE)
+
+        assert len(devices) == 2
+        keyboard, pad = devices
+        assert keyboard.joystick_node is None
+        assert keyboard.event_nodes == ["/dev/input/event0"]
+        assert pad.name == "Microsoft Xbox 360 pad"
+        assert pad.vendor_id == "045e"
+        assert pad.product_id == "028e"
+        assert pad.joystick_node == "/dev/input/js0"
+        assert pad.event_nodes == ["/dev/input/event2"]
+        assert pad.sysfs.endswith("input2")
+
+    def test_detect_multiple_controllers_in_one_round_trip(self):
+        """Test that several controllers need no extra commands."""
+        second_pad = PS4_DEVICE.replace("event3 js0", "event4 js1")
+        self.mock_client.execute_command.return_value = _detect_result(
+            "\n".join([second_pad, KEYBOARD_DEVICE, XBOX_DEVICE]), probes="ds4drv"
+        )
+
+        controllers = self.repository.detect_controllers()
+
+        assert self.mock_client.execute_command.call_count == 1
+        assert [controller.device_path for controller in controllers] == [
+            "/dev/input/js0",
+            "/dev/input/js1",
+        ]
+        assert controllers[0].driver_required == "xboxdrv"
+        assert controllers[1].vendor_id == "054c"
+        assert controllers[1].driver_required is None
+
+    def test_detect_controllers_returns_empty_list_on_failure(self):
+        """Test that a failed detection command returns no controllers."""
+        self.mock_client.execute_command.return_value = CommandResult(
+            command="cat /proc/bus/input/devices",
+            exit_code=255,
+            stdout="",
+            stderr="Connection lost",
+            success=False,
+            execution_time=0.1,
+        )
+
+        assert self.repository.detect_controllers() == []
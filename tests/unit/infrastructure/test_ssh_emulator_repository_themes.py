@@ -0,0 +1,102 @@
+"""Tests for the theme catalog in SSHEmulatorRepository."""
+
+from unittest.mock import Mock
+
+from retromcp.config import RetroPieConfig
+from retromcp.domain.models import CommandResult
+from retromcp.domain.ports import RetroPieClient
+from retromcp.infrastructure.ssh_emulator_repository import SSHEmulatorRepository
+
+PROBE_OUTPUT = 'mtime 1700000000\n<string name="ThemeSet" value="carbon" />'
+
+CATALOG_OUTPUT = (
+    f"{PROBE_OUTPUT}\n"
+    "@@retromcp-theme-mtimes@@\n"
+    "simple/\t1690000000\n"
+    "carbon/\t1690000500\n"
+    "@@retromcp-theme-sizes@@\n"
+    "2048\tcarbon/\n"
+    "512\tsimple/\n"
+    "@@retromcp-theme-descriptions@@\n"
+    'carbon/theme.xml:  <string name="description">Clean carbon look</string>\n'
+)
+
+
+def _result(command: str, stdout: str, exit_code: int = 0) -> CommandResult:
+    return CommandResult(
+        command=command,
+        exit_code=exit_code,
+        stdout=stdout,
+        stderr="",
+        success=exit_code == 0,
+        execution_time=0.1,
+    )
+
+
+class TestSSHEmulatorRepositoryThemes:
+    """Test single-pass theme catalog and directory mtime caching."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.config = RetroPieConfig(
+            host="test-host",
+            username="test-user",
+            password="test-pass",
+        )
+        self.mock_client = Mock(spec=RetroPieClient)
+        self.repository = SSHEmulatorRepository(self.mock_client, self.config)
+
+    def test_get_themes_builds_catalog_in_one_call(self):
+        """Test that names, sizes, mtimes and descriptions come from one call."""
+        self.mock_client.execute_command.return_value = _result("stat", CATALOG_OUTPUT)
+
+        themes = self.repository.get_themes()
+
+        assert self.mock_client.execute_command.call_count == 1
+        assert [theme.name for theme in themes] == ["carbon", "simple"]
+        carbon, simple = themes
+        assert carbon.active is True
+        assert carbon.size == 2048 * 1024
+        assert carbon.mtime == 1690000500.0
+        assert carbon.description == "Clean carbon look"
+        assert carbon.path == "/etc/emulationstation/themes/carbon"
+        assert simple.active is False
+        assert simple.description is None
+
+    def test_unchanged_directory_reuses_catalog_with_fresh_active_theme(self):
+        """Test that a cache hit costs one probe and re-reads the active theme."""
+        self.mock_client.execute_command.side_effect = [
+            _result("stat", CATALOG_OUTPUT),
+            _result(
+                "stat",
+                'mtime 1700000000\n<string name="ThemeSet" value="simple" />',
+            ),
+        ]
+
+        self.repository.get_themes()
+        themes = self.repository.get_themes()
+
+        assert self.mock_client.execute_command.call_count == 2
+        last_command = self.mock_client.execute_command.call_args[0][0]
+        assert "du -sk" not in last_command
+        assert {theme.name: theme.active for theme in themes} == {
+            "carbon": False,
+            "simple": True,
+        }
+
+    def test_changed_directory_rebuilds_catalog(self):
+        """Test that a new themes directory mtime triggers a rebuild."""
+        updated_output = CATALOG_OUTPUT.replace(
+            "mtime 1700000000", "mtime 1700000900"
+        ).replace("simple/\t1690000000\n", "simple/\t1690000000\nnbba/\t1700000900\n")
+        self.mock_client.execute_command.side_effect = [
+            _result("stat", CATALOG_OUTPUT),
+            _result("stat", PROBE_OUTPUT.replace("1700000000", "1700000900")),
+            _result("stat", updated_output),
+        ]
+
+        self.repository.get_themes()
+        themes = self.repository.get_themes()
+
+        assert self.mock_client.execute_command.call_count == 3
+        assert [theme.name for theme in themes] == ["carbon", "nbba", "simple"]
@@ -0,0 +1,147 @@
+"""Tests for cached state loads in SSHStateRepository."""
+
+import json
+from unittest.mock import Mock
+
+import pytest
+
+from retromcp.config import RetroPieConfig
+from retromcp.discovery import RetroPiePaths
+from retromcp.domain.models import CommandResult
+from retromcp.domain.models import SystemState
+from retromcp.domain.ports import RetroPieClient
+from retromcp.infrastructure.ssh_state_repository import SSHStateRepository
+
+MARKER = "@@retromcp-state-stat@@"
+
+STATE = SystemState(
+    schema_version="2.0",
+    last_updated="2026-05-01T10:00:00",
+    system={"hostname": "retropie"},
+    emulators={"installed": [], "preferred": {}},
+    controllers=[],
+    roms={"systems": [], "counts": {}},
+    custom_configs=[],
+    known_issues=[],
+)
+
+
+def _result(stdout: str, exit_code: int = 0, stderr: str = "") -> CommandResult:
+    return CommandResult(
+        command="stat",
+        exit_code=exit_code,
+        stdout=stdout,
+        stderr=stderr,
+        success=exit_code == 0,
+        execution_time=0.1,
+    )
+
+
+class TestSSHStateRepositoryCache:
+    """Test stat revalidation and single-write updates."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.config = RetroPieConfig(
+            host="test-host",
+            username="test-user",
+            password="test-pass",
+            paths=RetroPiePaths(
+                home_dir="/home/test-user",
+                username="test-user",
+                retropie_dir="/home/test-user/RetroPie",
+                retropie_setup_dir="/home/test-user/RetroPie-Setup",
+                bios_dir="/home/test-user/RetroPie/BIOS",
+                roms_dir="/home/test-user/RetroPie/roms",
+                configs_dir="/opt/retropie/configs",
+                emulators_dir="/opt/retropie/emulators",
+            ),
+        )
+        self.mock_client = Mock(spec=RetroPieClient)
+        self.repository = SSHStateRepository(self.mock_client, self.config)
+
+    def test_unchanged_file_is_not_downloaded_again(self):
+        """Test that a matching stat returns the cached state."""
+        self.mock_client.execute_command.side_effect = [
+            _result(f"{MARKER} 1700000000.250000000 512\n{STATE.to_json()}"),
+            _result(f"{MARKER} 1700000000.250000000 512\n"),
+        ]
+
+        first = self.repository.load_state()
+        second = self.repository.load_state()
+
+        assert second is first
+        revalidate = self.mock_client.execute_command.call_args[0][0]
+        assert "'1700000000.250000000 512'" in revalidate
+
+    def test_changed_file_is_downloaded_and_cached(self):
+        """Test that a new mtime, even within the same second, replaces the cache."""
+        changed = json.loads(STATE.to_json())
+        changed["system"]["hostname"] = "arcade"
+        self.mock_client.execute_command.side_effect = [
+            _result(f"{MARKER} 1700000000.250000000 512\n{STATE.to_json()}"),
+            _result(f"{MARKER} 1700000000.750000000 512\n{json.dumps(changed)}"),
+            _result(f"{MARKER} 1700000000.750000000 512\n"),
+        ]
+
+        self.repository.load_state()
+        updated = self.repository.load_state()
+
+        assert updated.system["hostname"] == "arcade"
+        assert self.repository.load_state() is updated
+
+    def test_update_with_cached_state_is_one_write(self):
+        """Test that update writes against the cached fingerprint only."""
+        self.mock_client.execute_command.side_effect = [
+            _result(f"{MARKER} 1700000000.250000000 512\n{STATE.to_json()}"),
+            _result(f"{MARKER} 1700000400.250000000 516\n"),
+        ]
+        self.repository.load_state()
+
+        result = self.repository.update_state_field("system.hostname", "arcade")
+
+        assert result.success is True
+        assert self.mock_client.execute_command.call_count == 2
+        write = self.mock_client.execute_command.call_args[0][0]
+        assert "= '1700000000.250000000 512' ] || exit 3" in write
+        assert '"hostname": "arcade"' in write
+        # The written state is cached under its new fingerprint
+        self.mock_client.execute_command.side_effect = [
+            _result(f"{MARKER} 1700000400.250000000 516\n")
+        ]
+        assert self.repository.load_state().system["hostname"] == "arcade"
+
+    def test_update_reloads_when_file_changed_underneath(self):
+        """Test that a failed precondition re-reads and reapplies the update."""
+        external = json.loads(STATE.to_json())
+        external["known_issues"] = ["edited elsewhere"]
+        self.mock_client.execute_command.side_effect = [
+            _result(f"{MARKER} 1700000000.250000000 512\n{STATE.to_json()}"),
+            _result("", exit_code=3),
+            _result(f"{MARKER} 1700000500.250000000 540\n{json.dumps(external)}"),
+            _result(f"{MARKER} 1700000600.250000000 542\n"),
+        ]
+        self.repository.load_state()
+
+        result = self.repository.update_state_field("system.hostname", "arcade")
+
+        assert result.success is True
+        write = self.mock_client.execute_command.call_args[0][0]
+        assert "= '1700000500.250000000 540' ] || exit 3" in write
+        assert "edited elsewhere" in write
+
+    def test_missing_file_clears_cache(self):
+        """Test that a deleted state file is reported, not served from cache."""
+        self.mock_client.execute_command.side_effect = [
+            _result(f"{MARKER} 1700000000.250000000 512\n{STATE.to_json()}"),
+            _result(
+                "",
+                exit_code=1,
+                stderr="stat: cannot statx: No such file or directory",
+            ),
+        ]
+        self.repository.load_state()
+
+        with pytest.raises(FileNotFoundError):
+            self.repository.load_state()
+        assert self.repository._cached_state is None
@@ -0,0 +1,122 @@
+"""Tests for BIOS inventory and checksum verification in SSHSystemRepository."""
+
+from unittest.mock import Mock
+
+from retromcp.config import RetroPieConfig
+from retromcp.domain.models import CommandResult
+from retromcp.domain.ports import RetroPieClient
+from retromcp.infrastructure.cache_system import SystemCache
+from retromcp.infrastructure.ssh_system_repository import SSHSystemRepository
+
+FIND_OUTPUT = (
+    "/home/test-user/RetroPie/BIOS/scph1001.bin\t524288\t1700000000.0000000000\n"
+    "/home/test-user/RetroPie/BIOS/dc/dc_boot.bin\t2097152\t1700000100.5000000000\n"
+    "/home/test-user/RetroPie/BIOS/mystery.rom\t1024\t1700000200.0000000000"
+)
+
+
+def _result(command: str, stdout: str, exit_code: int = 0) -> CommandResult:
+    return CommandResult(
+        command=command,
+        exit_code=exit_code,
+        stdout=stdout,
+        stderr="",
+        success=exit_code == 0,
+        execution_time=0.1,
+    )
+
+
+class TestSSHSystemRepositoryBios:
+    """Test single-pass BIOS inventory and checksum verification."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.config = RetroPieConfig(
+            host="test-host",
+            username="test-user",
+            password="test-pass",
+        )
+        self.mock_client = Mock(spec=RetroPieClient)
+        self.repository = SSHSystemRepository(
+            self.mock_client, self.config, SystemCache()
+        )
+
+    def test_get_bios_files_uses_single_find_call(self):
+        """Test that sizes come from find -printf without per-file stat calls."""
+        self.mock_client.execute_command.return_value = _result("find", FIND_OUTPUT)
+
+        bios_files = self.repository.get_bios_files()
+
+        assert self.mock_client.execute_command.call_count == 1
+        command = self.mock_client.execute_command.call_args[0][0]
+        assert "-printf" in command
+        assert len(bios_files) == 3
+        by_name = {bios.name: bios for bios in bios_files}
+        assert by_name["scph1001.bin"].size == 524288
+        assert by_name["scph1001.bin"].system == "psx"
+        assert by_name["dc_boot.bin"].system == "dreamcast"
+        assert by_name["mystery.rom"].system == "unknown"
+        assert by_name["scph1001.bin"].checksum is None
+        assert by_name["scph1001.bin"].checksum_valid is None
+
+    def test_get_bios_files_verifies_checksums_against_known_table(self):
+        """Test that checksums are compared with the known-good table."""
+        self.mock_client.execute_command.side_effect = [
+            _result("find", FIND_OUTPUT),
+            _result(
+                "md5sum",
+                "924e392ed05558ffdb115408c263dccf  /home/test-user/RetroPie/BIOS/scph1001.bin\n"
+                "00000000000000000000000000000000  /home/test-user/RetroPie/BIOS/dc/dc_boot.bin\n"
+                "d41d8cd98f00b204e9800998ecf8427e  /home/test-user/RetroPie/BIOS/mystery.rom",
+            ),
+        ]
+
+        bios_files = self.repository.get_bios_files(verify_checksums=True)
+
+        assert self.mock_client.execute_command.call_count == 2
+        by_name = {bios.name: bios for bios in bios_files}
+        assert by_name["scph1001.bin"].checksum_valid is True
+        assert by_name["dc_boot.bin"].checksum_valid is False
+        assert by_name["mystery.rom"].checksum == "d41d8cd98f00b204e9800998ecf8427e"
+        assert by_name["mystery.rom"].checksum_valid is None
+
+    def test_get_bios_files_reuses_checksums_for_unchanged_files(self):
+        """Test that only files with a changed mtime are re-hashed."""
+        changed_output = FIND_OUTPUT.replace(
+            "1700000200.0000000000", "1700009999.0000000000"
+        )
+        self.mock_client.execute_command.side_effect = [
+            _result("find", FIND_OUTPUT),
+            _result(
+                "md5sum",
+                "924e392ed05558ffdb115408c263dccf  /home/test-user/RetroPie/BIOS/scph1001.bin\n"
+                "e10c53c2f8b90bab96ead2d368858623  /home/test-user/RetroPie/BIOS/dc/dc_boot.bin\n"
+                "d41d8cd98f00b204e9800998ecf8427e  /home/test-user/RetroPie/BIOS/mystery.rom",
+            ),
+            _result("find", FIND_OUTPUT),
+            _result("find", changed_output),
+            _result(
+                "md5sum",
+                "0cc175b9c0f1b6a831c399e269772661  /home/test-user/RetroPie/BIOS/mystery.rom",
+            ),
+        ]
+
+        self.repository.get_bios_files(verify_checksums=True)
+        self.repository.get_bios_files(verify_checksums=True)
+        bios_files = self.repository.get_bios_files(verify_checksums=True)
+
+        # find + md5sum, find only (all cached), find + md5sum for one file
+        assert self.mock_client.execute_command.call_count == 5
+        last_hash_command = self.mock_client.execute_command.call_args[0][0]
+        assert "mystery.rom" in last_hash_command
+        assert "scph1001.bin" not in last_hash_command
+        by_name = {bios.name: bios for bios in bios_files}
+        assert by_name["mystery.rom"].checksum == "0cc175b9c0f1b6a831c399e269772661"
+        assert by_name["dc_boot.bin"].checksum_valid is True
+
+    def test_get_bios_files_returns_empty_list_when_find_fails(self):
+        """Test that a failed find returns no BIOS files."""
+        self.mock_client.execute_command.return_value = _result("find", "", 1)
+
+        assert self.repository.get_bios_files(verify_checksums=True) == []
+        assert self.mock_client.execute_command.call_count == 1
@@ -0,0 +1,103 @@
+"""Tests for the installed-package index in SSHSystemRepository."""
+
+from unittest.mock import Mock
+
+from retromcp.config import RetroPieConfig
+from retromcp.domain.models import CommandResult
+from retromcp.domain.ports import RetroPieClient
+from retromcp.infrastructure.cache_system import SystemCache
+from retromcp.infrastructure.ssh_system_repository import SSHSystemRepository
+
+QUERY_OUTPUT = (
+    "fingerprint 1700000000.123456789 204800\n"
+    "vim|2:8.2.2434-3|install ok installed\n"
+    "htop|3.0.5-7|install ok installed\n"
+    "nano|5.4-2|deinstall ok config-files\n"
+    "python3|3.9.2-3|install ok not-installed"
+)
+
+
+def _result(command: str, stdout: str, exit_code: int = 0) -> CommandResult:
+    return CommandResult(
+        command=command,
+        exit_code=exit_code,
+        stdout=stdout,
+        stderr="" if exit_code == 0 else "dpkg-query: error",
+        success=exit_code == 0,
+        execution_time=0.1,
+    )
+
+
+class TestSSHSystemRepositoryPackageIndex:
+    """Test package index construction and fingerprint revalidation."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.config = RetroPieConfig(
+            host="test-host",
+            username="test-user",
+            password="test-pass",
+        )
+        self.mock_client = Mock(spec=RetroPieClient)
+        self.repository = SSHSystemRepository(
+            self.mock_client, self.config, SystemCache()
+        )
+
+    def test_first_call_builds_index_with_single_query(self):
+        """Test that the index is built from one combined command."""
+        self.mock_client.execute_command.return_value = _result(
+            "dpkg-query", QUERY_OUTPUT
+        )
+
+        result = self.repository.get_package_index()
+
+        assert result.is_success()
+        index = result.value
+        assert self.mock_client.execute_command.call_count == 1
+        assert index.fingerprint == "1700000000.123456789 204800"
+        assert index.status(["vim", "nano", "python3"]) == {
+            "vim": True,
+            "nano": False,
+            "python3": False,
+        }
+
+    def test_unchanged_fingerprint_reuses_index(self):
+        """Test that an unchanged dpkg status file costs only a stat call."""
+        self.mock_client.execute_command.side_effect = [
+            _result("dpkg-query", QUERY_OUTPUT),
+            _result("stat", "1700000000.123456789 204800\n"),
+        ]
+
+        first = self.repository.get_package_index().value
+        second = self.repository.get_package_index().value
+
+        assert second is first
+        assert self.mock_client.execute_command.call_count == 2
+        assert "stat" in self.mock_client.execute_command.call_args[0][0]
+        assert "dpkg-query" not in self.mock_client.execute_command.call_args[0][0]
+
+    def test_changed_fingerprint_rebuilds_index(self):
+        """Test that a rewrite within the same second and size triggers a rebuild."""
+        updated_output = QUERY_OUTPUT.replace("123456789", "987654321").replace(
+            "install ok not-installed", "install ok installed"
+        )
+        self.mock_client.execute_command.side_effect = [
+            _result("dpkg-query", QUERY_OUTPUT),
+            _result("stat", "1700000000.987654321 204800\n"),
+            _result("dpkg-query", updated_output),
+        ]
+
+        self.repository.get_package_index()
+        index = self.repository.get_package_index().value
+
+        assert self.mock_client.execute_command.call_count == 3
+        assert index.is_installed("python3") is True
+
+    def test_query_failure_returns_error(self):
+        """Test that a failed query returns an execution error."""
+        self.mock_client.execute_command.return_value = _result("dpkg-query", "", 2)
+
+        result = self.repository.get_package_index()
+
+        assert result.is_error()
+        assert result.error_value.code == "PACKAGE_QUERY_FAILED"
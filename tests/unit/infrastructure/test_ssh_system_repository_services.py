@@ -0,0 +1,125 @@
+"""Tests for the batched service inventory in SSHSystemRepository."""
+
+from unittest.mock import Mock
+
+from retromcp.config import RetroPieConfig
+from retromcp.domain.models import CommandResult
+from retromcp.domain.models import ServiceStatus
+from retromcp.domain.ports import RetroPieClient
+from retromcp.infrastructure.cache_system import SystemCache
+from retromcp.infrastructure.ssh_system_repository import SSHSystemRepository
+
+SHOW_OUTPUT = """Id=ssh.service
+Description=OpenBSD Secure Shell server
+LoadState=loaded
+ActiveState=active
+SubState=running
+UnitFileState=enabled
+MemoryCurrent=5242880
+NRestarts=2
+
+Id=bluetooth.service
+Description=Bluetooth service
+LoadState=loaded
+ActiveState=inactive
+SubState=dead
+UnitFileState=disabled
+MemoryCurrent=[not set]
+NRestarts=0
+
+Id=ghost.service
+Description=ghost.service
+LoadState=not-found
+ActiveState=inactive
+SubState=dead
+UnitFileState=
+MemoryCurrent=18446744073709551615
+NRestarts=0
+
+Id=retro-watchdog.service
+Description=Watchdog
+LoadState=loaded
+ActiveState=failed
+SubState=failed
+UnitFileState=enabled
+MemoryCurrent=18446744073709551615
+NRestarts=5
+"""
+
+
+def _result(command: str, stdout: str, exit_code: int = 0) -> CommandResult:
+    return CommandResult(
+        command=command,
+        exit_code=exit_code,
+        stdout=stdout,
+        stderr="",
+        success=exit_code == 0,
+        execution_time=0.1,
+    )
+
+
+class TestSSHSystemRepositoryServices:
+    """Test service inventory parsing and cache invalidation."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.config = RetroPieConfig(
+            host="test-host",
+            username="test-user",
+            password="test-pass",
+        )
+        self.mock_client = Mock(spec=RetroPieClient)
+        self.cache = SystemCache()
+        self.repository = SSHSystemRepository(self.mock_client, self.config, self.cache)
+
+    def test_get_services_parses_show_blocks_in_one_call(self):
+        """Test that one systemctl show call yields all unit details."""
+        self.mock_client.execute_command.return_value = _result(
+            "systemctl show", SHOW_OUTPUT
+        )
+
+        services = self.repository.get_services()
+
+        assert self.mock_client.execute_command.call_count == 1
+        command = self.mock_client.execute_command.call_args[0][0]
+        assert "systemctl show" in command
+        assert "--property=" in command
+        by_name = {service.name: service for service in services}
+        assert set(by_name) == {"ssh", "bluetooth", "retro-watchdog"}
+
+        ssh = by_name["ssh"]
+        assert ssh.status == ServiceStatus.RUNNING
+        assert ssh.enabled is True
+        assert ssh.sub_state == "running"
+        assert ssh.memory_bytes == 5242880
+        assert ssh.restart_count == 2
+        assert ssh.description == "OpenBSD Secure Shell server"
+
+        assert by_name["bluetooth"].status == ServiceStatus.STOPPED
+        assert by_name["bluetooth"].enabled is False
+        assert by_name["bluetooth"].memory_bytes is None
+        assert by_name["retro-watchdog"].status == ServiceStatus.FAILED
+        assert by_name["retro-watchdog"].memory_bytes is None
+
+    def test_get_services_uses_cache_until_restart(self):
+        """Test that the inventory is cached and invalidated by a restart."""
+        self.mock_client.execute_command.side_effect = [
+            _result("systemctl show", SHOW_OUTPUT),
+            _result("sudo systemctl restart ssh", ""),
+            _result("systemctl show", SHOW_OUTPUT),
+        ]
+
+        self.repository.get_services()
+        self.repository.get_services()
+        assert self.mock_client.execute_command.call_count == 1
+
+        self.repository.restart_service("ssh")
+        self.repository.get_services()
+        assert self.mock_client.execute_command.call_count == 3
+
+    def test_get_services_returns_empty_list_on_failure(self):
+        """Test that a failed systemctl call returns no services."""
+        self.mock_client.execute_command.return_value = _result("systemctl show", "", 1)
+
+        assert self.repository.get_services() == []
+        assert self.cache.get_service_status() is None
@@ -0,0 +1,106 @@
+"""Tests for the structural state diff."""
+
+import copy
+import time
+
+from retromcp.infrastructure.state_diff import diff_documents
+
+
+def _state() -> dict:
+    return {
+        "system": {"hostname": "retropie", "cpu_temperature": 50.0},
+        "emulators": {"installed": ["mupen64plus", "pcsx-rearmed", "snes9x"]},
+        "controllers": [
+            {"type": "xbox", "device": "/dev/input/js0", "configured": True},
+            {"type": "ps4", "device": "/dev/input/js1", "configured": False},
+        ],
+        "roms": {"counts": {f"game-{i}": i for i in range(5000)}},
+    }
+
+
+class TestDiffDocuments:
+    """Test keyed matching, pointer paths and subtree skipping."""
+
+    def test_equal_documents_have_no_differences(self):
+        """Test that identical states diff to empty maps."""
+        assert diff_documents(_state(), _state()) == {
+            "added": {},
+            "changed": {},
+            "removed": {},
+        }
+
+    def test_one_entry_change_in_large_map(self):
+        """Test that a single leaf change is reported alone."""
+        old, new = _state(), _state()
+        new["roms"]["counts"]["game-4321"] = 1
+
+        diff = diff_documents(old, new)
+
+        assert diff["changed"] == {"/roms/counts/game-4321": {"old": 4321, "new": 1}}
+        assert diff["added"] == {}
+        assert diff["removed"] == {}
+
+    def test_controllers_matched_by_device(self):
+        """Test that reordered controllers are matched by device path."""
+        old, new = _state(), _state()
+        new["controllers"] = [
+            {"type": "ps4", "device": "/dev/input/js1", "configured": True},
+            {"type": "xbox", "device": "/dev/input/js0", "configured": True},
+            {"type": "8bitdo", "device": "/dev/input/js2", "configured": False},
+        ]
+
+        diff = diff_documents(old, new)
+
+        assert diff["changed"] == {
+            "/controllers/0/configured": {"old": False, "new": True}
+        }
+        assert diff["added"] == {"/controllers/2": new["controllers"][2]}
+        assert diff["removed"] == {}
+
+    def test_scalar_lists_compared_as_sets(self):
+        """Test that installing and removing emulators reports only those."""
+        old, new = _state(), _state()
+        new["emulators"]["installed"] = ["snes9x", "mupen64plus", "lr-mame2003"]
+
+        diff = diff_documents(old, new)
+
+        assert diff["added"] == {"/emulators/installed/2": "lr-mame2003"}
+        assert diff["removed"] == {"/emulators/installed/1": "pcsx-rearmed"}
+        assert diff["changed"] == {}
+
+    def test_pointer_tokens_are_escaped(self):
+        """Test RFC 6901 escaping of ~ and / in keys."""
+        diff = diff_documents({"paths": {}}, {"paths": {"/opt/~x": 1}})
+
+        assert diff["added"] == {"/paths/~1opt~1~0x": 1}
+
+    def test_type_change_and_unkeyed_lists(self):
+        """Test that differing types are changes and plain lists go by index."""
+        old = {"value": {"a": 1}, "issues": [["a"], ["b"]]}
+        new = {"value": [1], "issues": [["a"], ["c"], ["d"]]}
+
+        diff = diff_documents(old, new)
+
+        assert diff["changed"]["/value"] == {"old": {"a": 1}, "new": [1]}
+        assert diff["removed"] == {"/issues/1/0": "b"}
+        assert diff["added"] == {"/issues/1/0": "c", "/issues/2": ["d"]}
+
+    def test_scales_to_tens_of_thousands_of_leaves(self):
+        """Test that large states with few changes diff quickly."""
+        old = {
+            "roms": {
+                "systems": {
+                    f"system-{s}": {f"rom-{r}": r for r in range(1000)}
+                    for s in range(40)
+                }
+            }
+        }
+        new = copy.deepcopy(old)
+        new["roms"]["systems"]["system-7"]["rom-500"] = -1
+
+        start = time.monotonic()
+        diff = diff_documents(old, new)
+        elapsed = time.monotonic() - start
+
+        assert list(diff["changed"]) == ["/roms/systems/system-7/rom-500"]
+        assert elapsed < 5.0
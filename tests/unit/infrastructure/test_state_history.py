@@ -0,0 +1,260 @@
+"""Tests for delta-encoded state history."""
+
+import base64
+import gzip
+import json
+import os
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from retromcp.config import RetroPieConfig
+from retromcp.discovery import RetroPiePaths
+from retromcp.domain.models import CommandResult
+from retromcp.domain.models import SystemState
+from retromcp.domain.ports import RetroPieClient
+from retromcp.infrastructure.ssh_state_repository import SSHStateRepository
+from retromcp.infrastructure.state_history import _READ_CHUNK
+from retromcp.infrastructure.state_history import StateHistory
+from retromcp.infrastructure.state_history import apply_json_patch
+from retromcp.infrastructure.state_history import make_json_patch
+
+
+def _state(hour: int, temperature: float, roms: int) -> dict:
+    return {
+        "schema_version": "2.0",
+        "last_updated": f"2026-05-01T{hour:02d}:00:00",
+        "system": {"hostname": "retropie", "cpu_temperature": temperature},
+        "emulators": {"installed": ["mupen64plus"], "preferred": {}},
+        "controllers": [{"type": "xbox", "device": "/dev/input/js0"}],
+        "roms": {"systems": ["nes"], "counts": {"nes": roms}},
+        "custom_configs": [],
+        "known_issues": [],
+    }
+
+
+class TestJsonPatch:
+    """Test JSON patch generation and application."""
+
+    def test_patch_round_trip(self):
+        """Test that applying a generated patch reproduces the new document."""
+        old = {"a": {"b": 1, "c/d": [1, 2]}, "gone": True, "list": [1]}
+        new = {"a": {"b": 2, "c/d": [1, 3]}, "list": [1, 2], "added": {"x": None}}
+
+        patch = make_json_patch(old, new)
+
+        assert {"op": "remove", "path": "/gone"} in patch
+        assert {"op": "replace", "path": "/a/c~1d/1", "value": 3} in patch
+        assert apply_json_patch(old, patch) == new
+        assert old["a"]["b"] == 1
+
+    def test_equal_documents_give_empty_patch(self):
+        """Test that unchanged documents need no operations."""
+        assert make_json_patch(_state(1, 50.0, 10), _state(1, 50.0, 10)) == []
+
+
+class TestStateHistory:
+    """Test recording, reconstruction and time-range queries."""
+
+    def test_full_snapshot_every_interval(self, tmp_path: Path):
+        """Test that deltas are stored between periodic full snapshots."""
+        history = StateHistory(tmp_path / "history.jsonl.gz", snapshot_interval=3)
+
+        for hour in range(7):
+            state = _state(hour, 50.0 + hour, 10 + hour)
+            history.record(state, state["last_updated"])
+
+        entries = history.entries()
+        assert [entry.full for entry in entries] == [
+            True,
+            False,
+            False,
+            True,
+            False,
+            False,
+            True,
+        ]
+        assert entries[1].size < entries[0].size
+
+    def test_reconstructs_any_entry_after_reload(self, tmp_path: Path):
+        """Test that a fresh instance rebuilds states from the file."""
+        path = tmp_path / "history.jsonl.gz"
+        history = StateHistory(path, snapshot_interval=4)
+        states = [_state(hour, 50.0 + hour, 10 + hour) for hour in range(6)]
+        for state in states:
+            history.record(state, state["last_updated"])
+
+        reloaded = StateHistory(path, snapshot_interval=4)
+
+        assert [reloaded.reconstruct(i) for i in range(6)] == states
+        assert [entry.size for entry in reloaded.entries()] == [
+            entry.size for entry in history.entries()
+        ]
+        # The file is a valid multi-member gzip stream
+        with gzip.open(path, "rt") as history_file:
+            assert len(history_file.readlines()) == 6
+
+    def test_time_range_queries(self, tmp_path: Path):
+        """Test range listing and point-in-time lookup."""
+        history = StateHistory(tmp_path / "history.jsonl.gz")
+        for hour in (1, 3, 5, 7):
+            state = _state(hour, 50.0, hour)
+            history.record(state, state["last_updated"])
+
+        in_range = history.entries(
+            since="2026-05-01T03:00:00", until="2026-05-01T06:00"
+        )
+
+        assert [entry.sequence for entry in in_range] == [1, 2]
+        assert history.state_at("2026-05-01T04:30:00")["roms"]["counts"]["nes"] == 3
+        assert history.state_at("2026-05-01T00:00:00") is None
+        with pytest.raises(ValueError, match="Invalid timestamp"):
+            history.entries(since="yesterday")
+
+    def test_offset_timestamps_order_by_instant(self, tmp_path: Path):
+        """Test that a UTC offset is converted rather than dropped."""
+        history = StateHistory(tmp_path / "history.jsonl.gz")
+        local = datetime(2026, 5, 1, 12, 0)
+        later = (local + timedelta(hours=1)).astimezone(
+            timezone(timedelta(hours=5, minutes=30))
+        )
+        history.record(_state(12, 50.0, 1), local.isoformat())
+        history.record(_state(13, 50.0, 2), later.isoformat())
+
+        in_range = history.entries(
+            since=(local + timedelta(minutes=30)).isoformat(),
+            until=(local + timedelta(hours=2)).isoformat(),
+        )
+
+        assert [entry.sequence for entry in in_range] == [1]
+        assert history.state_at(later.isoformat())["roms"]["counts"]["nes"] == 2
+
+    def test_loads_entries_larger_than_read_chunk(self, tmp_path: Path):
+        """Test that members spanning several read chunks load intact."""
+        path = tmp_path / "history.jsonl.gz"
+        history = StateHistory(path, snapshot_interval=1)
+        noise = base64.b64encode(os.urandom(_READ_CHUNK)).decode()
+        for hour in (1, 2, 3):
+            state = _state(hour, 50.0, hour)
+            state["known_issues"] = [noise]
+            history.record(state, state["last_updated"])
+
+        reloaded = StateHistory(path)
+
+        assert [entry.sequence for entry in reloaded.entries()] == [0, 1, 2]
+        assert reloaded.reconstruct(2)["known_issues"] == [noise]
+        assert sum(entry.size for entry in reloaded.entries()) == path.stat().st_size
+
+    def test_ignores_truncated_final_entry(self, tmp_path: Path):
+        """Test that an interrupted append does not break loading."""
+        path = tmp_path / "history.jsonl.gz"
+        history = StateHistory(path)
+        for hour in (1, 2):
+            state = _state(hour, 50.0, hour)
+            history.record(state, state["last_updated"])
+        data = path.read_bytes()
+        path.write_bytes(data + data[:10])
+
+        reloaded = StateHistory(path)
+
+        assert len(reloaded.entries()) == 2
+        assert reloaded.reconstruct(1)["roms"]["counts"]["nes"] == 2
+
+    def test_records_after_truncated_entry_survive_reload(self, tmp_path: Path):
+        """Test that a damaged tail is cut off before new entries are appended."""
+        path = tmp_path / "history.jsonl.gz"
+        history = StateHistory(path)
+        state = _state(1, 50.0, 1)
+        history.record(state, state["last_updated"])
+        intact = path.read_bytes()
+        path.write_bytes(intact + intact[:10])
+
+        resumed = StateHistory(path)
+        for hour in (2, 3):
+            state = _state(hour, 50.0, hour)
+            resumed.record(state, state["last_updated"])
+        reloaded = StateHistory(path)
+
+        assert path.read_bytes().startswith(intact)
+        assert [entry.sequence for entry in reloaded.entries()] == [0, 1, 2]
+        assert reloaded.reconstruct(2)["roms"]["counts"]["nes"] == 3
+
+    def test_ignores_corrupt_entry(self, tmp_path: Path):
+        """Test that a complete member holding no valid entry is cut off."""
+        path = tmp_path / "history.jsonl.gz"
+        history = StateHistory(path)
+        state = _state(1, 50.0, 1)
+        history.record(state, state["last_updated"])
+        intact = path.read_bytes()
+        path.write_bytes(
+            intact + gzip.compress(b"not json\n") + gzip.compress(b'{"sequence":1}\n')
+        )
+
+        reloaded = StateHistory(path)
+
+        assert len(reloaded.entries()) == 1
+        assert path.read_bytes() == intact
+
+
+class TestSSHStateRepositoryHistory:
+    """Test history recording through the state repository."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.config = RetroPieConfig(
+            host="test-host",
+            username="test-user",
+            password="test-pass",
+            paths=RetroPiePaths(
+                home_dir="/home/test-user",
+                username="test-user",
+                retropie_dir="/home/test-user/RetroPie",
+                retropie_setup_dir="/home/test-user/RetroPie-Setup",
+                bios_dir="/home/test-user/RetroPie/BIOS",
+                roms_dir="/home/test-user/RetroPie/roms",
+                configs_dir="/opt/retropie/configs",
+                emulators_dir="/opt/retropie/emulators",
+            ),
+        )
+        self.mock_client = Mock(spec=RetroPieClient)
+        self.mock_client.execute_command.return_value = CommandResult(
+            command="tee",
+            exit_code=0,
+            stdout="",
+            stderr="",
+            success=True,
+            execution_time=0.1,
+        )
+
+    def test_saved_states_are_recorded_and_mirrored(self, tmp_path: Path):
+        """Test that saves feed the history and the optional copy on the Pi."""
+        history = StateHistory(tmp_path / "history.jsonl.gz")
+        repository = SSHStateRepository(
+            self.mock_client, self.config, history=history, mirror_history=True
+        )
+        for hour in (1, 2):
+            state = SystemState.from_json(json.dumps(_state(hour, 50.0, hour)))
+            assert repository.save_state(state).success
+
+        assert [entry.sequence for entry in repository.list_history()] == [0, 1]
+        past = repository.load_state_at("2026-05-01T01:30:00")
+        assert past.roms["counts"]["nes"] == 1
+
+        mirror_command = self.mock_client.execute_command.call_args[0][0]
+        assert "/home/test-user/.retropie-state-history.gz" in mirror_command
+        encoded = mirror_command.split()[1]
+        mirrored = json.loads(gzip.decompress(base64.b64decode(encoded)))
+        assert mirrored["sequence"] == 1
+        assert mirrored["full"] is False
+
+    def test_load_state_at_without_history_raises(self):
+        """Test that point-in-time loads need a history."""
+        repository = SSHStateRepository(self.mock_client, self.config)
+
+        assert repository.list_history() == []
+        with pytest.raises(FileNotFoundError):
+            repository.load_state_at("2026-05-01T01:00:00")
@@ -0,0 +1,176 @@
+"""Tests for the single-pass system inventory."""
+
+from unittest.mock import Mock
+
+from retromcp.config import RetroPieConfig
+from retromcp.domain.models import CommandResult
+from retromcp.domain.models import NetworkStatus
+from retromcp.domain.models import ServiceStatus
+from retromcp.domain.ports import RetroPieClient
+from retromcp.infrastructure.cache_system import SystemCache
+from retromcp.infrastructure.ssh_system_repository import SSHSystemRepository
+from retromcp.infrastructure.system_inventory import format_bytes
+from retromcp.infrastructure.system_inventory import split_sections
+
+INVENTORY_OUTPUT = """@@retromcp:model@@
+Raspberry Pi 4 Model B Rev 1.4
+@@retromcp:revision@@
+d03114
+@@retromcp:temperature@@
+48312
+@@retromcp:memory@@
+8245235712 1073741824
+@@retromcp:storage@@
+/dev/root ext4 31268536320 9663676416 20310511616 33% /
+/dev/mmcblk0p1 vfat 268435456 52428800 216006656 20% /boot
+@@retromcp:cooling@@
+1
+@@retromcp:fan@@
+4120
+@@retromcp:interfaces@@
+eth0 up 1000
+wlan0 up
+@@retromcp:addresses@@
+eth0 192.168.1.50/24
+wlan0 192.168.1.51/24
+@@retromcp:ssid@@
+wlan0     ESSID:"HomeNet"
+@@retromcp:signal@@
+wlan0: -56.
+@@retromcp:os@@
+Debian GNU/Linux
+11 (bullseye)
+@@retromcp:kernel@@
+6.1.21-v8+
+@@retromcp:python@@
+Python 3.9.2
+/usr/bin/python3
+@@retromcp:docker@@
+Docker version 24.0.5, build ced0996
+state active
+@@retromcp:retropie@@
+__version="4.8.5"
+running
+@@retromcp:services@@
+Id=ssh.service
+Description=OpenBSD Secure Shell server
+LoadState=loaded
+ActiveState=active
+SubState=running
+UnitFileState=enabled
+MemoryCurrent=5242880
+NRestarts=0
+
+Id=docker.service
+Description=Docker Application Container Engine
+LoadState=loaded
+ActiveState=active
+SubState=running
+UnitFileState=enabled
+MemoryCurrent=41943040
+NRestarts=1
+"""
+
+
+class TestSystemInventoryParsing:
+    """Test inventory section parsing helpers."""
+
+    def test_split_sections_keeps_multiline_sections(self):
+        """Test that sections are split on marker lines only."""
+        sections = split_sections(INVENTORY_OUTPUT)
+
+        assert sections["model"] == "Raspberry Pi 4 Model B Rev 1.4"
+        assert sections["os"] == "Debian GNU/Linux\n11 (bullseye)"
+        assert "\n\nId=docker.service" in sections["services"]
+
+    def test_format_bytes_uses_state_units(self):
+        """Test size formatting matches the stored v2.0 format."""
+        assert format_bytes(512) == "512B"
+        assert format_bytes(8245235712) == "7.7GB"
+        assert format_bytes(2 * 1024**4) == "2.0TB"
+
+
+class TestSSHSystemRepositoryInventory:
+    """Test inventory collection through the system repository."""
+
+    def setup_method(self):
+        """Set up test fixtures."""
+        self.config = RetroPieConfig(
+            host="test-host",
+            username="test-user",
+            password="test-pass",
+        )
+        self.mock_client = Mock(spec=RetroPieClient)
+        self.cache = SystemCache()
+        self.repository = SSHSystemRepository(self.mock_client, self.config, self.cache)
+
+    def test_get_system_inventory_collects_all_sections_in_one_call(self):
+        """Test that hardware, network, software and services need one call."""
+        self.mock_client.execute_command.return_value = CommandResult(
+            command="inventory",
+            exit_code=0,
+            stdout=INVENTORY_OUTPUT,
+            stderr="",
+            success=True,
+            execution_time=0.4,
+        )
+
+        result = self.repository.get_system_inventory()
+
+        assert result.is_success()
+        assert self.mock_client.execute_command.call_count == 1
+        script = self.mock_client.execute_command.call_args[0][0]
+        assert "/home/test-user/RetroPie-Setup/retropie_packages.sh" in script
+        inventory = result.value
+
+        hardware = inventory.hardware
+        assert hardware.model == "Raspberry Pi 4 Model B Rev 1.4"
+        assert hardware.revision == "d03114"
+        assert hardware.cpu_temperature == 48.312
+        assert hardware.memory_total == "7.7GB"
+        assert hardware.memory_used == "1.0GB"
+        assert [device.mount for device in hardware.storage] == ["/", "/boot"]
+        assert hardware.storage[0].filesystem_type == "ext4"
+        assert hardware.cooling_active is True
+        assert hardware.fan_speed == 4120
+
+        eth0, wlan0 = inventory.network
+        assert eth0.ip == "192.168.1.50"
+        assert eth0.status == NetworkStatus.UP
+        assert eth0.speed == "1000Mbps"
+        assert wlan0.speed == "unknown"
+        assert wlan0.ssid == "HomeNet"
+        assert wlan0.signal_strength == -56
+
+        software = inventory.software
+        assert software.os_name == "Debian GNU/Linux"
+        assert software.os_version == "11 (bullseye)"
+        assert software.kernel == "6.1.21-v8+"
+        assert software.python_version == "3.9.2"
+        assert software.python_path == "/usr/bin/python3"
+        assert software.docker_version == "24.0.5"
+        assert software.docker_status == ServiceStatus.RUNNING
+        assert software.retropie_version == "4.8.5"
+        assert software.retropie_status == ServiceStatus.RUNNING
+
+        assert [service.name for service in inventory.services] == ["ssh", "docker"]
+        assert inventory.services[1].restart_count == 1
+        # The service section also warms the service inventory cache
+        assert self.repository.get_services() == inventory.services
+        assert self.mock_client.execute_command.call_count == 1
+
+    def test_get_system_inventory_returns_error_on_failure(self):
+        """Test that a failed inventory script returns an execution error."""
+        self.mock_client.execute_command.return_value = CommandResult(
+            command="inventory",
+            exit_code=255,
+            stdout="",
+            stderr="Connection reset",
+            success=False,
+            execution_time=0.1,
+        )
+
+        result = self.repository.get_system_inventory()
+
+        assert result.is_error()
+        assert result.error_value.code == "INVENTORY_FAILED"
@@ -0,0 +1,125 @@
+"""Tests for the incremental kernel and journal log reader."""
+
+from unittest.mock import Mock
+
+from retromcp.domain.models import CommandResult
+from retromcp.domain.ports import RetroPieClient
+from retromcp.infrastructure.system_log_reader import SystemLogReader
+from retromcp.infrastructure.system_log_reader import classify_log_message
+
+MARKER = "@@retromcp-logs@@"
+BOOT_ID = "bbc45eb3-59b0-4f12-a0e9-1c4f309e78f3"
+
+
+def _poll_output(kernel: str = "", journal: str = "", boot_id: str = BOOT_ID) -> str:
+    return f"{boot_id}\n{MARKER} kernel\n{kernel}\n{MARKER} journal\n{journal}"
+
+
+def _result(stdout: str) -> CommandResult:
+    return CommandResult(
+        command="poll",
+        exit_code=0,
+        stdout=stdout,
+        stderr="",
+        success=True,
+        execution_time=0.1,
+    )
+
+
+class TestClassifyLogMessage:
+    """Test the precompiled category patterns."""
+
+    def test_messages_land_in_matching_buckets(self):
+        """Test representative Raspberry Pi messages."""
+        assert classify_log_message("Under-voltage detected! (0x00050005)") == (
+            "power",
+        )
+        assert classify_log_message(
+            "usb 1-1.2: device descriptor read/64, error -71"
+        ) == ("usb",)
+        assert classify_log_message("cpufreq: throttling ARM to 600MHz") == ("thermal",)
+        assert classify_log_message("mmc0: timeout waiting for hardware interrupt") == (
+            "hardware",
+        )
+        assert classify_log_message("nginx: config reloaded") == ()
+
+
+class TestSystemLogReader:
+    """Test cursor tracking, filtering and the bounded index."""
+
+    def setup_method(self):
+        """Set up a reader with a mock client."""
+        self.mock_client = Mock(spec=RetroPieClient)
+        self.reader = SystemLogReader(self.mock_client, max_entries=3)
+
+    def test_poll_classifies_and_advances_positions(self):
+        """Test that the next poll asks only for newer entries."""
+        self.mock_client.execute_command.return_value = _result(
+            _poll_output(
+                kernel=(
+                    "<6>[    2.100000] usb 1-1: new high-speed USB device\n"
+                    "<3>[   12.345678] usb 1-1: device not accepting address 4\n"
+                    "<4>[   30.000000] Under-voltage detected! (0x00050005)"
+                ),
+                journal=(
+                    "2026-10-18T10:00:00+0000 retropie kernel: mmc0: I/O error\n"
+                    "2026-10-18T10:00:05+0000 retropie sshd[812]: error: PAM\n"
+                    "-- cursor: s=abc;i=42"
+                ),
+            )
+        )
+
+        entries = self.reader.poll()
+
+        assert [(e.source, e.categories) for e in entries] == [
+            ("kernel", ("usb",)),
+            ("kernel", ("power",)),
+            ("journal", ("hardware",)),
+            ("journal", ("system",)),
+        ]
+        assert str(entries[0]) == "[12.345678] usb 1-1: device not accepting address 4"
+
+        self.mock_client.execute_command.return_value = _result(_poll_output())
+        assert self.reader.poll() == []
+        command = self.mock_client.execute_command.call_args[0][0]
+        assert f'[ "$b" = {BOOT_ID} ] && a=30.000000' in command
+        assert "--after-cursor='s=abc;i=42'" in command
+        assert "-f" not in command
+
+    def test_reboot_resets_kernel_position(self):
+        """Test that a new boot id reads the kernel buffer from the start."""
+        self.mock_client.execute_command.return_value = _result(
+            _poll_output(kernel="<3>[  500.000000] usb 1-1: reset failed")
+        )
+        self.reader.poll()
+
+        self.mock_client.execute_command.return_value = _result(
+            _poll_output(
+                kernel="<3>[    3.000000] usb 1-1: reset failed", boot_id="new-boot"
+            )
+        )
+        entries = self.reader.poll()
+
+        assert [entry.timestamp for entry in entries] == ["3.000000"]
+        assert self.reader._kernel_time == 3.0
+
+    def test_index_is_bounded_and_filterable(self):
+        """Test that old entries drop out and recent filters by bucket."""
+        self.mock_client.execute_command.return_value = _result(
+            _poll_output(
+                kernel="\n".join(
+                    f"<3>[   {i}.000000] usb 1-1: error {i}" for i in range(1, 5)
+                )
+                + "\n<4>[    9.000000] Under-voltage detected!"
+            )
+        )
+
+        self.reader.poll()
+
+        assert [entry.timestamp for entry in self.reader.recent()] == [
+            "3.000000",
+            "4.000000",
+            "9.000000",
+        ]
+        assert [e.timestamp for e in self.reader.recent(["power"])] == ["9.000000"]
+        assert self.reader.counts() == {"usb": 2, "power": 1}
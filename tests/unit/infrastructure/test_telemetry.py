@@ -0,0 +1,154 @@
+"""Tests for the hardware telemetry sampler."""
+
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from retromcp.domain.models import CommandResult
+from retromcp.domain.ports import RetroPieClient
+from retromcp.infrastructure.telemetry import TELEMETRY_COMMAND
+from retromcp.infrastructure.telemetry import TelemetryRing
+from retromcp.infrastructure.telemetry import TelemetrySampler
+from retromcp.infrastructure.telemetry import parse_telemetry_sample
+
+SAMPLE_OUTPUT = """temp=61.3'C
+throttled=0x50005
+volt=0.8563V
+frequency(48)=1500345728
+load=1.24
+memory=37.5
+"""
+
+
+class TestParseTelemetrySample:
+    """Test parsing of the combined telemetry command output."""
+
+    def test_parses_every_metric(self):
+        """Test that one output yields all six metrics."""
+        values = parse_telemetry_sample(SAMPLE_OUTPUT)
+
+        assert values == {
+            "temperature": 61.3,
+            "throttled": 1.0,
+            "core_voltage": 0.8563,
+            "arm_clock": 1500.345728,
+            "cpu_load": 1.24,
+            "memory": 37.5,
+        }
+
+    def test_historic_throttle_flags_are_not_current(self):
+        """Test that only the current flags count as throttled."""
+        assert parse_telemetry_sample("throttled=0x50000") == {"throttled": 0.0}
+
+    def test_skips_missing_and_malformed_lines(self):
+        """Test that unavailable tools leave their metric out."""
+        values = parse_telemetry_sample(
+            "bash: vcgencmd: command not found\nload=1.0\nmemory=\n"
+        )
+
+        assert values == {"cpu_load": 1.0}
+
+
+class TestTelemetryRing:
+    """Test the array-backed ring buffer."""
+
+    def test_raw_ring_overwrites_oldest(self):
+        """Test that a full ring keeps only the newest points."""
+        ring = TelemetryRing(capacity=3, resolution=0)
+        for second in range(5):
+            ring.add(float(second), float(second * 10))
+
+        assert len(ring) == 3
+        assert [point[3] for point in ring.points(since=0)] == [40.0, 30.0, 20.0]
+
+    def test_bucketed_ring_aggregates(self):
+        """Test that values in one bucket merge into min, max, sum and count."""
+        ring = TelemetryRing(capacity=4, resolution=60)
+        for timestamp, value in ((0, 5.0), (30, 9.0), (59, 1.0), (60, 2.0)):
+            ring.add(float(timestamp), value)
+
+        assert list(ring.points(since=0)) == [
+            (60.0, 2.0, 2.0, 2.0, 1),
+            (0.0, 1.0, 9.0, 15.0, 3),
+        ]
+
+
+class TestTelemetrySampler:
+    """Test recording, tier selection and background sampling."""
+
+    def setup_method(self):
+        """Set up a sampler with a mock client."""
+        self.mock_client = Mock(spec=RetroPieClient)
+        self.sampler = TelemetrySampler(self.mock_client, interval=10.0)
+
+    def teardown_method(self):
+        """Stop the sampler thread."""
+        self.sampler.stop()
+
+    def test_query_raw_window_exact_stats(self):
+        """Test min, max, average and percentiles over raw samples."""
+        for i in range(100):
+            self.sampler.record({"temperature": float(i + 1)}, 1000.0 + i * 10)
+
+        stats = self.sampler.query("temperature", 600, now=1990.0)
+
+        assert stats.resolution == 0
+        assert stats.samples == 61  # 1390..1990 inclusive
+        assert stats.minimum == 40.0
+        assert stats.maximum == 100.0
+        assert stats.average == pytest.approx(70.0)
+        assert stats.percentiles[50] == 70.0
+        assert stats.percentiles[99] == 100.0
+
+    def test_throttling_in_long_window_uses_downsampled_tier(self):
+        """Test that a day-long window is answered from minute buckets."""
+        start = 1_000_020.0  # Aligned to a minute
+        for i in range(8640):  # One day at 10s
+            throttled = 1.0 if 3000 <= i < 3060 else 0.0
+            self.sampler.record({"throttled": throttled}, start + i * 10)
+
+        stats = self.sampler.query("throttled", 86400, now=start + 86390)
+
+        assert stats.resolution == 60
+        assert stats.samples == 8640
+        assert stats.maximum == 1.0
+        assert stats.average == pytest.approx(60 / 8640)
+        # The raw tier only holds the last hour, which had no throttling
+        assert self.sampler.query("throttled", 3600, now=start + 86390).maximum == 0
+
+    def test_unknown_metric_and_empty_window(self):
+        """Test query validation and windows without samples."""
+        with pytest.raises(ValueError, match="Unknown metric"):
+            self.sampler.query("fan_speed", 60)
+
+        stats = self.sampler.query("memory", 60, now=0.0)
+        assert stats.samples == 0
+        assert stats.average is None
+
+    def test_background_thread_samples_with_one_command(self):
+        """Test that the sampler thread records one combined read."""
+        sampled = threading.Event()
+
+        def execute(command: str) -> CommandResult:
+            sampled.set()
+            return CommandResult(
+                command=command,
+                exit_code=0,
+                stdout=SAMPLE_OUTPUT,
+                stderr="",
+                success=True,
+                execution_time=0.1,
+            )
+
+        self.mock_client.execute_command.side_effect = execute
+        self.sampler.start()
+
+        assert sampled.wait(timeout=5)
+        for _ in range(500):
+            if self.sampler.query("cpu_load", 60).samples:
+                break
+            threading.Event().wait(0.01)
+        self.sampler.stop()
+        self.mock_client.execute_command.assert_called_with(TELEMETRY_COMMAND)
+        assert self.sampler.query("cpu_load", 60).samples >= 1
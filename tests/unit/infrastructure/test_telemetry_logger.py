@@ -0,0 +1,145 @@
+"""Tests for the on-Pi telemetry logger."""
+
+from unittest.mock import Mock
+
+from retromcp.domain.models import CommandResult
+from retromcp.domain.ports import RetroPieClient
+from retromcp.infrastructure.telemetry import TelemetrySampler
+from retromcp.infrastructure.telemetry_logger import TelemetryLogger
+from retromcp.infrastructure.telemetry_logger import parse_telemetry_record
+
+MARKER = "@@retromcp-telemetry@@"
+
+RECORD_1 = "1700000000,61.3,0x0,0.8563,1500000000,0.52,31.0"
+RECORD_2 = "1700000002,62.0,0x4,0.8563,1200000000,0.61,31.2"
+RECORD_3 = "1700000004,60.1,0x0,0.8563,1500000000,0.40,30.9"
+
+
+def _result(stdout: str, success: bool = True) -> CommandResult:
+    return CommandResult(
+        command="fetch",
+        exit_code=0 if success else 1,
+        stdout=stdout,
+        stderr="" if success else "stat: cannot statx",
+        success=success,
+        execution_time=0.1,
+    )
+
+
+class TestParseTelemetryRecord:
+    """Test parsing of logger CSV records."""
+
+    def test_parses_record(self):
+        """Test that a full record yields every metric."""
+        timestamp, values = parse_telemetry_record(RECORD_2)
+
+        assert timestamp == 1700000002.0
+        assert values == {
+            "temperature": 62.0,
+            "throttled": 1.0,
+            "core_voltage": 0.8563,
+            "arm_clock": 1200.0,
+            "cpu_load": 0.61,
+            "memory": 31.2,
+        }
+
+    def test_empty_fields_and_malformed_lines(self):
+        """Test that missing vcgencmd values are skipped and junk rejected."""
+        assert parse_telemetry_record("1700000000,,,,,0.5,20.0") == (
+            1700000000.0,
+            {"cpu_load": 0.5, "memory": 20.0},
+        )
+        assert parse_telemetry_record("1700000000,61.3") is None
+        assert parse_telemetry_record("now,1,0x0,1,1,1,1") is None
+
+
+class TestTelemetryLogger:
+    """Test installation and offset-based fetching."""
+
+    def setup_method(self):
+        """Set up a logger with a mock client."""
+        self.mock_client = Mock(spec=RetroPieClient)
+        self.logger = TelemetryLogger(self.mock_client, "/home/pi")
+
+    def test_install_starts_logger_once(self):
+        """Test that install writes the script and guards on the pid file."""
+        self.mock_client.execute_command.return_value = _result("")
+
+        assert self.logger.install().success is True
+
+        command = self.mock_client.execute_command.call_args[0][0]
+        assert "cat > /home/pi/.retromcp/telemetry-logger.sh" in command
+        assert "kill -0 $(cat /home/pi/.retromcp/telemetry-logger.pid" in command
+        assert "nohup nice -n 19 sh /home/pi/.retromcp/telemetry-logger.sh" in command
+        assert "/home/pi/.retromcp/telemetry.csv 2 1048576" in command
+
+    def test_fetch_reads_only_new_complete_lines(self):
+        """Test that offsets advance past complete records only."""
+        self.mock_client.execute_command.side_effect = [
+            _result(f"{MARKER} 4242\n{RECORD_1}\n{RECORD_2[:20]}{MARKER} end"),
+            _result(f"{MARKER} 4242\n{RECORD_2}\n{MARKER} end"),
+        ]
+
+        first = self.logger.fetch()
+        second = self.logger.fetch()
+
+        assert [timestamp for timestamp, _ in first] == [1700000000.0]
+        assert [timestamp for timestamp, _ in second] == [1700000002.0]
+        command = self.mock_client.execute_command.call_args[0][0]
+        start = len(RECORD_1) + 2
+        assert f"tail -c +{start} /home/pi/.retromcp/telemetry.csv" in command
+        assert '[ "$i" = 4242 ]' in command
+        assert self.logger._offset == len(RECORD_1) + len(RECORD_2) + 2
+
+    def test_fetch_after_rotation_reads_rest_of_old_log(self):
+        """Test that a rotated log is finished before the new one is read."""
+        self.mock_client.execute_command.side_effect = [
+            _result(f"{MARKER} 4242\n{RECORD_1}\n{MARKER} end"),
+            _result(
+                f"{MARKER} rotated\n{RECORD_2}\n{MARKER} 4343\n{RECORD_3}\n{MARKER} end"
+            ),
+        ]
+
+        self.logger.fetch()
+        records = self.logger.fetch()
+
+        assert [timestamp for timestamp, _ in records] == [
+            1700000002.0,
+            1700000004.0,
+        ]
+        assert self.logger._inode == "4343"
+        assert self.logger._offset == len(RECORD_3) + 1
+
+    def test_failed_fetch_keeps_position(self):
+        """Test that a missing log returns nothing and keeps the offset."""
+        self.mock_client.execute_command.return_value = _result("", success=False)
+
+        assert self.logger.fetch() == []
+        assert self.logger._offset == 0
+
+    def test_sampler_sync_records_logged_history(self):
+        """Test that the sampler stores records fetched from the logger."""
+        self.mock_client.execute_command.return_value = _result(
+            f"{MARKER} 4242\n{RECORD_1}\n{RECORD_2}\n{RECORD_3}\n{MARKER} end"
+        )
+        sampler = TelemetrySampler(self.mock_client)
+        sampler.use_remote_log(self.logger)
+
+        assert sampler.sync() == 3
+        stats = sampler.query("throttled", 60, now=1700000010.0)
+        assert stats.samples == 3
+        assert stats.maximum == 1.0
+
+    def test_sampler_sync_skips_history_before_polled_samples(self):
+        """Test that attaching a logger does not replay older records."""
+        self.mock_client.execute_command.return_value = _result(
+            f"{MARKER} 4242\n{RECORD_1}\n{RECORD_2}\n{RECORD_3}\n{MARKER} end"
+        )
+        sampler = TelemetrySampler(self.mock_client)
+        sampler.record({"throttled": 0.0}, 1700000003.0)
+        sampler.use_remote_log(self.logger)
+
+        assert sampler.sync() == 1
+        stats = sampler.query("throttled", 60, now=1700000010.0)
+        assert stats.samples == 2
+        assert stats.maximum == 0.0
@@ -1,15 +1,19 @@
 """Tests for CommandQueueTools."""
 
 from datetime import datetime
+from unittest.mock import AsyncMock
 from unittest.mock import MagicMock
-from unittest.mock import patch
 
 import pytest
 
+from retromcp.application.queue_executor import QueueExecutor
+from retromcp.application.queue_executor import RunState
 from retromcp.domain.models import CommandResult
 from retromcp.domain.models import CommandQueue
 from retromcp.domain.models import CommandStatus
 from retromcp.domain.models import QueuedCommand
+from retromcp.infrastructure.gzip_output_store import GzipOutputStore
+from retromcp.infrastructure.persistent_queue_storage import PersistentQueueStorage
 from retromcp.tools.command_queue import CommandQueueTools
 
 
@@ -17,26 +21,22 @@ class TestCommandQueueTools:
     """Test CommandQueueTools functionality."""
 
     @pytest.fixture
-    def mock_container(self):
-        """Create a mock container."""
+    def mock_container(self, tmp_path):
+        """Create a mock container with queue storage in a temp directory."""
         container = MagicMock()
         container.retropie_client = MagicMock()
         container.retropie_client.execute_command = MagicMock()
+        container.command_queue_storage = PersistentQueueStorage(
+            str(tmp_path / "command_queues.json")
+        )
+        container.command_output_store = GzipOutputStore(str(tmp_path / "outputs"))
+        container.queue_executor = QueueExecutor(
+            container.retropie_client,
+            container.command_queue_storage,
+            outputs=container.command_output_store,
+        )
         return container
 
-    @pytest.fixture(autouse=True)
-    def setup_teardown(self):
-        """Setup and teardown for each test."""
-        import os
-        # Clean up persistent storage before each test
-        storage_path = os.path.expanduser("~/.retromcp/command_queues.json")
-        if os.path.exists(storage_path):
-            os.remove(storage_path)
-        yield
-        # Clean up after each test
-        if os.path.exists(storage_path):
-            os.remove(storage_path)
-
     @pytest.fixture
     def queue_tools(self, mock_container):
         """Create CommandQueueTools instance."""
@@ -59,6 +59,7 @@ class TestCommandQueueTools:
             "status",
             "cancel",
             "skip",
+            "output",
         ]
 
     def test_create_queue_empty(self, queue_tools):
@@ -333,6 +334,23 @@ class TestCommandQueueTools:
         assert "Added 2 commands to queue" in text
         assert "Total commands: 3" in text
 
+    def test_execute_next_does_not_run_blocked_dependents(
+        self, queue_tools, mock_container
+    ):
+        """Test that execute_next keeps commands behind a failed dependency."""
+        queue = CommandQueue(id="q1", name="Test")
+        broken = queue.add_command("false", "Broken")
+        queue.add_command("echo after", "After", depends_on=["q1_0"])
+        broken.status = CommandStatus.FAILED
+        mock_container.command_queue_storage.create_queue("q1", queue)
+
+        result = queue_tools.manage_command_queue(
+            {"action": "execute_next", "queue_id": "q1"}
+        )
+
+        assert "Queue is blocked: 1 pending commands" in result[0].text
+        mock_container.retropie_client.execute_command.assert_not_called()
+
     def test_execute_all_without_auto_execute(self, queue_tools):
         """Test execute_all requires auto_execute or force."""
         queue_tools.manage_command_queue(
@@ -349,9 +367,9 @@ class TestCommandQueueTools:
         assert "was not created with auto_execute=true" in result[0].text
         assert "force=true" in result[0].text
 
-    @patch("time.sleep")
-    def test_execute_all_with_force(self, mock_sleep, queue_tools, mock_container):
-        """Test execute_all with force flag."""
+    @pytest.mark.asyncio
+    async def test_execute_all_with_force(self, queue_tools, mock_container):
+        """Test execute_all with force flag runs in the background."""
         queue_tools.manage_command_queue(
             {
                 "action": "create",
@@ -359,7 +377,7 @@ class TestCommandQueueTools:
                     {"command": "echo '1'", "description": "First"},
                     {"command": "echo '2'", "description": "Second"},
                 ],
-                "pause_between": 1,
+                "pause_between": 0,
             }
         )
 
@@ -377,11 +395,70 @@ class TestCommandQueueTools:
         )
 
         text = result[0].text
-        assert "All 2 commands executed successfully" in text
+        assert "Started background run" in text
+        run_id = text.split("Started background run ")[1].split()[0]
+
+        run = await mock_container.queue_executor.wait(run_id)
+
+        assert run.state is RunState.COMPLETED
         assert mock_container.retropie_client.execute_command.call_count == 2
-        mock_sleep.assert_called_once_with(1)
+        status = queue_tools.manage_command_queue(
+            {"action": "status", "run_id": run_id}
+        )[0].text
+        assert f"Run {run_id}: completed, 2/2 commands executed" in status
+        assert "Progress: 2/2 commands" in status
+
+    @pytest.mark.asyncio
+    async def test_execute_all_sends_no_progress_after_returning(
+        self, queue_tools, mock_container
+    ):
+        """Test that the run does not notify with the finished request's token."""
+        lowlevel = pytest.importorskip("mcp.server.lowlevel.server")
+        if not hasattr(lowlevel, "request_ctx"):
+            pytest.skip("mcp version without a request context variable")
+        from mcp.shared.context import RequestContext
+        from mcp.types import RequestParams
 
-    def test_execute_all_stops_on_failure(self, queue_tools, mock_container):
+        queue_tools.manage_command_queue(
+            {
+                "action": "create",
+                "commands": [{"command": "echo '1'", "description": "First"}],
+                "pause_between": 0,
+                "auto_execute": True,
+            }
+        )
+        mock_container.retropie_client.execute_command.return_value = CommandResult(
+            command="echo '1'",
+            exit_code=0,
+            stdout="1",
+            stderr="",
+            success=True,
+            execution_time=0.1,
+        )
+        session = MagicMock()
+        session.send_progress_notification = AsyncMock()
+        context = RequestContext(
+            request_id=1,
+            meta=RequestParams.Meta(progressToken="token"),
+            session=session,
+            lifespan_context=None,
+        )
+
+        reset = lowlevel.request_ctx.set(context)
+        try:
+            result = await queue_tools.handle_tool_call(
+                "manage_command_queue", {"action": "execute_all", "queue_id": "q1"}
+            )
+        finally:
+            lowlevel.request_ctx.reset(reset)
+        run_id = result[0].text.split("Started background run ")[1].split()[0]
+        run = await mock_container.queue_executor.wait(run_id)
+
+        assert run.state is RunState.COMPLETED
+        session.send_progress_notification.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_execute_all_stops_on_failure(self, queue_tools, mock_container):
         """Test execute_all stops when a command fails."""
         queue_tools.manage_command_queue(
             {
@@ -392,6 +469,7 @@ class TestCommandQueueTools:
                     {"command": "echo '3'", "description": "Should not run"},
                 ],
                 "auto_execute": True,
+                "pause_between": 0,
             }
         )
 
@@ -419,9 +497,155 @@ class TestCommandQueueTools:
             {"action": "execute_all", "queue_id": "q1"}
         )
 
-        text = result[0].text
-        assert "Execution stopped after 2 commands due to failure" in text
+        run_id = result[0].text.split("Started background run ")[1].split()[0]
+        run = await mock_container.queue_executor.wait(run_id)
+
+        assert run.state is RunState.FAILED
+        assert run.executed == 2
+        assert "Fail" in run.message
         assert mock_container.retropie_client.execute_command.call_count == 2
+        queue = mock_container.command_queue_storage.get_queue("q1")
+        assert [cmd.status for cmd in queue.commands] == [
+            CommandStatus.COMPLETED,
+            CommandStatus.FAILED,
+            CommandStatus.PENDING,
+        ]
+
+    @pytest.mark.asyncio
+    async def test_execute_all_parallel_follows_dependencies(
+        self, queue_tools, mock_container
+    ):
+        """Test execute_all with max_parallel runs steps after their dependencies."""
+        result = queue_tools.manage_command_queue(
+            {
+                "action": "create",
+                "commands": [
+                    {"command": "docker stop a", "description": "Stop A"},
+                    {"command": "docker stop b", "description": "Stop B"},
+                    {
+                        "command": "docker system prune -f",
+                        "description": "Prune",
+                        "depends_on": [1, 2],
+                    },
+                ],
+            }
+        )
+        assert "After: 1, 2" in result[0].text
+
+        order = []
+
+        def execute(command):
+            order.append(command)
+            return CommandResult(
+                command=command,
+                exit_code=0,
+                stdout="",
+                stderr="",
+                success=True,
+                execution_time=0.1,
+            )
+
+        mock_container.retropie_client.execute_command.side_effect = execute
+
+        result = queue_tools.manage_command_queue(
+            {
+                "action": "execute_all",
+                "queue_id": "q1",
+                "force": True,
+                "max_parallel": 2,
+            }
+        )
+        run_id = result[0].text.split("Started background run ")[1].split()[0]
+        run = await mock_container.queue_executor.wait(run_id)
+
+        assert run.state is RunState.COMPLETED
+        assert sorted(order[:2]) == ["docker stop a", "docker stop b"]
+        assert order[2] == "docker system prune -f"
+        assert mock_container.command_queue_storage.get_queue("q1").current_index == 3
+
+    def test_dependencies_must_be_earlier_steps(self, queue_tools):
+        """Test that depends_on rejects later or unknown steps."""
+        result = queue_tools.manage_command_queue(
+            {
+                "action": "create",
+                "commands": [
+                    {"command": "echo 1", "description": "First", "depends_on": [2]},
+                    {"command": "echo 2", "description": "Second"},
+                ],
+            }
+        )
+        assert "can only depend on earlier steps" in result[0].text
+        assert queue_tools._storage.list_queues() == []
+
+        queue_tools.manage_command_queue(
+            {
+                "action": "create",
+                "commands": [{"command": "echo 1", "description": "First"}],
+            }
+        )
+        queue_tools.manage_command_queue(
+            {
+                "action": "add",
+                "queue_id": "q1",
+                "commands": [
+                    {"command": "echo 2", "description": "Second", "depends_on": [1]}
+                ],
+            }
+        )
+        queue = queue_tools._storage.get_queue("q1")
+        assert queue.commands[1].depends_on == ["q1_0"]
+
+    def test_long_output_is_spilled_and_fetched_in_ranges(
+        self, queue_tools, mock_container
+    ):
+        """Test that long output stays out of the queue and can be paged."""
+        queue_tools.manage_command_queue(
+            {
+                "action": "create",
+                "commands": [{"command": "apt-get upgrade", "description": "Upgrade"}],
+            }
+        )
+        stdout = "".join(f"Unpacking package-{i} ...\n" for i in range(5000))
+        mock_container.retropie_client.execute_command.return_value = CommandResult(
+            command="apt-get upgrade",
+            exit_code=0,
+            stdout=stdout,
+            stderr="",
+            success=True,
+            execution_time=30.0,
+        )
+
+        result = queue_tools.manage_command_queue(
+            {"action": "execute_next", "queue_id": "q1"}
+        )
+
+        assert "Unpacking package-0 ..." in result[0].text
+        assert "Unpacking package-4999 ..." in result[0].text
+        assert "Unpacking package-2500 ..." not in result[0].text
+        saved = mock_container.command_queue_storage.get_queue("q1").commands[0]
+        output_id = saved.result["stdout_output_id"]
+        assert saved.result["stdout_bytes"] == len(stdout)
+        assert len(saved.result["stdout"]) < 10 * 1024
+        assert "stderr_output_id" not in saved.result
+
+        status = queue_tools.manage_command_queue(
+            {"action": "status", "queue_id": "q1"}
+        )
+        assert f"Full stdout: {output_id} ({len(stdout)} bytes)" in status[0].text
+
+        offset = stdout.index("Unpacking package-2500")
+        page = queue_tools.manage_command_queue(
+            {"action": "output", "output_id": output_id, "offset": offset, "length": 27}
+        )
+        assert page[0].text == (
+            f"Output {output_id}: bytes {offset}-{offset + 27} of {len(stdout)}"
+            f" (continue with offset={offset + 27})\n\nUnpacking package-2500 ...\n"
+        )
+
+        missing = queue_tools.manage_command_queue(
+            {"action": "output", "output_id": "../../etc/passwd"}
+        )
+        assert "Invalid output ID" in missing[0].text
 
     def test_queue_not_found(self, queue_tools):
         """Test operations on non-existent queue."""
@@ -525,6 +749,12 @@ class TestCommandQueue:
         assert cmd2.id == "q1_1"
         assert len(queue.commands) == 2
 
+        cmd3 = queue.add_command("echo '3'", "Third", depends_on=["q1_0"])
+        assert cmd3.depends_on == ["q1_0"]
+        with pytest.raises(ValueError, match="q1_9"):
+            queue.add_command("echo '4'", "Fourth", depends_on=["q1_9"])
+        assert len(queue.commands) == 3
+
     def test_get_current(self):
         """Test getting current command."""
         queue = CommandQueue(id="q1", name="Test")
@@ -572,6 +802,30 @@ class TestCommandQueue:
         cmd3.status = CommandStatus.COMPLETED
         assert queue.get_next_pending() is None
 
+    def test_get_ready_and_advance(self):
+        """Test dependency readiness and moving past finished commands."""
+        queue = CommandQueue(id="q1", name="Test")
+        first = queue.add_command("echo '1'", "First")
+        second = queue.add_command("echo '2'", "Second")
+        third = queue.add_command("echo '3'", "Third", depends_on=["q1_0", "q1_1"])
+        fourth = queue.add_command("echo '4'", "Fourth", depends_on=["q1_0"])
+
+        assert queue.get_ready() == [first, second]
+
+        first.status = CommandStatus.FAILED
+        second.status = CommandStatus.COMPLETED
+        queue.advance()
+        assert queue.current_index == 0
+        assert queue.get_ready() == []
+
+        assert queue.get_next_pending() is None
+        assert queue.get_blocked() == [third, fourth]
+
+        first.status = CommandStatus.SKIPPED
+        assert queue.get_ready() == [third, fourth]
+        queue.advance()
+        assert queue.current_index == 2
+
     def test_queue_to_dict(self):
         """Test converting queue to dictionary."""
         queue = CommandQueue(
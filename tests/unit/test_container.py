@@ -1,14 +1,23 @@
 """Unit tests for dependency injection container."""
 
+import time
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import Mock
 from unittest.mock import patch
 
 import pytest
 
+from retromcp.application.queue_executor import QueueExecutor
+from retromcp.application.state_use_cases import ManageStateUseCase
 from retromcp.config import RetroPieConfig
 from retromcp.container import Container
 from retromcp.discovery import RetroPiePaths
 from retromcp.domain.ports import RetroPieClient
+from retromcp.infrastructure.game_aware_scheduler import GameAwareScheduler
+from retromcp.infrastructure.persistent_queue_storage import PersistentQueueStorage
+from retromcp.infrastructure.sqlite_queue_storage import SQLiteQueueStorage
+from retromcp.infrastructure.ssh_controller_repository import SSHControllerRepository
+from retromcp.infrastructure.telemetry import TelemetrySampler
 from retromcp.ssh_handler import RetroPieSSH
 
 
@@ -67,6 +76,50 @@ class TestContainer:
         assert result == mock_instance
         factory.assert_not_called()
 
+    def test_get_or_create_concurrent_callers_share_instance(
+        self, container: Container
+    ):
+        """Test that racing callers run the factory once."""
+        calls = []
+
+        def factory():
+            calls.append(1)
+            time.sleep(0.05)
+            return object()
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(
+                executor.map(
+                    lambda _: container._get_or_create("shared", factory), range(4)
+                )
+            )
+
+        assert len(calls) == 1
+        assert all(result is results[0] for result in results)
+
+    def test_command_queue_storage_property(self, container: Container, tmp_path):
+        """Test that queue storage is one shared instance per selected backend."""
+        with patch("retromcp.container.Path.home", return_value=tmp_path):
+            storage = container.command_queue_storage
+            assert isinstance(storage, PersistentQueueStorage)
+            assert container.command_queue_storage is storage
+            assert storage.storage_path == str(
+                tmp_path / ".retromcp" / "command_queues.json"
+            )
+
+            with patch.dict("os.environ", {"RETROMCP_QUEUE_STORAGE": "sqlite"}):
+                sqlite_storage = Container(container.config).command_queue_storage
+            assert isinstance(sqlite_storage, SQLiteQueueStorage)
+            sqlite_storage.close()
+
+    def test_command_output_store_property(self, container: Container, tmp_path):
+        """Test that the output store lives next to queue storage."""
+        with patch("retromcp.container.Path.home", return_value=tmp_path):
+            store = container.command_output_store
+
+        assert container.command_output_store is store
+        assert store.directory == tmp_path / ".retromcp" / "outputs"
+
     @patch("retromcp.container.RetroPieDiscovery")
     def test_ensure_discovery_success(
         self, mock_discovery_class: Mock, container: Container
@@ -228,6 +281,30 @@ class TestContainer:
         # Assert
         mock_client.disconnect.assert_called_once()
 
+    def test_disconnect_stops_background_components(self, container: Container):
+        """Test disconnect stops every background component it created."""
+        # Arrange
+        components = {
+            "retropie_client": Mock(spec=RetroPieClient),
+            "telemetry_sampler": Mock(spec=TelemetrySampler),
+            "controller_repository": Mock(spec=SSHControllerRepository),
+            "manage_state_use_case": Mock(spec=ManageStateUseCase),
+            "game_scheduler": Mock(spec=GameAwareScheduler),
+            "queue_executor": Mock(spec=QueueExecutor),
+        }
+        container._instances.update(components)
+
+        # Act
+        container.disconnect()
+
+        # Assert
+        components["telemetry_sampler"].stop.assert_called_once()
+        components["controller_repository"].stop_hotplug_watch.assert_called_once()
+        components["manage_state_use_case"].stop.assert_called_once()
+        components["game_scheduler"].stop.assert_called_once()
+        components["queue_executor"].cancel_all.assert_called_once()
+        components["retropie_client"].disconnect.assert_called_once()
+
     def test_disconnect_without_client(self, container: Container):
         """Test disconnect when no client exists."""
         # Act (should not raise exception)
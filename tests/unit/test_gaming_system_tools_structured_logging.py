@@ -285,3 +285,33 @@ class TestGamingSystemToolsStructuredLogging:
 
         assert "Controller detection failed" in error_call[0][0]
         assert error_call[1]["category"] == ErrorCategory.SYSTEM_ERROR
+
+    @pytest.mark.asyncio
+    async def test_bios_check_reports_checksum_status(
+        self, gaming_system_tools: GamingSystemTools, mock_container: Mock
+    ) -> None:
+        """Test that the bios component runs checksum verification."""
+        from retromcp.domain.models import BiosFile
+        from retromcp.domain.models import Result
+
+        mock_container.check_bios_use_case.execute.return_value = Result.success(
+            [
+                BiosFile(
+                    name="scph1001.bin",
+                    path="/home/retro/RetroPie/BIOS/scph1001.bin",
+                    system="psx",
+                    required=True,
+                    present=True,
+                    checksum="0" * 32,
+                    checksum_valid=False,
+                )
+            ]
+        )
+
+        result = await gaming_system_tools.handle_tool_call(
+            "manage_gaming", {"component": "bios", "action": "check", "target": "psx"}
+        )
+
+        mock_container.check_bios_use_case.execute.assert_called_once_with("psx", True)
+        assert "scph1001.bin** (psx): ❌ checksum mismatch" in result[0].text
+        assert "1 file(s) do not match" in result[0].text
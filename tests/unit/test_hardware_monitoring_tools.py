@@ -0,0 +1,91 @@
+"""Unit tests for HardwareMonitoringTools overview checks."""
+
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from retromcp.domain.models import CommandResult
+from retromcp.infrastructure.system_log_reader import SystemLogReader
+from retromcp.tools.hardware_monitoring_tools import HardwareMonitoringTools
+
+
+def _result(command: str, stdout: str) -> CommandResult:
+    return CommandResult(
+        command=command,
+        exit_code=0,
+        stdout=stdout,
+        stderr="",
+        success=True,
+        execution_time=0.1,
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.tools
+@pytest.mark.hardware_tools
+class TestHardwareOverview:
+    """Test concurrent sub-checks of manage_hardware component=all."""
+
+    def setup_method(self):
+        """Set up tools over a mock client with per-command delays."""
+        self.delays = {}
+        self.release = threading.Event()
+        self.mock_container = Mock()
+        self.mock_container.retropie_client.execute_command.side_effect = self._execute
+        self.mock_container.system_log_reader = SystemLogReader(
+            self.mock_container.retropie_client
+        )
+        self.tools = HardwareMonitoringTools(self.mock_container)
+
+    def teardown_method(self):
+        """Let blocked background commands finish."""
+        self.release.set()
+
+    def _execute(self, command: str) -> CommandResult:
+        for fragment, delay in self.delays.items():
+            if fragment in command:
+                if delay is None:
+                    self.release.wait(timeout=5)
+                else:
+                    time.sleep(delay)
+        if command == "vcgencmd measure_temp":
+            return _result(command, "temp=52.0'C")
+        if command == "vcgencmd get_throttled":
+            return _result(command, "throttled=0x0")
+        return _result(command, "")
+
+    @pytest.mark.asyncio
+    async def test_components_run_concurrently(self):
+        """Test that slow components overlap instead of adding up."""
+        self.delays = {"measure_temp": 0.5, "dmesg": 0.5}
+
+        start = time.monotonic()
+        result = await self.tools.handle_tool_call(
+            "manage_hardware", {"component": "all", "action": "check"}
+        )
+        elapsed = time.monotonic() - start
+
+        text = result[0].text
+        assert "## Temperature" in text
+        assert "52.0°C" in text
+        assert "## Power" in text
+        assert "No hardware errors detected" in text
+        # Sequential runs take at least 1s
+        assert elapsed < 0.9
+
+    @pytest.mark.asyncio
+    async def test_component_missing_deadline_is_marked_timed_out(self):
+        """Test that a hung component does not fail the overview."""
+        self.delays = {"journalctl": None}
+        self.tools.all_hardware_timeout = 0.2
+
+        result = await self.tools.handle_tool_call(
+            "manage_hardware", {"component": "all", "action": "check"}
+        )
+
+        text = result[0].text
+        assert text.startswith("🖥️ **Hardware System Overview**")
+        assert "52.0°C" in text
+        assert "## Errors\n⏱️ Timed out after 0.2s" in text
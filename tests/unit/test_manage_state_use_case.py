@@ -1,5 +1,8 @@
 """Unit tests for ManageStateUseCase."""
 
+import threading
+import time
+from dataclasses import replace
 from datetime import datetime
 from unittest.mock import Mock
 
@@ -7,9 +10,15 @@ import pytest
 
 from retromcp.application.use_cases import ManageStateUseCase
 from retromcp.domain.models import EmulatorStatus
+from retromcp.domain.models import ExecutionError
+from retromcp.domain.models import Result
 from retromcp.domain.models import StateAction
 from retromcp.domain.models import StateManagementRequest
 from retromcp.domain.models import StateManagementResult
+from retromcp.domain.models import StateSnapshot
+from retromcp.domain.models import SystemInfo
+from retromcp.domain.models import SystemInventory
+from retromcp.domain.models import SystemNote
 from retromcp.domain.models import SystemState
 
 
@@ -341,3 +350,337 @@ class TestManageStateUseCase:
         error = result.error_value
         assert error.code == "UNKNOWN_ACTION"
         assert "Unknown action" in error.message
+
+    @staticmethod
+    def _system_info() -> SystemInfo:
+        return SystemInfo(
+            hostname="retropie",
+            cpu_temperature=50.0,
+            memory_total=4096,
+            memory_used=2048,
+            memory_free=2048,
+            disk_total=32000,
+            disk_used=16000,
+            disk_free=16000,
+            load_average=[0.1, 0.2, 0.3],
+            uptime=3600,
+        )
+
+    def test_save_state_collects_sections_concurrently(
+        self,
+        mock_state_repository: Mock,
+        mock_system_repository: Mock,
+        mock_emulator_repository: Mock,
+        mock_controller_repository: Mock,
+    ) -> None:
+        """Test that slow sections overlap instead of running in sequence."""
+
+        def slow(value):
+            def collect():
+                time.sleep(0.2)
+                return value
+
+            return collect
+
+        mock_system_repository.get_system_info.side_effect = slow(self._system_info())
+        mock_emulator_repository.get_emulators.side_effect = slow([])
+        mock_controller_repository.detect_controllers.side_effect = slow([])
+        mock_emulator_repository.get_rom_directories.side_effect = slow([])
+        use_case = ManageStateUseCase(
+            state_repository=mock_state_repository,
+            system_repository=mock_system_repository,
+            emulator_repository=mock_emulator_repository,
+            controller_repository=mock_controller_repository,
+        )
+
+        start = time.monotonic()
+        result = use_case.execute(StateManagementRequest(action=StateAction.SAVE))
+        elapsed = time.monotonic() - start
+
+        assert result.is_success()
+        assert elapsed < 0.6
+        saved_state = mock_state_repository.save_state.call_args[0][0]
+        assert saved_state.system["hostname"] == "retropie"
+        assert saved_state.known_issues == []
+
+    def test_save_state_returns_partial_state_when_section_times_out(
+        self,
+        mock_state_repository: Mock,
+        mock_system_repository: Mock,
+        mock_emulator_repository: Mock,
+        mock_controller_repository: Mock,
+    ) -> None:
+        """Test that a hung section is annotated instead of blocking the save."""
+        release = threading.Event()
+
+        def hang():
+            release.wait(timeout=5)
+            return []
+
+        mock_system_repository.get_system_info.return_value = self._system_info()
+        mock_emulator_repository.get_emulators.return_value = []
+        mock_controller_repository.detect_controllers.side_effect = hang
+        mock_rom_dir = Mock()
+        mock_rom_dir.system = "nes"
+        mock_rom_dir.rom_count = 150
+        mock_emulator_repository.get_rom_directories.return_value = [mock_rom_dir]
+        use_case = ManageStateUseCase(
+            state_repository=mock_state_repository,
+            system_repository=mock_system_repository,
+            emulator_repository=mock_emulator_repository,
+            controller_repository=mock_controller_repository,
+            max_workers=2,
+            section_timeout=0.2,
+        )
+
+        try:
+            result = use_case.execute(StateManagementRequest(action=StateAction.SAVE))
+        finally:
+            release.set()
+
+        assert result.is_success()
+        saved_state = mock_state_repository.save_state.call_args[0][0]
+        assert saved_state.controllers == []
+        assert saved_state.roms["counts"] == {"nes": 150}
+        assert saved_state.system["hostname"] == "retropie"
+        assert len(saved_state.known_issues) == 1
+        assert "'controllers' timed out" in saved_state.known_issues[0]
+
+    def test_save_state_populates_v2_sections_from_inventory(
+        self,
+        use_case: ManageStateUseCase,
+        mock_state_repository: Mock,
+        mock_system_repository: Mock,
+        mock_emulator_repository: Mock,
+        mock_controller_repository: Mock,
+    ) -> None:
+        """Test that hardware, network, software and services are saved."""
+        inventory = SystemInventory(
+            hardware=Mock(),
+            network=[Mock()],
+            software=Mock(),
+            services=[Mock()],
+        )
+        mock_system_repository.get_system_info.return_value = self._system_info()
+        mock_system_repository.get_system_inventory.return_value = Result.success(
+            inventory
+        )
+        mock_emulator_repository.get_emulators.return_value = []
+        mock_emulator_repository.get_rom_directories.return_value = []
+        mock_controller_repository.detect_controllers.return_value = []
+        mock_state_repository.load_state.return_value = SystemState(
+            schema_version="2.0",
+            last_updated=datetime.now().isoformat(),
+            system={},
+            emulators={},
+            controllers=[],
+            roms={},
+            custom_configs=[],
+            known_issues=[],
+            notes=[
+                SystemNote(
+                    date="2026-01-01",
+                    action="overclock",
+                    description="Set arm_freq=2000",
+                    user="pi",
+                )
+            ],
+        )
+
+        result = use_case.execute(StateManagementRequest(action=StateAction.SAVE))
+
+        assert result.is_success()
+        mock_system_repository.get_system_inventory.assert_called_once()
+        saved_state = mock_state_repository.save_state.call_args[0][0]
+        assert saved_state.hardware is inventory.hardware
+        assert saved_state.network == inventory.network
+        assert saved_state.software is inventory.software
+        assert saved_state.services == inventory.services
+        assert saved_state.notes[0].action == "overclock"
+        assert saved_state.known_issues == []
+
+    def test_save_state_records_inventory_failure(
+        self,
+        use_case: ManageStateUseCase,
+        mock_state_repository: Mock,
+        mock_system_repository: Mock,
+        mock_emulator_repository: Mock,
+        mock_controller_repository: Mock,
+    ) -> None:
+        """Test that a failed inventory leaves v2.0 sections empty and noted."""
+        mock_system_repository.get_system_info.return_value = self._system_info()
+        mock_system_repository.get_system_inventory.return_value = Result.error(
+            ExecutionError(
+                code="INVENTORY_FAILED",
+                message="Connection reset",
+                command="inventory",
+                exit_code=255,
+                stderr="Connection reset",
+            )
+        )
+        mock_emulator_repository.get_emulators.return_value = []
+        mock_emulator_repository.get_rom_directories.return_value = []
+        mock_controller_repository.detect_controllers.return_value = []
+        mock_state_repository.load_state.side_effect = FileNotFoundError()
+
+        result = use_case.execute(StateManagementRequest(action=StateAction.SAVE))
+
+        assert result.is_success()
+        saved_state = mock_state_repository.save_state.call_args[0][0]
+        assert saved_state.hardware is None
+        assert saved_state.services is None
+        assert saved_state.known_issues == [
+            "Inventory collection failed: Connection reset"
+        ]
+
+    def test_diff_between_points_in_history(
+        self,
+        use_case: ManageStateUseCase,
+        mock_state_repository: Mock,
+        sample_state: SystemState,
+    ) -> None:
+        """Test that diff with since/until compares two saved states."""
+        later_state = replace(sample_state, last_updated="2026-05-02T00:00:00")
+        mock_state_repository.load_state_at.side_effect = [sample_state, later_state]
+        mock_state_repository.compare_state.return_value = {
+            "added": {},
+            "changed": {"/roms/counts/nes": {"old": 150, "new": 151}},
+            "removed": {},
+        }
+
+        result = use_case.execute(
+            StateManagementRequest(
+                action=StateAction.DIFF,
+                since="2026-05-01T00:00:00",
+                until="2026-05-02T00:00:00",
+            )
+        )
+
+        assert result.is_success()
+        assert result.value.diff["changed"]["/roms/counts/nes"]["new"] == 151
+        mock_state_repository.compare_state.assert_called_once_with(
+            later_state, sample_state
+        )
+
+    def test_diff_requires_other_state_or_since(
+        self, use_case: ManageStateUseCase
+    ) -> None:
+        """Test that diff without a target is rejected."""
+        result = use_case.execute(StateManagementRequest(action=StateAction.DIFF))
+
+        assert result.is_error()
+        assert result.error_value.code == "MISSING_DIFF_PARAMS"
+
+    def test_history_lists_saved_states(
+        self, use_case: ManageStateUseCase, mock_state_repository: Mock
+    ) -> None:
+        """Test that history returns entries in the requested range."""
+        snapshots = [
+            StateSnapshot(
+                sequence=0, timestamp="2026-05-01T00:00:00", full=True, size=900
+            ),
+            StateSnapshot(
+                sequence=1, timestamp="2026-05-01T06:00:00", full=False, size=120
+            ),
+        ]
+        mock_state_repository.list_history.return_value = snapshots
+
+        result = use_case.execute(
+            StateManagementRequest(action=StateAction.HISTORY, since="2026-05-01")
+        )
+
+        assert result.is_success()
+        assert result.value.history == snapshots
+        mock_state_repository.list_history.assert_called_once_with("2026-05-01", None)
+
+    def test_history_rejects_invalid_timestamp(
+        self, use_case: ManageStateUseCase, mock_state_repository: Mock
+    ) -> None:
+        """Test that malformed range bounds are validation errors."""
+        mock_state_repository.list_history.side_effect = ValueError(
+            "Invalid timestamp: yesterday"
+        )
+
+        result = use_case.execute(
+            StateManagementRequest(action=StateAction.HISTORY, since="yesterday")
+        )
+
+        assert result.is_error()
+        assert result.error_value.code == "INVALID_TIMESTAMP"
+
+    def test_watch_samples_only_the_watched_section(
+        self,
+        mock_state_repository: Mock,
+        mock_system_repository: Mock,
+        mock_emulator_repository: Mock,
+        mock_controller_repository: Mock,
+    ) -> None:
+        """Test that watch scans the path's source once and then reads changes."""
+        mock_system_repository.get_system_info.return_value = self._system_info()
+        use_case = ManageStateUseCase(
+            state_repository=mock_state_repository,
+            system_repository=mock_system_repository,
+            emulator_repository=mock_emulator_repository,
+            controller_repository=mock_controller_repository,
+            watch_interval=3600,
+        )
+        request = StateManagementRequest(
+            action=StateAction.WATCH, path="system.cpu_temperature"
+        )
+
+        try:
+            started = use_case.execute(request)
+            mock_system_repository.get_system_info.return_value = replace(
+                self._system_info(), cpu_temperature=71.0
+            )
+            use_case._watcher.sample_now()
+            polled = use_case.execute(request)
+        finally:
+            use_case._watcher.stop()
+
+        assert started.is_success()
+        assert started.value.watch_value == 50.0
+        assert polled.value.watch_value == 71.0
+        assert [(c.old_value, c.new_value) for c in polled.value.changes] == [
+            (50.0, 71.0)
+        ]
+        # Initial scan plus one sample; polling itself needs no scan
+        assert mock_system_repository.get_system_info.call_count == 2
+        mock_emulator_repository.get_emulators.assert_not_called()
+        mock_controller_repository.detect_controllers.assert_not_called()
+        mock_system_repository.get_system_inventory.assert_not_called()
+
+    def test_watch_rejects_unknown_paths(
+        self, use_case: ManageStateUseCase, mock_system_repository: Mock
+    ) -> None:
+        """Test that unwatchable or missing paths are validation errors."""
+        mock_system_repository.get_system_info.return_value = self._system_info()
+
+        unknown_field = use_case.execute(
+            StateManagementRequest(action=StateAction.WATCH, path="notes.0")
+        )
+        missing_key = use_case.execute(
+            StateManagementRequest(action=StateAction.WATCH, path="system.bogus")
+        )
+
+        assert unknown_field.error_value.code == "INVALID_WATCH_PATH"
+        assert missing_key.error_value.code == "INVALID_WATCH_PATH"
+
+    def test_unwatch_stops_watch(
+        self, use_case: ManageStateUseCase, mock_system_repository: Mock
+    ) -> None:
+        """Test that unwatch removes a watch and rejects unknown paths."""
+        mock_system_repository.get_system_info.return_value = self._system_info()
+        use_case.execute(
+            StateManagementRequest(action=StateAction.WATCH, path="system.hostname")
+        )
+
+        stopped = use_case.execute(
+            StateManagementRequest(action=StateAction.UNWATCH, path="system.hostname")
+        )
+        again = use_case.execute(
+            StateManagementRequest(action=StateAction.UNWATCH, path="system.hostname")
+        )
+
+        assert stopped.is_success()
+        assert again.error_value.code == "NOT_WATCHED"
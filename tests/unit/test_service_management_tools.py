@@ -181,6 +181,30 @@ class TestServiceManagementTools:
         service_tools.container.retropie_client.execute_command.assert_called_once_with(
             "sudo systemctl restart ssh"
         )
+        service_tools.container.system_cache.invalidate_service_status.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_status_service_keeps_cached_inventory(
+        self, service_tools: ServiceManagementTools
+    ) -> None:
+        """Test that a read-only status action does not invalidate the cache."""
+        service_tools.container.retropie_client.execute_command.return_value = (
+            CommandResult(
+                command="systemctl status ssh --no-pager",
+                exit_code=0,
+                stdout="active (running)",
+                stderr="",
+                success=True,
+                execution_time=0.1,
+            )
+        )
+
+        await service_tools.handle_tool_call(
+            "manage_service",
+            {"action": "status", "name": "ssh"},
+        )
+
+        service_tools.container.system_cache.invalidate_service_status.assert_not_called()
 
     # Service Enable Operation Tests
 
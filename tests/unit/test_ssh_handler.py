@@ -187,6 +187,23 @@ class TestSSHHandler:
         with pytest.raises(paramiko.SSHException, match="SSH error"):
             ssh_handler.execute_command("ls")
 
+    def test_stream_command_closes_channel(self, ssh_handler: SSHHandler) -> None:
+        """Test streaming on a pty and closing the channel from the stream."""
+        mock_client = Mock()
+        mock_stdout = Mock()
+        mock_stdout.__iter__ = Mock(return_value=iter(["one\r\n", "two\n"]))
+        mock_client.exec_command.return_value = (Mock(), mock_stdout, Mock())
+        ssh_handler.client = mock_client
+
+        stream = ssh_handler.stream_command("udevadm monitor", pty=True)
+        stream.close()
+
+        mock_client.exec_command.assert_called_once_with(
+            "udevadm monitor", get_pty=True
+        )
+        mock_stdout.channel.close.assert_called_once()
+        assert list(stream) == ["one", "two"]
+
     def test_test_connection_success(self, ssh_handler: SSHHandler) -> None:
         """Test connection test success."""
         # Set up mock client
@@ -111,9 +111,10 @@ class TestSSHStateRepository:
         assert result.schema_version == sample_state.schema_version
         assert result.system["hostname"] == "retropie"
         assert result.emulators["installed"] == ["mupen64plus", "pcsx-rearmed"]
-        mock_client.execute_command.assert_called_once_with(
-            "cat /home/retro/.retropie-state.json"
-        )
+        mock_client.execute_command.assert_called_once()
+        command = mock_client.execute_command.call_args[0][0]
+        assert "stat -c '%.9Y %s' /home/retro/.retropie-state.json" in command
+        assert "cat /home/retro/.retropie-state.json" in command
 
     def test_load_state_file_not_found(
         self, repository: SSHStateRepository, mock_client: Mock
@@ -338,9 +339,9 @@ class TestSSHStateRepository:
 
         # Check for expected changes
         changes = diff["changed"]
-        assert "system.hostname" in changes
-        assert changes["system.hostname"]["old"] == "old-retropie"
-        assert changes["system.hostname"]["new"] == "retropie"
+        assert "/system/hostname" in changes
+        assert changes["/system/hostname"]["old"] == "old-retropie"
+        assert changes["/system/hostname"]["new"] == "retropie"
 
     def test_compare_state_no_differences(
         self,
@@ -903,7 +904,7 @@ class TestSSHStateRepositoryEdgeCases:
         assert diff["changed"] == {}
         assert diff["removed"] == {}
         # Everything should be in added since there's no stored state
-        assert "system" in diff["added"]
+        assert "/system" in diff["added"]
 
     def test_validate_path_empty_string(self, repository: SSHStateRepository) -> None:
         """Test path validation with empty string (line 231)."""
@@ -1151,6 +1152,6 @@ class TestSSHStateRepositoryEdgeCases:
         diff = repository.compare_state(current_state)
 
         assert "changed" in diff
-        assert "system.nested.level1.level2" in diff["changed"]
-        assert diff["changed"]["system.nested.level1.level2"]["old"] == "old_value"
-        assert diff["changed"]["system.nested.level1.level2"]["new"] == "new_value"
+        assert "/system/nested/level1/level2" in diff["changed"]
+        assert diff["changed"]["/system/nested/level1/level2"]["old"] == "old_value"
+        assert diff["changed"]["/system/nested/level1/level2"]["new"] == "new_value"
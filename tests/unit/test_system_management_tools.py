@@ -32,6 +32,7 @@ class TestSystemManagementTools:
         mock.test_connection_use_case = Mock()
         mock.get_system_info_use_case = Mock()
         mock.update_system_use_case = Mock()
+        mock.check_packages_use_case = Mock()
         mock.system_repository = Mock()
 
         return mock
@@ -205,14 +206,9 @@ class TestSystemManagementTools:
         self, system_management_tools: SystemManagementTools
     ) -> None:
         """Test package verification functionality."""
-        # Mock package check output
-        system_management_tools.container.retropie_client.execute_command.return_value = CommandResult(
-            command="dpkg -l test-package 2>/dev/null | grep '^ii'",
-            exit_code=0,
-            stdout="ii  test-package  1.0  amd64  Test package",
-            stderr="",
-            success=True,
-            execution_time=0.2,
+        # Mock batched package status lookup
+        system_management_tools.container.check_packages_use_case.execute.return_value = Result.success(
+            {"test-package": True}
         )
 
         # Execute package check